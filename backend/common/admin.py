@@ -2,6 +2,8 @@
 ## WoCo Commons - Admin Panel Configuration
 ## Phase 1 model rewrite -- unified Marking, polymorphic Image, Cover* shape.
 ###################################################################################################
+import json
+
 from django.contrib import admin
 from django.contrib.admin.sites import NotRegistered
 from allauth.account.models import EmailAddress
@@ -11,8 +13,6 @@ from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.models import Group
 from django.urls import reverse
 from django.utils.html import format_html
-from django.core.paginator import Paginator
-from django.utils.functional import cached_property
 from django import forms
 from django.contrib import messages
 
@@ -22,6 +22,8 @@ from import_export.widgets import CharWidget, ForeignKeyWidget, Widget
 from django.db.models import CharField as DjangoCharField, TextField as DjangoTextField
 from django.utils.dateparse import parse_datetime
 
+from woco.counts import CountedPaginator
+
 
 class IsoDateTimeWidget(Widget):
     """Accepts ISO 8601 datetimes (with or without microseconds / tz offset) on import,
@@ -75,6 +77,7 @@ from .models import (
     Marking,
     MarkingType,
     MarkingVersion,
+    CoverVersion,
     Image,
     Postcover,
     DateSeen,
@@ -93,6 +96,7 @@ from .models import (
     Contribution,
     FAQEntry,
 )
+from .version_store import version_snapshot
 
 User = get_user_model()
 
@@ -108,16 +112,13 @@ def _collection_assignment_table_available() -> bool:
 
 # ========== BASE ABSTRACT MODELS ==========
 
-class NoCountPaginator(Paginator):
-    @cached_property
-    def count(self):
-        return 10_000_000
-
-
 class TimestampedModelAdmin(ImportExportModelAdmin):
     """Base admin for models using TimestampedModel"""
     readonly_fields = ['created_by', 'created_date', 'modified_by', 'modified_date']
     show_full_result_count = False
+    # Cached exact counts (estimated from table statistics for unfiltered
+    # changelists on large MySQL tables) instead of a COUNT(*) per page view.
+    paginator = CountedPaginator
     list_per_page = 50
     list_max_show_all = 200
 
@@ -442,7 +443,6 @@ class ImageAdmin(TimestampedModelAdmin):
     list_filter = ['subject_type', 'image_view', 'is_tracing']
     search_fields = ['original_filename', 'storage_filename', 'subject_id']
     readonly_fields = ['created_by', 'created_date', 'modified_by', 'modified_date', 'file_checksum']
-    paginator = NoCountPaginator
 
     fieldsets = (
         ('Subject', {
@@ -532,14 +532,34 @@ class CoverMarkingAdmin(TimestampedModelAdmin):
     raw_id_fields = ['cover', 'marking']
 
 
+class RecordVersionAdmin(admin.ModelAdmin):
+    """Version history rows. Delta rows store {} in `snapshot`, so the form
+    shows the snapshot rebuilt by common.version_store instead, plus the
+    stored delta and its keyframe."""
+    list_filter = ['created_at']
+    exclude = ['snapshot']
+    readonly_fields = ['full_snapshot', 'base_version_no', 'delta', 'created_at']
+    ordering = ['-created_at']
+
+    def full_snapshot(self, obj):
+        if obj.pk is None:
+            return '-'
+        return format_html('<pre>{}</pre>', json.dumps(version_snapshot(obj), indent=2, sort_keys=True))
+    full_snapshot.short_description = "Snapshot"
+
+
 @admin.register(MarkingVersion)
-class MarkingVersionAdmin(admin.ModelAdmin):
+class MarkingVersionAdmin(RecordVersionAdmin):
     list_display = ['id', 'marking', 'version_no', 'created_at', 'created_by']
-    list_filter = ['created_at']
     search_fields = ['marking__code']
     raw_id_fields = ['marking', 'transaction']
-    readonly_fields = ['snapshot', 'created_at']
-    ordering = ['-created_at']
+
+
+@admin.register(CoverVersion)
+class CoverVersionAdmin(RecordVersionAdmin):
+    list_display = ['id', 'cover', 'version_no', 'created_at', 'created_by']
+    search_fields = ['cover__code']
+    raw_id_fields = ['cover', 'transaction']
 
 
 # ========== POSTCOVER (DEPRECATED) ADMIN ==========
@@ -0,0 +1,152 @@
+###################################################################################################
+## WoCo Commons - API v2 record changelog
+##
+## Builds the /markings/{id}/changelog/ and /covers/{id}/changelog/ payloads.
+## Events are SubmissionTransaction rows filtered on the record FK alone
+## (transactions logged against a contribution carry its marking once it is
+## approved; see common.audit.link_contribution_transactions), read newest
+## first by id so the (marking, id) / (cover, id) indexes serve filter, order
+## and cursor. Transaction payload bodies are deferred; version rows carry
+## their summary (written by common.audit), so snapshots and deltas are never
+## loaded.
+##
+## Every response is one page:
+##   ?limit=N      at most N events (default CHANGELOG_PAGE_SIZE, capped at
+##                 CHANGELOG_MAX_LIMIT)
+##   ?cursor=ID    events older than event ID (the previous page's next_cursor)
+##   ?since=ID     events newer than event ID (incremental refresh)
+## A page lists only the versions written by its events; next_cursor is null
+## on the last one.
+###################################################################################################
+from django.db.models import F
+from rest_framework import serializers
+
+from common.models import SubmissionTransaction
+
+CHANGELOG_PAGE_SIZE = 50
+CHANGELOG_MAX_LIMIT = 200
+
+APPROVED_ACTIONS = {
+    SubmissionTransaction.ACTION_APPROVE,
+    SubmissionTransaction.ACTION_CATALOG_DIRECT_EDIT,
+    SubmissionTransaction.ACTION_RESTORE_VERSION,
+}
+
+
+def _positive_int(query_params, name):
+    raw = query_params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({name: "Must be an integer."})
+    if value < 0:
+        raise serializers.ValidationError({name: "Must not be negative."})
+    return value
+
+
+def changelog_window(query_params):
+    """(since, cursor, limit) from the query string."""
+    since = _positive_int(query_params, "since")
+    cursor = _positive_int(query_params, "cursor")
+    limit = _positive_int(query_params, "limit")
+    if limit is None:
+        limit = CHANGELOG_PAGE_SIZE
+    return since, cursor, max(1, min(limit, CHANGELOG_MAX_LIMIT))
+
+
+def _user_label(user):
+    if not user:
+        return None
+    return user.get_username() or getattr(user, "email", "") or str(user.pk)
+
+
+def _action_label(action_labels, action):
+    return action_labels.get(action, action.replace("_", " ").title())
+
+
+def build_changelog(transactions, versions, query_params):
+    """
+    transactions: SubmissionTransaction queryset already filtered to the record.
+    versions: MarkingVersion / CoverVersion queryset already filtered to it.
+    Returns the events / versions / approved_versions / next_cursor payload.
+    """
+    since, cursor, limit = changelog_window(query_params)
+    transactions = (
+        transactions.select_related("actor")
+        .defer("before_payload", "after_payload", "extra_payload")
+        .order_by("-id")
+    )
+    if since is not None:
+        transactions = transactions.filter(id__gt=since)
+    if cursor is not None:
+        transactions = transactions.filter(id__lt=cursor)
+    txns = list(transactions[:limit + 1])
+    has_more = len(txns) > limit
+    txns = txns[:limit]
+
+    versions = list(
+        versions.filter(transaction_id__in=[txn.id for txn in txns])
+        .select_related("created_by")
+        .defer("snapshot", "delta")
+        .annotate(txn_action=F("transaction__action"))
+        .order_by("-version_no")
+    )
+
+    version_no_by_txn_id = {
+        v.transaction_id: v.version_no for v in versions if v.transaction_id is not None
+    }
+    action_labels = dict(SubmissionTransaction.ACTION_CHOICES)
+
+    events = []
+    for txn in txns:
+        actor_name = None
+        actor_email = None
+        if txn.actor:
+            actor_email = (getattr(txn.actor, "email", "") or "").strip() or None
+            actor_name = txn.actor.get_username() or actor_email or str(txn.actor.pk)
+        events.append(
+            {
+                "event_id": txn.id,
+                "transaction_uuid": str(txn.transaction_uuid),
+                "timestamp": txn.created_at,
+                "action": txn.action,
+                "action_label": _action_label(action_labels, txn.action),
+                "actor": actor_name,
+                # actor_email is what the editor-facing Record History panel
+                # displays per row. We expose it explicitly (in addition to
+                # the username-fallback "actor" string) because the audit
+                # trail is contractually email-based on the UI side.
+                "actor_email": actor_email,
+                "source": txn.source,
+                "contribution_id": txn.contribution_id,
+                "version_no": version_no_by_txn_id.get(txn.id),
+                "diff": txn.diff_payload or [],
+                "summary": f"{action_labels.get(txn.action, txn.action)} by {actor_email or actor_name or 'system'}",
+            }
+        )
+
+    version_rows = []
+    approved_version_rows = []
+    for version in versions:
+        txn_action = version.txn_action
+        row = {
+            "version_no": version.version_no,
+            "created_at": version.created_at,
+            "created_by": _user_label(version.created_by),
+            "transaction_id": version.transaction_id,
+            "action": txn_action,
+            "action_label": _action_label(action_labels, txn_action) if txn_action else None,
+            "snapshot": version.summary,
+        }
+        version_rows.append(row)
+        if txn_action in APPROVED_ACTIONS:
+            approved_version_rows.append(row)
+
+    return {
+        "events": events,
+        "versions": version_rows,
+        "approved_versions": approved_version_rows,
+        "next_cursor": txns[-1].id if has_more else None,
+    }
@@ -0,0 +1,86 @@
+###################################################################################################
+## WoCo Commons - API v2 bulk catalog export
+##
+## Streams a filtered Marking queryset as NDJSON or CSV in id-ordered chunks.
+## Each chunk is one keyset query (pk > last seen pk) plus the batched lookups
+## the list serializer already does per page: regions via prefetch_related,
+## date spans via with_date_span(), the first two images via prefetch_page().
+## Memory stays bounded by the chunk size whatever the row count.
+###################################################################################################
+import csv
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import MarkingListSerializer
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Flat CSV columns: the list serializer's fields, with its nested image
+# objects reduced to their URLs.
+CSV_COLUMNS = [
+    field for field in MarkingListSerializer.Meta.fields
+    if field not in ("main_image", "second_image")
+] + ["main_image_url", "second_image_url"]
+
+
+def iter_marking_chunks(queryset, chunk_size=None):
+    """Yield lists of up to chunk_size markings, in ascending id order."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def _serialized_chunks(queryset, context, chunk_size):
+    for chunk in iter_marking_chunks(queryset, chunk_size):
+        yield MarkingListSerializer(chunk, many=True, context=context).data
+
+
+def stream_ndjson(queryset, context, chunk_size=None):
+    """One JSON object per line, same shape as a /markings/ list row."""
+    encoder = JSONEncoder(ensure_ascii=False)
+    for rows in _serialized_chunks(queryset, context, chunk_size):
+        yield "".join(f"{encoder.encode(row)}\n" for row in rows)
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line back instead of buffering."""
+
+    def write(self, value):
+        return value
+
+
+def _image_url(image):
+    return (image or {}).get("image_url") or ""
+
+
+def stream_csv(queryset, context, chunk_size=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for rows in _serialized_chunks(queryset, context, chunk_size):
+        lines = []
+        for row in rows:
+            values = dict(row)
+            values["main_image_url"] = _image_url(values.pop("main_image", None))
+            values["second_image_url"] = _image_url(values.pop("second_image", None))
+            lines.append(writer.writerow([
+                "" if values.get(column) is None else values[column] for column in CSV_COLUMNS
+            ]))
+        yield "".join(lines)
+
+
+def stream_markings(export_format, queryset, context, chunk_size=None):
+    if export_format == "csv":
+        return stream_csv(queryset, context, chunk_size)
+    return stream_ndjson(queryset, context, chunk_size)
+
@@ -14,19 +14,91 @@ endpoints — there is no separate Administrator group.
 """
 from __future__ import annotations
 
+import uuid
+
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
-from common.models import Contribution, Region
+from common.models import CollectionAssignment, Contribution, Region
 
 
 REVIEW_CONTRIBUTION_PERM = "common.review_contribution"
 APPROVE_IMAGE_PERM = "common.approve_image"
 
 
-def _get_user_assigned_regions(user):
+###################################################################################################
+## Editor scope
+###################################################################################################
+class EditorScope:
+    """
+    The Collections a user is assigned to as an Editor and the Regions those
+    Collections wrap. Computed by editor_scope() with one query, reused for
+    the rest of the request (memoized on the user object, which the auth
+    middleware loads per request) and across requests (Django cache, keyed by
+    a generation that CollectionAssignment and Collection writes bump; see
+    common.signals).
+
+    Role checks (is_superuser, common.review_contribution) are NOT part of
+    the scope; they stay on the user, whose permission cache Django already
+    keeps per request.
+    """
+    __slots__ = ("collection_ids", "region_ids")
+
+    def __init__(self, collection_ids=frozenset(), region_ids=frozenset()):
+        self.collection_ids = frozenset(collection_ids)
+        self.region_ids = frozenset(region_ids)
+
+
+EDITOR_SCOPE_TIMEOUT = 60 * 60
+_EMPTY_SCOPE = EditorScope()
+_SCOPE_GENERATION_KEY = "editor-scope-generation"
+# Bumps made by this process. The per-user memo records it so a write later
+# in the same request drops the memo without a cache round trip.
+_local_bumps = 0
+
+
+def _scope_generation():
+    return cache.get_or_set(_SCOPE_GENERATION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_editor_scope_generation():
+    """Invalidate every cached EditorScope (assignment or collection change)."""
+    global _local_bumps
+    _local_bumps += 1
+    cache.set(_SCOPE_GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def editor_scope(user) -> EditorScope:
     if not user or not user.is_authenticated:
+        return _EMPTY_SCOPE
+    # The generation is read from the cache once per user object, i.e. once
+    # per request; later calls return the memo without touching the cache.
+    memo = getattr(user, "_editor_scope", None)
+    if memo is not None and memo[0] == _local_bumps:
+        return memo[1]
+    local_bumps = _local_bumps
+    generation = _scope_generation()
+    key = f"editor-scope:{user.pk}:{generation}"
+    scope = cache.get(key)
+    if scope is None:
+        rows = list(
+            CollectionAssignment.objects.filter(user_id=user.pk)
+            .values_list("collection_id", "collection__region_id")
+        )
+        scope = EditorScope(
+            collection_ids={collection_id for collection_id, _ in rows},
+            region_ids={region_id for _, region_id in rows if region_id is not None},
+        )
+        cache.set(key, scope, EDITOR_SCOPE_TIMEOUT)
+    user._editor_scope = (local_bumps, scope)
+    return scope
+
+
+def _get_user_assigned_regions(user):
+    region_ids = editor_scope(user).region_ids
+    if not region_ids:
         return Region.objects.none()
-    return Region.objects.filter(collection__editor_assignments__user=user).distinct()
+    return Region.objects.filter(pk__in=region_ids)
 
 
 def _user_is_responsible_for_marking(user, marking):
@@ -38,10 +110,18 @@ def _user_is_responsible_for_marking(user, marking):
         return False
     if not marking or not marking.post_office_id:
         return False
+    # PostOffice.region resolves from prefetched post_office_regions when present.
     region = marking.post_office.region
     if region is None:
         return False
-    return _get_user_assigned_regions(user).filter(pk=region.pk).exists()
+    return region.pk in editor_scope(user).region_ids
+
+
+def _cover_links(cover):
+    prefetched = getattr(cover, "_prefetched_objects_cache", {}).get("cover_markings")
+    if prefetched is not None:
+        return prefetched
+    return cover.cover_markings.select_related("marking__post_office").all()
 
 
 def _user_is_responsible_for_cover(user, cover):
@@ -58,28 +138,21 @@ def _user_is_responsible_for_cover(user, cover):
         return True
     if not user.has_perm(REVIEW_CONTRIBUTION_PERM):
         return False
-    assigned = _get_user_assigned_regions(user)
-    if not assigned.exists():
+    assigned = editor_scope(user).region_ids
+    if not assigned:
         return False
-    region_ids = set()
-    for cm in cover.cover_markings.select_related("marking__post_office").all():
+    for cm in _cover_links(cover):
         post_office = cm.marking.post_office if cm.marking else None
         # PostOffice.region is a property resolving the most-recent active region.
         region = post_office.region if post_office else None
-        if region is not None:
-            region_ids.add(region.pk)
-    if not region_ids:
-        return False
-    return assigned.filter(pk__in=region_ids).exists()
+        if region is not None and region.pk in assigned:
+            return True
+    return False
 
 
 def user_assigned_collection_ids(user) -> set[int]:
     """Return the set of Collection IDs this user is assigned to as an Editor."""
-    if not user or not user.is_authenticated:
-        return set()
-    return set(
-        user.collection_assignments.values_list("collection_id", flat=True)
-    )
+    return set(editor_scope(user).collection_ids)
 
 
 class IsEditor(BasePermission):
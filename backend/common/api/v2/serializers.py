@@ -8,6 +8,8 @@
 ## Image is polymorphic over (subject_type, subject_id).
 ###################################################################################################
 from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
 
 from rest_framework import serializers
 
@@ -33,16 +35,90 @@ from common.models import (
     Region,
     Shape,
 )
+from common.subject_prefetch import prefetch_subject_rows, subject_rows
 
 from .permissions import (
     _user_is_responsible_for_cover,
     _user_is_responsible_for_marking,
+    editor_scope,
     REVIEW_CONTRIBUTION_PERM,
 )
 
 
 User = get_user_model()
 
+# Polymorphic (subject_type, subject_id) relations, batch-loaded through
+# common.subject_prefetch and cached on the instance under `to_attr`.
+MARKING_LIST_IMAGES = dict(
+    model=Image, subject_type=Image.SUBJECT_MARKING, to_attr="_marking_images",
+    order_by=("display_order", "image_id"), limit=2,
+)
+MARKING_IMAGES = dict(
+    model=Image, subject_type=Image.SUBJECT_MARKING, to_attr="_subject_images",
+    order_by=("display_order", "image_id"),
+)
+MARKING_CITATIONS = dict(
+    model=Citation, subject_type="MARKING", to_attr="_subject_citations",
+    order_by=("reference_work_id",), queryset=Citation.objects.select_related("reference_work"),
+)
+COVER_DATES_SEEN = dict(
+    model=DateSeen, subject_type=DateSeen.SUBJECT_COVER, to_attr="_subject_dates_seen",
+    order_by=("date",),
+)
+
+
+class PageFlags:
+    """
+    Per-page answers for the row flags that would otherwise cost a query per
+    row: is_removed (recycle-bin membership), can_remove (editor
+    responsibility) and the Contribution behind each row (comment_for_editor /
+    editor_feedback). Built by the child serializer's page_flags(instances)
+    with a few set queries. Rows it does not cover (a nested or single-object
+    serializer) fall back to the per-object lookups.
+    """
+    __slots__ = ("model", "pks", "removed", "removable", "contributions")
+
+    def __init__(self, model, pks, removed=(), removable=(), contributions=None):
+        self.model = model
+        self.pks = frozenset(pks)
+        self.removed = frozenset(removed)
+        self.removable = frozenset(removable)
+        self.contributions = contributions or {}
+
+    def covers(self, obj):
+        return isinstance(obj, self.model) and obj.pk in self.pks
+
+
+def _page_flags_for(serializer, obj):
+    # The row serializer is the list serializer's child; the page's flags
+    # live on that list serializer (SubjectPrefetchListSerializer).
+    flags = getattr(serializer.parent, "current_page_flags", None)
+    return flags if flags is not None and flags.covers(obj) else None
+
+
+def _context_user(context):
+    return getattr(context.get("request"), "user", None)
+
+
+class SubjectPrefetchListSerializer(serializers.ListSerializer):
+    """
+    many=True wrapper that lets the child batch-load its polymorphic
+    Image / Citation / DateSeen rows for the whole page (one query per
+    relation) before the per-row SerializerMethodFields run. The child
+    serializer implements prefetch_page(instances), and optionally
+    page_flags(instances) -> PageFlags, which is kept on this serializer as
+    current_page_flags for the rows to read.
+    """
+    current_page_flags = None
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.prefetch_page(items)
+        page_flags = getattr(self.child, "page_flags", None)
+        if page_flags is not None:
+            self.current_page_flags = page_flags(items)
+        return super().to_representation(items)
+
 
 ###################################################################################################
 ## Lookup / shared
@@ -401,20 +477,49 @@ class CoverSerializer(serializers.ModelSerializer):
             "modified_date",
         ]
         read_only_fields = ["id", "code", "created_date", "modified_date"]
+        list_serializer_class = SubjectPrefetchListSerializer
+
+    @staticmethod
+    def prefetch_page(covers):
+        prefetch_subject_rows(covers, **COVER_DATES_SEEN)
+
+    def page_flags(self, covers):
+        pks = [cover.pk for cover in covers]
+        if not pks:
+            return PageFlags(Cover, pks)
+        removed = CoverRecycleBin.objects.filter(cover_id__in=pks).values_list("cover_id", flat=True)
+        user = _context_user(self.context)
+        if (
+            user is not None
+            and user.is_authenticated
+            and not user.is_superuser
+            and user.has_perm(REVIEW_CONTRIBUTION_PERM)
+            and editor_scope(user).region_ids
+        ):
+            # Responsibility walks cover -> markings -> post office -> regions;
+            # load that chain for the whole page instead of per cover.
+            prefetch_related_objects(covers, Prefetch(
+                "cover_markings",
+                queryset=CoverMarking.objects.select_related("marking__post_office")
+                .prefetch_related("marking__post_office__post_office_regions__region"),
+            ))
+        removable = [cover.pk for cover in covers if _user_is_responsible_for_cover(user, cover)]
+        return PageFlags(Cover, pks, removed=removed, removable=removable)
 
     def get_dates_seen(self, obj):
-        qs = DateSeen.objects.filter(
-            subject_type=DateSeen.SUBJECT_COVER,
-            subject_id=obj.pk,
-        ).order_by("date")
-        return DateSeenSerializer(qs, many=True).data
+        return DateSeenSerializer(subject_rows(obj, **COVER_DATES_SEEN), many=True).data
 
     def get_is_removed(self, obj):
+        flags = _page_flags_for(self, obj)
+        if flags is not None:
+            return obj.pk in flags.removed
         return CoverRecycleBin.objects.filter(cover_id=obj.pk).exists()
 
     def get_can_remove(self, obj):
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
+        flags = _page_flags_for(self, obj)
+        if flags is not None:
+            return obj.pk in flags.removable
+        user = _context_user(self.context)
         if user is None:
             return False
         return _user_is_responsible_for_cover(user, obj)
@@ -471,6 +576,14 @@ class CoverMarkingSerializer(serializers.ModelSerializer):
             "created_date",
             "modified_date",
         ]
+        list_serializer_class = SubjectPrefetchListSerializer
+
+    @staticmethod
+    def prefetch_page(cover_markings):
+        # Nested cover_details reads each cover's dates_seen.
+        CoverSerializer.prefetch_page(
+            [cm.cover for cm in cover_markings if cm.cover_id is not None]
+        )
 
     def get_reviewer_username(self, obj):
         if obj.reviewer_id and obj.reviewer:
@@ -593,6 +706,12 @@ class MarkingListSerializer(serializers.ModelSerializer):
             "main_image",
             "second_image",
         ]
+        list_serializer_class = SubjectPrefetchListSerializer
+
+    @staticmethod
+    def prefetch_page(markings):
+        # First two images per marking for the whole page in one query.
+        prefetch_subject_rows(markings, **MARKING_LIST_IMAGES)
 
     def get_state(self, obj):
         return _marking_state_name(obj)
@@ -604,17 +723,7 @@ class MarkingListSerializer(serializers.ModelSerializer):
         return _marking_state_name(obj)
 
     def _images_for(self, obj):
-        cached = getattr(obj, "_marking_images", None)
-        if cached is not None:
-            return cached
-        rows = list(
-            Image.objects.filter(
-                subject_type=Image.SUBJECT_MARKING,
-                subject_id=obj.pk,
-            ).order_by("display_order", "image_id")
-        )
-        obj._marking_images = rows
-        return rows
+        return subject_rows(obj, **MARKING_LIST_IMAGES)
 
     def _image_payload(self, image):
         if not image:
@@ -707,29 +816,63 @@ class MarkingSerializer(serializers.ModelSerializer):
             "editor_feedback",
         ]
         read_only_fields = ["id", "created_date", "modified_date"]
+        list_serializer_class = SubjectPrefetchListSerializer
+
+    @staticmethod
+    def prefetch_page(markings):
+        prefetch_subject_rows(markings, **MARKING_IMAGES)
+        prefetch_subject_rows(markings, **MARKING_CITATIONS)
+
+    def page_flags(self, markings):
+        pks = [marking.pk for marking in markings]
+        if not pks:
+            return PageFlags(Marking, pks)
+        removed = MarkingRecycleBin.objects.filter(marking_id__in=pks).values_list("marking_id", flat=True)
+        user = _context_user(self.context)
+        # Regions come from the prefetched post_office_regions and the cached
+        # editor scope, so this loop runs no queries.
+        removable = [marking.pk for marking in markings if _user_is_responsible_for_marking(user, marking)]
+        contributions = {}
+        if user is not None and user.is_authenticated:
+            contributions = {
+                contribution.marking_id: contribution
+                for contribution in Contribution.objects.filter(marking_id__in=pks).only(
+                    "marking", "contributor", "review_notes", "submitted_data"
+                )
+            }
+        return PageFlags(Marking, pks, removed=removed, removable=removable, contributions=contributions)
+
+    def _contribution_for(self, obj):
+        flags = _page_flags_for(self, obj)
+        if flags is not None:
+            return flags.contributions.get(obj.pk)
+        return getattr(obj, "contribution", None)
 
     def get_is_removed(self, obj):
+        flags = _page_flags_for(self, obj)
+        if flags is not None:
+            return obj.pk in flags.removed
         return MarkingRecycleBin.objects.filter(marking_id=obj.pk).exists()
 
     def get_can_remove(self, obj):
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
+        flags = _page_flags_for(self, obj)
+        if flags is not None:
+            return obj.pk in flags.removable
+        user = _context_user(self.context)
         if user is None:
             return False
         return _user_is_responsible_for_marking(user, obj)
 
     def get_editor_feedback(self, obj):
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
-        contribution = getattr(obj, "contribution", None)
+        user = _context_user(self.context)
+        contribution = self._contribution_for(obj)
         if not _viewer_may_see_contribution_notes(user, contribution):
             return ""
         return (contribution.review_notes or "").strip()
 
     def get_comment_for_editor(self, obj):
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
-        contribution = getattr(obj, "contribution", None)
+        user = _context_user(self.context)
+        contribution = self._contribution_for(obj)
         if not _viewer_may_see_contribution_notes(user, contribution):
             return ""
         return _comment_for_editor_from(contribution.submitted_data)
@@ -744,17 +887,11 @@ class MarkingSerializer(serializers.ModelSerializer):
         return _marking_state_name(obj)
 
     def get_images(self, obj):
-        rows = Image.objects.filter(
-            subject_type=Image.SUBJECT_MARKING,
-            subject_id=obj.pk,
-        ).order_by("display_order", "image_id")
+        rows = subject_rows(obj, **MARKING_IMAGES)
         return ImageSerializer(rows, many=True, context=self.context).data
 
     def get_citations(self, obj):
-        rows = Citation.objects.filter(
-            subject_type="MARKING",
-            subject_id=obj.pk,
-        ).select_related("reference_work").order_by("reference_work_id")
+        rows = subject_rows(obj, **MARKING_CITATIONS)
         return CitationSerializer(rows, many=True, context=self.context).data
 
     def get_size_display(self, obj):
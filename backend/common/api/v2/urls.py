@@ -68,6 +68,11 @@ urlpatterns = [
         views.MarkingDateRangeView.as_view(),
         name="markings-range",
     ),
+    path(
+        "request-metrics/",
+        views.RequestMetricsView.as_view(),
+        name="request-metrics",
+    ),
 
     path("", include(router.urls)),
 ]
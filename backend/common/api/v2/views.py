@@ -16,8 +16,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, ProgrammingError, transaction
 from django.db.models import Min, Max, Q
-from django.db.models.functions import ExtractYear
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -51,7 +50,8 @@ from common.audit import (
     restore_cover_from_snapshot,
     restore_marking_from_snapshot,
 )
-from common.filters import CoverMarkingFilter, MarkingListFilter
+from common.filters import CoverMarkingFilter, MarkingListFilter, MarkingSearchFilter
+from common.fuzzy import fuzzy_match_markings
 from common.models import (
     Citation,
     Collection,
@@ -68,6 +68,7 @@ from common.models import (
     Image,
     Lettering,
     Marking,
+    MarkingDateSpan,
     MarkingRecycleBin,
     MarkingVersion,
     PostOffice,
@@ -76,16 +77,28 @@ from common.models import (
     Shape,
     SubmissionTransaction,
 )
+from common.version_store import version_snapshot
 from woco.pagination import MarkingListPagination
+from woco.conditional import (
+    ConditionalRetrieveMixin,
+    conditional_catalog_response,
+    record_etag,
+    record_not_modified,
+    stamp_etag,
+)
+from woco.request_metrics import TimedSerializationMixin, endpoint_summary, serializer_data
+from woco.response_cache import cache_anonymous_response, catalog_generation
 
+from .changelog import build_changelog
+from .export import EXPORT_FORMATS, stream_markings
 from .permissions import (
     REVIEW_CONTRIBUTION_PERM,
     CanManageReferenceWorks,
     CanReviewContribution,
     IsDraftOwner,
-    _get_user_assigned_regions,
     _user_is_responsible_for_cover,
     _user_is_responsible_for_marking,
+    editor_scope,
     user_assigned_collection_ids,
 )
 from .serializers import (
@@ -117,7 +130,7 @@ User = get_user_model()
 ###################################################################################################
 ## Helpers
 ###################################################################################################
-# _get_user_assigned_regions and _user_is_responsible_for_marking now live in
+# editor_scope and _user_is_responsible_for_marking now live in
 # .permissions (imported above) so serializers.py can reuse them without a
 # circular import back into views.py.
 
@@ -141,24 +154,45 @@ class IsResponsibleForRegion(BasePermission):
         return _user_is_responsible_for_marking(request.user, marking)
 
 
+def _record_validator(record, versions, transactions, user):
+    """
+    Conditional-GET validator for a marking or cover (woco.conditional): its
+    modified_date, latest version_no and latest transaction id, plus the
+    viewer's role and region scope, which decide can_remove and whether the
+    editor notes show. Two indexed MAX lookups; nothing is serialized.
+    """
+    parts = [
+        record.modified_date.isoformat() if record.modified_date else "",
+        versions.aggregate(latest=Max("version_no"))["latest"],
+        transactions.aggregate(latest=Max("id"))["latest"],
+    ]
+    if user.is_authenticated:
+        parts += [user.has_perm(REVIEW_CONTRIBUTION_PERM), sorted(editor_scope(user).region_ids)]
+    return parts
+
+
 def _marking_list_queryset():
     """Optimized queryset for Marking list-style endpoints with date-range annotations.
 
-    Uses MarkingQuerySet.with_date_range so earliest_seen / latest_seen aggregate
-    both directly-attached DateSeen rows (subject_type='MARKING') and
-    cover-mediated DateSeen rows (subject_type='COVER' via cover_markings).
+    Uses MarkingQuerySet.with_date_span so earliest_seen / latest_seen come from
+    the materialized MarkingDateSpan row, which aggregates both directly-attached
+    DateSeen rows (subject_type='MARKING') and cover-mediated DateSeen rows
+    (subject_type='COVER' via cover_markings).
     """
     return Marking.objects.select_related(
         "post_office", "shape", "lettering", "color"
     ).prefetch_related(
         "post_office__post_office_regions__region"
-    ).with_date_range()
+    ).with_date_span()
 
 
 ###################################################################################################
 ## Lookup viewsets (read-only or simple CRUD)
 ###################################################################################################
-class ColorViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+@method_decorator(cache_anonymous_response, name="list")
+@method_decorator(cache_anonymous_response, name="retrieve")
+class ColorViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Color.objects.all()
     serializer_class = ColorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -173,7 +207,10 @@ class ColorViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class RegionViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+@method_decorator(cache_anonymous_response, name="list")
+@method_decorator(cache_anonymous_response, name="retrieve")
+class RegionViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     """Regions; supports ?assigned_only=true to scope to the user's Collections."""
     queryset = Region.objects.all().select_related("parent_region")
     serializer_class = RegionSerializer
@@ -208,7 +245,8 @@ class RegionViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class PostOfficeViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+class PostOfficeViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = PostOffice.objects.all().prefetch_related(
         "post_office_regions__region"
     )
@@ -231,13 +269,25 @@ class PostOfficeViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
     @action(detail=False, methods=["get"], url_path="town-options")
+    @method_decorator(conditional_catalog_response)
+    @method_decorator(cache_anonymous_response)
     def town_options(self, request):
-        """Lightweight {town, state} payload for autocomplete controls."""
+        """Lightweight {town, state} payload for autocomplete controls.
+
+        Optional `?q=` narrows to towns whose name starts with the typed
+        prefix (an index-friendly LIKE 'q%'), so the control can query as the
+        user types instead of loading every town up front.
+        """
         rows = (
             PostOffice.objects.prefetch_related("post_office_regions__region")
             .exclude(name__isnull=True)
             .exclude(name__exact="")
-            .values_list("name", "post_office_regions__region__name")
+        )
+        prefix = (request.query_params.get("q") or "").strip()
+        if prefix:
+            rows = rows.filter(name__istartswith=prefix)
+        rows = (
+            rows.values_list("name", "post_office_regions__region__name")
             .order_by("name", "post_office_regions__region__name")
             .distinct()
         )
@@ -248,7 +298,10 @@ class PostOfficeViewSet(viewsets.ModelViewSet):
         return Response(out, status=status.HTTP_200_OK)
 
 
-class LetteringViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+@method_decorator(cache_anonymous_response, name="list")
+@method_decorator(cache_anonymous_response, name="retrieve")
+class LetteringViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Lettering.objects.all()
     serializer_class = LetteringSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -264,7 +317,10 @@ class LetteringViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class ShapeViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+@method_decorator(cache_anonymous_response, name="list")
+@method_decorator(cache_anonymous_response, name="retrieve")
+class ShapeViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Shape.objects.all()
     serializer_class = ShapeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -280,7 +336,8 @@ class ShapeViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class ReferenceWorkViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+class ReferenceWorkViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     """Reads: any authenticated user. Writes: Editors / Administrators."""
     queryset = ReferenceWork.objects.all()
     serializer_class = ReferenceWorkSerializer
@@ -298,7 +355,9 @@ class ReferenceWorkViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class FAQEntryViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(conditional_catalog_response, name="list")
+@method_decorator(cache_anonymous_response, name="list")
+class FAQEntryViewSet(TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
     """Read-only FAQ for the public SPA homepage."""
     queryset = FAQEntry.objects.filter(is_active=True).order_by("display_order", "faq_entry_id")
     serializer_class = FAQEntrySerializer
@@ -314,7 +373,7 @@ class FAQEntryViewSet(viewsets.ReadOnlyModelViewSet):
 ###################################################################################################
 ## Image (polymorphic over COVER | MARKING)
 ###################################################################################################
-class ImageViewSet(viewsets.ModelViewSet):
+class ImageViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     """
     Polymorphic image API. Filter by `?subject_type=MARKING&subject_id=<id>`
     or `?subject_type=COVER&subject_id=<id>`.
@@ -366,7 +425,7 @@ class ImageViewSet(viewsets.ModelViewSet):
 ###################################################################################################
 ## Citation (subject_type COVER | MARKING)
 ###################################################################################################
-class CitationViewSet(viewsets.ModelViewSet):
+class CitationViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Citation.objects.all().select_related("reference_work")
     serializer_class = CitationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -386,7 +445,7 @@ class CitationViewSet(viewsets.ModelViewSet):
 ###################################################################################################
 ## Cover, DateSeen, CoverValuation, CoverMarking
 ###################################################################################################
-class CoverV2ViewSet(viewsets.ModelViewSet):
+class CoverV2ViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Cover.objects.all().select_related("color")
     serializer_class = CoverSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -420,6 +479,16 @@ class CoverV2ViewSet(viewsets.ModelViewSet):
                 return cover
             raise
 
+    def record_validator(self, cover):
+        # The catalog generation covers the color name and dates seen, which
+        # are other tables' rows.
+        return [catalog_generation(), *_record_validator(
+            cover,
+            CoverVersion.objects.filter(cover=cover),
+            SubmissionTransaction.objects.filter(cover=cover),
+            self.request.user,
+        )]
+
     def perform_create(self, serializer):
         cover = serializer.save(created_by=self.request.user, modified_by=self.request.user)
         after_snapshot = build_cover_snapshot(cover)
@@ -531,19 +600,19 @@ class CoverV2ViewSet(viewsets.ModelViewSet):
             .order_by("-recycle_bin_entry__removed_at")
         )
         if not user.is_superuser:
-            assigned_regions = _get_user_assigned_regions(user)
-            if assigned_regions.exists():
+            region_ids = editor_scope(user).region_ids
+            if region_ids:
                 qs = qs.filter(
-                    cover_markings__marking__post_office__post_office_regions__region__in=assigned_regions
+                    cover_markings__marking__post_office__post_office_regions__region_id__in=region_ids
                 ).distinct()
             else:
                 qs = qs.none()
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(serializer_data(serializer))
         serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        return Response(serializer_data(serializer))
 
     @action(detail=True, methods=["get"], url_path="changelog", permission_classes=[IsAuthenticated])
     def changelog(self, request, pk=None):
@@ -559,106 +628,15 @@ class CoverV2ViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        def _summary(snap):
-            snap = snap if isinstance(snap, dict) else {}
-            return {
-                "code": snap.get("code") or "",
-                "type": snap.get("type") or "",
-                "has_adhesive": bool(snap.get("has_adhesive")),
-                "is_institutional": snap.get("is_institutional"),
-                "color_id": snap.get("color_id"),
-                "width": snap.get("width"),
-                "height": snap.get("height"),
-            }
+        transactions = SubmissionTransaction.objects.filter(cover=cover)
+        versions = CoverVersion.objects.filter(cover=cover)
+        etag = record_etag(request, _record_validator(cover, versions, transactions, request.user))
+        not_modified = record_not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-        # Covers have no contribution FK link, so filter on the cover FK only.
-        txns = list(
-            SubmissionTransaction.objects.filter(cover=cover)
-            .select_related("actor", "contribution")
-            .order_by("-created_at", "-id")
-            .distinct()
-        )
-        versions = list(
-            CoverVersion.objects.filter(cover=cover)
-            .select_related("created_by", "transaction")
-            .order_by("-version_no")
-        )
-        version_no_by_txn_id = {
-            v.transaction_id: v.version_no for v in versions if v.transaction_id is not None
-        }
-        txn_by_id = {txn.id: txn for txn in txns}
-        action_labels = dict(SubmissionTransaction.ACTION_CHOICES)
-
-        events = []
-        for txn in txns:
-            actor_name = None
-            actor_email = None
-            if txn.actor:
-                actor_email = (getattr(txn.actor, "email", "") or "").strip() or None
-                actor_name = (
-                    txn.actor.get_username()
-                    or actor_email
-                    or str(txn.actor.pk)
-                )
-            events.append(
-                {
-                    "event_id": txn.id,
-                    "transaction_uuid": str(txn.transaction_uuid),
-                    "timestamp": txn.created_at,
-                    "action": txn.action,
-                    "action_label": action_labels.get(txn.action, txn.action.replace("_", " ").title()),
-                    "actor": actor_name,
-                    "actor_email": actor_email,
-                    "source": txn.source,
-                    "contribution_id": txn.contribution_id,
-                    "version_no": version_no_by_txn_id.get(txn.id),
-                    "diff": txn.diff_payload or [],
-                    "summary": f"{action_labels.get(txn.action, txn.action)} by {actor_email or actor_name or 'system'}",
-                }
-            )
-
-        approved_actions = {
-            SubmissionTransaction.ACTION_APPROVE,
-            SubmissionTransaction.ACTION_CATALOG_DIRECT_EDIT,
-            SubmissionTransaction.ACTION_RESTORE_VERSION,
-        }
-        version_rows = []
-        approved_version_rows = []
-        for version in versions:
-            created_by_name = None
-            if version.created_by:
-                created_by_name = (
-                    version.created_by.get_username()
-                    or getattr(version.created_by, "email", "")
-                    or str(version.created_by.pk)
-                )
-            txn = txn_by_id.get(version.transaction_id) if version.transaction_id is not None else None
-            txn_action = txn.action if txn else None
-            row = {
-                "version_no": version.version_no,
-                "created_at": version.created_at,
-                "created_by": created_by_name,
-                "transaction_id": version.transaction_id,
-                "action": txn_action,
-                "action_label": (
-                    action_labels.get(txn_action, str(txn_action).replace("_", " ").title())
-                    if txn_action
-                    else None
-                ),
-                "snapshot": _summary(version.snapshot),
-            }
-            version_rows.append(row)
-            if txn_action in approved_actions:
-                approved_version_rows.append(row)
-
-        return Response(
-            {
-                "cover_id": cover.pk,
-                "events": events,
-                "versions": version_rows,
-                "approved_versions": approved_version_rows,
-            }
-        )
+        payload = build_changelog(transactions, versions, request.query_params)
+        return stamp_etag(Response({"cover_id": cover.pk, **payload}), etag)
 
     @action(detail=True, methods=["post"], url_path="restore-version", permission_classes=[IsAuthenticated])
     def restore_version(self, request, pk=None):
@@ -686,7 +664,7 @@ class CoverV2ViewSet(viewsets.ModelViewSet):
             )
         before_snapshot = build_cover_snapshot(cover)
         with transaction.atomic():
-            restore_cover_from_snapshot(cover, restore_from.snapshot or {}, request.user)
+            restore_cover_from_snapshot(cover, version_snapshot(restore_from), request.user)
             cover.refresh_from_db()
             after_snapshot = build_cover_snapshot(cover)
             txn = log_submission_transaction(
@@ -709,7 +687,7 @@ class CoverV2ViewSet(viewsets.ModelViewSet):
         )
 
 
-class DateSeenViewSet(viewsets.ModelViewSet):
+class DateSeenViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     # DateSeen is polymorphic. Clients filter by `subject_type=COVER|MARKING`
     # plus `subject_id=<pk>` to retrieve the date observations for a given
     # cover or marking.
@@ -728,7 +706,7 @@ class DateSeenViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class CoverValuationViewSet(viewsets.ModelViewSet):
+class CoverValuationViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = CoverValuation.objects.all().select_related("cover")
     serializer_class = CoverValuationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -748,7 +726,7 @@ class CoverValuationViewSet(viewsets.ModelViewSet):
         serializer.save(modified_by=self.request.user)
 
 
-class CoverMarkingViewSet(viewsets.ModelViewSet):
+class CoverMarkingViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     # DateSeen is polymorphic and has no FK back to Cover, so we can no longer
     # prefetch it as a reverse relation. CoverSerializer.get_dates_seen issues
     # its own query per cover; if that becomes a hotspot, swap in a
@@ -820,11 +798,7 @@ class CoverMarkingViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return qs.none()
         if user.has_perm(REVIEW_CONTRIBUTION_PERM):
-            region_ids = list(
-                Region.objects.filter(collection__id__in=user_assigned_collection_ids(user)).values_list(
-                    "pk", flat=True
-                )
-            )
+            region_ids = editor_scope(user).region_ids
             if not region_ids:
                 return qs.filter(created_by=user)
             return qs.filter(
@@ -1070,7 +1044,13 @@ class CoverMarkingViewSet(viewsets.ModelViewSet):
 ###################################################################################################
 ## Marking (unified TOWNMARK | RATEMARK | AUXMARK)
 ###################################################################################################
-class MarkingViewSet(viewsets.ModelViewSet):
+FUZZY_DEFAULT_LIMIT = 20
+FUZZY_MAX_LIMIT = 50
+
+
+@method_decorator(cache_anonymous_response, name="list")
+@method_decorator(cache_anonymous_response, name="retrieve")
+class MarkingViewSet(ConditionalRetrieveMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     """
     Unified marking ViewSet. Replaces PostmarkViewSet / RatemarkViewSet /
     AuxmarkViewSet. List supports `?type=TOWNMARK|RATEMARK|AUXMARK`
@@ -1079,23 +1059,14 @@ class MarkingViewSet(viewsets.ModelViewSet):
     pagination_class = MarkingListPagination
     queryset = Marking.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly, IsResponsibleForRegion]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # MarkingSearchFilter runs after OrderingFilter so `?search=` results are
+    # ranked by relevance unless the client passes an explicit `?ordering=`.
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, MarkingSearchFilter]
     filterset_class = MarkingListFilter
     # No raw DELETE: removing a marking goes through the audited, reversible
     # POST /markings/<pk>/remove/ (recycle bin) action instead. Custom POST
     # actions (remove, restore) are unaffected by this restriction.
     http_method_names = ["get", "post", "put", "patch", "head", "options", "trace"]
-    search_fields = [
-        "code",
-        "catalog_txt",
-        "inscription_txt",
-        "desc",
-        "post_office__post_office_regions__region__name",
-        "post_office__name",
-        "shape__name",
-        "lettering__name",
-        "color__name",
-    ]
     ordering_fields = [
         # Location / identity
         "post_office__post_office_regions__region__name",
@@ -1119,7 +1090,20 @@ class MarkingViewSet(viewsets.ModelViewSet):
         "post_office__post_office_regions__region__name",
         "post_office__name",
         "earliest_seen",
+        "code",
     ]
+    # MarkingListPagination cursor mode: the ordering fields it supports and
+    # the indexed column each seeks on. The default ordering's keys are
+    # copied onto MarkingDateSpan (one composite index; the region is the
+    # post office's current one, so a post office linked to several regions
+    # is listed once); code is unique, and InnoDB appends id to every index.
+    keyset_ordering_fields = {
+        "post_office__post_office_regions__region__name": "date_span__region_name",
+        "post_office__name": "date_span__post_office_name",
+        "earliest_seen": "date_span__earliest_seen",
+        "code": "code",
+        "id": "id",
+    }
 
     def get_queryset(self):
         return _marking_list_queryset()
@@ -1138,7 +1122,7 @@ class MarkingViewSet(viewsets.ModelViewSet):
                 Marking.all_objects
                 .select_related("post_office", "shape", "lettering", "color")
                 .prefetch_related("post_office__post_office_regions__region")
-                .with_date_range()
+                .with_date_span()
                 .filter(pk=self.kwargs[self.lookup_field])
                 .first()
             )
@@ -1147,6 +1131,16 @@ class MarkingViewSet(viewsets.ModelViewSet):
                 return marking
             raise
 
+    def record_validator(self, marking):
+        # The catalog generation covers images, citations and lookup names,
+        # which are other tables' rows.
+        return [catalog_generation(), *_record_validator(
+            marking,
+            MarkingVersion.objects.filter(marking=marking),
+            SubmissionTransaction.objects.filter(marking=marking),
+            self.request.user,
+        )]
+
     def get_serializer_class(self):
         if self.action == "list":
             return MarkingListSerializer
@@ -1269,61 +1263,123 @@ class MarkingViewSet(viewsets.ModelViewSet):
             Marking.all_objects.filter(recycle_bin_entry__isnull=False)
             .select_related("post_office", "shape", "lettering", "color")
             .prefetch_related("post_office__post_office_regions__region")
-            .with_date_range()
+            .with_date_span()
             .order_by("-recycle_bin_entry__removed_at")
         )
         if not user.is_superuser:
-            assigned_regions = _get_user_assigned_regions(user)
-            if assigned_regions.exists():
+            region_ids = editor_scope(user).region_ids
+            if region_ids:
                 qs = qs.filter(
-                    post_office__post_office_regions__region__in=assigned_regions
+                    post_office__post_office_regions__region_id__in=region_ids
                 ).distinct()
             else:
                 qs = qs.none()
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = MarkingListSerializer(page, many=True, context=self.get_serializer_context())
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(serializer_data(serializer))
         serializer = MarkingListSerializer(qs, many=True, context=self.get_serializer_context())
-        return Response(serializer.data)
+        return Response(serializer_data(serializer))
+
+    def _editor_page_queryset(self):
+        # my_assigned / my_submissions render the full MarkingSerializer, whose
+        # nested created_by / modified_by would otherwise load per row. The
+        # remaining per-row flags are batched by MarkingSerializer.page_flags.
+        return self.get_queryset().select_related("created_by", "modified_by")
 
     @action(detail=False, methods=["get"], url_path="my-assigned", permission_classes=[IsAuthenticated])
     def my_assigned(self, request):
         user = request.user
-        assigned_regions = _get_user_assigned_regions(user)
-        if not assigned_regions.exists():
+        region_ids = editor_scope(user).region_ids
+        if not region_ids:
             empty = self.get_queryset().none()
             page = self.paginate_queryset(empty)
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            return Response(self.get_serializer(empty, many=True).data)
-        qs = self.get_queryset().filter(
-            post_office__post_office_regions__region__in=assigned_regions
+                return self.get_paginated_response(serializer_data(serializer))
+            return Response(serializer_data(self.get_serializer(empty, many=True)))
+        qs = self._editor_page_queryset().filter(
+            post_office__post_office_regions__region_id__in=region_ids
         ).distinct().order_by("-created_date")
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        return Response(self.get_serializer(qs, many=True).data)
+            return self.get_paginated_response(serializer_data(serializer))
+        return Response(serializer_data(self.get_serializer(qs, many=True)))
 
     @action(detail=False, methods=["get"], url_path="my-submissions", permission_classes=[IsAuthenticated])
     def my_submissions(self, request):
         user = request.user
-        qs = self.get_queryset().filter(contribution__contributor=user).order_by("-created_date")
+        qs = self._editor_page_queryset().filter(contribution__contributor=user).order_by("-created_date")
         if not user.is_superuser:
-            assigned_regions = _get_user_assigned_regions(user)
-            if assigned_regions.exists():
+            region_ids = editor_scope(user).region_ids
+            if region_ids:
                 qs = qs.filter(
-                    post_office__post_office_regions__region__in=assigned_regions
+                    post_office__post_office_regions__region_id__in=region_ids
                 ).distinct()
             else:
                 qs = qs.none()
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        return Response(self.get_serializer(qs, many=True).data)
+            return self.get_paginated_response(serializer_data(serializer))
+        return Response(serializer_data(self.get_serializer(qs, many=True)))
+
+    @action(detail=False, methods=["get"], url_path="fuzzy")
+    def fuzzy(self, request):
+        """
+        Similarity-ranked lookup for inscriptions typed loosely: abbreviated
+        ("FREDG"), without periods ("ST LOUIS MO") or with OCR slips. Matches
+        `?q=` against the MarkingTrigram index over inscription and post office
+        name (see common.fuzzy) and returns up to `?limit=` (default 20, max
+        50) list-shaped rows, best first, each with a `similarity` in [0, 1].
+        """
+        query = (request.query_params.get("q") or "").strip()
+        if not query:
+            return Response(
+                {"detail": "Query parameter 'q' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get("limit") or FUZZY_DEFAULT_LIMIT)
+        except ValueError:
+            return Response(
+                {"detail": "Query parameter 'limit' must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, FUZZY_MAX_LIMIT))
+
+        scores = dict(fuzzy_match_markings(query, limit=limit))
+        markings = {m.pk: m for m in self.get_queryset().filter(pk__in=scores).order_by()}
+        ranked = [markings[pk] for pk in scores if pk in markings]
+        rows = serializer_data(MarkingListSerializer(ranked, many=True, context=self.get_serializer_context()))
+        for row in rows:
+            row["similarity"] = scores[row["id"]]
+        return Response({"results": rows})
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream the whole filtered catalog for bulk consumers (mirrors, power
+        users) instead of paging through the list. Accepts every list filter
+        (MarkingListFilter, `?search=`); `?output=ndjson` (default) yields one
+        list-shaped JSON object per line, `?output=csv` flat columns with image
+        URLs. Rows come in id order, fetched in keyset chunks (see
+        common.api.v2.export) so memory stays bounded.
+        """
+        export_format = (request.query_params.get("output") or "ndjson").strip().lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Query parameter 'output' must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream_markings(export_format, queryset, self.get_serializer_context()),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="markings.{export_format}"'
+        return response
 
     @action(detail=True, methods=["get"], url_path="changelog", permission_classes=[IsAuthenticated])
     def changelog(self, request, pk=None):
@@ -1339,121 +1395,18 @@ class MarkingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        def _summary(snap):
-            snap = snap if isinstance(snap, dict) else {}
-            return {
-                "catalog_txt": snap.get("catalog_txt") or "",
-                "code": snap.get("code") or "",
-                "town": snap.get("town") or "",
-                "state": snap.get("state") or "",
-                "type": snap.get("type") or "",
-                "inscription_txt": snap.get("inscription_txt") or "",
-                "desc": snap.get("desc") or "",
-                "is_manuscript": bool(snap.get("is_manuscript")),
-                "impression": snap.get("impression") or "",
-                "is_irreg": snap.get("is_irreg"),
-                "shape_id": snap.get("shape_id"),
-                "lettering_id": snap.get("lettering_id"),
-                "color_id": snap.get("color_id"),
-                "date_fmt": snap.get("date_fmt") or "",
-                "rate_val": snap.get("rate_val"),
-                "width": snap.get("width"),
-                "height": snap.get("height"),
-            }
-
-        txns = list(
-            SubmissionTransaction.objects.filter(
-                Q(marking=marking) | Q(contribution__marking=marking)
-            )
-            .select_related("actor", "contribution")
-            .order_by("-created_at", "-id")
-            .distinct()
-        )
-        versions = list(
-            MarkingVersion.objects.filter(marking=marking)
-            .select_related("created_by", "transaction")
-            .order_by("-version_no")
-        )
-        version_no_by_txn_id = {
-            v.transaction_id: v.version_no for v in versions if v.transaction_id is not None
-        }
-        txn_by_id = {txn.id: txn for txn in txns}
-        action_labels = dict(SubmissionTransaction.ACTION_CHOICES)
-
-        events = []
-        for txn in txns:
-            actor_name = None
-            actor_email = None
-            if txn.actor:
-                actor_email = (getattr(txn.actor, "email", "") or "").strip() or None
-                actor_name = (
-                    txn.actor.get_username()
-                    or actor_email
-                    or str(txn.actor.pk)
-                )
-            events.append(
-                {
-                    "event_id": txn.id,
-                    "transaction_uuid": str(txn.transaction_uuid),
-                    "timestamp": txn.created_at,
-                    "action": txn.action,
-                    "action_label": action_labels.get(txn.action, txn.action.replace("_", " ").title()),
-                    "actor": actor_name,
-                    # actor_email is what the editor-facing Record History panel
-                    # displays per row. We expose it explicitly (in addition to
-                    # the username-fallback "actor" string) because the audit
-                    # trail is contractually email-based on the UI side.
-                    "actor_email": actor_email,
-                    "source": txn.source,
-                    "contribution_id": txn.contribution_id,
-                    "version_no": version_no_by_txn_id.get(txn.id),
-                    "diff": txn.diff_payload or [],
-                    "summary": f"{action_labels.get(txn.action, txn.action)} by {actor_email or actor_name or 'system'}",
-                }
-            )
-
-        approved_actions = {
-            SubmissionTransaction.ACTION_APPROVE,
-            SubmissionTransaction.ACTION_CATALOG_DIRECT_EDIT,
-            SubmissionTransaction.ACTION_RESTORE_VERSION,
-        }
-        version_rows = []
-        approved_version_rows = []
-        for version in versions:
-            created_by_name = None
-            if version.created_by:
-                created_by_name = (
-                    version.created_by.get_username()
-                    or getattr(version.created_by, "email", "")
-                    or str(version.created_by.pk)
-                )
-            txn = txn_by_id.get(version.transaction_id) if version.transaction_id is not None else None
-            txn_action = txn.action if txn else None
-            row = {
-                "version_no": version.version_no,
-                "created_at": version.created_at,
-                "created_by": created_by_name,
-                "transaction_id": version.transaction_id,
-                "action": txn_action,
-                "action_label": (
-                    action_labels.get(txn_action, str(txn_action).replace("_", " ").title())
-                    if txn_action
-                    else None
-                ),
-                "snapshot": _summary(version.snapshot),
-            }
-            version_rows.append(row)
-            if txn_action in approved_actions:
-                approved_version_rows.append(row)
+        # Transactions logged against the marking's contribution carry the
+        # marking FK too (common.audit.link_contribution_transactions), so one
+        # indexed filter replaces the marking-or-contribution OR + DISTINCT.
+        transactions = SubmissionTransaction.objects.filter(marking=marking)
+        versions = MarkingVersion.objects.filter(marking=marking)
+        etag = record_etag(request, _record_validator(marking, versions, transactions, request.user))
+        not_modified = record_not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-        return Response(
-            {
-                "marking_id": marking.pk,
-                "events": events,
-                "versions": version_rows,
-                "approved_versions": approved_version_rows,
-            }
-        )
+        payload = build_changelog(transactions, versions, request.query_params)
+        return stamp_etag(Response({"marking_id": marking.pk, **payload}), etag)
 
     @action(detail=True, methods=["post"], url_path="restore-version", permission_classes=[IsAuthenticated])
     def restore_version(self, request, pk=None):
@@ -1481,7 +1434,7 @@ class MarkingViewSet(viewsets.ModelViewSet):
             )
         before_snapshot = build_marking_snapshot(marking)
         with transaction.atomic():
-            restore_marking_from_snapshot(marking, restore_from.snapshot or {}, request.user)
+            restore_marking_from_snapshot(marking, version_snapshot(restore_from), request.user)
             marking.refresh_from_db()
             after_snapshot = build_marking_snapshot(marking)
             txn = log_submission_transaction(
@@ -1528,29 +1481,33 @@ class MarkingDateRangeView(APIView):
         to at least one Marking via an APPROVED CoverMarking. Cover-scoped
         DateSeen rows created during draft / pending / rejected reviews are
         therefore excluded from the public catalog range.
+
+    Both sources are pre-aggregated per marking in MarkingDateSpan's
+    approved_* columns, so this is a single MIN/MAX over one row per
+    non-removed marking rather than a scan of dates_seen.
     """
     permission_classes = [AllowAny]
 
+    @method_decorator(cache_anonymous_response)
     def get(self, request):
-        approved_cover_ids = CoverMarking.objects.filter(
-            review_status=CoverMarking.REVIEW_APPROVED,
-        ).values("cover_id")
-        approved_marking_ids = Marking.objects.values("pk")
-
-        qs = DateSeen.objects.filter(
-            Q(subject_type=DateSeen.SUBJECT_MARKING, subject_id__in=approved_marking_ids)
-            | Q(subject_type=DateSeen.SUBJECT_COVER, subject_id__in=approved_cover_ids)
-        )
-
-        agg = qs.aggregate(
-            earliest_year=Min(ExtractYear("date")),
-            latest_year=Max(ExtractYear("date")),
+        agg = MarkingDateSpan.objects.filter(is_removed=False).aggregate(
+            earliest=Min("approved_earliest_seen"),
+            latest=Max("approved_latest_seen"),
         )
-        earliest = int(agg["earliest_year"]) if agg["earliest_year"] is not None else None
-        latest = int(agg["latest_year"]) if agg["latest_year"] is not None else None
+        earliest = agg["earliest"].year if agg["earliest"] is not None else None
+        latest = agg["latest"].year if agg["latest"] is not None else None
         return Response({"earliest_year": earliest, "latest_year": latest})
 
 
+class RequestMetricsView(APIView):
+    """Rolling per-endpoint query / timing / size summary from woco.request_metrics
+    (this worker process only). Administrators only."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"results": endpoint_summary()})
+
+
 ###################################################################################################
 ## Contribution viewset
 ###################################################################################################
@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import Any
 from uuid import uuid4
 
-from django.db.models import Max
 from django.utils import timezone
 
 from common.models import (
@@ -16,6 +15,22 @@ from common.models import (
     MarkingVersion,
     SubmissionTransaction,
 )
+from common.subject_prefetch import fetch_subject_rows
+from common.version_store import create_version
+
+SNAPSHOT_IMAGE_FIELDS = (
+    "original_filename",
+    "storage_filename",
+    "file_checksum",
+    "mime_type",
+    "image_width",
+    "image_height",
+    "file_size_bytes",
+    "image_view",
+    "image_description",
+    "display_order",
+)
+SNAPSHOT_CITATION_FIELDS = ("reference_work_id", "citation_detail")
 
 
 def _json_safe(value: Any) -> Any:
@@ -43,29 +58,22 @@ def build_marking_snapshot(marking: Marking | None) -> dict[str, Any]:
     # PostOffice.region is a property that resolves to the most-recent active
     # Region via the post_office_regions junction. May be None if no link exists.
     region = post_office.region if post_office else None
-    images = (
-        Image.objects.filter(subject_type=Image.SUBJECT_MARKING, subject_id=marking.pk)
-        .order_by("display_order")
-        .values(
-            "original_filename",
-            "storage_filename",
-            "file_checksum",
-            "mime_type",
-            "image_width",
-            "image_height",
-            "file_size_bytes",
-            "image_view",
-            "image_description",
-            "display_order",
-        )
-    )
-    citations = Citation.objects.filter(
-        subject_type="MARKING",
-        subject_id=marking.pk,
-    ).order_by("reference_work_id", "citation_detail").values(
-        "reference_work_id",
-        "citation_detail",
-    )
+    # Always read fresh (never an instance-cached prefetch): snapshots are
+    # taken before and after a write on the same instance.
+    images = fetch_subject_rows(
+        Image,
+        Image.SUBJECT_MARKING,
+        [marking.pk],
+        order_by=("display_order",),
+        values=SNAPSHOT_IMAGE_FIELDS,
+    )[marking.pk]
+    citations = fetch_subject_rows(
+        Citation,
+        "MARKING",
+        [marking.pk],
+        order_by=("reference_work_id", "citation_detail"),
+        values=SNAPSHOT_CITATION_FIELDS,
+    )[marking.pk]
 
     return _json_safe(
         {
@@ -89,13 +97,36 @@ def build_marking_snapshot(marking: Marking | None) -> dict[str, Any]:
             "height": marking.height,
             "date_fmt": marking.date_fmt,
             "rate_val": marking.rate_val,
-            "images": list(images),
-            "citations": list(citations),
+            "images": images,
+            "citations": citations,
             "captured_at": timezone.now(),
         }
     )
 
 
+def marking_snapshot_summary(snap: dict[str, Any]) -> dict[str, Any]:
+    """The scalar fields of a marking snapshot the changelog lists per version."""
+    return {
+        "catalog_txt": snap.get("catalog_txt") or "",
+        "code": snap.get("code") or "",
+        "town": snap.get("town") or "",
+        "state": snap.get("state") or "",
+        "type": snap.get("type") or "",
+        "inscription_txt": snap.get("inscription_txt") or "",
+        "desc": snap.get("desc") or "",
+        "is_manuscript": bool(snap.get("is_manuscript")),
+        "impression": snap.get("impression") or "",
+        "is_irreg": snap.get("is_irreg"),
+        "shape_id": snap.get("shape_id"),
+        "lettering_id": snap.get("lettering_id"),
+        "color_id": snap.get("color_id"),
+        "date_fmt": snap.get("date_fmt") or "",
+        "rate_val": snap.get("rate_val"),
+        "width": snap.get("width"),
+        "height": snap.get("height"),
+    }
+
+
 def compute_payload_diff(before_payload: Any, after_payload: Any) -> list[dict[str, Any]]:
     before_dict = before_payload if isinstance(before_payload, dict) else {}
     after_dict = after_payload if isinstance(after_payload, dict) else {}
@@ -132,6 +163,8 @@ def log_submission_transaction(
     before_safe = _json_safe(before_payload or {})
     after_safe = _json_safe(after_payload or {})
     extra_safe = _json_safe(extra_payload or {})
+    if marking is None and getattr(contribution, "marking_id", None):
+        marking = contribution.marking
     return SubmissionTransaction.objects.create(
         transaction_uuid=uuid4(),
         actor=actor if getattr(actor, "is_authenticated", False) else None,
@@ -147,12 +180,26 @@ def log_submission_transaction(
     )
 
 
+def link_contribution_transactions(contribution) -> int:
+    """
+    Stamp the contribution's marking onto its earlier transactions (the submit
+    / edit rows logged before approval linked the marking), so a marking's
+    changelog is a single indexed filter on SubmissionTransaction.marking.
+    """
+    if not contribution.marking_id:
+        return 0
+    return SubmissionTransaction.objects.filter(
+        contribution_id=contribution.pk, marking__isnull=True
+    ).update(marking_id=contribution.marking_id)
+
+
 def create_marking_version(marking: Marking, transaction: SubmissionTransaction | None, actor=None) -> MarkingVersion:
-    latest = MarkingVersion.objects.filter(marking=marking).aggregate(max_no=Max("version_no"))["max_no"] or 0
-    return MarkingVersion.objects.create(
-        marking=marking,
-        version_no=latest + 1,
-        snapshot=build_marking_snapshot(marking),
+    snapshot = build_marking_snapshot(marking)
+    return create_version(
+        MarkingVersion,
+        marking,
+        snapshot,
+        summary=marking_snapshot_summary(snapshot),
         transaction=transaction,
         created_by=actor if getattr(actor, "is_authenticated", False) else None,
     )
@@ -253,32 +300,27 @@ def build_cover_snapshot(cover: Cover | None) -> dict[str, Any]:
     if not cover:
         return {}
 
-    images = (
-        Image.objects.filter(subject_type=Image.SUBJECT_COVER, subject_id=cover.pk)
-        .order_by("display_order")
-        .values(
-            "original_filename",
-            "storage_filename",
-            "file_checksum",
-            "mime_type",
-            "image_width",
-            "image_height",
-            "file_size_bytes",
-            "image_view",
-            "image_description",
-            "display_order",
-        )
-    )
-    dates_seen = (
-        DateSeen.objects.filter(subject_type="COVER", subject_id=cover.pk)
-        .order_by("date")
-        .values("date", "granularity")
-    )
-    citations = (
-        Citation.objects.filter(subject_type="COVER", subject_id=cover.pk)
-        .order_by("reference_work_id", "citation_detail")
-        .values("reference_work_id", "citation_detail")
-    )
+    images = fetch_subject_rows(
+        Image,
+        Image.SUBJECT_COVER,
+        [cover.pk],
+        order_by=("display_order",),
+        values=SNAPSHOT_IMAGE_FIELDS,
+    )[cover.pk]
+    dates_seen = fetch_subject_rows(
+        DateSeen,
+        DateSeen.SUBJECT_COVER,
+        [cover.pk],
+        order_by=("date",),
+        values=("date", "granularity"),
+    )[cover.pk]
+    citations = fetch_subject_rows(
+        Citation,
+        "COVER",
+        [cover.pk],
+        order_by=("reference_work_id", "citation_detail"),
+        values=SNAPSHOT_CITATION_FIELDS,
+    )[cover.pk]
     cover_markings = cover.cover_markings.values(
         "marking_id", "is_backstamp", "placement", "review_status"
     )
@@ -304,12 +346,26 @@ def build_cover_snapshot(cover: Cover | None) -> dict[str, Any]:
     )
 
 
+def cover_snapshot_summary(snap: dict[str, Any]) -> dict[str, Any]:
+    """The scalar fields of a cover snapshot the changelog lists per version."""
+    return {
+        "code": snap.get("code") or "",
+        "type": snap.get("type") or "",
+        "has_adhesive": bool(snap.get("has_adhesive")),
+        "is_institutional": snap.get("is_institutional"),
+        "color_id": snap.get("color_id"),
+        "width": snap.get("width"),
+        "height": snap.get("height"),
+    }
+
+
 def create_cover_version(cover: Cover, transaction: SubmissionTransaction | None, actor=None) -> CoverVersion:
-    latest = CoverVersion.objects.filter(cover=cover).aggregate(max_no=Max("version_no"))["max_no"] or 0
-    return CoverVersion.objects.create(
-        cover=cover,
-        version_no=latest + 1,
-        snapshot=build_cover_snapshot(cover),
+    snapshot = build_cover_snapshot(cover)
+    return create_version(
+        CoverVersion,
+        cover,
+        snapshot,
+        summary=cover_snapshot_summary(snapshot),
         transaction=transaction,
         created_by=actor if getattr(actor, "is_authenticated", False) else None,
     )
@@ -0,0 +1,442 @@
+###################################################################################################
+## WoCo Commons - Bundle diff
+## Incremental re-import of a regenerated ASCC bundle (import_ascc_bundle --diff)
+###################################################################################################
+"""
+Plan and apply the difference between a bundle and the catalog.
+
+A munger rerun regenerates the whole bundle. Row ids are not guaranteed to be
+stable between runs, so bundle rows are matched to DB rows by natural key
+(NATURAL_KEYS: marking / cover code, post office name plus its regions,
+lookup names). Tables without a natural key (dates seen, citations, images,
+...) are matched by content. Each row's content hash covers every column the
+CSV carries except the id and audit columns, with FKs rewritten to DB ids,
+so the same data always hashes the same however it was numbered.
+
+  matched, same hash       unchanged
+  matched, different hash  update (keeps the DB id)
+  bundle only              insert (keeps the bundle id when it is free)
+  DB only                  tombstone: markings / covers go to their recycle
+                           bin, dependent rows are deleted. Lookup rows
+                           (KEEP_STALE_STEMS) and rows of a recycle-binned
+                           record are left in place as "stale"
+
+Bundle rows carry the munger's audit user in created_by / modified_by. A DB
+row last modified by anyone else is editor work: it is never updated or
+tombstoned, only counted as "kept". Child FKs in the bundle are rewritten
+through the id mapping of their parent table, so a renumbered parent does
+not orphan its children.
+
+plan_bundle_diff() only reads. apply_bundle_diff() writes the plan in bulk,
+then gives every inserted, updated or tombstoned marking / cover the history
+an editor's change gets: a SubmissionTransaction (source=SOURCE_BUNDLE_IMPORT)
+holding full before / after snapshots, and a version row. Like the fast
+loader it bypasses model signals; the caller rebuilds the derived tables and
+bumps the caches.
+"""
+import hashlib
+import os
+from decimal import Decimal
+from uuid import uuid4
+
+from common.audit import (
+    build_cover_snapshot,
+    build_marking_snapshot,
+    create_cover_version,
+    create_marking_version,
+    log_submission_transaction,
+)
+from common.bundle_load import FAST_LOAD_BATCH_SIZE, bulk_load_rows, read_bundle_csv, validate_bundle_frame
+from common.models import (
+    Color,
+    Cover,
+    CoverMarking,
+    CoverRecycleBin,
+    CoverValuation,
+    Citation,
+    DateSeen,
+    Image,
+    Lettering,
+    Marking,
+    MarkingRecycleBin,
+    PostOffice,
+    PostOfficeRegion,
+    ReferenceWork,
+    Region,
+    Shape,
+    SubmissionTransaction,
+)
+
+STEM_MODELS = {
+    "colors": Color,
+    "letterings": Lettering,
+    "shapes": Shape,
+    "regions": Region,
+    "reference_works": ReferenceWork,
+    "post_offices": PostOffice,
+    "post_office_regions": PostOfficeRegion,
+    "markings": Marking,
+    "covers": Cover,
+    "cover_valuations": CoverValuation,
+    "dates_seen": DateSeen,
+    "cover_markings": CoverMarking,
+    "citations": Citation,
+    "images": Image,
+}
+
+# Pseudo-column: the region ids a post office is linked to through post_office_regions.
+REGIONS_KEY = "regions"
+
+# Natural key attnames per stem; stems not listed are matched by content hash.
+# A row with a blank key part is matched by content hash too.
+NATURAL_KEYS = {
+    "colors": ("name",),
+    "letterings": ("name",),
+    "shapes": ("name",),
+    "regions": ("name", "abbrev"),
+    "reference_works": ("code",),
+    "post_offices": ("name", REGIONS_KEY),
+    "post_office_regions": ("post_office_id", "region_id"),
+    "markings": ("code",),
+    "covers": ("code",),
+}
+
+# Lookup tables other records point at: rows gone from the bundle stay.
+KEEP_STALE_STEMS = frozenset({"colors", "letterings", "shapes", "regions", "reference_works", "post_offices"})
+
+# Stem -> (recycle bin model, FK field) for soft tombstones.
+RECYCLE_BINS = {
+    "markings": (MarkingRecycleBin, "marking"),
+    "covers": (CoverRecycleBin, "cover"),
+}
+
+# Stem -> SubmissionTransaction FK for changes that are logged.
+LOGGED_STEMS = {"markings": "marking", "covers": "cover"}
+REMOVED_ACTIONS = {
+    "markings": SubmissionTransaction.ACTION_MARKING_REMOVED,
+    "covers": SubmissionTransaction.ACTION_COVER_REMOVED,
+}
+# Stem -> (snapshot builder, version writer) for the logged stems.
+RECORD_HISTORY = {
+    "markings": (build_marking_snapshot, create_marking_version),
+    "covers": (build_cover_snapshot, create_cover_version),
+}
+
+AUDIT_ATTNAMES = frozenset({"created_date", "modified_date", "created_by_id", "modified_by_id"})
+
+# subject_type -> stem for the polymorphic subject_id columns.
+SUBJECT_STEMS = {"MARKING": "markings", "COVER": "covers"}
+
+
+class StemDiff:
+    """Planned changes for one bundle CSV."""
+
+    def __init__(self, stem, model, columns, errors=(), invalid=0):
+        self.stem = stem
+        self.model = model
+        self.columns = columns          # converted bundle columns; pk rewritten to the target id
+        self.errors = list(errors)
+        self.invalid = invalid
+        self.hashed = []                # attnames covered by the content hash
+        self.inserts = []               # row indexes into columns
+        self.updates = []               # (row index, DB row)
+        self.tombstones = []            # DB rows
+        self.unchanged = 0
+        self.kept = 0
+        self.stale = 0
+        self.id_map = {}                # bundle id -> target id
+
+    @property
+    def changes(self):
+        return len(self.inserts) + len(self.updates) + len(self.tombstones)
+
+
+class BundleDiff:
+    """plan_bundle_diff() result: one StemDiff per CSV, in load order."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.stems = {}
+
+    @property
+    def invalid(self):
+        return sum(diff.invalid for diff in self.stems.values())
+
+    @property
+    def changes(self):
+        return sum(diff.changes for diff in self.stems.values())
+
+
+###################################################################################################
+## Hashing and keys
+###################################################################################################
+def _canonical(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def row_hash(values):
+    """Stable content hash of one row's hashed column values."""
+    return hashlib.sha1("\x1f".join(_canonical(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def _key(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _remap_references(stem, frame, id_maps):
+    """Rewrite FK cells (and polymorphic subject ids) from bundle ids to target ids."""
+    frame = frame.copy()
+    for field in STEM_MODELS[stem]._meta.concrete_fields:
+        if not field.is_relation or field.name not in frame.columns:
+            continue
+        for parent, model in STEM_MODELS.items():
+            if model is field.related_model and parent in id_maps:
+                mapping = id_maps[parent]
+                frame[field.name] = [
+                    str(mapping.get(_key(v), v)) if _key(v) is not None else v for v in frame[field.name]
+                ]
+    if "subject_type" in frame.columns and "subject_id" in frame.columns:
+        remapped = []
+        for subject_type, subject_id in zip(frame["subject_type"], frame["subject_id"]):
+            mapping = id_maps.get(SUBJECT_STEMS.get(str(subject_type).strip()), {})
+            target = mapping.get(_key(subject_id))
+            remapped.append(str(target) if target is not None else subject_id)
+        frame["subject_id"] = remapped
+    return frame
+
+
+def _bundle_post_office_regions(directory, id_maps):
+    """{bundle post office id: sorted target region ids} from post_office_regions.csv."""
+    path = os.path.join(directory, "post_office_regions.csv")
+    links = {}
+    if os.path.isfile(path):
+        frame = read_bundle_csv(path)
+        regions = id_maps.get("regions", {})
+        for post_office, region in zip(frame["post_office"], frame["region"]):
+            region_id = regions.get(_key(region), _key(region))
+            links.setdefault(_key(post_office), set()).add(region_id)
+    return {pk: tuple(sorted(ids)) for pk, ids in links.items()}
+
+
+def _db_post_office_regions():
+    links = {}
+    for post_office_id, region_id in PostOfficeRegion.objects.values_list("post_office_id", "region_id"):
+        links.setdefault(post_office_id, set()).add(region_id)
+    return {pk: tuple(sorted(ids)) for pk, ids in links.items()}
+
+
+###################################################################################################
+## Planning
+###################################################################################################
+def _hangs_off(db_row, recycled):
+    """True if a DB row belongs to a marking / cover that is (being) recycle-binned."""
+    subject = SUBJECT_STEMS.get(db_row.get("subject_type"))
+    if subject and db_row.get("subject_id") in recycled.get(subject, ()):
+        return True
+    return any(db_row.get(f"{field}_id") in recycled.get(stem, ()) for stem, (_bin, field) in RECYCLE_BINS.items())
+
+
+def _match(diff, directory, id_maps, recycled):
+    """
+    Match bundle rows to DB rows and classify them (fills the StemDiff).
+    `recycled` ({stem: ids}) collects recycle-binned markings / covers; rows
+    hanging off them stay in place with the record.
+    """
+    model, columns = diff.model, diff.columns
+    pk = model._meta.pk.attname
+    diff.hashed = sorted(a for a in columns if a != pk and a not in AUDIT_ATTNAMES)
+    bundle_rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    db_rows = list(model._base_manager.values(pk, *diff.hashed, "created_by_id", "modified_by_id"))
+
+    key_fields = NATURAL_KEYS.get(diff.stem, ())
+    if REGIONS_KEY in key_fields:
+        bundle_links = _bundle_post_office_regions(directory, id_maps)
+        db_links = _db_post_office_regions()
+        for row in bundle_rows:
+            row[REGIONS_KEY] = bundle_links.get(row[pk], ())
+        for row in db_rows:
+            row[REGIONS_KEY] = db_links.get(row[pk], ())
+
+    def key_of(row):
+        digest = row_hash(row[a] for a in diff.hashed)
+        parts = tuple(row[a] for a in key_fields)
+        if parts and all(part not in (None, "", ()) for part in parts):
+            return parts, digest
+        return ("#", digest), digest
+
+    owners = {v for a in ("created_by_id", "modified_by_id") for v in columns.get(a, ()) if v is not None}
+
+    def owned(db_row):
+        # Without audit columns in the CSV every row counts as bundle-owned.
+        return not owners or (db_row["created_by_id"] in owners and db_row["modified_by_id"] in owners)
+
+    db_by_key = {}
+    for db_row in db_rows:
+        key, digest = key_of(db_row)
+        db_row["_hash"] = digest
+        db_by_key.setdefault(key, []).append(db_row)
+
+    taken = {row[pk] for row in db_rows}
+    next_free = max(taken | {row[pk] for row in bundle_rows if row[pk] is not None} | {0}) + 1
+    targets = []
+    for index, row in enumerate(bundle_rows):
+        key, digest = key_of(row)
+        candidates = db_by_key.get(key)
+        if candidates:
+            db_row = candidates.pop(0)
+            target = db_row[pk]
+            if db_row["_hash"] == digest:
+                diff.unchanged += 1
+            elif owned(db_row):
+                diff.updates.append((index, db_row))
+            else:
+                diff.kept += 1
+        else:
+            target = row[pk]
+            if target is None or target in taken:
+                target, next_free = next_free, next_free + 1
+            taken.add(target)
+            diff.inserts.append(index)
+        diff.id_map[row[pk]] = target
+        targets.append(target)
+    columns[pk] = targets
+    for field in model._meta.concrete_fields:
+        if field.is_relation and field.related_model is model and field.attname in columns:
+            columns[field.attname] = [diff.id_map.get(v, v) for v in columns[field.attname]]
+
+    removed = set()
+    if diff.stem in RECYCLE_BINS:
+        bin_model, field = RECYCLE_BINS[diff.stem]
+        removed = set(bin_model.objects.values_list(f"{field}_id", flat=True))
+    for leftovers in db_by_key.values():
+        for db_row in leftovers:
+            if db_row[pk] in removed:
+                continue
+            if not owned(db_row):
+                diff.kept += 1
+            elif diff.stem in KEEP_STALE_STEMS or _hangs_off(db_row, recycled):
+                diff.stale += 1
+            else:
+                diff.tombstones.append(db_row)
+    if diff.stem in RECYCLE_BINS:
+        recycled[diff.stem] = removed | {db_row[pk] for db_row in diff.tombstones}
+
+
+def plan_bundle_diff(directory, stems, batch_size=FAST_LOAD_BATCH_SIZE):
+    """
+    Compare the bundle CSVs for `stems` (in load order) with the DB. Stops at
+    the first CSV with invalid rows; check BundleDiff.invalid before applying.
+    """
+    plan = BundleDiff(directory)
+    id_maps, pending, recycled = {}, {}, {}
+    for stem in stems:
+        path = os.path.join(directory, f"{stem}.csv")
+        if not os.path.isfile(path):
+            continue
+        model = STEM_MODELS[stem]
+        frame = _remap_references(stem, read_bundle_csv(path), id_maps)
+        columns, errors, invalid = validate_bundle_frame(model, frame, batch_size=batch_size, pending=pending)
+        diff = StemDiff(stem, model, columns, errors, invalid)
+        plan.stems[stem] = diff
+        if invalid:
+            break
+        if len(frame):
+            _match(diff, directory, id_maps, recycled)
+        id_maps[stem] = diff.id_map
+        pending[model] = {diff.columns[model._meta.pk.attname][i] for i in diff.inserts}
+    return plan
+
+
+###################################################################################################
+## Applying
+###################################################################################################
+def _changed_records(diff):
+    """(action, record id) for every logged change in a marking / cover StemDiff."""
+    pk = diff.model._meta.pk.attname
+    return (
+        [(SubmissionTransaction.ACTION_RECORD_CREATE, diff.columns[pk][index]) for index in diff.inserts]
+        + [(SubmissionTransaction.ACTION_RECORD_UPDATE, db_row[pk]) for _index, db_row in diff.updates]
+        + [(REMOVED_ACTIONS[diff.stem], db_row[pk]) for db_row in diff.tombstones]
+    )
+
+
+def _records(diff, record_ids):
+    """{id: instance} of the given markings / covers, recycle-binned ones included."""
+    records = diff.model._base_manager.all()
+    if diff.model is Marking:
+        records = records.select_related("post_office")
+    return records.in_bulk(record_ids)
+
+
+def apply_bundle_diff(plan, actor, batch_size=FAST_LOAD_BATCH_SIZE):
+    """
+    Write a plan: inserts and updates per table in bulk, then tombstones.
+    Each changed marking / cover is then logged record by record, as the
+    API's perform_update does: log_submission_transaction with snapshots
+    taken before any table was written and after all of them, then a
+    version row. Returns the number of SubmissionTransaction rows logged.
+    Call inside transaction.atomic().
+    """
+    extra = {"bundle": os.path.abspath(plan.directory), "import_run": str(uuid4())}
+    reason = f"Removed from ASCC bundle {extra['bundle']}"
+    # Snapshots cover child rows (dates seen, citations, images), which later
+    # stems write, so take every "before" up front.
+    logged = {stem: diff for stem, diff in plan.stems.items() if stem in LOGGED_STEMS and diff.changes}
+    before = {}
+    for stem, diff in logged.items():
+        build_snapshot, _create_version = RECORD_HISTORY[stem]
+        existing = [record_id for action, record_id in _changed_records(diff)
+                    if action != SubmissionTransaction.ACTION_RECORD_CREATE]
+        before[stem] = {pk: build_snapshot(record) for pk, record in _records(diff, existing).items()}
+
+    for diff in plan.stems.values():
+        pk = diff.model._meta.pk.attname
+        written = diff.inserts + [index for index, _db_row in diff.updates]
+        if written:
+            bulk_load_rows(
+                diff.model,
+                {attname: [values[i] for i in written] for attname, values in diff.columns.items()},
+                batch_size=batch_size,
+            )
+        tombstoned = [db_row[pk] for db_row in diff.tombstones]
+        if diff.stem in RECYCLE_BINS:
+            bin_model, field = RECYCLE_BINS[diff.stem]
+            bin_model.objects.bulk_create(
+                [bin_model(**{f"{field}_id": record_id}, removed_by=actor, reason=reason) for record_id in tombstoned],
+                batch_size=batch_size,
+            )
+        else:
+            for start in range(0, len(tombstoned), batch_size):
+                diff.model._base_manager.filter(pk__in=tombstoned[start:start + batch_size]).delete()
+
+    count = 0
+    for stem, diff in logged.items():
+        build_snapshot, create_version = RECORD_HISTORY[stem]
+        changes = _changed_records(diff)
+        records = _records(diff, [record_id for _action, record_id in changes])
+        for action, record_id in changes:
+            record = records[record_id]
+            removed = action == REMOVED_ACTIONS[stem]
+            txn = log_submission_transaction(
+                action=action,
+                actor=actor,
+                source=SubmissionTransaction.SOURCE_BUNDLE_IMPORT,
+                before_payload=before[stem].get(record_id, {}),
+                after_payload={} if removed else build_snapshot(record),
+                extra_payload={**extra, "reason": reason} if removed else extra,
+                **{LOGGED_STEMS[stem]: record},
+            )
+            create_version(record, txn, actor)
+            count += 1
+    return count
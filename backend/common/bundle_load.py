@@ -0,0 +1,369 @@
+###################################################################################################
+## WoCo Commons - Bundle fast load
+## Vectorized validation + bulk_create loading of Django-shape bundle CSVs (import_ascc_bundle --fast)
+###################################################################################################
+"""
+Load one Django-shape CSV into its model without the per-row Resource path.
+
+import_ascc_bundle normally runs every CSV through django-import-export,
+which resolves each FK with its own query and saves each row with its own
+INSERT / UPDATE (plus the post_save receivers). fast_load_csv() does the same
+job table-at-a-time:
+
+  1. stream the CSV with pandas in BUNDLE_CSV_CHUNK_ROWS-row chunks (every
+     cell a string, blanks kept as ''), parsing the next chunk on a
+     background thread while the current one is written;
+  2. validate and convert each column of a chunk in one vectorized pass
+     against the model field: integers, decimals, booleans, dates, ISO
+     datetimes, max_length, choices, NOT NULL, duplicate ids / unique values
+     inside the file (across chunks too), and FK ids against the parent
+     table (one query per batch of ids);
+  3. bulk_create new ids and upsert existing ids in FAST_LOAD_BATCH_SIZE
+     batches.
+
+Memory is bounded by the chunk size, not the file size. Chunks before an
+invalid one have already been written, so callers run the load inside a
+transaction and roll back on error.
+
+Cell semantics follow the Resource widgets in common.admin: a blank cell is
+NULL for nullable columns (NullableCharWidget), '' for NOT NULL text, and the
+field default for NOT NULL columns that have one. Columns the model does not
+have are ignored; columns missing from the CSV keep their default on insert
+and their stored value on update. A file with any invalid cell writes
+nothing; the caller decides how to abort.
+
+bulk_create bypasses model signals. Callers must suspend / rebuild the
+derived tables and bump the cache generations themselves, as
+import_ascc_bundle does.
+"""
+import queue
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+
+# Rows per INSERT / upsert statement and ids per FK existence query.
+FAST_LOAD_BATCH_SIZE = getattr(settings, "BUNDLE_FAST_LOAD_BATCH_SIZE", 2000)
+
+# Rows parsed, validated and written per chunk when streaming a CSV.
+BUNDLE_CSV_CHUNK_ROWS = getattr(settings, "BUNDLE_CSV_CHUNK_ROWS", 10000)
+
+INTEGER_TYPES = frozenset({
+    "AutoField",
+    "BigAutoField",
+    "SmallAutoField",
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+})
+TEXT_TYPES = frozenset({"CharField", "TextField"})
+
+# import_export.widgets.BooleanWidget values, compared case-insensitively.
+BOOLEAN_VALUES = {
+    "1": True,
+    "true": True,
+    "0": False,
+    "false": False,
+    "": None,
+    "null": None,
+    "none": None,
+}
+
+
+class StemLoad:
+    """Outcome of fast_load_csv() for one CSV."""
+
+    def __init__(self, rows=0, new=0, update=0, errors=(), invalid=0, validate_seconds=0.0, load_seconds=0.0):
+        self.rows = rows
+        self.new = new
+        self.update = update
+        self.errors = list(errors)
+        self.invalid = invalid
+        self.validate_seconds = validate_seconds
+        self.load_seconds = load_seconds
+
+    def merge(self, other):
+        """Fold the outcome of a later chunk into this one."""
+        self.rows += other.rows
+        self.new += other.new
+        self.update += other.update
+        self.errors.extend(other.errors)
+        self.invalid += other.invalid
+        self.validate_seconds += other.validate_seconds
+        self.load_seconds += other.load_seconds
+
+    @property
+    def seconds(self):
+        return self.validate_seconds + self.load_seconds
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_bundle_csv(path, chunksize=None):
+    """Read a bundle CSV as strings; blank cells stay '' (no NaN inference)."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8", chunksize=chunksize)
+
+
+def iter_bundle_csv(path, chunk_rows=BUNDLE_CSV_CHUNK_ROWS, prefetch=1):
+    """
+    Yield a bundle CSV as DataFrames of at most `chunk_rows` rows. A
+    background thread parses up to `prefetch` chunks ahead while the caller
+    works on the current one. Index labels are 0-based row numbers in the
+    file and continue across chunks. A header-only or empty file yields
+    nothing.
+    """
+    chunks = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            with read_bundle_csv(path, chunksize=chunk_rows) as reader:
+                for chunk in reader:
+                    if not put(("chunk", chunk)):
+                        return
+        except pd.errors.EmptyDataError:
+            pass
+        except Exception as exc:  # re-raised in the consuming thread
+            put(("error", exc))
+            return
+        put(("done", None))
+
+    reader = threading.Thread(target=produce, name=f"bundle-csv-{path}", daemon=True)
+    reader.start()
+    try:
+        while True:
+            kind, payload = chunks.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise payload
+            yield payload
+    finally:
+        stop.set()
+        reader.join()
+
+
+###################################################################################################
+## Column validation
+###################################################################################################
+def _to_decimal(value):
+    try:
+        parsed = Decimal(value.strip())
+    except InvalidOperation:
+        return None
+    return parsed if parsed.is_finite() else None
+
+
+def _convert_column(field, raw, blank):
+    """
+    (values, invalid, message) for one CSV column. `values` is a list of
+    Python values (None for NULL); `invalid` flags unparseable cells.
+    """
+    kind = field.target_field.get_internal_type() if field.is_relation else field.get_internal_type()
+    none = pd.Series(False, index=raw.index)
+
+    if kind in INTEGER_TYPES:
+        numbers = pd.to_numeric(raw.where(~blank), errors="coerce")
+        invalid = ~blank & (numbers.isna() | (numbers % 1 != 0))
+        if kind.startswith("Positive"):
+            invalid |= numbers < 0
+        values = [None if pd.isna(v) else int(v) for v in numbers.where(~invalid).tolist()]
+        return values, invalid, "expected an integer"
+
+    if kind == "DecimalField":
+        parsed = raw.where(~blank).map(_to_decimal, na_action="ignore")
+        invalid = ~blank & parsed.isna()
+        return [None if pd.isna(v) else v for v in parsed.tolist()], invalid, "expected a decimal number"
+
+    if kind == "BooleanField":
+        lowered = raw.str.strip().str.lower()
+        invalid = ~lowered.isin(list(BOOLEAN_VALUES))
+        return [BOOLEAN_VALUES.get(v) for v in lowered.tolist()], invalid, "expected True / False / 1 / 0"
+
+    if kind == "DateField":
+        parsed = pd.to_datetime(raw.where(~blank), format="%Y-%m-%d", errors="coerce")
+        invalid = ~blank & parsed.isna()
+        return [None if pd.isna(ts) else ts.date() for ts in parsed], invalid, "expected a YYYY-MM-DD date"
+
+    if kind == "DateTimeField":
+        # Naive values are taken as UTC (settings.TIME_ZONE), as Django would.
+        parsed = pd.to_datetime(raw.where(~blank), format="ISO8601", utc=True, errors="coerce")
+        invalid = ~blank & parsed.isna()
+        return [None if pd.isna(ts) else ts.to_pydatetime() for ts in parsed], invalid, "expected an ISO 8601 datetime"
+
+    if kind in TEXT_TYPES and field.null:
+        stripped = raw.str.strip()
+        return [None if b else v for v, b in zip(stripped.tolist(), blank.tolist())], none, ""
+
+    return raw.tolist(), none, ""
+
+
+def _existing_pks(model, pks, batch_size):
+    found = set()
+    pks = sorted(pks)
+    for start in range(0, len(pks), batch_size):
+        found.update(
+            model._base_manager.filter(pk__in=pks[start:start + batch_size]).values_list("pk", flat=True)
+        )
+    return found
+
+
+def validate_bundle_frame(model, frame, batch_size=FAST_LOAD_BATCH_SIZE, max_errors=5, pending=None, seen=None):
+    """
+    Validate and convert a bundle DataFrame for `model`.
+
+    Returns (columns, errors, invalid): columns maps each present field's
+    attname to its list of Python values, errors holds the first
+    `max_errors` messages, invalid counts the rows with any bad cell.
+    `pending` ({model: ids}) names rows that will exist by the time this
+    one is written; FK values pointing at them are accepted. `seen`
+    ({column: values}) carries unique values across the chunks of one
+    file and is updated in place.
+    """
+    pending = pending or {}
+    fields = {f.name: f for f in model._meta.concrete_fields}
+    pk_name = model._meta.pk.name
+    # Self-referencing FKs (Region.parent_region) may point at rows in this file.
+    own_ids = set()
+    if pk_name in frame.columns:
+        own_ids = set(pd.to_numeric(frame[pk_name], errors="coerce").dropna().astype("int64").tolist())
+    columns = {}
+    problems = []  # (mask, column, message, raw)
+
+    for name in frame.columns:
+        field = fields.get(name)
+        if field is None:
+            continue
+        raw = frame[name].astype(str)
+        blank = raw.str.strip() == ""
+        values, invalid, message = _convert_column(field, raw, blank)
+        problems.append((invalid, name, message, raw))
+
+        automatic = getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+        if not field.null and not automatic and field.get_internal_type() not in TEXT_TYPES:
+            missing = blank & ~invalid
+            if field.has_default():
+                default = field.get_default()
+                values = [default if m else v for v, m in zip(values, missing.tolist())]
+            else:
+                problems.append((missing, name, "this field cannot be blank", raw))
+
+        text = raw.str.strip() if field.null else raw
+        if field.choices:
+            valid = [str(key) for key, _label in field.flatchoices]
+            problems.append((~blank & ~text.isin(valid), name, "not a valid choice", raw))
+        if field.get_internal_type() in TEXT_TYPES and field.max_length:
+            problems.append((text.str.len() > field.max_length, name, f"longer than {field.max_length}", raw))
+        if field.unique:
+            earlier = seen.setdefault(name, set()) if seen is not None else set()
+            duplicate = ~blank & (text.duplicated(keep="first") | text.isin(earlier))
+            problems.append((duplicate, name, "duplicate value in this file", raw))
+            if seen is not None:
+                earlier.update(text[~blank].tolist())
+        if field.is_relation:
+            ids = {v for v in values if v is not None}
+            known = pending.get(field.related_model, set())
+            if field.related_model is model:
+                known = known | own_ids
+            existing = known | _existing_pks(field.related_model, ids - known, batch_size)
+            dangling = pd.Series([v is not None and v not in existing for v in values], index=raw.index)
+            problems.append((dangling & ~invalid, name, f"{field.related_model.__name__} does not exist", raw))
+
+        columns[field.attname] = values
+
+    bad_rows = pd.Series(False, index=frame.index)
+    errors = []
+    for mask, name, message, raw in problems:
+        bad_rows |= mask
+        for index in mask[mask].index[: max(0, max_errors - len(errors))]:
+            errors.append(f"row {index + 1}: {name}: {message} ({raw[index]!r})")
+    return columns, errors, int(bad_rows.sum())
+
+
+###################################################################################################
+## Loading
+###################################################################################################
+def bulk_load_rows(model, columns, batch_size=FAST_LOAD_BATCH_SIZE):
+    """
+    Insert rows whose pk is new and upsert rows whose pk exists. Returns
+    (new, update). `columns` is the mapping validate_bundle_frame() returns.
+    """
+    attnames = list(columns)
+    objs = [model(**dict(zip(attnames, row))) for row in zip(*columns.values())]
+    pk = model._meta.pk
+    existing = _existing_pks(model, {obj.pk for obj in objs if obj.pk is not None}, batch_size)
+    new = [obj for obj in objs if obj.pk not in existing]
+    old = [obj for obj in objs if obj.pk in existing]
+
+    manager = model._base_manager
+    # New ids go through a plain INSERT so a clash on another unique column
+    # fails loudly instead of MySQL's ON DUPLICATE KEY UPDATE rewriting the
+    # row that owns that value.
+    manager.bulk_create(new, batch_size=batch_size)
+    if old:
+        # created_date keeps the stored value; auto_now columns always refresh,
+        # as Model.save() would.
+        update_fields = [
+            f.name for f in model._meta.concrete_fields
+            if not f.primary_key
+            and not getattr(f, "auto_now_add", False)
+            and (f.attname in columns or getattr(f, "auto_now", False))
+        ]
+        kwargs = {"update_conflicts": True, "update_fields": update_fields}
+        # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target.
+        if connection.features.supports_update_conflicts_with_target:
+            kwargs["unique_fields"] = [pk.name]
+        manager.bulk_create(old, batch_size=batch_size, **kwargs)
+    return len(new), len(old)
+
+
+def fast_load_csv(model, path, batch_size=FAST_LOAD_BATCH_SIZE, max_errors=5, chunk_rows=BUNDLE_CSV_CHUNK_ROWS):
+    """
+    Stream one bundle CSV: validate each chunk and load it before moving on;
+    stops at the first chunk with invalid rows. Returns a StemLoad (parse
+    time is counted as validation).
+    """
+    total = StemLoad()
+    seen = {}
+    started = time.perf_counter()
+    for chunk in iter_bundle_csv(path, chunk_rows=chunk_rows):
+        part = fast_load_frame(model, chunk, batch_size=batch_size, max_errors=max_errors, started=started, seen=seen)
+        total.merge(part)
+        if part.invalid:
+            break
+        started = time.perf_counter()
+    return total
+
+
+def fast_load_frame(model, frame, batch_size=FAST_LOAD_BATCH_SIZE, max_errors=5, started=None, seen=None):
+    """fast_load_csv() for a DataFrame already read with read_bundle_csv()."""
+    started = time.perf_counter() if started is None else started
+    columns, errors, invalid = validate_bundle_frame(
+        model, frame, batch_size=batch_size, max_errors=max_errors, seen=seen
+    )
+    result = StemLoad(rows=len(frame), errors=errors, invalid=invalid)
+    result.validate_seconds = time.perf_counter() - started
+    if invalid or not len(frame):
+        return result
+
+    started = time.perf_counter()
+    result.new, result.update = bulk_load_rows(model, columns, batch_size=batch_size)
+    result.load_seconds = time.perf_counter() - started
+    return result
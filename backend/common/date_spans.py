@@ -0,0 +1,234 @@
+###################################################################################################
+## WoCo Commons - Marking date spans
+## Maintenance of the materialized MarkingDateSpan table (earliest/latest seen per marking)
+###################################################################################################
+"""
+Compute and store MarkingDateSpan rows.
+
+The span for a marking is the min/max DateSeen.date over:
+  1. DateSeen rows attached directly to the marking (subject_type='MARKING')
+  2. DateSeen rows attached to covers linked to the marking via CoverMarking
+     (subject_type='COVER'); for the approved_* columns only APPROVED links count.
+
+This is the same union MarkingQuerySet.with_date_range computes per row with
+correlated subqueries. Here it is computed for a batch of markings with a
+handful of grouped queries and upserted, so callers can refresh any set of
+markings in O(batch) queries regardless of catalog size. The same batch
+also records the post office name and current region name the catalog's
+default ordering sorts on.
+
+Incremental maintenance is driven by the receivers in common.signals. Bulk
+loaders that write thousands of DateSeen / CoverMarking rows should wrap the
+load in suspend_date_span_maintenance() and call rebuild_marking_date_spans()
+once at the end.
+"""
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Max, Min
+
+
+logger = logging.getLogger(__name__)
+
+# Markings refreshed per grouped query / upsert batch.
+REFRESH_BATCH_SIZE = 1000
+
+SPAN_UPDATE_FIELDS = [
+    "earliest_seen",
+    "latest_seen",
+    "approved_earliest_seen",
+    "approved_latest_seen",
+    "is_removed",
+    "region_name",
+    "post_office_name",
+    "refreshed_at",
+]
+
+_maintenance_suspended = contextvars.ContextVar("marking_date_span_suspended", default=False)
+
+
+def date_span_maintenance_suspended():
+    """True while inside suspend_date_span_maintenance()."""
+    return _maintenance_suspended.get()
+
+
+@contextmanager
+def suspend_date_span_maintenance():
+    """
+    Disable per-row span refreshes from the signal handlers for the duration
+    of the block. The caller is responsible for calling
+    rebuild_marking_date_spans() (or refresh_marking_date_spans()) afterwards.
+    """
+    token = _maintenance_suspended.set(True)
+    try:
+        yield
+    finally:
+        _maintenance_suspended.reset(token)
+
+
+def _merge(lo_hi, lo, hi):
+    """Widen a [lo, hi] pair with another pair; either side may be None."""
+    cur_lo, cur_hi = lo_hi
+    if lo is not None and (cur_lo is None or lo < cur_lo):
+        cur_lo = lo
+    if hi is not None and (cur_hi is None or hi > cur_hi):
+        cur_hi = hi
+    return cur_lo, cur_hi
+
+
+def _compute_spans(marking_ids):
+    """
+    Return {marking_id: MarkingDateSpan (unsaved)} for the given existing
+    marking ids. Seven queries, independent of how many dates each marking has.
+    """
+    from .models import CoverMarking, DateSeen, Marking, MarkingDateSpan, MarkingRecycleBin, PostOffice
+
+    marking_ids = list(marking_ids)
+    spans = {mid: [(None, None), (None, None)] for mid in marking_ids}
+
+    direct = (
+        DateSeen.objects.filter(subject_type=DateSeen.SUBJECT_MARKING, subject_id__in=marking_ids)
+        .order_by()
+        .values("subject_id")
+        .annotate(lo=Min("date"), hi=Max("date"))
+    )
+    for row in direct:
+        span = spans.get(row["subject_id"])
+        if span is None:
+            continue
+        span[0] = _merge(span[0], row["lo"], row["hi"])
+        span[1] = _merge(span[1], row["lo"], row["hi"])
+
+    links = list(
+        CoverMarking.objects.filter(marking_id__in=marking_ids)
+        .order_by()
+        .values_list("marking_id", "cover_id", "review_status")
+    )
+    if links:
+        cover_ranges = {
+            row["subject_id"]: (row["lo"], row["hi"])
+            for row in DateSeen.objects.filter(
+                subject_type=DateSeen.SUBJECT_COVER,
+                subject_id__in={cover_id for _, cover_id, _ in links},
+            )
+            .order_by()
+            .values("subject_id")
+            .annotate(lo=Min("date"), hi=Max("date"))
+        }
+        for marking_id, cover_id, review_status in links:
+            rng = cover_ranges.get(cover_id)
+            if rng is None:
+                continue
+            span = spans[marking_id]
+            span[0] = _merge(span[0], *rng)
+            if review_status == CoverMarking.REVIEW_APPROVED:
+                span[1] = _merge(span[1], *rng)
+
+    removed = set(
+        MarkingRecycleBin.objects.filter(marking_id__in=marking_ids).values_list("marking_id", flat=True)
+    )
+
+    post_office_ids = dict(Marking.all_objects.filter(pk__in=marking_ids).values_list("pk", "post_office_id"))
+    # PostOffice.region picks the current region from the prefetched links.
+    post_offices = PostOffice.objects.filter(pk__in=set(post_office_ids.values())).prefetch_related(
+        "post_office_regions__region"
+    ).in_bulk()
+
+    result = {}
+    for mid, (all_span, approved_span) in spans.items():
+        post_office = post_offices.get(post_office_ids.get(mid))
+        region = post_office.region if post_office is not None else None
+        result[mid] = MarkingDateSpan(
+            marking_id=mid,
+            earliest_seen=all_span[0],
+            latest_seen=all_span[1],
+            approved_earliest_seen=approved_span[0],
+            approved_latest_seen=approved_span[1],
+            is_removed=mid in removed,
+            region_name=region.name if region is not None else None,
+            post_office_name=post_office.name if post_office is not None else None,
+        )
+    return result
+
+
+def _upsert(objs):
+    from .models import MarkingDateSpan
+
+    if not objs:
+        return
+    kwargs = {"update_conflicts": True, "update_fields": SPAN_UPDATE_FIELDS}
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target.
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["marking"]
+    MarkingDateSpan.objects.bulk_create(objs, batch_size=REFRESH_BATCH_SIZE, **kwargs)
+
+
+def refresh_marking_date_spans(marking_ids):
+    """
+    Recompute and upsert the span rows for the given marking ids. Ids that no
+    longer reference a Marking (e.g. deleted in the same transaction) are
+    ignored; their span row goes away with the CASCADE.
+
+    Returns the number of span rows written.
+    """
+    from .models import Marking
+
+    ids = sorted({int(mid) for mid in marking_ids if mid is not None})
+    written = 0
+    for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+        chunk = ids[start:start + REFRESH_BATCH_SIZE]
+        existing = Marking.all_objects.filter(pk__in=chunk).values_list("pk", flat=True)
+        objs = list(_compute_spans(existing).values())
+        _upsert(objs)
+        written += len(objs)
+    return written
+
+
+def refresh_marking_date_spans_for_covers(cover_ids):
+    """Refresh every marking linked (in any review state) to the given covers."""
+    from .models import CoverMarking
+
+    cover_ids = [cid for cid in cover_ids if cid is not None]
+    if not cover_ids:
+        return 0
+    marking_ids = CoverMarking.objects.filter(cover_id__in=cover_ids).values_list("marking_id", flat=True)
+    return refresh_marking_date_spans(list(marking_ids))
+
+
+def rebuild_marking_date_spans(batch_size=REFRESH_BATCH_SIZE, stdout=None):
+    """
+    Rebuild the whole MarkingDateSpan table: drop rows whose marking is gone
+    (possible after a raw-SQL truncate) and recompute every marking in
+    pk-ordered batches. Safe to run at any time; run inside a transaction for
+    an all-or-nothing rebuild.
+
+    Returns the number of span rows written.
+    """
+    from .models import Marking, MarkingDateSpan
+
+    MarkingDateSpan.objects.exclude(
+        marking_id__in=Marking.all_objects.values("pk")
+    ).delete()
+
+    written = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            Marking.all_objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not chunk:
+            break
+        objs = list(_compute_spans(chunk).values())
+        _upsert(objs)
+        written += len(objs)
+        last_pk = chunk[-1]
+        if stdout is not None:
+            stdout.write(f"  marking date spans  refreshed={written:>6d}  (through marking #{last_pk})")
+    logger.info("Rebuilt %d marking date span rows", written)
+    return written
+
+###################################################################################################
@@ -2,10 +2,19 @@
 ## WoCo Commons - Model Filters
 ## MPC: 2025/11/15
 ###################################################################################################
+from datetime import MAXYEAR, MINYEAR, date
+
 import django_filters
 from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
 from .models import CoverMarking, Marking, MarkingType
+from .search import search_markings
+
+
+def _clamp_year(value):
+    """Coerce a year filter value into the range datetime.date accepts."""
+    return min(max(int(value), MINYEAR), MAXYEAR)
 
 
 class MarkingListFilter(django_filters.FilterSet):
@@ -50,20 +59,20 @@ class MarkingListFilter(django_filters.FilterSet):
 
     @staticmethod
     def filter_earliest_use_year_min(queryset, name, value):
-        # Filter on the unioned (direct + cover-mediated) earliest date that
-        # `with_date_range` annotates onto the Marking queryset. Idempotent:
-        # re-annotating with the same expression is safe.
+        # Filter on the unioned (direct + cover-mediated) earliest date kept
+        # in the materialized MarkingDateSpan table. "year >= Y" is expressed
+        # as a date comparison so the indexed column can be range-scanned.
         if value is None:
             return queryset
-        return queryset.with_date_range().filter(earliest_seen__year__gte=int(value))
+        return queryset.filter(date_span__earliest_seen__gte=date(_clamp_year(value), 1, 1))
 
     @staticmethod
     def filter_latest_use_year_max(queryset, name, value):
-        # Filter on the unioned (direct + cover-mediated) latest date that
-        # `with_date_range` annotates onto the Marking queryset.
+        # Filter on the unioned (direct + cover-mediated) latest date kept in
+        # the materialized MarkingDateSpan table.
         if value is None:
             return queryset
-        return queryset.with_date_range().filter(latest_seen__year__lte=int(value))
+        return queryset.filter(date_span__latest_seen__lte=date(_clamp_year(value), 12, 31))
 
     @staticmethod
     def filter_is_manuscript(queryset, name, value):
@@ -119,12 +128,7 @@ class MarkingFilter(django_filters.FilterSet):
     def filter_q(self, queryset, name, value):
         if not value:
             return queryset
-        return queryset.filter(
-            Q(code__icontains=value)
-            | Q(catalog_txt__icontains=value)
-            | Q(inscription_txt__icontains=value)
-            | Q(desc__icontains=value)
-        )
+        return search_markings(queryset, value)
 
     def filter_by_state(self, queryset, name, value):
         if not value:
@@ -170,3 +174,36 @@ class CoverMarkingFilter(django_filters.FilterSet):
 
 
 ###################################################################################################
+
+
+class MarkingSearchFilter(BaseFilterBackend):
+    """
+    `?search=` over the MarkingSearchDocument index (see common.search),
+    replacing DRF's SearchFilter icontains ORs. Every term must match (as a
+    prefix). Unless the client asked for an explicit `?ordering=`, results
+    come back best match first, then by id. List it AFTER OrderingFilter so
+    the rank ordering wins over the view's default ordering.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip():
+            return queryset
+        queryset = search_markings(queryset, text)
+        if 'search_rank' not in queryset.query.annotations:
+            return queryset
+        if request.query_params.get(OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by('-search_rank', 'id')
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Ranked keyword search (prefix match on every term).',
+                'schema': {'type': 'string'},
+            },
+        ]
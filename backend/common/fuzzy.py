@@ -0,0 +1,160 @@
+###################################################################################################
+## WoCo Commons - Fuzzy inscription matching
+## Trigram index over Marking.inscription_txt + PostOffice.name, similarity-ranked lookup
+###################################################################################################
+"""
+Fuzzy lookup for inscriptions typed the way collectors read them off a
+cover: abbreviated ("FREDG" for FREDERICKSBURG), missing periods ("ST LOUIS
+MO" for "ST. LOUIS, Mo."), or with OCR-style letter errors ("RICHM0ND").
+
+Index: for every marking, fuzzy_text() of its inscription plus post office
+name is split into words and each word into padded trigrams ('##R', '#RI',
+'RIC', ..., 'ND#'). The distinct trigrams live in MarkingTrigram; the count
+and the normalized text sit on the marking's MarkingSearchDocument row. Both
+are written by common.search alongside the keyword search document.
+
+Lookup: one indexed `trigram IN (...) GROUP BY marking` query returns the
+markings sharing the most trigrams with the query; those candidates are
+re-scored in Python by trigram Jaccard similarity blended with word
+coverage, where a query word covers a document word it equals, prefixes,
+or abbreviates.
+
+Normalization mirrors the munger's alias rules in
+tools/munger/relationships.py (_norm_for_alias: trailing periods / commas
+dropped, upper-cased; _is_abbrev_of: conservative subsequence abbreviation)
+so that names resolve the same way at import and at search time.
+"""
+import re
+import unicodedata
+
+from django.db.models import Count
+
+# Trigram padding; not a space so PAD SPACE collations cannot fold it away.
+PAD = "#"
+# Candidates fetched from the trigram index before Python re-scoring.
+CANDIDATE_LIMIT = 200
+# Query trigrams beyond this are dropped (very long queries).
+MAX_QUERY_TRIGRAMS = 48
+# Blend of trigram similarity and word coverage in the final score.
+TRIGRAM_WEIGHT = 0.6
+
+_NON_WORD = re.compile(r"[^0-9A-Z]+")
+
+
+def _norm_for_alias(s):
+    """Trim, drop trailing periods / commas / whitespace, upper-case (munger rule)."""
+    if s is None:
+        return None
+    return re.sub(r"[.,\s]+$", "", str(s).strip()).upper() or None
+
+
+def _is_abbrev_of(short, long):
+    """Conservative: short shares first letter with long, is at least 3
+    characters, at most half long's length, and short's letters appear
+    as a subsequence in long. Catches FREDG -> FREDERICKSBURG, CULPE ->
+    CULPEPER, CHS -> CHARLES; rejects CHARLE -> CHARLESTON (length
+    ratio too high)."""
+    if not short or not long or short[0] != long[0]:
+        return False
+    if len(short) < 3 or len(short) * 2 > len(long):
+        return False
+    j = 0
+    for ch in long:
+        if j < len(short) and ch == short[j]:
+            j += 1
+    return j == len(short)
+
+
+def fuzzy_words(text):
+    """Normalized words: accents stripped, each word alias-normalized, punctuation folded."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", str(text))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    words = []
+    for raw in folded.split():
+        word = _norm_for_alias(raw)
+        if word:
+            words.extend(w for w in _NON_WORD.split(word) if w)
+    return words
+
+
+def fuzzy_text(*parts):
+    """Space-joined distinct normalized words of all parts, in first-seen order."""
+    words = []
+    for part in parts:
+        words.extend(fuzzy_words(part))
+    return " ".join(dict.fromkeys(words))
+
+
+def trigrams(text):
+    """Distinct padded word trigrams of an already-normalized text."""
+    grams = set()
+    for word in text.split():
+        padded = f"{PAD}{PAD}{word}{PAD}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _word_covered(query_word, doc_words):
+    for word in doc_words:
+        if word == query_word or word.startswith(query_word) or _is_abbrev_of(query_word, word):
+            return True
+    return False
+
+
+def similarity(query_text, query_grams, doc_text, doc_gram_count, shared):
+    """Score in [0, 1] for one candidate; see module docstring."""
+    union = len(query_grams) + doc_gram_count - shared
+    gram_score = shared / union if union else 0.0
+    query_words = query_text.split()
+    doc_words = doc_text.split()
+    covered = sum(1 for w in query_words if _word_covered(w, doc_words))
+    word_score = covered / len(query_words) if query_words else 0.0
+    return TRIGRAM_WEIGHT * gram_score + (1 - TRIGRAM_WEIGHT) * word_score
+
+
+def fuzzy_match_markings(query, *, limit=20, min_score=0.2):
+    """
+    Return [(marking_id, score), ...] best first for markings (excluding
+    recycle-binned ones) whose inscription / town resemble `query`.
+    """
+    from .models import MarkingRecycleBin, MarkingSearchDocument, MarkingTrigram
+
+    query_text = fuzzy_text(query)
+    query_grams = sorted(trigrams(query_text))[:MAX_QUERY_TRIGRAMS]
+    if not query_grams:
+        return []
+
+    # Require a minimal overlap so single shared padding trigrams ('##S')
+    # do not flood the candidate list. Removed markings are excluded here,
+    # before the cut, so they cannot push live ones out of it; NOT IN over
+    # the small recycle-bin table is cheaper than joining every trigram row
+    # to marking.
+    min_shared = max(1, len(query_grams) // 4)
+    candidates = list(
+        MarkingTrigram.objects.filter(trigram__in=query_grams)
+        .exclude(marking_id__in=MarkingRecycleBin.objects.values("marking_id"))
+        .values("marking_id")
+        .annotate(shared=Count("marking_id"))
+        .filter(shared__gte=min_shared)
+        .order_by("-shared", "marking_id")[:CANDIDATE_LIMIT]
+    )
+    if not candidates:
+        return []
+
+    shared_by_id = {row["marking_id"]: row["shared"] for row in candidates}
+    docs = MarkingSearchDocument.objects.filter(marking_id__in=shared_by_id).values_list(
+        "marking_id", "fuzzy_text", "trigram_count"
+    )
+
+    query_gram_set = set(query_grams)
+    scored = []
+    for marking_id, doc_text, gram_count in docs:
+        score = similarity(query_text, query_gram_set, doc_text, gram_count, shared_by_id[marking_id])
+        if score >= min_score:
+            scored.append((marking_id, round(score, 4)))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+###################################################################################################
@@ -0,0 +1,104 @@
+"""
+Time fuzzy inscription lookups (common.fuzzy) against the current catalog.
+
+Samples live markings from the search index, turns each one's fuzzy text
+into a collector-style query (one long word abbreviated the munger way,
+FREDERICKSBURG -> FREDG, or one letter swapped for an OCR look-alike,
+RICHMOND -> RICHM0ND) and times fuzzy_match_markings: the candidate query on
+MarkingTrigram plus the Python re-scoring. Reports latency percentiles and
+how often the sampled marking ranked first (ties with the top score count:
+many markings share one town's text). Read-only; the target is a p95 under
+50 ms on the full catalog, so run it against MySQL.
+
+Usage:
+    python manage.py benchmark_fuzzy_match
+    python manage.py benchmark_fuzzy_match --samples 1000 --seed 7
+    python manage.py benchmark_fuzzy_match --query "FREDG VA" --query "st louis mo"
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from common.fuzzy import fuzzy_match_markings
+from common.models import Marking, MarkingSearchDocument, MarkingTrigram
+
+# OCR-style confusions applied to one letter of a sampled query.
+LOOKALIKES = {"O": "0", "I": "1", "S": "5", "B": "8", "E": "F", "N": "M", "L": "I"}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _loosen(text, rng):
+    """A collector-style variant of a normalized fuzzy text."""
+    words = text.split()
+    i = rng.randrange(len(words))
+    word = words[i]
+    if len(word) >= 10 and rng.random() < 0.5:
+        words[i] = word[:4] + word[-1]
+    else:
+        positions = [j for j, ch in enumerate(word) if ch in LOOKALIKES]
+        if positions:
+            j = rng.choice(positions)
+            words[i] = word[:j] + LOOKALIKES[word[j]] + word[j + 1:]
+    return " ".join(words)
+
+
+class Command(BaseCommand):
+    help = "Time fuzzy inscription lookups against the current catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=200, help="Markings sampled as queries (default: 200).")
+        parser.add_argument("--seed", type=int, default=0, help="Sampling seed (default: 0).")
+        parser.add_argument(
+            "--query", action="append", default=[],
+            help="Time this query instead of sampling (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        if options["samples"] < 1:
+            raise CommandError("--samples must be a positive integer.")
+        queries = [(query, None) for query in options["query"]] or self._sample(options["samples"], options["seed"])
+
+        fuzzy_match_markings(queries[0][0])  # warm the connection and query cache
+        latencies, first = [], 0
+        for query, expected in queries:
+            started = time.perf_counter()
+            results = fuzzy_match_markings(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            scores = dict(results)
+            if expected is not None and scores.get(expected) == (results[0][1] if results else None):
+                first += 1
+
+        self.stdout.write(
+            f"{len(queries)} lookups over {Marking.objects.count()} markings, "
+            f"{MarkingTrigram.objects.count()} trigram rows ({connection.vendor})"
+        )
+        self.stdout.write(
+            f"latency ms: p50={_percentile(latencies, 0.5):.1f} p95={_percentile(latencies, 0.95):.1f} "
+            f"max={max(latencies):.1f} mean={statistics.mean(latencies):.1f}"
+        )
+        if not options["query"]:
+            self.stdout.write(f"sampled marking ranked first: {first}/{len(queries)}")
+
+    @staticmethod
+    def _sample(samples, seed):
+        rng = random.Random(seed)
+        ids = list(
+            MarkingSearchDocument.objects.filter(marking__recycle_bin_entry__isnull=True)
+            .exclude(fuzzy_text="")
+            .order_by("marking_id")
+            .values_list("marking_id", flat=True)
+        )
+        if not ids:
+            raise CommandError("No search documents; run rebuild_marking_search_index first.")
+        picked = rng.sample(ids, min(samples, len(ids)))
+        texts = dict(
+            MarkingSearchDocument.objects.filter(marking_id__in=picked).values_list("marking_id", "fuzzy_text")
+        )
+        return [(_loosen(texts[marking_id], rng), marking_id) for marking_id in picked]
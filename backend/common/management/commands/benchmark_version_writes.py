@@ -0,0 +1,155 @@
+"""
+Benchmark concurrent marking edits and check version numbering.
+
+Runs MarkingViewSet.perform_update (snapshot, SubmissionTransaction and
+MarkingVersion, the same path as PATCH /api/v2/markings/{id}/) from several
+threads against ONE marking, then reports per-write latency and verifies that
+the marking's versions are numbered 1..N with no gaps, duplicates or failed
+writes. Every thread uses its own database connection, so run it against
+MySQL: SQLite serializes writers and select_for_update is a no-op there.
+
+By default a scratch marking is created and deleted afterwards (with its
+versions and transactions); --marking edits an existing one and keeps the
+history. Meant for a development or staging database.
+
+Usage:
+    python manage.py benchmark_version_writes
+    python manage.py benchmark_version_writes --threads 16 --writes 25
+    python manage.py benchmark_version_writes --marking 1234 --username admin
+"""
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.api.v2.views import MarkingViewSet
+from common.models import (
+    Color,
+    Marking,
+    MarkingVersion,
+    PostOffice,
+    RecordVersionCounter,
+    SubmissionTransaction,
+)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = "Time concurrent marking updates and verify race-free version numbering."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent writers (default: 8).")
+        parser.add_argument("--writes", type=int, default=10, help="Updates per thread (default: 10).")
+        parser.add_argument("--marking", type=int, default=None, help="Edit this marking instead of a scratch one.")
+        parser.add_argument("--username", default=None, help="Acting user (default: first superuser).")
+
+    def handle(self, *args, **options):
+        threads, writes = options["threads"], options["writes"]
+        if threads < 1 or writes < 1:
+            raise CommandError("--threads and --writes must be positive integers.")
+        actor = self._actor(options["username"])
+
+        scratch = options["marking"] is None
+        if scratch:
+            color = Color.objects.order_by("pk").first()
+            post_office = PostOffice.objects.order_by("pk").first()
+            if color is None or post_office is None:
+                raise CommandError("Need a Color and a PostOffice to create a scratch marking.")
+            marking = Marking.objects.create(
+                type="TOWNMARK", inscription_txt="VERSION BENCHMARK", is_manuscript=True,
+                color=color, post_office=post_office, created_by=actor, modified_by=actor,
+            )
+        else:
+            marking = Marking.all_objects.filter(pk=options["marking"]).first()
+            if marking is None:
+                raise CommandError(f"Marking {options['marking']} not found.")
+        start_no = MarkingVersion.objects.filter(marking=marking).count()
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def writer(thread_no):
+            factory = APIRequestFactory()
+            try:
+                barrier.wait()
+                for n in range(writes):
+                    started = time.perf_counter()
+                    try:
+                        self._update(factory, actor, marking.pk, f"bench-{thread_no}-{n}")
+                    except Exception as exc:  # report every failure, keep going
+                        with lock:
+                            errors.append(f"thread {thread_no} write {n}: {exc!r}")
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+        wall_started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        wall = time.perf_counter() - wall_started
+
+        version_nos = sorted(
+            MarkingVersion.objects.filter(marking=marking).values_list("version_no", flat=True)
+        )
+        expected = list(range(1, start_no + threads * writes + 1))
+
+        self.stdout.write(f"{threads} threads x {writes} updates on marking {marking.pk} ({connection.vendor})")
+        if latencies:
+            ms = [value * 1000 for value in latencies]
+            self.stdout.write(
+                f"latency ms: p50={_percentile(ms, 0.5):.1f} p95={_percentile(ms, 0.95):.1f} "
+                f"max={max(ms):.1f} mean={statistics.mean(ms):.1f}"
+            )
+            self.stdout.write(f"throughput: {len(latencies) / wall:.1f} writes/s over {wall:.2f}s")
+        for error in errors[:10]:
+            self.stdout.write(self.style.ERROR(error))
+
+        if scratch:
+            with transaction.atomic():
+                SubmissionTransaction.objects.filter(marking=marking).delete()
+                RecordVersionCounter.objects.filter(
+                    record_type=RecordVersionCounter.RECORD_MARKING, record_id=marking.pk
+                ).delete()
+                marking.delete()
+
+        if errors or version_nos != expected:
+            raise CommandError(
+                f"Version numbering check FAILED: {len(errors)} failed writes, "
+                f"{len(version_nos)} versions, expected 1..{len(expected)}."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Version numbering OK: 1..{len(expected)}, no gaps or duplicates."))
+
+    @staticmethod
+    def _actor(username):
+        users = get_user_model().objects
+        actor = users.filter(username=username).first() if username else users.filter(is_superuser=True).first()
+        if actor is None:
+            raise CommandError("No acting user found; pass --username.")
+        return actor
+
+    @staticmethod
+    def _update(factory, actor, marking_id, code):
+        """One MarkingViewSet.perform_update, as a PATCH request would run it."""
+        request = Request(factory.patch(f"/api/v2/markings/{marking_id}/", {"code": code}, format="json"))
+        request.user = actor
+        view = MarkingViewSet(request=request, format_kwarg=None, action="partial_update", kwargs={})
+        with transaction.atomic():
+            marking = Marking.all_objects.get(pk=marking_id)
+            serializer = view.get_serializer(marking, data={"code": code}, partial=True)
+            serializer.is_valid(raise_exception=True)
+            view.perform_update(serializer)
@@ -0,0 +1,97 @@
+"""
+Re-encode MarkingVersion / CoverVersion history as keyframes + deltas.
+
+New versions are delta-encoded as they are written (common.version_store);
+history written before that holds a full snapshot per row. This command
+rewrites each record's versions so only every VERSION_KEYFRAME_INTERVAL-th
+row (or one whose delta would not be smaller) keeps a full snapshot, and
+reports the stored JSON size before and after. Snapshots reconstruct
+exactly as before; restore-version and the changelog are unaffected. Each
+record is compacted under its RecordVersionCounter lock, so edits made while
+the command runs wait for that record instead of racing it.
+
+Usage:
+    python manage.py compact_version_history
+    python manage.py compact_version_history --model marking --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from common.models import CoverVersion, MarkingVersion
+from common.version_store import VERSION_KEYFRAME_INTERVAL, VERSION_OWNER_FIELDS, compact_record_history
+
+MODELS = {
+    "marking": MarkingVersion,
+    "cover": CoverVersion,
+}
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class Command(BaseCommand):
+    help = "Compact version history into keyframe + JSON-patch delta rows and report the saving."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=["all", *MODELS],
+            default="all",
+            help="Which version table to compact (default: all).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the saving without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        names = list(MODELS) if options["model"] == "all" else [options["model"]]
+        self.stdout.write(f"Keyframe interval: {VERSION_KEYFRAME_INTERVAL}")
+
+        total_before = total_after = 0
+        for name in names:
+            model = MODELS[name]
+            owner_id_field = f"{VERSION_OWNER_FIELDS[model]}_id"
+            owner_ids = list(
+                model.objects.order_by(owner_id_field)
+                .values_list(owner_id_field, flat=True)
+                .distinct()
+            )
+            before = after = rows = records = 0
+            for owner_id in owner_ids:
+                # One transaction per record: a partial run leaves every
+                # record either fully old-format or fully compacted.
+                with transaction.atomic():
+                    record_before, record_after, rewritten = compact_record_history(
+                        model, owner_id, dry_run=dry_run
+                    )
+                before += record_before
+                after += record_after
+                rows += rewritten
+                records += 1
+            total_before += before
+            total_after += after
+            self.stdout.write(
+                f"{model.__name__}: records={records} rows_rewritten={rows} "
+                f"size {_format_bytes(before)} -> {_format_bytes(after)}"
+                f"{self._saving(before, after)}"
+            )
+
+        verb = "Would save" if dry_run else "Saved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {_format_bytes(total_before - total_after)} of {_format_bytes(total_before)}"
+            f"{self._saving(total_before, total_after)}"
+        ))
+
+    @staticmethod
+    def _saving(before, after):
+        if not before:
+            return ""
+        return f" ({100 * (before - after) / before:.1f}% smaller)"
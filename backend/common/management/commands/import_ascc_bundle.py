@@ -40,15 +40,42 @@ and integer FK columns referencing the parent table's `id`. There is
 no per-row transformation in this command -- the Resource classes
 handle parsing, FK resolution, and persistence.
 
+--fast skips the Resource classes: each CSV is validated column-at-a-time
+and written with bulk_create (common.bundle_load), which is much faster on
+full bundles. Same load order, same single transaction, same --dry-run and
+--truncate behaviour; a CSV with any invalid cell aborts the whole bundle.
+Every stem reports its throughput in rows/s.
+
+Every CSV is streamed in --chunk-rows chunks (common.bundle_load.iter_bundle_csv):
+while one chunk is validated and written, the next is parsed on a background
+thread, so memory is bounded by the chunk size rather than by the largest
+table (dates_seen / images). Totals and the per-stem progress line are the
+same as for a whole-file read; error row numbers count from the top of the
+file.
+
+--diff re-imports a regenerated bundle incrementally instead of wiping it
+with --truncate (common.bundle_diff). Rows are matched to the catalog by
+natural key or content hash and only the differences are written: inserts,
+updates, and tombstones (markings / covers go to the recycle bin). Rows that
+editors have changed since the import are left alone. The change summary is
+printed before anything is written, marking / cover changes are logged as
+SubmissionTransactions with source "bundle_import", and --dry-run stops after
+the summary.
+
 Usage:
     python manage.py import_ascc_bundle ./tools/wip/out/
     python manage.py import_ascc_bundle ./out/ --only markings,covers
     python manage.py import_ascc_bundle ./out/ --dry-run
+    python manage.py import_ascc_bundle ./out/ --fast --truncate
+    python manage.py import_ascc_bundle ./out/ --fast --chunk-rows 50000
+    python manage.py import_ascc_bundle ./out/ --diff --dry-run
 """
 import os
 import sys
+import time
 
 import tablib
+from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 from django.db import connection, transaction
 
@@ -68,7 +95,20 @@ from common.admin import (
     RegionResource,
     ShapeResource,
 )
-from common.models import Collection, Region
+from common.bundle_diff import apply_bundle_diff, plan_bundle_diff
+from common.bundle_load import BUNDLE_CSV_CHUNK_ROWS, FAST_LOAD_BATCH_SIZE, fast_load_csv, iter_bundle_csv
+from common.date_spans import rebuild_marking_date_spans, suspend_date_span_maintenance
+from common.models import (
+    Collection,
+    MarkingDateSpan,
+    MarkingSearchDocument,
+    MarkingTrigram,
+    RecordVersionCounter,
+    Region,
+)
+from common.search import rebuild_marking_search_documents, suspend_search_index_maintenance
+from woco.counts import bump_count_generation
+from woco.response_cache import bump_catalog_generation
 
 
 # Stem -> Resource class. The stem is the CSV basename without extension.
@@ -118,6 +158,28 @@ ASCC_LOAD_ORDER = (
     "images",
 )
 
+# Stems whose rows feed MarkingDateSpan. Loading any of them triggers a
+# span rebuild at the end of the import.
+DATE_SPAN_STEMS = frozenset({
+    "markings",
+    "covers",
+    "dates_seen",
+    "cover_markings",
+})
+
+# Stems whose rows feed MarkingSearchDocument (marking text plus the names
+# of its post office, regions, shape, lettering and color) and the
+# MarkingTrigram fuzzy-match index.
+SEARCH_INDEX_STEMS = frozenset({
+    "colors",
+    "letterings",
+    "shapes",
+    "regions",
+    "post_offices",
+    "post_office_regions",
+    "markings",
+})
+
 # Stems whose CSV may be absent from the bundle without --allow-missing.
 # Reason: the munger no longer auto-creates Covers and therefore does not
 # emit CoverMarking or CoverValuation rows either. Bundles produced after
@@ -131,13 +193,9 @@ OPTIONAL_STEMS = frozenset({
 })
 
 
-def _load_dataset(path):
-    """Read a CSV from disk into a tablib.Dataset with headers."""
-    with open(path, "r", encoding="utf-8", newline="") as fh:
-        csv_text = fh.read()
-    dataset = tablib.Dataset()
-    dataset.load(csv_text, format="csv")
-    return dataset
+def _chunk_dataset(chunk):
+    """One iter_bundle_csv() chunk as a tablib.Dataset with headers."""
+    return tablib.Dataset(*chunk.itertuples(index=False, name=None), headers=list(chunk.columns))
 
 
 def _ensure_collections_for_regions(stdout):
@@ -187,23 +245,32 @@ def _ensure_collections_for_regions(stdout):
     return created
 
 
-def _summarize_errors(result, max_errors=5):
-    """Return a list of human-readable strings for the first N row/validation errors."""
+def _summarize_errors(result, max_errors=5, offset=0):
+    """
+    Return a list of human-readable strings for the first N row/validation
+    errors. `offset` is the number of file rows before the chunk `result`
+    was imported from.
+    """
     out = []
     # Row-level exceptions (e.g. FK lookup failed, type cast failed)
     for row_num, errs in result.row_errors():
         for e in errs:
-            out.append(f"row {row_num}: {e.error!s}")
+            out.append(f"row {row_num + offset}: {e.error!s}")
             if len(out) >= max_errors:
                 return out
     # Validation errors (raised by Resource.before_import_row, model.full_clean, etc.)
     for inv in result.invalid_rows:
-        out.append(f"row {inv.number}: invalid -- {inv.error_dict or inv.error}")
+        out.append(f"row {inv.number + offset}: invalid -- {inv.error_dict or inv.error}")
         if len(out) >= max_errors:
             return out
     return out
 
 
+def _rate(rows, seconds):
+    rate = rows / seconds if seconds else 0.0
+    return f"{seconds:6.2f}s  {rate:>8.0f} rows/s"
+
+
 class Command(BaseCommand):
     help = "Load an ASCC CSV bundle into the catalog in dependency order via Resource classes."
 
@@ -247,6 +314,43 @@ class Command(BaseCommand):
                 "the truncate is rolled back too."
             ),
         )
+        parser.add_argument(
+            "--fast",
+            action="store_true",
+            help=(
+                "Validate each CSV in one vectorized pass and load it with "
+                "bulk_create instead of the per-row Resource import."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=FAST_LOAD_BATCH_SIZE,
+            help=f"Rows per bulk INSERT under --fast / --diff (default: {FAST_LOAD_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--chunk-rows",
+            type=int,
+            default=BUNDLE_CSV_CHUNK_ROWS,
+            help=(
+                "Rows read, validated and written at a time per CSV "
+                f"(default: {BUNDLE_CSV_CHUNK_ROWS}). Bounds memory on large bundles."
+            ),
+        )
+        parser.add_argument(
+            "--diff",
+            action="store_true",
+            help=(
+                "Apply only the inserts, updates and tombstones between the "
+                "bundle and the catalog. Incompatible with --truncate, --only "
+                "and --fast."
+            ),
+        )
+        parser.add_argument(
+            "--username",
+            default=None,
+            help="User recorded on --diff transactions and tombstones (default: first superuser).",
+        )
 
     def handle(self, *args, **options):
         directory = options["directory"]
@@ -269,6 +373,14 @@ class Command(BaseCommand):
         else:
             order = list(ASCC_LOAD_ORDER)
 
+        fast = bool(options["fast"])
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        chunk_rows = options["chunk_rows"]
+        if chunk_rows < 1:
+            raise CommandError("--chunk-rows must be a positive integer.")
+
         dry_run = bool(options["dry_run"])
         if dry_run:
             self.stdout.write(self.style.NOTICE("DRY RUN: no rows will be committed."))
@@ -286,6 +398,12 @@ class Command(BaseCommand):
                 continue
             raise CommandError(f"Missing CSV: {path}")
 
+        if options["diff"]:
+            if truncate or options["only"] or fast:
+                raise CommandError("--diff is incompatible with --truncate, --only and --fast.")
+            self._diff_import(directory, order, dry_run, batch_size, options["username"])
+            return
+
         totals = {"new": 0, "update": 0, "skip": 0, "invalid": 0, "error": 0}
         is_mysql = connection.vendor == "mysql"
 
@@ -311,6 +429,14 @@ class Command(BaseCommand):
                         if is_mysql:
                             cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
                         try:
+                            # Derived tables; rebuilt from scratch below.
+                            cursor.execute(f"DELETE FROM `{MarkingDateSpan._meta.db_table}`")
+                            cursor.execute(f"DELETE FROM `{MarkingSearchDocument._meta.db_table}`")
+                            cursor.execute(f"DELETE FROM `{MarkingTrigram._meta.db_table}`")
+                            # Version numbering is keyed by record id, not an
+                            # FK; re-imported ids re-seed it from whatever
+                            # history survives on their next version write.
+                            cursor.execute(f"DELETE FROM `{RecordVersionCounter._meta.db_table}`")
                             for stem in reversed(ASCC_LOAD_ORDER):
                                 model = RESOURCES[stem]._meta.model
                                 table = model._meta.db_table
@@ -322,67 +448,29 @@ class Command(BaseCommand):
                             if is_mysql:
                                 cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
 
-                for stem in order:
-                    path = os.path.join(directory, f"{stem}.csv")
-                    if not os.path.isfile(path):
-                        # allow_missing = True (already validated above for
-                        # the !allow_missing case).
-                        self.stdout.write(f"  {stem:<18s} (missing, skipped)")
-                        continue
-
-                    dataset = _load_dataset(path)
-                    resource = RESOURCES[stem]()
-
-                    try:
-                        # Always pass dry_run=False to django-import-export.
-                        # Their dry_run path enables a per-resource atomic
-                        # block AND calls set_rollback(True) at the end of
-                        # each stem, which would undo the rows just inserted
-                        # before the next stem can resolve FKs against them
-                        # (e.g. post_office_regions -> post_offices). The
-                        # outer atomic in this command + transaction.set_rollback(True)
-                        # at the tail handles dry-run semantics for the
-                        # whole bundle in one shot.
-                        result = resource.import_data(
-                            dataset,
-                            dry_run=False,
-                            raise_errors=False,
-                            use_transactions=False,
-                            collect_failed_rows=True,
-                        )
-                    except Exception as exc:
-                        raise CommandError(f"{stem}: {exc!s}") from exc
-
-                    stem_totals = dict(result.totals or {})
-                    new = int(stem_totals.get("new", 0) or 0)
-                    update = int(stem_totals.get("update", 0) or 0)
-                    skip = int(stem_totals.get("skip", 0) or 0)
-                    invalid = int(stem_totals.get("invalid", 0) or 0)
-                    error = int(stem_totals.get("error", 0) or 0)
-
-                    totals["new"] += new
-                    totals["update"] += update
-                    totals["skip"] += skip
-                    totals["invalid"] += invalid
-                    totals["error"] += error
-
-                    self.stdout.write(
-                        f"  {stem:<18s}  new={new:>5d}  update={update:>5d}  "
-                        f"skip={skip:>5d}  invalid={invalid:>4d}  error={error:>4d}"
-                    )
-
-                    if result.has_errors() or result.has_validation_errors():
-                        msgs = _summarize_errors(result, max_errors=5)
-                        for m in msgs:
-                            self.stdout.write(self.style.WARNING(f"    ! {m}"))
-                        remaining = (error + invalid) - len(msgs)
-                        if remaining > 0:
-                            self.stdout.write(self.style.WARNING(f"    ... ({remaining} more)"))
-                        # Raising inside the atomic block triggers automatic
-                        # rollback of every prior stem AND the truncate.
-                        raise CommandError(
-                            f"{stem}: import failed with errors; bundle rolled back."
-                        )
+                # Per-row span and search-document refreshes from the signal
+                # handlers are switched off for the load; one bulk rebuild
+                # of each after the last stem replaces them.
+                with suspend_date_span_maintenance(), suspend_search_index_maintenance():
+                    for stem in order:
+                        path = os.path.join(directory, f"{stem}.csv")
+                        if not os.path.isfile(path):
+                            # allow_missing = True (already validated above for
+                            # the !allow_missing case).
+                            self.stdout.write(f"  {stem:<18s} (missing, skipped)")
+                            continue
+
+                        if fast:
+                            self._fast_load_stem(stem, path, batch_size, chunk_rows, totals)
+                        else:
+                            self._resource_load_stem(stem, path, chunk_rows, totals)
+
+                if truncate or DATE_SPAN_STEMS.intersection(order):
+                    written = rebuild_marking_date_spans()
+                    self.stdout.write(f"  marking date spans rebuilt={written:>5d}")
+                if truncate or SEARCH_INDEX_STEMS.intersection(order):
+                    written = rebuild_marking_search_documents()
+                    self.stdout.write(f"  marking search documents rebuilt={written:>5d}")
 
                 # Post-import: ensure every Region has a Collection wrapper.
                 # The munger bundle does not emit collections.csv, so we
@@ -393,6 +481,12 @@ class Command(BaseCommand):
                 if "regions" in order:
                     _ensure_collections_for_regions(self.stdout)
 
+                # The truncate, derived-table rebuilds and --fast bulk writes
+                # bypass model signals; drop cached counts and anonymous
+                # catalog responses on commit.
+                bump_count_generation("common")
+                bump_catalog_generation()
+
                 # Successful pass through every stem. Under --dry-run, mark
                 # the outer transaction for rollback so the bundle never
                 # commits.
@@ -413,3 +507,133 @@ class Command(BaseCommand):
         if dry_run:
             summary = "[DRY RUN] " + summary
         self.stdout.write(self.style.SUCCESS(summary))
+
+    def _resource_load_stem(self, stem, path, chunk_rows, totals):
+        """
+        One stem through its Resource class, a chunk at a time; raises
+        CommandError (rolling back) at the first chunk with errors.
+        """
+        started = time.perf_counter()
+        resource = RESOURCES[stem]()
+        stem_totals = dict.fromkeys(("new", "update", "skip", "invalid", "error"), 0)
+        rows = 0
+        failed = None
+
+        try:
+            for chunk in iter_bundle_csv(path, chunk_rows=chunk_rows):
+                dataset = _chunk_dataset(chunk)
+                # Always pass dry_run=False to django-import-export.
+                # Their dry_run path enables a per-resource atomic
+                # block AND calls set_rollback(True) at the end of
+                # each stem, which would undo the rows just inserted
+                # before the next stem can resolve FKs against them
+                # (e.g. post_office_regions -> post_offices). The
+                # outer atomic in this command + transaction.set_rollback(True)
+                # at the tail handles dry-run semantics for the
+                # whole bundle in one shot.
+                result = resource.import_data(
+                    dataset,
+                    dry_run=False,
+                    raise_errors=False,
+                    use_transactions=False,
+                    collect_failed_rows=True,
+                )
+                for key in stem_totals:
+                    stem_totals[key] += int((result.totals or {}).get(key, 0) or 0)
+                if result.has_errors() or result.has_validation_errors():
+                    failed = _summarize_errors(result, max_errors=5, offset=rows)
+                rows += len(dataset)
+                if failed is not None:
+                    break
+        except Exception as exc:
+            raise CommandError(f"{stem}: {exc!s}") from exc
+
+        for key, value in stem_totals.items():
+            totals[key] += value
+        self.stdout.write(
+            f"  {stem:<18s}  new={stem_totals['new']:>5d}  update={stem_totals['update']:>5d}  "
+            f"skip={stem_totals['skip']:>5d}  invalid={stem_totals['invalid']:>4d}  "
+            f"error={stem_totals['error']:>4d}  {_rate(rows, time.perf_counter() - started)}"
+        )
+
+        if failed is not None:
+            for m in failed:
+                self.stdout.write(self.style.WARNING(f"    ! {m}"))
+            remaining = (stem_totals["error"] + stem_totals["invalid"]) - len(failed)
+            if remaining > 0:
+                self.stdout.write(self.style.WARNING(f"    ... ({remaining} more)"))
+            # Raising inside the atomic block triggers automatic
+            # rollback of every prior stem AND the truncate.
+            raise CommandError(f"{stem}: import failed with errors; bundle rolled back.")
+
+    def _fast_load_stem(self, stem, path, batch_size, chunk_rows, totals):
+        """One stem under --fast; raises CommandError (rolling back) on invalid rows."""
+        model = RESOURCES[stem]._meta.model
+        try:
+            result = fast_load_csv(model, path, batch_size=batch_size, chunk_rows=chunk_rows)
+        except Exception as exc:
+            raise CommandError(f"{stem}: {exc!s}") from exc
+
+        totals["new"] += result.new
+        totals["update"] += result.update
+        totals["invalid"] += result.invalid
+        self.stdout.write(
+            f"  {stem:<18s}  new={result.new:>5d}  update={result.update:>5d}  "
+            f"invalid={result.invalid:>4d}  validate={result.validate_seconds:.2f}s  "
+            f"load={result.load_seconds:.2f}s  {result.rows_per_second:>8.0f} rows/s"
+        )
+        if result.invalid:
+            for message in result.errors:
+                self.stdout.write(self.style.WARNING(f"    ! {message}"))
+            remaining = result.invalid - len(result.errors)
+            if remaining > 0:
+                self.stdout.write(self.style.WARNING(f"    ... ({remaining} more rows)"))
+            raise CommandError(f"{stem}: import failed with errors; bundle rolled back.")
+
+    def _diff_import(self, directory, order, dry_run, batch_size, username):
+        """--diff: print the planned changes, then apply them in one transaction."""
+        users = get_user_model().objects
+        actor = users.filter(username=username).first() if username else users.filter(is_superuser=True).first()
+        if actor is None:
+            raise CommandError("No user to record the import as; pass --username.")
+
+        try:
+            with transaction.atomic():
+                plan = plan_bundle_diff(directory, order, batch_size=batch_size)
+                self.stdout.write("Changes against the current catalog:")
+                for diff in plan.stems.values():
+                    if diff.invalid:
+                        for message in diff.errors:
+                            self.stdout.write(self.style.WARNING(f"    ! {message}"))
+                        raise CommandError(f"{diff.stem}: {diff.invalid} invalid row(s); nothing applied.")
+                    self.stdout.write(
+                        f"  {diff.stem:<19s} insert={len(diff.inserts):>5d}  update={len(diff.updates):>5d}  "
+                        f"tombstone={len(diff.tombstones):>5d}  unchanged={diff.unchanged:>5d}  "
+                        f"kept={diff.kept:>4d}  stale={diff.stale:>4d}"
+                    )
+                if dry_run or not plan.changes:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{'[DRY RUN] ' if dry_run else ''}{plan.changes} change(s); nothing applied."
+                    ))
+                    return
+
+                started = time.perf_counter()
+                with suspend_date_span_maintenance(), suspend_search_index_maintenance():
+                    logged = apply_bundle_diff(plan, actor, batch_size=batch_size)
+                changed = {stem for stem, diff in plan.stems.items() if diff.changes}
+                if DATE_SPAN_STEMS & changed:
+                    self.stdout.write(f"  marking date spans rebuilt={rebuild_marking_date_spans():>5d}")
+                if SEARCH_INDEX_STEMS & changed:
+                    self.stdout.write(f"  marking search documents rebuilt={rebuild_marking_search_documents():>5d}")
+                if "regions" in changed:
+                    _ensure_collections_for_regions(self.stdout)
+                bump_count_generation("common")
+                bump_catalog_generation()
+        except CommandError:
+            self.stdout.write(self.style.ERROR("Diff aborted; nothing was applied."))
+            raise
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Applied {plan.changes} change(s) in {time.perf_counter() - started:.2f}s; "
+            f"logged {logged} transaction(s) as {actor.username}."
+        ))
@@ -0,0 +1,399 @@
+"""
+Load several ASCC bundles (one directory per region, e.g. tools/wip/out/va/,
+tools/wip/out/nc/) in one run, loading independent bundles concurrently.
+
+Every bundle is read and checked up front, before anything is written:
+
+  - shared lookups (colors, letterings, shapes, reference_works) appear in
+    most bundles. Rows that agree on id and content are merged into one
+    row. The same id with different content, or the same unique value
+    (e.g. Color.name) under different ids, is a collision;
+  - every other table is region-specific. An id, or a unique value such as
+    Marking.code, that appears in more than one bundle is a collision;
+  - a bundle whose rows point at region-specific rows of another bundle
+    (a parent region, a post office, a marking) depends on that bundle.
+
+Any collision or dependency cycle aborts the run with nothing written.
+Otherwise the merged lookups are loaded and committed first. Each bundle's
+region-specific tables are then loaded in its own transaction on its own DB
+connection, with up to --jobs bundles at a time. A bundle starts once every
+bundle it depends on has committed. Loading uses the import_ascc_bundle
+--fast path (common.bundle_load), and one progress report covers all
+bundles.
+
+A failing bundle rolls back on its own. Bundles that depend on it are
+skipped, the others still commit, and the command exits with an error
+naming them. --dry-run loads everything in one transaction on one
+connection and rolls it back.
+
+Usage:
+    python manage.py import_ascc_bundles tools/wip/out/va tools/wip/out/nc tools/wip/out/md
+    python manage.py import_ascc_bundles tools/wip/out/*/ --jobs 8
+    python manage.py import_ascc_bundles tools/wip/out/*/ --dry-run
+"""
+import graphlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from common.bundle_load import FAST_LOAD_BATCH_SIZE, fast_load_frame, read_bundle_csv
+from common.date_spans import rebuild_marking_date_spans, suspend_date_span_maintenance
+from common.management.commands.import_ascc_bundle import (
+    ASCC_LOAD_ORDER,
+    DATE_SPAN_STEMS,
+    OPTIONAL_STEMS,
+    RESOURCES,
+    SEARCH_INDEX_STEMS,
+    _ensure_collections_for_regions,
+)
+from common.search import rebuild_marking_search_documents, suspend_search_index_maintenance
+from woco.counts import bump_count_generation
+from woco.response_cache import bump_catalog_generation
+
+# Lookup tables every regional bundle carries a copy of; merged and loaded once.
+SHARED_STEMS = ("colors", "letterings", "shapes", "reference_works")
+REGION_STEMS = tuple(stem for stem in ASCC_LOAD_ORDER if stem not in SHARED_STEMS)
+
+# Audit timestamps differ between munger runs; ignored when comparing copies.
+AUDIT_TIME_COLUMNS = ("created_date", "modified_date")
+
+# subject_type -> stem for the polymorphic subject_id columns.
+SUBJECT_STEMS = {"MARKING": "markings", "COVER": "covers"}
+
+MAX_REPORTED_COLLISIONS = 20
+
+
+class Bundle:
+    """One bundle directory and its CSVs, read into DataFrames."""
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.directory = directory
+        self.frames = {}
+        self.depends_on = set()
+
+
+def _model(stem):
+    return RESOURCES[stem]._meta.model
+
+
+def _key(value):
+    """Normalized id cell: '12', '12.0' and ' 12' are the same row id."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+###################################################################################################
+## Collision detection
+###################################################################################################
+def _combined(bundles, stem):
+    frames = [b.frames[stem].assign(_bundle=b.name) for b in bundles if stem in b.frames]
+    if not frames:
+        return None
+    combined = pd.concat(frames, ignore_index=True).fillna("")
+    combined["_pk"] = combined[_model(stem)._meta.pk.name].map(_key)
+    return combined
+
+
+def _unique_collisions(stem, frame, collisions):
+    """Same unique value under different ids."""
+    model = _model(stem)
+    for field in model._meta.concrete_fields:
+        if not field.unique or field.primary_key or field.name not in frame.columns:
+            continue
+        values = frame[field.name].astype(str).str.strip()
+        rows = frame[values != ""].assign(_value=values)
+        clashes = rows.groupby("_value")["_pk"].nunique()
+        for value in clashes[clashes > 1].index:
+            owners = rows[rows["_value"] == value]
+            collisions.append(
+                f"{stem}.{field.name} {value!r}: ids {sorted(set(owners['_pk']))} "
+                f"in {sorted(set(owners['_bundle']))}"
+            )
+
+
+def merge_shared_lookups(bundles):
+    """
+    One Bundle holding the de-duplicated shared lookup rows, plus the list
+    of collisions found while merging.
+    """
+    shared = Bundle("(shared lookups)")
+    collisions = []
+    for stem in SHARED_STEMS:
+        combined = _combined(bundles, stem)
+        if combined is None:
+            continue
+        content = [c for c in combined.columns if c not in AUDIT_TIME_COLUMNS and c not in ("_bundle", "_pk")]
+        distinct = combined.drop_duplicates(subset=content)
+        conflicting = distinct[distinct["_pk"].duplicated(keep=False)]
+        for pk, rows in conflicting.groupby("_pk"):
+            collisions.append(
+                f"{stem} id {pk}: different rows in {sorted(set(rows['_bundle']))}"
+            )
+        merged = distinct.drop_duplicates(subset=["_pk"])
+        _unique_collisions(stem, merged, collisions)
+        shared.frames[stem] = merged.drop(columns=["_bundle", "_pk"]).reset_index(drop=True)
+    return shared, collisions
+
+
+def find_region_collisions(bundles):
+    """Region-specific ids and unique values claimed by more than one bundle."""
+    collisions = []
+    for stem in REGION_STEMS:
+        combined = _combined(bundles, stem)
+        if combined is None:
+            continue
+        per_bundle = combined.drop_duplicates(subset=["_pk", "_bundle"])
+        claimed = per_bundle[per_bundle["_pk"].duplicated(keep=False)]
+        for pk, rows in claimed.groupby("_pk"):
+            collisions.append(f"{stem} id {pk}: in {sorted(set(rows['_bundle']))}")
+        _unique_collisions(stem, per_bundle, collisions)
+    return collisions
+
+
+###################################################################################################
+## Cross-bundle dependencies
+###################################################################################################
+def _references(stem, frame):
+    """(parent stem, referenced id) pairs for region-specific parents of `stem` rows."""
+    model = _model(stem)
+    for field in model._meta.concrete_fields:
+        if not field.is_relation or field.name not in frame.columns:
+            continue
+        for parent in REGION_STEMS:
+            if _model(parent) is field.related_model:
+                for value in frame[field.name]:
+                    yield parent, _key(value)
+    if "subject_type" in frame.columns and "subject_id" in frame.columns:
+        for subject_type, subject_id in zip(frame["subject_type"], frame["subject_id"]):
+            parent = SUBJECT_STEMS.get(str(subject_type).strip())
+            if parent:
+                yield parent, _key(subject_id)
+
+
+def resolve_dependencies(bundles):
+    """Fill Bundle.depends_on with the bundles whose rows each bundle references."""
+    owners = {}
+    for bundle in bundles:
+        for stem in REGION_STEMS:
+            if stem in bundle.frames:
+                for value in bundle.frames[stem][_model(stem)._meta.pk.name]:
+                    owners[(stem, _key(value))] = bundle.name
+    for bundle in bundles:
+        for stem, frame in bundle.frames.items():
+            for reference in _references(stem, frame):
+                owner = owners.get(reference)
+                if owner is not None and owner != bundle.name:
+                    bundle.depends_on.add(owner)
+
+
+###################################################################################################
+## Command
+###################################################################################################
+class Command(BaseCommand):
+    help = "Load several regional ASCC bundles, merging shared lookups and loading bundles concurrently."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directories", nargs="+", help="Bundle directories (one per region).")
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=4,
+            help="Bundles loaded at once, each on its own DB connection (default: 4).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=FAST_LOAD_BATCH_SIZE,
+            help=f"Rows per bulk INSERT (default: {FAST_LOAD_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--allow-missing",
+            action="store_true",
+            help="Skip any absent CSV instead of failing (optional stems are always allowed).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and load every bundle in one transaction, then roll it back.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        jobs = options["jobs"]
+        if jobs < 1 or self.batch_size < 1:
+            raise CommandError("--jobs and --batch-size must be positive integers.")
+        dry_run = bool(options["dry_run"])
+        if dry_run:
+            self.stdout.write(self.style.NOTICE("DRY RUN: no rows will be committed."))
+
+        bundles = self._read_bundles(options["directories"], options["allow_missing"])
+        shared, collisions = merge_shared_lookups(bundles)
+        collisions += find_region_collisions(bundles)
+        if collisions:
+            for message in collisions[:MAX_REPORTED_COLLISIONS]:
+                self.stdout.write(self.style.WARNING(f"  ! {message}"))
+            if len(collisions) > MAX_REPORTED_COLLISIONS:
+                self.stdout.write(self.style.WARNING(f"  ... ({len(collisions) - MAX_REPORTED_COLLISIONS} more)"))
+            raise CommandError(f"{len(collisions)} collision(s) between bundles; nothing was imported.")
+
+        resolve_dependencies(bundles)
+        sorter = graphlib.TopologicalSorter({b.name: b.depends_on for b in bundles})
+        try:
+            order = list(sorter.static_order())
+        except graphlib.CycleError as exc:
+            raise CommandError(f"Bundles depend on each other in a cycle: {exc.args[1]}") from exc
+        for bundle in bundles:
+            if bundle.depends_on:
+                self.stdout.write(f"  {bundle.name} waits for {', '.join(sorted(bundle.depends_on))}")
+
+        self._lock = threading.Lock()
+        self._done_tasks = 0
+        self._total_tasks = len(shared.frames) + sum(
+            1 for b in bundles for stem in b.frames if stem in REGION_STEMS
+        )
+        self._totals = {"rows": 0, "new": 0, "update": 0}
+        started = time.perf_counter()
+
+        by_name = {b.name: b for b in bundles}
+        if dry_run:
+            with transaction.atomic():
+                self._load(shared, SHARED_STEMS)
+                for name in order:
+                    self._load(by_name[name], REGION_STEMS)
+                self._finish([shared, *bundles])
+                transaction.set_rollback(True)
+            failed = skipped = []
+        else:
+            with transaction.atomic():
+                self._load(shared, SHARED_STEMS)
+            failed, skipped = self._load_concurrently(bundles, jobs)
+            loaded = [b for b in bundles if b.name not in failed and b.name not in skipped]
+            with transaction.atomic():
+                self._finish([shared, *loaded])
+
+        elapsed = time.perf_counter() - started
+        rate = self._totals["rows"] / elapsed if elapsed else 0.0
+        summary = (
+            f"Done. bundles={len(bundles) - len(failed) - len(skipped)}/{len(bundles)}  "
+            f"new={self._totals['new']}  update={self._totals['update']}  "
+            f"{elapsed:.2f}s  {rate:.0f} rows/s"
+        )
+        if dry_run:
+            summary = "[DRY RUN] " + summary
+        self.stdout.write("")
+        if failed or skipped:
+            self.stdout.write(self.style.WARNING(summary))
+            raise CommandError(
+                f"Failed: {', '.join(failed) or '-'}; skipped (depend on a failed bundle): "
+                f"{', '.join(skipped) or '-'}. Other bundles were committed."
+            )
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _read_bundles(self, directories, allow_missing):
+        bundles, names = [], set()
+        for directory in directories:
+            if not os.path.isdir(directory):
+                raise CommandError(f"Not a directory: {directory}")
+            name = os.path.basename(os.path.normpath(directory))
+            if name in names:
+                name = os.path.normpath(directory)
+            names.add(name)
+            bundle = Bundle(name, directory)
+            for stem in ASCC_LOAD_ORDER:
+                path = os.path.join(directory, f"{stem}.csv")
+                if os.path.isfile(path):
+                    bundle.frames[stem] = read_bundle_csv(path)
+                elif stem not in OPTIONAL_STEMS and not allow_missing:
+                    raise CommandError(f"Missing CSV: {path}")
+            bundles.append(bundle)
+        return bundles
+
+    def _load(self, bundle, stems):
+        """Validate and load `stems` of one bundle in load order; raises CommandError on bad rows."""
+        with suspend_date_span_maintenance(), suspend_search_index_maintenance():
+            for stem in ASCC_LOAD_ORDER:
+                if stem not in stems or stem not in bundle.frames:
+                    continue
+                result = fast_load_frame(_model(stem), bundle.frames[stem], batch_size=self.batch_size)
+                with self._lock:
+                    self._done_tasks += 1
+                    self._report(bundle, stem, result)
+                if result.invalid:
+                    raise CommandError(f"{bundle.name} {stem}: {result.invalid} invalid row(s); bundle rolled back.")
+
+    def _report(self, bundle, stem, result):
+        if result.invalid:
+            for message in result.errors:
+                self.stdout.write(self.style.WARNING(f"    ! {bundle.name} {stem} {message}"))
+            return
+        self._totals["rows"] += result.rows
+        self._totals["new"] += result.new
+        self._totals["update"] += result.update
+        self.stdout.write(
+            f"  [{self._done_tasks:>3d}/{self._total_tasks}] {bundle.name:<16s} {stem:<19s} "
+            f"new={result.new:>6d}  update={result.update:>6d}  {result.rows_per_second:>8.0f} rows/s"
+        )
+
+    def _load_worker(self, bundle):
+        try:
+            with transaction.atomic():
+                self._load(bundle, REGION_STEMS)
+        finally:
+            connection.close()
+
+    def _load_concurrently(self, bundles, jobs):
+        """Run bundles on a thread pool in dependency order. Returns (failed, skipped) names."""
+        sorter = graphlib.TopologicalSorter({b.name: b.depends_on for b in bundles})
+        sorter.prepare()
+        by_name = {b.name: b for b in bundles}
+        failed, running = [], {}
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    running[pool.submit(self._load_worker, by_name[name])] = name
+                if not running:
+                    break  # the rest wait on a failed bundle
+                finished, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        sorter.done(name)
+                    else:
+                        failed.append(name)
+                        self.stdout.write(self.style.ERROR(f"  {name}: {error}"))
+        skipped = [b.name for b in bundles if b.name not in failed and self._blocked(b, by_name, set(failed))]
+        return failed, skipped
+
+    @staticmethod
+    def _blocked(bundle, by_name, failed):
+        """True if `bundle` transitively depends on a failed bundle."""
+        seen, stack = set(), list(bundle.depends_on)
+        while stack:
+            name = stack.pop()
+            if name in failed:
+                return True
+            if name not in seen:
+                seen.add(name)
+                stack.extend(by_name[name].depends_on)
+        return False
+
+    def _finish(self, loaded):
+        """One derived-table rebuild and cache bump for everything loaded."""
+        stems = {stem for b in loaded for stem in b.frames}
+        if DATE_SPAN_STEMS & stems:
+            self.stdout.write(f"  marking date spans rebuilt={rebuild_marking_date_spans():>6d}")
+        if SEARCH_INDEX_STEMS & stems:
+            self.stdout.write(f"  marking search documents rebuilt={rebuild_marking_search_documents():>6d}")
+        if "regions" in stems:
+            _ensure_collections_for_regions(self.stdout)
+        bump_count_generation("common")
+        bump_catalog_generation()
@@ -0,0 +1,40 @@
+"""
+Rebuild the materialized MarkingDateSpan table from DateSeen / CoverMarking.
+
+Spans are kept current incrementally by the signal handlers in
+common.signals; run this after loading data through paths that bypass
+model signals (raw SQL, queryset.update(), bulk_create) or to verify the
+table from scratch. import_ascc_bundle runs the same rebuild at the end of
+every import.
+
+Usage:
+    python manage.py rebuild_marking_date_spans
+    python manage.py rebuild_marking_date_spans --batch-size 5000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.date_spans import REFRESH_BATCH_SIZE, rebuild_marking_date_spans
+from woco.response_cache import bump_catalog_generation
+
+
+class Command(BaseCommand):
+    help = "Recompute earliest/latest-seen date spans for every Marking."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help=f"Markings recomputed per batch (default: {REFRESH_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        with transaction.atomic():
+            written = rebuild_marking_date_spans(batch_size=batch_size, stdout=self.stdout)
+            bump_catalog_generation()
+        self.stdout.write(self.style.SUCCESS(f"Done. span rows written={written}"))
@@ -0,0 +1,43 @@
+"""
+Rebuild the MarkingSearchDocument table that backs catalog keyword search,
+and the MarkingTrigram rows that back the fuzzy inscription lookup.
+
+Documents are kept current incrementally by the signal handlers in
+common.signals; run this after loading data through paths that bypass
+model signals (raw SQL, queryset.update(), bulk_create). import_ascc_bundle
+runs the same rebuild at the end of every import.
+
+Usage:
+    python manage.py rebuild_marking_search_index
+    python manage.py rebuild_marking_search_index --batch-size 5000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.search import REFRESH_BATCH_SIZE, rebuild_marking_search_documents
+from woco.counts import bump_count_generation
+from woco.response_cache import bump_catalog_generation
+
+
+class Command(BaseCommand):
+    help = "Recompute the full-text search document and fuzzy-match trigrams for every Marking."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help=f"Markings recomputed per batch (default: {REFRESH_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        with transaction.atomic():
+            written = rebuild_marking_search_documents(batch_size=batch_size, stdout=self.stdout)
+            # ?search= counts are cached per query; they join the documents.
+            bump_count_generation("common")
+            bump_catalog_generation()
+        self.stdout.write(self.style.SUCCESS(f"Done. search documents written={written}"))
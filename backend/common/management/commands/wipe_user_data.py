@@ -14,10 +14,11 @@ contributions. The importer's own --truncate handles the 14 catalog tables;
 this command only clears the non-catalog submission rows that would otherwise
 dangle once the catalog is re-imported.
 
-What is WIPED (6 tables, all rows):
+What is WIPED (7 tables, all rows):
     SubmissionTransactions   submission / moderation audit log
     MarkingVersions          marking snapshot history
     CoverVersions            cover snapshot history
+    record_version_counter   next version number per marking / cover
     marking_recycle_bin      soft-deleted markings
     cover_recycle_bin        soft-deleted covers
     Contributions            pending / draft / approved submissions
@@ -46,6 +47,7 @@ from common.models import (
     CoverVersion,
     MarkingRecycleBin,
     MarkingVersion,
+    RecordVersionCounter,
     SubmissionTransaction,
 )
 
@@ -60,6 +62,9 @@ WIPE_ORDER = (
     SubmissionTransaction,
     MarkingVersion,
     CoverVersion,
+    # Counters outlive the history they number (no FK); left behind, they
+    # would hand a re-imported record a keyframe that no longer exists.
+    RecordVersionCounter,
     MarkingRecycleBin,
     CoverRecycleBin,
     Contribution,
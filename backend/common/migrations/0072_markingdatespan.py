@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0071_coverrecyclebin_coverversion_alter_cover_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarkingDateSpan',
+            fields=[
+                ('marking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='date_span', serialize=False, to='common.marking')),
+                ('earliest_seen', models.DateField(blank=True, null=True)),
+                ('latest_seen', models.DateField(blank=True, null=True)),
+                ('approved_earliest_seen', models.DateField(blank=True, null=True)),
+                ('approved_latest_seen', models.DateField(blank=True, null=True)),
+                ('is_removed', models.BooleanField(default=False)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Marking Date Span',
+                'verbose_name_plural': 'Marking Date Spans',
+                'db_table': 'marking_date_span',
+                'ordering': ['marking'],
+                'indexes': [models.Index(fields=['earliest_seen'], name='marking_span_earliest_idx'), models.Index(fields=['latest_seen'], name='marking_span_latest_idx')],
+            },
+        ),
+    ]
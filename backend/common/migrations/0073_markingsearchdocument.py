@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Django cannot declare FULLTEXT indexes, so add it by hand on MySQL. Other
+# backends (SQLite in tests) use the LIKE fallback in common.search.
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE marking_search_document ADD FULLTEXT INDEX marking_search_document_ft (document)"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE marking_search_document DROP INDEX marking_search_document_ft"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0072_markingdatespan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarkingSearchDocument',
+            fields=[
+                ('marking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='common.marking')),
+                ('document', models.TextField(blank=True, default='')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Marking Search Document',
+                'verbose_name_plural': 'Marking Search Documents',
+                'db_table': 'marking_search_document',
+                'ordering': ['marking'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postoffice',
+            index=models.Index(fields=['name'], name='post_office_name_idx'),
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0073_markingsearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingsearchdocument',
+            name='fuzzy_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='markingsearchdocument',
+            name='trigram_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MarkingTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('marking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='common.marking')),
+            ],
+            options={
+                'verbose_name': 'Marking Trigram',
+                'verbose_name_plural': 'Marking Trigrams',
+                'db_table': 'marking_trigram',
+                'indexes': [models.Index(fields=['trigram', 'marking'], name='marking_trigram_lookup_idx')],
+                'unique_together': {('marking', 'trigram')},
+            },
+        ),
+    ]
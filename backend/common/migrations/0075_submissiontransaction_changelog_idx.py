@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def link_contribution_transactions(apps, schema_editor):
+    # Give transactions logged against an approved contribution (before it was
+    # linked to its marking) the marking FK, so the marking changelog can
+    # filter on SubmissionTransaction.marking alone. One UPDATE with a
+    # correlated subquery; neither filter joins, so MySQL need not pre-select
+    # the target ids.
+    Contribution = apps.get_model('common', 'Contribution')
+    SubmissionTransaction = apps.get_model('common', 'SubmissionTransaction')
+    linked = Contribution.objects.filter(marking__isnull=False).order_by()
+    SubmissionTransaction.objects.filter(
+        marking__isnull=True,
+        contribution_id__in=linked.values('id'),
+    ).update(
+        marking_id=Subquery(linked.filter(pk=OuterRef('contribution_id')).values('marking_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0074_markingtrigram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submissiontransaction',
+            index=models.Index(fields=['marking', 'id'], name='SubmissionT_marking_f7890c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submissiontransaction',
+            index=models.Index(fields=['cover', 'id'], name='SubmissionT_cover_i_ed87cc_idx'),
+        ),
+        migrations.RunPython(link_contribution_transactions, migrations.RunPython.noop),
+    ]
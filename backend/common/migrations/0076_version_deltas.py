@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0075_submissiontransaction_changelog_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coverversion',
+            name='base_version_no',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coverversion',
+            name='delta',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='markingversion',
+            name='base_version_no',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='markingversion',
+            name='delta',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
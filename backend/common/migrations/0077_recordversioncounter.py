@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0076_version_deltas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordVersionCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(choices=[('MARKING', 'Marking'), ('COVER', 'Cover')], max_length=10)),
+                ('record_id', models.PositiveIntegerField()),
+                ('last_version_no', models.PositiveIntegerField(default=0)),
+                ('keyframe_version_no', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Record Version Counter',
+                'verbose_name_plural': 'Record Version Counters',
+                'db_table': 'record_version_counter',
+                'unique_together': {('record_type', 'record_id')},
+            },
+        ),
+    ]
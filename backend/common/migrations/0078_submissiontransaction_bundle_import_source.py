@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0077_recordversioncounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submissiontransaction',
+            name='source',
+            field=models.CharField(choices=[('contributor_portal', 'Contributor portal'), ('editor_portal', 'Editor portal'), ('system', 'System'), ('bundle_import', 'Bundle import')], default='system', max_length=30),
+        ),
+    ]
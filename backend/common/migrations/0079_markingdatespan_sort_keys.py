@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:12
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def fill_sort_keys(apps, schema_editor):
+    # One UPDATE with correlated subqueries. The region is the post office's
+    # current one, chosen as PostOffice.region does: active links first, then
+    # the latest established, then (as the prefetch order) by name.
+    Marking = apps.get_model('common', 'Marking')
+    MarkingDateSpan = apps.get_model('common', 'MarkingDateSpan')
+    PostOfficeRegion = apps.get_model('common', 'PostOfficeRegion')
+    current_region = PostOfficeRegion.objects.filter(
+        post_office__markings=OuterRef('marking_id'),
+    ).order_by(
+        F('region__defunct_date').desc(nulls_first=True),
+        F('region__established_date').desc(nulls_last=True),
+        'region__name',
+    )
+    MarkingDateSpan.objects.update(
+        region_name=Subquery(current_region.values('region__name')[:1]),
+        post_office_name=Subquery(
+            Marking.objects.filter(pk=OuterRef('marking_id')).values('post_office__name')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0078_submissiontransaction_bundle_import_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingdatespan',
+            name='region_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='markingdatespan',
+            name='post_office_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='markingdatespan',
+            index=models.Index(fields=['region_name', 'post_office_name', 'earliest_seen'], name='marking_span_catalog_idx'),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:40
+
+from django.db import migrations
+
+
+def backfill_date_spans(apps, schema_editor):
+    # 0072 created the table empty; an existing catalog needs a row per
+    # marking before the date ordering, year filters and /markings-range/
+    # can use it. The rebuild writes through the current models: a later
+    # migration that changes MarkingDateSpan's columns must move this
+    # backfill after itself.
+    from common.date_spans import rebuild_marking_date_spans
+
+    rebuild_marking_date_spans()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0079_markingdatespan_sort_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_date_spans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:05
+
+from django.db import migrations
+
+
+def backfill_search_documents(apps, schema_editor):
+    # 0073/0074 created the document and trigram tables empty, and keyword
+    # search inner-joins the documents, so ?search= matches nothing until
+    # every marking has one. Like 0080 this writes through the current
+    # models: a later migration that changes either table's columns must
+    # move this backfill after itself. Cached responses and list counts
+    # predate both backfills, so drop them as import_ascc_bundle does.
+    from common.search import rebuild_marking_search_documents
+    from woco.counts import bump_count_generation
+    from woco.response_cache import bump_catalog_generation
+
+    rebuild_marking_search_documents()
+    bump_count_generation('common')
+    bump_catalog_generation()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0080_backfill_marking_date_spans'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:40
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_summaries(apps, schema_editor):
+    # Summaries of existing history are taken from the reconstructed
+    # snapshots, one record at a time (a delta needs its record's keyframe).
+    # version_snapshots() only knows the current model classes, so like 0080
+    # this must move after any later migration that changes the version
+    # tables' columns.
+    from common.audit import cover_snapshot_summary, marking_snapshot_summary
+    from common.models import CoverVersion, MarkingVersion
+    from common.version_store import version_snapshots
+
+    for model, owner, summarize in (
+        (MarkingVersion, 'marking_id', marking_snapshot_summary),
+        (CoverVersion, 'cover_id', cover_snapshot_summary),
+    ):
+        versions = (
+            model.objects.only('id', owner, 'version_no', 'snapshot', 'base_version_no', 'delta')
+            .order_by(owner, 'version_no')
+            .iterator(chunk_size=BACKFILL_BATCH_SIZE)
+        )
+        pending = []
+        for _owner_id, rows in groupby(versions, key=lambda version: getattr(version, owner)):
+            rows = list(rows)
+            snapshots = version_snapshots(rows)
+            for version in rows:
+                version.summary = summarize(snapshots[version.version_no])
+            pending.extend(rows)
+            if len(pending) >= BACKFILL_BATCH_SIZE:
+                model.objects.bulk_update(pending, ['summary'])
+                pending = []
+        model.objects.bulk_update(pending, ['summary'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0081_backfill_marking_search_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingversion',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='coverversion',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
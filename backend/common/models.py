@@ -97,6 +97,20 @@ class MarkingQuerySet(models.QuerySet):
             ),
         )
 
+    def with_date_span(self):
+        """
+        Annotate each Marking with `earliest_seen` / `latest_seen` read from
+        the materialized MarkingDateSpan row instead of the four correlated
+        subqueries in with_date_range. Same union semantics (direct DateSeen
+        rows plus cover-mediated ones), but a single LEFT JOIN against an
+        indexed table, so ordering and year-range filters stay cheap on the
+        full catalog. Markings without a span row annotate as NULL.
+        """
+        return self.annotate(
+            earliest_seen=F('date_span__earliest_seen'),
+            latest_seen=F('date_span__latest_seen'),
+        )
+
 
 class MarkingManager(models.Manager.from_queryset(MarkingQuerySet)):
     """
@@ -111,6 +125,10 @@ class MarkingManager(models.Manager.from_queryset(MarkingQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(recycle_bin_entry__isnull=True)
 
+    def hidden_row_count(self):
+        """Rows this manager hides: one per recycle-bin entry (see woco.counts)."""
+        return MarkingRecycleBin.objects.using(self.db).count()
+
 
 MARKING_DATE_FMT_CHOICES = [('MD', 'MD'), ('MDD', 'MDD'), ('YD', 'YD'), ('YMD', 'YMD'), ('YMDD', 'YMDD')]
 MARKING_IMPRESSION_CHOICES = [('Normal', 'Normal'), ('Stencil', 'Stencil'), ('Negative', 'Negative')]
@@ -309,10 +327,13 @@ class SubmissionTransaction(models.Model):
     SOURCE_CONTRIBUTOR_PORTAL = "contributor_portal"
     SOURCE_EDITOR_PORTAL = "editor_portal"
     SOURCE_SYSTEM = "system"
+    # Changes applied by import_ascc_bundle --diff (common.bundle_diff).
+    SOURCE_BUNDLE_IMPORT = "bundle_import"
     SOURCE_CHOICES = [
         (SOURCE_CONTRIBUTOR_PORTAL, "Contributor portal"),
         (SOURCE_EDITOR_PORTAL, "Editor portal"),
         (SOURCE_SYSTEM, "System"),
+        (SOURCE_BUNDLE_IMPORT, "Bundle import"),
     ]
 
     id = models.AutoField(primary_key=True)
@@ -364,6 +385,10 @@ class SubmissionTransaction(models.Model):
             models.Index(fields=["marking", "created_at"]),
             models.Index(fields=["cover", "created_at"]),
             models.Index(fields=["contribution", "created_at"]),
+            # Record changelog: filter on the record, newest first by id,
+            # keyset ?cursor= / ?since= (common.api.v2.changelog).
+            models.Index(fields=["marking", "id"]),
+            models.Index(fields=["cover", "id"]),
             models.Index(fields=["actor", "created_at"]),
             models.Index(fields=["action", "created_at"]),
         ]
@@ -377,7 +402,14 @@ class MarkingVersion(models.Model):
     id = models.AutoField(primary_key=True)
     marking = models.ForeignKey(Marking, on_delete=models.CASCADE, related_name="versions")
     version_no = models.PositiveIntegerField()
+    # Keyframe rows hold the full snapshot; delta rows hold {} here and a JSON
+    # Patch against keyframe base_version_no in `delta` (common.version_store).
     snapshot = models.JSONField(default=dict, blank=True)
+    base_version_no = models.PositiveIntegerField(null=True, blank=True)
+    delta = models.JSONField(null=True, blank=True)
+    # The changelog's summary of the full snapshot (common.audit), written
+    # with the row so listing history never reconstructs deltas.
+    summary = models.JSONField(default=dict, blank=True)
     transaction = models.ForeignKey(
         SubmissionTransaction,
         on_delete=models.SET_NULL,
@@ -415,7 +447,14 @@ class CoverVersion(models.Model):
     # Cover is defined later in this module, so reference it by name.
     cover = models.ForeignKey('Cover', on_delete=models.CASCADE, related_name="versions")
     version_no = models.PositiveIntegerField()
+    # Keyframe rows hold the full snapshot; delta rows hold {} here and a JSON
+    # Patch against keyframe base_version_no in `delta` (common.version_store).
     snapshot = models.JSONField(default=dict, blank=True)
+    base_version_no = models.PositiveIntegerField(null=True, blank=True)
+    delta = models.JSONField(null=True, blank=True)
+    # The changelog's summary of the full snapshot (common.audit), written
+    # with the row so listing history never reconstructs deltas.
+    summary = models.JSONField(default=dict, blank=True)
     transaction = models.ForeignKey(
         SubmissionTransaction,
         on_delete=models.SET_NULL,
@@ -447,6 +486,37 @@ class CoverVersion(models.Model):
         return f"Cover #{self.cover_id} v{self.version_no}"
 
 
+class RecordVersionCounter(models.Model):
+    """
+    Last version_no handed out per versioned record (MarkingVersion /
+    CoverVersion), plus its latest keyframe. common.version_store locks this
+    row (SELECT ... FOR UPDATE) inside the write transaction, so concurrent
+    saves of one record take consecutive numbers without a MAX() over the
+    version table. Seeded from existing history the first time a record is
+    versioned after the counter was introduced.
+    """
+    RECORD_MARKING = "MARKING"
+    RECORD_COVER = "COVER"
+    RECORD_TYPE_CHOICES = [
+        (RECORD_MARKING, "Marking"),
+        (RECORD_COVER, "Cover"),
+    ]
+
+    record_type = models.CharField(max_length=10, choices=RECORD_TYPE_CHOICES)
+    record_id = models.PositiveIntegerField()
+    last_version_no = models.PositiveIntegerField(default=0)
+    keyframe_version_no = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = "record_version_counter"
+        verbose_name = "Record Version Counter"
+        verbose_name_plural = "Record Version Counters"
+        unique_together = [["record_type", "record_id"]]
+
+    def __str__(self):
+        return f"{self.record_type} #{self.record_id} v{self.last_version_no}"
+
+
 class MarkingRecycleBin(models.Model):
     """
     Soft-delete sidecar for Marking. The presence of a row here means the
@@ -485,6 +555,129 @@ class MarkingRecycleBin(models.Model):
         return f"Marking #{self.marking_id} removed at {self.removed_at}"
 
 
+class MarkingDateSpan(models.Model):
+    """
+    Denormalized earliest/latest-seen span for one Marking. Mirrors what
+    MarkingQuerySet.with_date_range computes on the fly, stored so the
+    catalog list can sort and filter by date without correlated subqueries.
+    Also carries the other sort keys of the catalog's default ordering, so
+    cursor pages seek on one composite index.
+
+      earliest_seen / latest_seen
+          Min/max DateSeen.date over rows attached directly to the marking
+          plus rows attached to any cover linked via cover_markings.
+      approved_earliest_seen / approved_latest_seen
+          Same, but counting only cover links with review_status=APPROVED.
+          Feeds the public catalog range (MarkingDateRangeView).
+      is_removed
+          Mirrors the presence of a MarkingRecycleBin row so catalog-wide
+          aggregates can skip removed markings without a join.
+      region_name / post_office_name
+          The post office's current region (PostOffice.region) and name.
+          NULL when the post office has no region.
+
+    Maintained incrementally by the signal handlers in common.signals (see
+    common.date_spans); rebuilt in bulk by `manage.py rebuild_marking_date_spans`.
+    """
+    marking = models.OneToOneField(
+        Marking,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="date_span",
+    )
+    earliest_seen = models.DateField(null=True, blank=True)
+    latest_seen = models.DateField(null=True, blank=True)
+    approved_earliest_seen = models.DateField(null=True, blank=True)
+    approved_latest_seen = models.DateField(null=True, blank=True)
+    is_removed = models.BooleanField(default=False)
+    region_name = models.CharField(max_length=100, null=True, blank=True)
+    post_office_name = models.CharField(max_length=255, null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "marking_date_span"
+        verbose_name = "Marking Date Span"
+        verbose_name_plural = "Marking Date Spans"
+        ordering = ["marking"]
+        indexes = [
+            models.Index(fields=["earliest_seen"], name="marking_span_earliest_idx"),
+            models.Index(fields=["latest_seen"], name="marking_span_latest_idx"),
+            models.Index(
+                fields=["region_name", "post_office_name", "earliest_seen"],
+                name="marking_span_catalog_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Marking #{self.marking_id} seen {self.earliest_seen} -- {self.latest_seen}"
+
+
+class MarkingSearchDocument(models.Model):
+    """
+    Normalized full-text search document for one Marking: code, catalog /
+    inscription / description text, post office and region names, shape,
+    lettering and color names, lowercased with accents and punctuation
+    folded to single spaces (see common.search.normalize_search_text).
+
+    On MySQL the `document` column carries a FULLTEXT index (added in the
+    migration; Django cannot declare one) that common.search queries with
+    MATCH ... AGAINST in boolean mode. Other backends fall back to
+    token-boundary LIKE matching over the same column.
+
+    Maintained by the signal handlers in common.signals; rebuilt in bulk by
+    `manage.py rebuild_marking_search_index`.
+    """
+    marking = models.OneToOneField(
+        Marking,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    document = models.TextField(blank=True, default="")
+    fuzzy_text = models.TextField(blank=True, default="")
+    trigram_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "marking_search_document"
+        verbose_name = "Marking Search Document"
+        verbose_name_plural = "Marking Search Documents"
+        ordering = ["marking"]
+
+    def __str__(self):
+        return f"Marking #{self.marking_id} search document"
+
+
+class MarkingTrigram(models.Model):
+    """
+    One distinct padded word trigram of a marking's fuzzy text (inscription
+    plus post office name, normalized by common.fuzzy.fuzzy_text). Backs the
+    similarity-ranked `/api/v2/markings/fuzzy/` lookup: candidates are the
+    markings sharing the most trigrams with the query.
+
+    Written together with MarkingSearchDocument (whose fuzzy_text and
+    trigram_count describe the same set) by common.search.
+    """
+    marking = models.ForeignKey(
+        Marking,
+        on_delete=models.CASCADE,
+        related_name="trigrams",
+    )
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = "marking_trigram"
+        verbose_name = "Marking Trigram"
+        verbose_name_plural = "Marking Trigrams"
+        unique_together = [["marking", "trigram"]]
+        indexes = [
+            models.Index(fields=["trigram", "marking"], name="marking_trigram_lookup_idx"),
+        ]
+
+    def __str__(self):
+        return f"Marking #{self.marking_id} {self.trigram!r}"
+
+
 IMAGE_MARKING_VIEW_CHOICES = ['FULL', 'DETAIL']
 IMAGE_COVER_VIEW_CHOICES = ['FRONT', 'BACK', 'INTERIOR', 'DETAIL']
 IMAGE_VIEW_CHOICES_TUPLES = [(v, v.title()) for v in sorted(set(IMAGE_MARKING_VIEW_CHOICES + IMAGE_COVER_VIEW_CHOICES))]
@@ -725,6 +918,9 @@ class PostOffice(TimestampedModel):
         verbose_name = 'Post Office'
         verbose_name_plural = 'Post Offices'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='post_office_name_idx'),
+        ]
 
     def __str__(self):
         r = self.region
@@ -736,6 +932,12 @@ class PostOffice(TimestampedModel):
         # post_office_regions junction. "Active" means defunct_date IS NULL;
         # NULLS-FIRST on defunct_date_desc puts active rows ahead of expired
         # ones, then we tie-break by latest established_date.
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('post_office_regions')
+        if prefetched is not None:
+            # Same rule in Python over prefetch_related('post_office_regions__region')
+            # rows, so list serializers do not issue one query per row.
+            links = sorted(prefetched, key=_region_link_sort_key)
+            return links[0].region if links else None
         link = (
             self.post_office_regions
             .select_related('region')
@@ -747,6 +949,18 @@ class PostOffice(TimestampedModel):
         )
         return link.region if link is not None else None
 
+
+def _region_link_sort_key(link):
+    defunct = link.region.defunct_date
+    established = link.region.established_date
+    return (
+        defunct is not None,
+        -defunct.toordinal() if defunct else 0,
+        established is None,
+        -established.toordinal() if established else 0,
+    )
+
+
 class PostOfficeRegion(TimestampedModel):
     """
     Association linking a PostOffice to a Region under whose jurisdiction
@@ -825,6 +1039,10 @@ class CoverManager(models.Manager.from_queryset(CoverQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(recycle_bin_entry__isnull=True)
 
+    def hidden_row_count(self):
+        """Rows this manager hides: one per recycle-bin entry (see woco.counts)."""
+        return CoverRecycleBin.objects.using(self.db).count()
+
 
 class Cover(TimestampedModel):
     """
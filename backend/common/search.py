@@ -0,0 +1,257 @@
+###################################################################################################
+## WoCo Commons - Marking full-text search
+## Normalized per-marking search documents + ranked search over them
+###################################################################################################
+"""
+Catalog keyword search.
+
+Each Marking has a MarkingSearchDocument row holding one normalized text
+blob built from its own text columns and the names of its post office,
+regions, shape, lettering and color. Searching that single column replaces
+the old icontains OR across seven columns and a to-many region join (full
+scans plus duplicated rows).
+
+search_markings(queryset, text) filters a Marking queryset to rows whose
+document contains every search term and annotates `search_rank`:
+
+  MySQL      MATCH(document) AGAINST('+term1* +term2*' IN BOOLEAN MODE) on the
+             FULLTEXT index. Every term is prefix-matched, so "rich" finds
+             "Richmond" as the user types. Terms shorter than InnoDB's
+             minimum token size (e.g. state abbreviations) are not in the
+             index and are matched with LIKE instead.
+  Others     token-boundary LIKE per term (' term' substring); rank counts
+             whole-token hits above prefix-only hits. Used by SQLite in tests.
+
+The same refresh also writes the fuzzy-match columns (fuzzy_text,
+trigram_count) and the MarkingTrigram rows used by common.fuzzy.
+
+Documents are refreshed by the receivers in common.signals and rebuilt in
+bulk by `manage.py rebuild_marking_search_index`.
+"""
+import contextvars
+import logging
+import re
+import unicodedata
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Case, FloatField, Func, IntegerField, Q, Value, When
+from django.db.models.functions import Cast
+
+from .fuzzy import fuzzy_text, trigrams
+
+logger = logging.getLogger(__name__)
+
+REFRESH_BATCH_SIZE = 1000
+
+# InnoDB's default innodb_ft_min_token_size; shorter tokens are not indexed.
+FULLTEXT_MIN_TOKEN_SIZE = 3
+# Hard cap on terms per query; the rest are ignored.
+MAX_SEARCH_TERMS = 8
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+_maintenance_suspended = contextvars.ContextVar("marking_search_suspended", default=False)
+
+
+def search_maintenance_suspended():
+    return _maintenance_suspended.get()
+
+
+@contextmanager
+def suspend_search_index_maintenance():
+    """
+    Disable per-row document refreshes from the signal handlers for the block.
+    The caller must rebuild (rebuild_marking_search_documents) afterwards.
+    """
+    token = _maintenance_suspended.set(True)
+    try:
+        yield
+    finally:
+        _maintenance_suspended.reset(token)
+
+
+def normalize_search_text(text):
+    """Lowercase, strip accents, fold every non-alphanumeric run to one space."""
+    if not text:
+        return ""
+    folded = unicodedata.normalize("NFKD", str(text))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    return _NON_WORD.sub(" ", folded).strip()
+
+
+def search_terms(text):
+    """Distinct normalized terms of a user query, in order."""
+    return list(dict.fromkeys(normalize_search_text(text).split()))[:MAX_SEARCH_TERMS]
+
+
+###################################################################################################
+## Document maintenance
+###################################################################################################
+def _build_documents(marking_ids):
+    """Return {marking_id: (document, fuzzy_text)} for the given existing markings."""
+    from .models import Marking, PostOfficeRegion
+
+    markings = list(
+        Marking.all_objects.filter(pk__in=marking_ids)
+        .select_related("post_office", "shape", "lettering", "color")
+        .order_by()
+    )
+    regions_by_office = {}
+    office_ids = {m.post_office_id for m in markings}
+    for office_id, name, abbrev in PostOfficeRegion.objects.filter(
+        post_office_id__in=office_ids
+    ).values_list("post_office_id", "region__name", "region__abbrev"):
+        regions_by_office.setdefault(office_id, []).extend([name, abbrev])
+
+    documents = {}
+    for m in markings:
+        parts = [
+            m.code,
+            m.catalog_txt,
+            m.inscription_txt,
+            m.desc,
+            m.post_office.name if m.post_office_id else None,
+            *regions_by_office.get(m.post_office_id, []),
+            m.shape.name if m.shape_id else None,
+            m.shape.code if m.shape_id else None,
+            m.lettering.name if m.lettering_id else None,
+            m.color.name if m.color_id else None,
+        ]
+        tokens = normalize_search_text(" ".join(p for p in parts if p)).split()
+        # Leading/trailing spaces let the LIKE fallback anchor on token
+        # boundaries with ' term' / ' term '.
+        document = f" {' '.join(tokens)} " if tokens else ""
+        fuzzy = fuzzy_text(m.inscription_txt, m.post_office.name if m.post_office_id else None)
+        documents[m.pk] = (document, fuzzy)
+    return documents
+
+
+def _upsert(documents):
+    from .models import MarkingSearchDocument, MarkingTrigram
+
+    if not documents:
+        return
+    objs = []
+    grams = []
+    for mid, (document, fuzzy) in documents.items():
+        marking_grams = trigrams(fuzzy)
+        objs.append(MarkingSearchDocument(
+            marking_id=mid, document=document, fuzzy_text=fuzzy, trigram_count=len(marking_grams),
+        ))
+        grams.extend(MarkingTrigram(marking_id=mid, trigram=g) for g in sorted(marking_grams))
+    kwargs = {
+        "update_conflicts": True,
+        "update_fields": ["document", "fuzzy_text", "trigram_count", "refreshed_at"],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target.
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["marking"]
+    MarkingSearchDocument.objects.bulk_create(objs, batch_size=REFRESH_BATCH_SIZE, **kwargs)
+    MarkingTrigram.objects.filter(marking_id__in=list(documents)).delete()
+    MarkingTrigram.objects.bulk_create(grams, batch_size=REFRESH_BATCH_SIZE * 10)
+
+
+def refresh_marking_search_documents(marking_ids):
+    """Rebuild and upsert the search documents of the given marking ids."""
+    ids = sorted({int(mid) for mid in marking_ids if mid is not None})
+    written = 0
+    for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+        documents = _build_documents(ids[start:start + REFRESH_BATCH_SIZE])
+        _upsert(documents)
+        written += len(documents)
+    return written
+
+
+def rebuild_marking_search_documents(batch_size=REFRESH_BATCH_SIZE, stdout=None):
+    """Recompute every marking's search document and trigrams in pk-ordered batches."""
+    from .models import Marking, MarkingSearchDocument, MarkingTrigram
+
+    MarkingSearchDocument.objects.exclude(
+        marking_id__in=Marking.all_objects.values("pk")
+    ).delete()
+    MarkingTrigram.objects.exclude(
+        marking_id__in=Marking.all_objects.values("pk")
+    ).delete()
+
+    written = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            Marking.all_objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not chunk:
+            break
+        documents = _build_documents(chunk)
+        _upsert(documents)
+        written += len(documents)
+        last_pk = chunk[-1]
+        if stdout is not None:
+            stdout.write(f"  marking search documents  refreshed={written:>6d}  (through marking #{last_pk})")
+    logger.info("Rebuilt %d marking search documents", written)
+    return written
+
+
+###################################################################################################
+## Querying
+###################################################################################################
+class MatchAgainst(Func):
+    """MySQL `MATCH (col) AGAINST (%s IN BOOLEAN MODE)` relevance score."""
+    output_field = FloatField()
+
+    def __init__(self, expression, query):
+        super().__init__(expression)
+        self.search_query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column_sql, params = compiler.compile(self.source_expressions[0])
+        return f"MATCH ({column_sql}) AGAINST (%s IN BOOLEAN MODE)", [*params, self.search_query]
+
+
+def _like_term(term):
+    return Q(search_document__document__contains=f" {term}")
+
+
+def _like_rank(terms):
+    """Whole-token hits score 2, prefix-only hits 1 (every term matched)."""
+    rank = Value(0)
+    for term in terms:
+        rank = rank + Case(
+            When(search_document__document__contains=f" {term} ", then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return Cast(rank, FloatField())
+
+
+def search_markings(queryset, text):
+    """
+    Filter a Marking queryset to rows matching every term of `text` (prefix
+    match on each) and annotate `search_rank` (higher is better). Blank
+    queries return the queryset unchanged.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    if connection.vendor == "mysql":
+        indexed = [t for t in terms if len(t) >= FULLTEXT_MIN_TOKEN_SIZE]
+        short = [t for t in terms if len(t) < FULLTEXT_MIN_TOKEN_SIZE]
+        if indexed:
+            boolean_query = " ".join(f"+{t}*" for t in indexed)
+            queryset = queryset.annotate(
+                search_rank=MatchAgainst("search_document__document", boolean_query)
+            ).filter(search_rank__gt=0)
+        else:
+            queryset = queryset.annotate(search_rank=_like_rank(short))
+        for term in short:
+            queryset = queryset.filter(_like_term(term))
+        return queryset
+
+    for term in terms:
+        queryset = queryset.filter(_like_term(term))
+    return queryset.annotate(search_rank=_like_rank(terms))
+
+###################################################################################################
@@ -1,15 +1,57 @@
 ###################################################################################################
 ## WoCo Commons - Signals
 ## User activation: send email when admin sets user Active (True)
+## Marking date spans: keep MarkingDateSpan in step with DateSeen / CoverMarking / place-name writes
+## Marking search: keep MarkingSearchDocument in step with Marking and its name lookups
+## Cached counts and responses: invalidate woco.counts and woco.response_cache entries on writes
+## Editor scope: invalidate cached EditorScope entries on assignment / collection writes
+## Record changelog: link a contribution's transactions to its marking once it has one
+## Version counters: drop a hard-deleted record's RecordVersionCounter
 ###################################################################################################
 import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from woco.counts import bump_count_generation
+from woco.response_cache import bump_catalog_generation
+
+from .api.v2.permissions import bump_editor_scope_generation
+from .audit import link_contribution_transactions
+from .date_spans import (
+    date_span_maintenance_suspended,
+    refresh_marking_date_spans,
+    refresh_marking_date_spans_for_covers,
+)
+from .models import (
+    Citation,
+    Collection,
+    CollectionAssignment,
+    Color,
+    Contribution,
+    Cover,
+    CoverMarking,
+    CoverRecycleBin,
+    CoverValuation,
+    DateSeen,
+    FAQEntry,
+    Image,
+    Lettering,
+    Marking,
+    MarkingRecycleBin,
+    Postcover,
+    PostOffice,
+    PostOfficeRegion,
+    ReferenceWork,
+    RecordVersionCounter,
+    Region,
+    Shape,
+)
+from .search import refresh_marking_search_documents, search_maintenance_suspended
+
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -112,4 +154,253 @@ def _send_activation_email(to_email):
         # Best-effort: do not block user save if SMTP is misconfigured or unreachable.
         logger.exception("Failed to send activation email to %s", to_email)
 
+
+###################################################################################################
+## Marking date spans
+###################################################################################################
+def _refresh_for_date_seen(subject_type, subject_id):
+    if subject_type == DateSeen.SUBJECT_MARKING:
+        refresh_marking_date_spans([subject_id])
+    elif subject_type == DateSeen.SUBJECT_COVER:
+        refresh_marking_date_spans_for_covers([subject_id])
+
+
+@receiver(pre_save, sender=DateSeen)
+def remember_previous_date_seen_subject(sender, instance, **kwargs):
+    """Stash the pre-edit subject so a re-pointed DateSeen refreshes both sides."""
+    instance._date_span_previous_subject = None
+    if instance.pk and not date_span_maintenance_suspended():
+        instance._date_span_previous_subject = (
+            sender.objects.filter(pk=instance.pk).values_list("subject_type", "subject_id").first()
+        )
+
+
+@receiver(post_save, sender=DateSeen)
+@receiver(post_delete, sender=DateSeen)
+def refresh_date_span_for_date_seen(sender, instance, **kwargs):
+    if date_span_maintenance_suspended():
+        return
+    previous = getattr(instance, "_date_span_previous_subject", None)
+    if previous and previous != (instance.subject_type, instance.subject_id):
+        _refresh_for_date_seen(*previous)
+    _refresh_for_date_seen(instance.subject_type, instance.subject_id)
+
+
+@receiver(pre_save, sender=CoverMarking)
+def remember_previous_cover_marking_marking(sender, instance, **kwargs):
+    instance._date_span_previous_marking_id = None
+    if instance.pk and not date_span_maintenance_suspended():
+        instance._date_span_previous_marking_id = (
+            sender.objects.filter(pk=instance.pk).values_list("marking_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=CoverMarking)
+@receiver(post_delete, sender=CoverMarking)
+def refresh_date_span_for_cover_marking(sender, instance, **kwargs):
+    """Linking, unlinking or (re)reviewing a cover changes the marking's span."""
+    if date_span_maintenance_suspended():
+        return
+    refresh_marking_date_spans([
+        instance.marking_id,
+        getattr(instance, "_date_span_previous_marking_id", None),
+    ])
+
+
+@receiver(post_save, sender=Marking)
+@receiver(post_save, sender="common.CatalogRequestMarking")  # admin-only proxy; saves send it as sender
+def refresh_date_span_for_marking(sender, instance, **kwargs):
+    """Give every new marking a (possibly empty) span row; a moved marking re-sorts."""
+    if not date_span_maintenance_suspended():
+        refresh_marking_date_spans([instance.pk])
+
+
+@receiver(post_save, sender=MarkingRecycleBin)
+@receiver(post_delete, sender=MarkingRecycleBin)
+def refresh_date_span_removed_flag(sender, instance, **kwargs):
+    if date_span_maintenance_suspended():
+        return
+    refresh_marking_date_spans([instance.marking_id])
+
+
+def _refresh_date_spans(markings):
+    if not date_span_maintenance_suspended():
+        refresh_marking_date_spans(markings.values_list("pk", flat=True))
+
+
+# Span rows carry the post office and current region names the catalog's
+# default ordering sorts on.
+@receiver(post_save, sender=PostOffice)
+def refresh_date_spans_for_post_office(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_date_spans(Marking.all_objects.filter(post_office_id=instance.pk))
+
+
+@receiver(post_save, sender=PostOfficeRegion)
+@receiver(post_delete, sender=PostOfficeRegion)
+def refresh_date_spans_for_post_office_region(sender, instance, **kwargs):
+    _refresh_date_spans(Marking.all_objects.filter(post_office_id=instance.post_office_id))
+
+
+@receiver(post_save, sender=Region)
+def refresh_date_spans_for_region(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_date_spans(Marking.all_objects.filter(post_office__post_office_regions__region_id=instance.pk))
+
+
+###################################################################################################
+## Marking search documents
+###################################################################################################
+@receiver(post_save, sender=Marking)
+@receiver(post_save, sender="common.CatalogRequestMarking")  # admin-only proxy; saves send it as sender
+def refresh_search_document_for_marking(sender, instance, **kwargs):
+    if not search_maintenance_suspended():
+        refresh_marking_search_documents([instance.pk])
+
+
+def _refresh_search_documents(markings):
+    if not search_maintenance_suspended():
+        refresh_marking_search_documents(markings.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=PostOffice)
+def refresh_search_documents_for_post_office(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_search_documents(Marking.all_objects.filter(post_office_id=instance.pk))
+
+
+@receiver(post_save, sender=PostOfficeRegion)
+@receiver(post_delete, sender=PostOfficeRegion)
+def refresh_search_documents_for_post_office_region(sender, instance, **kwargs):
+    _refresh_search_documents(Marking.all_objects.filter(post_office_id=instance.post_office_id))
+
+
+@receiver(post_save, sender=Region)
+def refresh_search_documents_for_region(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_search_documents(
+            Marking.all_objects.filter(post_office__post_office_regions__region_id=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Shape)
+@receiver(post_save, sender=Lettering)
+@receiver(post_save, sender=Color)
+def refresh_search_documents_for_lookup(sender, instance, created, **kwargs):
+    """A renamed shape / lettering / color changes every marking that uses it."""
+    if not created:
+        field = sender._meta.model_name
+        _refresh_search_documents(Marking.all_objects.filter(**{f"{field}_id": instance.pk}))
+
+
+###################################################################################################
+## Cached counts and catalog responses
+###################################################################################################
+# Models whose rows feed a count woco.counts caches: the marking list API and
+# every TimestampedModelAdmin changelist, plus what their default managers and
+# changelist querysets filter on (recycle bins; contributions for the catalog
+# request changelist). Writes anywhere else -- sessions, last_login, admin log
+# entries, version history -- leave the counts alone.
+COUNTED_MODELS = (
+    Citation,
+    Color,
+    Contribution,
+    Cover,
+    CoverMarking,
+    CoverRecycleBin,
+    CoverValuation,
+    DateSeen,
+    FAQEntry,
+    Image,
+    Lettering,
+    Marking,
+    MarkingRecycleBin,
+    Postcover,
+    PostOffice,
+    PostOfficeRegion,
+    ReferenceWork,
+    Region,
+    Shape,
+    "common.CatalogRequestMarking",  # admin-only proxy; saves send it as sender
+)
+
+
+# Models whose rows appear in the public catalog responses woco.response_cache
+# and woco.conditional validate against: the records, their lookups and the
+# recycle bins that hide them. Drafts and bookkeeping -- contributions,
+# submission transactions, version history, collection assignments -- leave
+# the catalog generation alone.
+CATALOG_MODELS = (
+    Citation,
+    Color,
+    Cover,
+    CoverMarking,
+    CoverRecycleBin,
+    CoverValuation,
+    DateSeen,
+    FAQEntry,
+    Image,
+    Lettering,
+    Marking,
+    MarkingRecycleBin,
+    PostOffice,
+    PostOfficeRegion,
+    ReferenceWork,
+    Region,
+    Shape,
+    "common.CatalogRequestMarking",
+)
+
+
+def invalidate_cached_counts(sender, **kwargs):
+    """A write to a counted model makes every cached list count for its app stale."""
+    bump_count_generation(sender._meta.app_label)
+
+
+def invalidate_catalog_responses(sender, **kwargs):
+    """A write to a catalog model makes every cached catalog response stale."""
+    bump_catalog_generation(using=kwargs.get("using"))
+
+
+for _model in COUNTED_MODELS:
+    post_save.connect(invalidate_cached_counts, sender=_model)
+    post_delete.connect(invalidate_cached_counts, sender=_model)
+
+for _model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_responses, sender=_model)
+    post_delete.connect(invalidate_catalog_responses, sender=_model)
+
+
+###################################################################################################
+## Editor scope
+###################################################################################################
+@receiver(post_save, sender=CollectionAssignment)
+@receiver(post_delete, sender=CollectionAssignment)
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def invalidate_editor_scopes(sender, **kwargs):
+    """Assignments and a collection's region feed every user's EditorScope."""
+    bump_editor_scope_generation()
+
+###################################################################################################
+## Record changelog
+###################################################################################################
+@receiver(post_save, sender=Contribution)
+def link_transactions_to_contribution_marking(sender, instance, **kwargs):
+    """Approval sets Contribution.marking; carry it onto the earlier transactions."""
+    link_contribution_transactions(instance)
+
+###################################################################################################
+## Version counters
+###################################################################################################
+@receiver(post_delete, sender=Marking)
+@receiver(post_delete, sender="common.CatalogRequestMarking")
+@receiver(post_delete, sender=Cover)
+def delete_version_counter(sender, instance, **kwargs):
+    """The counter has no FK to cascade from; a reused id must start a fresh history."""
+    record_type = (
+        RecordVersionCounter.RECORD_COVER if isinstance(instance, Cover) else RecordVersionCounter.RECORD_MARKING
+    )
+    RecordVersionCounter.objects.filter(record_type=record_type, record_id=instance.pk).delete()
+
 ###################################################################################################
@@ -0,0 +1,108 @@
+###################################################################################################
+## WoCo Commons - Polymorphic subject prefetch
+## Batch-load Image / Citation / DateSeen rows for many (subject_type, subject_id) owners at once
+###################################################################################################
+"""
+Image, Citation and DateSeen hang off a Cover or Marking via
+(subject_type, subject_id) rather than a real FK, so Django's
+prefetch_related cannot follow them. Serializing a page of markings used to
+run one query per row per relation.
+
+fetch_subject_rows() loads the rows for any number of subjects with a single
+`subject_id__in` query (optionally capped at the first N rows per subject
+using a ROW_NUMBER() window) and groups them by subject_id.
+prefetch_subject_rows() attaches the groups to model instances under a
+`to_attr` name; subject_rows() reads that attribute back, falling back to a
+one-subject query when nothing was prefetched.
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def _order_expressions(order_by):
+    exprs = []
+    for field in order_by:
+        if field.startswith("-"):
+            exprs.append(F(field[1:]).desc())
+        else:
+            exprs.append(F(field).asc())
+    return exprs
+
+
+def fetch_subject_rows(
+    model,
+    subject_type,
+    subject_ids,
+    *,
+    order_by,
+    limit=None,
+    queryset=None,
+    values=None,
+):
+    """
+    Return {subject_id: [row, ...]} for every id in `subject_ids` (ids with
+    no rows map to []). One query regardless of how many ids are passed.
+
+    order_by  -- ordering applied within each subject's group.
+    limit     -- keep only the first `limit` rows per subject (window function).
+    queryset  -- optional base queryset (e.g. with select_related) of `model`.
+    values    -- optional field names; rows are dicts instead of instances.
+    """
+    subject_ids = list(dict.fromkeys(pk for pk in subject_ids if pk is not None))
+    grouped = {pk: [] for pk in subject_ids}
+    if not subject_ids:
+        return grouped
+
+    qs = queryset if queryset is not None else model.objects.all()
+    qs = qs.filter(subject_type=subject_type, subject_id__in=subject_ids)
+    if limit is not None:
+        qs = qs.annotate(
+            _subject_row=Window(
+                expression=RowNumber(),
+                partition_by=[F("subject_id")],
+                order_by=_order_expressions(order_by),
+            )
+        ).filter(_subject_row__lte=limit)
+    qs = qs.order_by("subject_id", *order_by)
+    if values is not None:
+        fields = list(values)
+        qs = qs.values("subject_id", *fields)
+        for row in qs:
+            grouped[row["subject_id"]].append({f: row[f] for f in fields})
+        return grouped
+
+    for row in qs:
+        grouped[row.subject_id].append(row)
+    return grouped
+
+
+def prefetch_subject_rows(instances, model, subject_type, to_attr, *, order_by, limit=None, queryset=None):
+    """
+    Attach `to_attr` = list of related rows to each instance in `instances`
+    (Markings or Covers) using one query. Instances that already carry
+    `to_attr` are left alone. Returns `instances` for chaining.
+    """
+    pending = [obj for obj in instances if getattr(obj, to_attr, None) is None]
+    if not pending:
+        return instances
+    grouped = fetch_subject_rows(
+        model,
+        subject_type,
+        (obj.pk for obj in pending),
+        order_by=order_by,
+        limit=limit,
+        queryset=queryset,
+    )
+    for obj in pending:
+        setattr(obj, to_attr, grouped.get(obj.pk, []))
+    return instances
+
+
+def subject_rows(instance, model, subject_type, to_attr, *, order_by, limit=None, queryset=None):
+    """Prefetched rows for one instance, loading (and caching) them if absent."""
+    prefetch_subject_rows(
+        [instance], model, subject_type, to_attr, order_by=order_by, limit=limit, queryset=queryset
+    )
+    return getattr(instance, to_attr)
+
+###################################################################################################
@@ -0,0 +1,130 @@
+"""
+Tests for import_ascc_bundle --diff (common.bundle_diff).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_bundle_diff -v 2
+
+A regenerated bundle must re-import as inserts, updates and tombstones only:
+matched by natural key even when the munger renumbered its ids, a no-op when
+nothing changed, never touching rows editors changed or created, and logged
+after the change summary like an editor's change: bundle_import
+SubmissionTransactions with full before / after snapshots, plus a version.
+"""
+import copy
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from common.models import (
+    DateSeen,
+    Image,
+    Marking,
+    MarkingRecycleBin,
+    MarkingVersion,
+    SubmissionTransaction,
+)
+from common.version_store import version_snapshot
+from common.tests.test_bundle_fast_load import _bundle_rows, _write_bundle
+
+User = get_user_model()
+
+
+class BundleDiffTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.editor = User.objects.create_user(username="editor", password="pw")
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.rows = _bundle_rows(self.admin.pk)
+        _write_bundle(self.directory, self.rows)
+        call_command("import_ascc_bundle", self.directory, "--fast", stdout=StringIO())
+
+    def _diff(self, *args):
+        out = StringIO()
+        call_command("import_ascc_bundle", self.directory, "--diff", *args, stdout=out)
+        return out.getvalue()
+
+    def _regenerate(self):
+        """The next munger run: every marking renumbered, one edited, one dropped, one new."""
+        rows = copy.deepcopy(self.rows)
+        va1, _codeless = rows["markings"]
+        va1.update(id=110, inscription_txt="RICHMOND Va. (double ring)")
+        va3 = {**va1, "id": 112, "code": "VA-3", "inscription_txt": "PETERSBURG Va.", "width": "28"}
+        rows["markings"] = [va1, va3]
+        rows["dates_seen"] = [{**rows["dates_seen"][0], "id": 7, "subject_id": 110}]
+        rows["citations"][0]["subject_id"] = 110
+        rows["images"][0]["subject_id"] = 110
+        _write_bundle(self.directory, rows)
+
+    def test_unchanged_bundle_is_a_no_op(self):
+        output = self._diff()
+        self.assertIn("markings            insert=    0  update=    0  tombstone=    0  unchanged=    2", output)
+        self.assertIn("0 change(s); nothing applied.", output)
+        self.assertFalse(SubmissionTransaction.objects.exists())
+
+    def test_applies_inserts_updates_and_tombstones(self):
+        self._regenerate()
+        output = self._diff()
+        self.assertLess(output.index("Changes against the current catalog"), output.index("Applied"))
+        self.assertIn("markings            insert=    1  update=    1  tombstone=    1", output)
+        self.assertIn("dates_seen          insert=    0  update=    0  tombstone=    0  unchanged=    1", output)
+
+        # Matched by code: VA-1 keeps id 10; the codeless marking is recycle-binned.
+        self.assertEqual(Marking.all_objects.get(code="VA-1").pk, 10)
+        self.assertEqual(Marking.all_objects.get(pk=10).inscription_txt, "RICHMOND Va. (double ring)")
+        new = Marking.all_objects.get(code="VA-3")
+        self.assertEqual(new.pk, 112)
+        self.assertTrue(MarkingRecycleBin.objects.filter(marking_id=11, removed_by=self.admin).exists())
+        # Children follow the id mapping; the binned marking keeps its dates.
+        self.assertEqual(Image.objects.get().subject_id, 10)
+        self.assertEqual(DateSeen.objects.filter(subject_id=11).count(), 1)
+
+        transactions = SubmissionTransaction.objects.filter(source=SubmissionTransaction.SOURCE_BUNDLE_IMPORT)
+        self.assertEqual(
+            sorted(transactions.values_list("marking_id", "action")),
+            [(10, "record_update"), (11, "marking_removed"), (112, "record_create")],
+        )
+        update = transactions.get(marking_id=10)
+        self.assertEqual(
+            update.diff_payload,
+            [{"field": "inscription_txt", "before": "RICHMOND Va.", "after": "RICHMOND Va. (double ring)"}],
+        )
+        # Full snapshots, not flat attname dicts: names, children and all.
+        self.assertEqual(update.before_payload["town"], "Richmond")
+        self.assertEqual(update.after_payload["citations"], [{"reference_work_id": 1, "citation_detail": "p. 12"}])
+        self.assertEqual(transactions.get(marking_id=112).after_payload["state"], "Virginia")
+        removed = transactions.get(marking_id=11)
+        self.assertEqual((removed.before_payload["town"], removed.after_payload), ("Norfolk", {}))
+
+        versions = MarkingVersion.objects.filter(transaction__in=transactions)
+        self.assertEqual(sorted(versions.values_list("marking_id", flat=True)), [10, 11, 112])
+        self.assertEqual(
+            version_snapshot(versions.get(marking_id=10))["inscription_txt"], "RICHMOND Va. (double ring)"
+        )
+
+        self.assertIn("0 change(s)", self._diff())  # applied state now matches
+
+    def test_editor_work_is_left_alone(self):
+        Marking.all_objects.filter(pk=10).update(inscription_txt="Editor fix", modified_by=self.editor)
+        editor_marking = Marking.all_objects.get(pk=11)
+        editor_marking.pk, editor_marking.code = 50, "ED-1"
+        editor_marking.created_by = editor_marking.modified_by = self.editor
+        editor_marking.save()
+
+        self._regenerate()
+        output = self._diff()
+        self.assertIn("update=    0  tombstone=    1  unchanged=    0  kept=   2", output)
+        self.assertEqual(Marking.all_objects.get(pk=10).inscription_txt, "Editor fix")
+        self.assertFalse(MarkingRecycleBin.objects.filter(marking_id=50).exists())
+
+    def test_dry_run_prints_summary_only(self):
+        self._regenerate()
+        output = self._diff("--dry-run")
+        self.assertIn("[DRY RUN] 3 change(s); nothing applied.", output)
+        self.assertFalse(Marking.all_objects.filter(code="VA-3").exists())
+        self.assertFalse(MarkingRecycleBin.objects.exists())
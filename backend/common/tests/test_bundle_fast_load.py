@@ -0,0 +1,292 @@
+"""
+Tests for import_ascc_bundle --fast (common.bundle_load).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_bundle_fast_load -v 2
+
+The fast path must load a bundle into the same rows as the per-row Resource
+import, upsert on re-import, keep --dry-run and all-or-nothing rollback, and
+reject invalid cells before writing anything. Streaming a CSV in small
+chunks must give the same rows, totals and file row numbers as a whole-file
+read. import_ascc_bundles must merge
+shared lookups, refuse colliding bundles up front, and load a bundle only
+after the bundles it references have committed.
+"""
+import copy
+import csv
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+
+from common.bundle_load import iter_bundle_csv
+from common.models import (
+    Citation,
+    Color,
+    DateSeen,
+    Image,
+    Marking,
+    MarkingDateSpan,
+    PostOffice,
+    PostOfficeRegion,
+    Region,
+    Shape,
+)
+
+User = get_user_model()
+
+STAMP = "2024-05-01T12:00:00+00:00"
+
+
+def _audit(user_id):
+    return {"created_date": STAMP, "modified_date": STAMP, "created_by": user_id, "modified_by": user_id}
+
+
+def _bundle_rows(user_id):
+    audit = _audit(user_id)
+    return {
+        "colors": [
+            {"id": 1, "name": "Black", "hex_val": "#000000", "pantone_code": "", **audit},
+            {"id": 2, "name": "Red", "hex_val": "#FF0000", "pantone_code": "485 C", **audit},
+        ],
+        "letterings": [{"id": 1, "name": "Serif", **audit}],
+        "shapes": [{"id": 1, "name": "Circle", "code": "C", **audit}],
+        "regions": [
+            {"id": 1, "name": "Virginia", "abbrev": "VA", "region_tier": "STATE", "parent_region": "",
+             "established_date": "1788-06-25", "defunct_date": "", **audit},
+        ],
+        "reference_works": [
+            {"id": 1, "code": "ASCC", "title": "American Stampless Cover Catalog", "authorship": "Phillips",
+             "publisher": "DLP", "publication_year": 1997, "edition": "", "volume": "I", "isbn": "",
+             "url": "", **audit},
+        ],
+        "post_offices": [{"id": 1, "name": "Richmond", **audit}, {"id": 2, "name": "Norfolk", **audit}],
+        "post_office_regions": [
+            {"id": 1, "post_office": 1, "region": 1, **audit},
+            {"id": 2, "post_office": 2, "region": 1, **audit},
+        ],
+        "markings": [
+            {"id": 10, "code": "VA-1", "type": "TOWNMARK", "catalog_txt": "RICHMOND Va.",
+             "inscription_txt": "RICHMOND Va.", "desc": "", "is_manuscript": "False", "shape": 1,
+             "lettering": 1, "color": 2, "is_irreg": "False", "width": "31.5", "height": "",
+             "date_fmt": "MD", "impression": "", "rate_val": "", "post_office": 1, **audit},
+            {"id": 11, "code": "", "type": "TOWNMARK", "catalog_txt": "",
+             "inscription_txt": "Norfolk", "desc": "", "is_manuscript": "True", "shape": "",
+             "lettering": "", "color": 1, "is_irreg": "", "width": "", "height": "",
+             "date_fmt": "", "impression": "", "rate_val": "0.25", "post_office": 2, **audit},
+        ],
+        "dates_seen": [
+            {"id": 1, "subject_type": "MARKING", "subject_id": 10, "date": "1840-03-02", "granularity": "DAY", **audit},
+            {"id": 2, "subject_type": "MARKING", "subject_id": 11, "date": "1851-01-01", "granularity": "YEAR", **audit},
+        ],
+        "citations": [
+            {"id": 1, "reference_work": 1, "subject_type": "MARKING", "subject_id": 10,
+             "citation_detail": "p. 12", **audit},
+        ],
+        "images": [
+            {"image_id": 1, "subject_type": "MARKING", "subject_id": 10, "original_filename": "va1.png",
+             "storage_filename": "markings/va1.png", "file_checksum": "ab" * 32, "mime_type": "image/png",
+             "image_width": 120, "image_height": 80, "file_size_bytes": 5120, "image_view": "FULL",
+             "image_description": "", "is_tracing": "True", "display_order": 0, "uploaded_by": user_id,
+             **audit},
+        ],
+    }
+
+
+def _second_region_rows(rows):
+    """A North Carolina bundle: same lookups (newer timestamps), own regional ids."""
+    rows = copy.deepcopy(rows)
+    for stem in ("colors", "letterings", "shapes", "reference_works"):
+        for row in rows[stem]:
+            row["modified_date"] = "2024-06-01T09:30:00+00:00"
+    rows["regions"][0].update(id=2, name="North Carolina", abbrev="NC")
+    rows["post_offices"] = [{**row, "id": row["id"] + 2} for row in rows["post_offices"]]
+    rows["post_office_regions"] = [
+        {**rows["post_office_regions"][0], "id": 3, "post_office": 3, "region": 2},
+        {**rows["post_office_regions"][0], "id": 4, "post_office": 4, "region": 1},  # VA's region
+    ]
+    for row in rows["markings"]:
+        row.update(id=row["id"] + 10, post_office=row["post_office"] + 2, code=row["code"].replace("VA", "NC"))
+    for row in rows["dates_seen"] + rows["citations"]:
+        row.update(id=row["id"] + 2, subject_id=row["subject_id"] + 10)
+    rows["images"][0].update(image_id=2, subject_id=20)
+    return rows
+
+
+def _write_bundle(directory, rows_by_stem):
+    os.makedirs(directory, exist_ok=True)
+    for stem, rows in rows_by_stem.items():
+        with open(os.path.join(directory, f"{stem}.csv"), "w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def _catalog_state():
+    """Loaded catalog values, minus the audit timestamps save() rewrites."""
+    state = {}
+    for model in (Color, Region, PostOffice, PostOfficeRegion, Marking, DateSeen, Citation, Image):
+        skip = {"created_date", "modified_date"}
+        names = [f.attname for f in model._meta.concrete_fields if f.name not in skip]
+        state[model.__name__] = list(model._base_manager.order_by("pk").values(*names))
+    return state
+
+
+class BundleFastLoadTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.rows = _bundle_rows(self.admin.pk)
+        _write_bundle(self.directory, self.rows)
+
+    def _import(self, *args):
+        out = StringIO()
+        call_command("import_ascc_bundle", self.directory, *args, stdout=out)
+        return out.getvalue()
+
+    def test_fast_load_matches_resource_import(self):
+        self._import()
+        expected = _catalog_state()
+
+        output = self._import("--fast", "--truncate")
+        self.assertEqual(_catalog_state(), expected)
+        self.assertIn("rows/s", output)
+        self.assertIn("new=    2  update=    0", output)
+        self.assertEqual(MarkingDateSpan.objects.count(), 2)
+
+        marking = Marking.all_objects.get(pk=11)
+        self.assertIsNone(marking.code)  # blank nullable text -> NULL, as NullableCharWidget
+        self.assertEqual(str(marking.rate_val), "0.25")
+
+    def test_fast_reimport_upserts_by_id(self):
+        self._import("--fast")
+        self.rows["colors"][1]["name"] = "Scarlet"
+        self.rows["colors"].append({**self.rows["colors"][0], "id": 3, "name": "Blue"})
+        _write_bundle(self.directory, self.rows)
+
+        output = self._import("--fast", "--only", "colors")
+        self.assertIn("new=    1  update=    2", output)
+        self.assertEqual(list(Color.objects.order_by("pk").values_list("name", flat=True)), ["Black", "Scarlet", "Blue"])
+
+    def test_invalid_cell_rolls_back_whole_bundle(self):
+        self.rows["markings"][1]["post_office"] = 99
+        self.rows["markings"][0]["width"] = "wide"
+        _write_bundle(self.directory, self.rows)
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "markings: import failed"):
+            call_command("import_ascc_bundle", self.directory, "--fast", stdout=out)
+        self.assertIn("row 1: width: expected a decimal number ('wide')", out.getvalue())
+        self.assertIn("row 2: post_office: PostOffice does not exist ('99')", out.getvalue())
+        self.assertFalse(Color.objects.exists())  # earlier stems rolled back too
+        self.assertFalse(Marking.all_objects.exists())
+
+    def test_chunked_load_matches_whole_file(self):
+        self._import()
+        expected = _catalog_state()
+
+        output = self._import("--truncate", "--chunk-rows", "1")
+        self.assertEqual(_catalog_state(), expected)
+        self.assertIn("  colors              new=    2  update=    0  skip=    0", output)
+        self._import("--fast", "--truncate", "--chunk-rows", "1")
+        self.assertEqual(_catalog_state(), expected)
+
+    def test_chunked_errors_keep_file_row_numbers(self):
+        self.rows["colors"][1]["id"] = 1  # duplicate id in the next chunk
+        _write_bundle(self.directory, self.rows)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("import_ascc_bundle", self.directory, "--fast", "--chunk-rows", "1", stdout=out)
+        self.assertIn("row 2: id: duplicate value in this file ('1')", out.getvalue())
+
+        self.rows["colors"][1]["id"] = 2
+        self.rows["markings"][1]["post_office"] = 99
+        _write_bundle(self.directory, self.rows)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("import_ascc_bundle", self.directory, "--chunk-rows", "1", stdout=out)
+        self.assertIn("  markings            new=    1  update=    0", out.getvalue())
+        self.assertIn("    ! row 2: ", out.getvalue())
+        self.assertFalse(Color.objects.exists())
+
+    def test_iter_bundle_csv_streams_chunks(self):
+        path = os.path.join(self.directory, "post_offices.csv")
+        chunks = list(iter_bundle_csv(path, chunk_rows=1))
+        self.assertEqual([list(chunk.index) for chunk in chunks], [[0], [1]])
+        self.assertEqual(chunks[1].loc[1, "name"], "Norfolk")
+
+        # Abandoning the stream early stops the reader thread.
+        stream = iter_bundle_csv(path, chunk_rows=1)
+        next(stream)
+        stream.close()
+
+    def test_dry_run_writes_nothing(self):
+        output = self._import("--fast", "--dry-run")
+        self.assertIn("[DRY RUN] Done. new=16", output)
+        self.assertFalse(Region.objects.exists())
+        self.assertFalse(Image.objects.exists())
+
+
+class MultiBundleImportTests(TransactionTestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.va, self.nc = os.path.join(root, "va"), os.path.join(root, "nc")
+        self.va_rows = _bundle_rows(self.admin.pk)
+        self.nc_rows = _second_region_rows(self.va_rows)
+        _write_bundle(self.va, self.va_rows)
+        _write_bundle(self.nc, self.nc_rows)
+
+    def _import(self, *args):
+        out = StringIO()
+        try:
+            call_command("import_ascc_bundles", *args, stdout=out)
+        finally:
+            self.output = out.getvalue()
+
+    def test_merges_lookups_and_orders_dependent_bundles(self):
+        self._import(self.nc, self.va, "--jobs", "2")
+        self.assertIn("nc waits for va", self.output)
+        self.assertIn("Done. bundles=2/2", self.output)
+        self.assertIn("rows/s", self.output)
+        self.assertEqual(Color.objects.count(), 2)  # merged, not loaded twice
+        self.assertEqual(Shape.objects.count(), 1)
+        self.assertEqual(sorted(Marking.all_objects.values_list("pk", flat=True)), [10, 11, 20, 21])
+        self.assertEqual(PostOfficeRegion.objects.filter(region_id=1).count(), 3)
+        self.assertEqual(MarkingDateSpan.objects.count(), 4)
+
+    def test_collisions_abort_before_writing(self):
+        self.nc_rows["markings"][0]["id"] = 10
+        self.nc_rows["colors"][1]["name"] = "Crimson"
+        _write_bundle(self.nc, self.nc_rows)
+
+        with self.assertRaisesMessage(CommandError, "collision(s) between bundles"):
+            self._import(self.va, self.nc)
+        self.assertIn("markings id 10: in ['nc', 'va']", self.output)
+        self.assertIn("colors id 2: different rows in ['nc', 'va']", self.output)
+        self.assertFalse(Color.objects.exists())
+
+    def test_failed_bundle_skips_its_dependents(self):
+        self.va_rows["markings"][0]["type"] = "BOGUS"
+        _write_bundle(self.va, self.va_rows)
+
+        with self.assertRaisesMessage(CommandError, "Failed: va; skipped (depend on a failed bundle): nc"):
+            self._import(self.va, self.nc, "--jobs", "2")
+        self.assertIn("markings row 1: type: not a valid choice ('BOGUS')", self.output)
+        self.assertEqual(Color.objects.count(), 2)  # shared lookups committed first
+        self.assertFalse(Region.objects.exists())
+        self.assertFalse(Marking.all_objects.exists())
+
+    def test_dry_run_rolls_back_every_bundle(self):
+        self._import(self.va, self.nc, "--dry-run")
+        self.assertIn("[DRY RUN] Done. bundles=2/2", self.output)
+        self.assertFalse(Color.objects.exists())
+        self.assertFalse(Marking.all_objects.exists())
@@ -0,0 +1,126 @@
+"""
+Tests for ETag / Last-Modified conditional GET (woco.conditional).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_conditional_get -v 2
+
+On collection routes a matching If-None-Match must short-circuit to 304
+before the view does any work; any catalog write, another user or another
+URL must change the ETag. Detail routes only answer 304 for a record the
+user could have fetched: missing or forbidden records keep their 404/403,
+and a 304 is decided from the record's validator without serializing it or
+building the changelog.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from common.api.v2.serializers import ColorSerializer, MarkingSerializer
+from common.audit import log_submission_transaction
+from common.models import Color, Marking, PostOffice, SubmissionTransaction
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Commit the fixture: writes invalidate cached responses on commit only.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="editor", password="pw")
+            self.color = Color.objects.create(name="Black", created_by=self.user, modified_by=self.user)
+            po = PostOffice.objects.create(name="Richmond", created_by=self.user, modified_by=self.user)
+            self.marking = Marking.objects.create(
+                type="TOWNMARK",
+                inscription_txt="RICHMOND Va.",
+                is_manuscript=True,
+                color=self.color,
+                post_office=po,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+            self.url = f"/api/v2/markings/{self.marking.pk}/"
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        first = self.client.get("/api/v2/colors/")
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Last-Modified", first)
+
+        with mock.patch.object(ColorSerializer, "to_representation") as to_representation:
+            again = self.client.get("/api/v2/colors/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], etag)
+        to_representation.assert_not_called()
+
+        by_date = self.client.get("/api/v2/colors/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_detail_matching_etag_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("Last-Modified", first)
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_missing_or_forbidden_records_are_never_304(self):
+        missing = f"/api/v2/markings/{self.marking.pk + 1000}/"
+        self.assertEqual(self.client.get(missing, HTTP_IF_NONE_MATCH="*").status_code, 404)
+        self.assertEqual(
+            self.client.get(missing, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT").status_code,
+            404,
+        )
+
+        self.client.force_authenticate(self.user)
+        changelog = f"{self.url}changelog/"
+        self.assertEqual(self.client.get(changelog, HTTP_IF_NONE_MATCH="*").status_code, 403)
+
+    def test_writes_users_and_urls_change_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get("/api/v2/colors/")["ETag"], etag)
+
+        self.client.force_authenticate(self.user)
+        authed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(authed.status_code, 200)
+        self.assertNotEqual(authed["ETag"], etag)
+
+        self.client.force_authenticate(None)
+        self.color.name = "Blue"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.color.save()
+        after_write = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_write.status_code, 200)
+        self.assertNotEqual(after_write["ETag"], etag)
+
+    def test_changelog_is_conditional(self):
+        admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_authenticate(admin)
+        url = f"{self.url}changelog/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        # A transaction is not a catalog write, but it moves the changelog.
+        log_submission_transaction(
+            action=SubmissionTransaction.ACTION_CATALOG_DIRECT_EDIT,
+            actor=admin,
+            marking=self.marking,
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+
+    def test_detail_304_skips_serializer_and_changelog(self):
+        self.client.force_authenticate(User.objects.create_superuser(username="admin", password="pw"))
+        changelog = f"{self.url}changelog/"
+        etags = {url: self.client.get(url)["ETag"] for url in (self.url, changelog)}
+
+        with mock.patch.object(MarkingSerializer, "to_representation") as to_representation, \
+                mock.patch("common.api.v2.views.build_changelog") as build_changelog:
+            for url, etag in etags.items():
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        to_representation.assert_not_called()
+        build_changelog.assert_not_called()
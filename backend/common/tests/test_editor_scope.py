@@ -0,0 +1,123 @@
+"""
+Tests for the cached editor scope (common.api.v2.permissions.editor_scope).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_editor_scope -v 2
+
+Region / collection resolution must cost one query per user until an
+assignment or collection changes, and responsibility checks must follow it.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from common.api.v2.permissions import (
+    _user_is_responsible_for_marking,
+    editor_scope,
+    user_assigned_collection_ids,
+)
+from common.models import (
+    Collection,
+    CollectionAssignment,
+    Color,
+    Marking,
+    PostOffice,
+    PostOfficeRegion,
+    Region,
+)
+
+User = get_user_model()
+
+
+class EditorScopeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.editor = User.objects.create_user(username="editor", password="pw")
+        self.editor.user_permissions.add(Permission.objects.get(codename="review_contribution"))
+
+        def region(name, abbrev):
+            r = Region.objects.create(
+                name=name, abbrev=abbrev, region_tier="STATE", created_by=self.admin, modified_by=self.admin
+            )
+            c = Collection.objects.create(name=name, region=r, created_by=self.admin, modified_by=self.admin)
+            return r, c
+
+        self.virginia, self.va_collection = region("Virginia", "VA")
+        self.maryland, self.md_collection = region("Maryland", "MD")
+        CollectionAssignment.objects.create(
+            user=self.editor, collection=self.va_collection, created_by=self.admin, modified_by=self.admin
+        )
+        color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+
+        def marking(town, r):
+            po = PostOffice.objects.create(name=town, created_by=self.admin, modified_by=self.admin)
+            PostOfficeRegion.objects.create(post_office=po, region=r, created_by=self.admin, modified_by=self.admin)
+            return Marking.objects.create(
+                type="TOWNMARK", inscription_txt=town.upper(), is_manuscript=True, color=color,
+                post_office=po, created_by=self.admin, modified_by=self.admin,
+            )
+
+        self.richmond = marking("Richmond", self.virginia)
+        self.baltimore = marking("Baltimore", self.maryland)
+
+    def _fresh_editor(self):
+        # A new user object per "request", as the auth middleware would load.
+        return User.objects.get(pk=self.editor.pk)
+
+    def test_scope_is_computed_once_and_cached_across_requests(self):
+        with CaptureQueriesContext(connection) as first:
+            scope = editor_scope(self._fresh_editor())
+        self.assertEqual(len(first), 2)  # user load + one assignment query
+        self.assertEqual(scope.region_ids, {self.virginia.pk})
+        self.assertEqual(scope.collection_ids, {self.va_collection.pk})
+
+        editor = self._fresh_editor()
+        with CaptureQueriesContext(connection) as later:
+            editor_scope(editor)
+            user_assigned_collection_ids(editor)
+        self.assertEqual(len(later), 0)
+
+    def test_assignment_changes_invalidate(self):
+        self.assertFalse(_user_is_responsible_for_marking(self._fresh_editor(), self.baltimore))
+        CollectionAssignment.objects.create(
+            user=self.editor, collection=self.md_collection, created_by=self.admin, modified_by=self.admin
+        )
+        self.assertTrue(_user_is_responsible_for_marking(self._fresh_editor(), self.baltimore))
+        CollectionAssignment.objects.filter(user=self.editor, collection=self.va_collection).delete()
+        self.assertFalse(_user_is_responsible_for_marking(self._fresh_editor(), self.richmond))
+
+    def test_repeated_checks_in_one_request_add_no_queries(self):
+        editor = self._fresh_editor()
+        marking = (
+            Marking.objects.select_related("post_office")
+            .prefetch_related("post_office__post_office_regions__region")
+            .get(pk=self.richmond.pk)
+        )
+        self.assertTrue(_user_is_responsible_for_marking(editor, marking))
+        with CaptureQueriesContext(connection) as repeat:
+            for _ in range(5):
+                _user_is_responsible_for_marking(editor, marking)
+        self.assertEqual(len(repeat), 0)
+
+    def test_memoized_scope_skips_the_cache(self):
+        editor = self._fresh_editor()
+        editor_scope(editor)
+        with mock.patch("common.api.v2.permissions.cache") as fake_cache:
+            self.assertEqual(editor_scope(editor).region_ids, {self.virginia.pk})
+            user_assigned_collection_ids(editor)
+        self.assertEqual(fake_cache.mock_calls, [])
+
+    def test_write_in_the_same_request_drops_the_memo(self):
+        editor = self._fresh_editor()
+        self.assertEqual(editor_scope(editor).region_ids, {self.virginia.pk})
+        CollectionAssignment.objects.create(
+            user=self.editor, collection=self.md_collection, created_by=self.admin, modified_by=self.admin
+        )
+        self.assertEqual(editor_scope(editor).region_ids, {self.virginia.pk, self.maryland.pk})
@@ -0,0 +1,94 @@
+"""
+Tests for cached list counts (woco.counts) on the marking catalog.
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_list_counts -v 2
+
+The second identical list request must reuse the cached COUNT, a marking
+write must invalidate it, and the response must say which strategy was used.
+Writes to models no cached count reads must not invalidate anything.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.admin import CatalogRequestMarking
+from common.models import Color, Marking, MarkingRecycleBin, PostOffice
+from woco.counts import COUNT_ESTIMATE_MIN_ROWS, count_generation, resolve_count
+
+User = get_user_model()
+
+
+class MarkingListCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Commit the fixture: writes invalidate cached responses on commit only.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="editor", password="pw")
+            self.color = Color.objects.create(name="Black", created_by=self.user, modified_by=self.user)
+            self.po = PostOffice.objects.create(name="Richmond", created_by=self.user, modified_by=self.user)
+            for i in range(3):
+                self._make_marking(f"RICHMOND {i}")
+
+    def _make_marking(self, inscription):
+        return Marking.objects.create(
+            type="TOWNMARK",
+            inscription_txt=inscription,
+            is_manuscript=True,
+            color=self.color,
+            post_office=self.po,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+
+    def test_count_is_cached_and_invalidated_by_writes(self):
+        first = self.client.get("/api/v2/markings/")
+        self.assertEqual((first.data["count"], first.data["count_strategy"]), (3, "exact"))
+
+        again = self.client.get("/api/v2/markings/", {"page": 1})
+        self.assertEqual((again.data["count"], again.data["count_strategy"]), (3, "cached"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._make_marking("RICHMOND 3")
+        after_write = self.client.get("/api/v2/markings/")
+        self.assertEqual((after_write.data["count"], after_write.data["count_strategy"]), (4, "exact"))
+
+    def test_filters_are_counted_separately(self):
+        self.client.get("/api/v2/markings/")
+        filtered = self.client.get("/api/v2/markings/", {"search": "RICHMOND 1"})
+        self.assertEqual((filtered.data["count"], filtered.data["count_strategy"]), (1, "exact"))
+
+    def test_unrelated_writes_keep_count_generations(self):
+        generations = {app: count_generation(app) for app in ("auth", "sessions", "common")}
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=["last_login"])
+        SessionStore().create()
+        self.assertEqual({app: count_generation(app) for app in generations}, generations)
+
+    def test_proxy_model_writes_invalidate_counts(self):
+        before = count_generation("common")
+        proxy = CatalogRequestMarking.objects.get(pk=Marking.objects.first().pk)
+        proxy.save()
+        self.assertNotEqual(count_generation("common"), before)
+
+    def test_estimate_excludes_recycle_binned_rows(self):
+        MarkingRecycleBin.objects.create(marking=Marking.objects.first(), removed_by=self.user)
+        with mock.patch("woco.counts.estimated_table_rows", return_value=COUNT_ESTIMATE_MIN_ROWS + 10):
+            self.assertEqual(
+                resolve_count(Marking.objects.all()),
+                (COUNT_ESTIMATE_MIN_ROWS + 9, "estimated"),
+            )
+            # Color's default manager hides nothing: the estimate is used as is.
+            self.assertEqual(
+                resolve_count(Color.objects.all()),
+                (COUNT_ESTIMATE_MIN_ROWS + 10, "estimated"),
+            )
+
+    def test_include_count_false_still_skips_count(self):
+        resp = self.client.get("/api/v2/markings/", {"include_count": "false"})
+        self.assertIsNone(resp.data["count"])
@@ -0,0 +1,209 @@
+"""
+Tests for the materialized MarkingDateSpan table.
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_marking_date_span -v 2
+
+The span must agree with MarkingQuerySet.with_date_range (direct DateSeen rows
+plus cover-mediated ones) while being maintained incrementally from DateSeen /
+CoverMarking / recycle-bin writes, and rebuilt wholesale by the command and
+the 0080 migration. A marking without a span row still lists, undated.
+"""
+import importlib
+from datetime import date
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from common.admin import CatalogRequestMarking
+from common.date_spans import suspend_date_span_maintenance
+from common.models import (
+    Color,
+    Cover,
+    CoverMarking,
+    DateSeen,
+    Marking,
+    MarkingDateSpan,
+    MarkingRecycleBin,
+    PostOffice,
+)
+
+User = get_user_model()
+
+
+def _make_marking(user, inscription="RICHMOND VA"):
+    color, _ = Color.objects.get_or_create(
+        name="Black", defaults={"created_by": user, "modified_by": user}
+    )
+    po, _ = PostOffice.objects.get_or_create(
+        name="Richmond", defaults={"created_by": user, "modified_by": user}
+    )
+    return Marking.objects.create(
+        type="TOWNMARK",
+        inscription_txt=inscription,
+        is_manuscript=True,
+        color=color,
+        post_office=po,
+        created_by=user,
+        modified_by=user,
+    )
+
+
+def _date_seen(user, subject_type, subject_id, when):
+    return DateSeen.objects.create(
+        subject_type=subject_type,
+        subject_id=subject_id,
+        date=when,
+        granularity="DAY",
+        created_by=user,
+        modified_by=user,
+    )
+
+
+def _span(marking):
+    return MarkingDateSpan.objects.get(marking=marking)
+
+
+class MarkingDateSpanMaintenanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="editor", password="pw")
+        self.marking = _make_marking(self.user)
+        self.cover = Cover.objects.create(created_by=self.user, modified_by=self.user)
+
+    def test_new_marking_gets_empty_span(self):
+        span = _span(self.marking)
+        self.assertIsNone(span.earliest_seen)
+        self.assertIsNone(span.latest_seen)
+        self.assertFalse(span.is_removed)
+
+    def test_direct_and_cover_dates_are_unioned(self):
+        _date_seen(self.user, "MARKING", self.marking.pk, date(1850, 3, 1))
+        _date_seen(self.user, "COVER", self.cover.pk, date(1861, 7, 4))
+        link = CoverMarking.objects.create(
+            cover=self.cover,
+            marking=self.marking,
+            review_status=CoverMarking.REVIEW_PENDING,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+
+        span = _span(self.marking)
+        self.assertEqual((span.earliest_seen, span.latest_seen), (date(1850, 3, 1), date(1861, 7, 4)))
+        # Pending cover links do not count toward the public (approved) span.
+        self.assertEqual(span.approved_latest_seen, date(1850, 3, 1))
+
+        link.review_status = CoverMarking.REVIEW_APPROVED
+        link.save()
+        self.assertEqual(_span(self.marking).approved_latest_seen, date(1861, 7, 4))
+
+        annotated = Marking.objects.with_date_range().get(pk=self.marking.pk)
+        self.assertEqual(
+            (annotated.earliest_seen, annotated.latest_seen),
+            (span.earliest_seen, span.latest_seen),
+        )
+
+    def test_cover_date_changes_and_unlink_refresh_span(self):
+        CoverMarking.objects.create(
+            cover=self.cover, marking=self.marking, created_by=self.user, modified_by=self.user
+        )
+        ds = _date_seen(self.user, "COVER", self.cover.pk, date(1840, 1, 1))
+        self.assertEqual(_span(self.marking).earliest_seen, date(1840, 1, 1))
+
+        ds.date = date(1845, 5, 5)
+        ds.save()
+        self.assertEqual(_span(self.marking).earliest_seen, date(1845, 5, 5))
+
+        CoverMarking.objects.filter(cover=self.cover, marking=self.marking).delete()
+        self.assertIsNone(_span(self.marking).earliest_seen)
+
+    def test_repointed_date_seen_refreshes_previous_subject(self):
+        other = _make_marking(self.user, inscription="PETERSBURG VA")
+        ds = _date_seen(self.user, "MARKING", self.marking.pk, date(1855, 1, 1))
+        ds.subject_id = other.pk
+        ds.save()
+        self.assertIsNone(_span(self.marking).earliest_seen)
+        self.assertEqual(_span(other).earliest_seen, date(1855, 1, 1))
+
+    def test_recycle_bin_sets_removed_flag(self):
+        entry = MarkingRecycleBin.objects.create(marking=self.marking, removed_by=self.user)
+        self.assertTrue(_span(self.marking).is_removed)
+        entry.delete()
+        self.assertFalse(_span(self.marking).is_removed)
+
+    def test_rebuild_command_restores_suspended_writes(self):
+        with suspend_date_span_maintenance():
+            _date_seen(self.user, "MARKING", self.marking.pk, date(1870, 2, 2))
+        self.assertIsNone(_span(self.marking).earliest_seen)
+
+        MarkingDateSpan.objects.all().delete()
+        call_command("rebuild_marking_date_spans", stdout=StringIO())
+        self.assertEqual(_span(self.marking).earliest_seen, date(1870, 2, 2))
+
+    def test_backfill_migration_fills_missing_spans(self):
+        _date_seen(self.user, "MARKING", self.marking.pk, date(1866, 4, 4))
+        MarkingDateSpan.objects.all().delete()
+        migration = importlib.import_module("common.migrations.0080_backfill_marking_date_spans")
+        migration.backfill_date_spans(apps, None)
+        self.assertEqual(_span(self.marking).earliest_seen, date(1866, 4, 4))
+
+    def test_admin_proxy_saves_maintain_span(self):
+        proxy = CatalogRequestMarking.objects.create(
+            type="TOWNMARK",
+            inscription_txt="PROXY VA",
+            is_manuscript=True,
+            color=self.marking.color,
+            post_office=self.marking.post_office,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+        self.assertEqual(_span(proxy).post_office_name, "Richmond")
+
+        other = PostOffice.objects.create(name="Petersburg", created_by=self.user, modified_by=self.user)
+        proxy.post_office = other
+        proxy.save()
+        self.assertEqual(_span(proxy).post_office_name, "Petersburg")
+
+
+class MarkingDateSpanApiTests(APITestCase):
+    def setUp(self):
+        # Commit the fixture: writes invalidate cached responses on commit only.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="editor", password="pw")
+            self.early = _make_marking(self.user, inscription="EARLY")
+            self.late = _make_marking(self.user, inscription="LATE")
+            _date_seen(self.user, "MARKING", self.early.pk, date(1801, 6, 1))
+            _date_seen(self.user, "MARKING", self.late.pk, date(1899, 6, 1))
+
+    def test_year_filters_use_span(self):
+        resp = self.client.get("/api/v2/markings/", {"earliest_use_year_min": 1850})
+        self.assertEqual(resp.status_code, 200)
+        ids = [row["id"] for row in resp.data["results"]]
+        self.assertEqual(ids, [self.late.pk])
+
+        resp = self.client.get("/api/v2/markings/", {"latest_use_year_max": 1801})
+        ids = [row["id"] for row in resp.data["results"]]
+        self.assertEqual(ids, [self.early.pk])
+
+    def test_marking_without_span_row_lists_undated(self):
+        MarkingDateSpan.objects.filter(marking=self.early).delete()
+        resp = self.client.get("/api/v2/markings/", {"ordering": "earliest_seen"})
+        rows = {row["id"]: row for row in resp.data["results"]}
+        self.assertEqual(set(rows), {self.early.pk, self.late.pk})
+        self.assertIsNone(rows[self.early.pk]["earliest_seen"])
+
+        resp = self.client.get(f"/api/v2/markings/{self.early.pk}/")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_date_range_view_skips_removed_markings(self):
+        resp = self.client.get("/api/v2/markings-range/")
+        self.assertEqual(resp.data, {"earliest_year": 1801, "latest_year": 1899})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MarkingRecycleBin.objects.create(marking=self.late, removed_by=self.user)
+        resp = self.client.get("/api/v2/markings-range/")
+        self.assertEqual(resp.data, {"earliest_year": 1801, "latest_year": 1801})
@@ -0,0 +1,92 @@
+"""
+Tests for the fuzzy inscription lookup over MarkingTrigram (common.fuzzy).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_marking_fuzzy -v 2
+
+Abbreviated, period-less and misspelled queries must rank the intended
+marking first; edits and recycle-bin removals must be reflected.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from common.fuzzy import _is_abbrev_of, fuzzy_text, trigrams
+from common.models import Color, Marking, MarkingRecycleBin, MarkingTrigram, PostOffice
+
+User = get_user_model()
+
+
+class MarkingFuzzyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="editor", password="pw")
+        self.color = Color.objects.create(name="Black", created_by=self.user, modified_by=self.user)
+
+        def office(name):
+            return PostOffice.objects.create(name=name, created_by=self.user, modified_by=self.user)
+
+        self.fredericksburg = self._make("FREDERICKSBURG Va.", office("Fredericksburg"))
+        self.st_louis = self._make("ST. LOUIS, Mo.", office("St. Louis"))
+        self.richmond = self._make("RICHMOND Va.", office("Richmond"))
+        self.petersburg = self._make("PETERSBURG Va.", office("Petersburg"))
+
+    def _make(self, inscription, po):
+        return Marking.objects.create(
+            type="TOWNMARK",
+            inscription_txt=inscription,
+            is_manuscript=True,
+            color=self.color,
+            post_office=po,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+
+    def _fuzzy(self, q, **params):
+        resp = self.client.get("/api/v2/markings/fuzzy/", {"q": q, **params})
+        self.assertEqual(resp.status_code, 200)
+        return resp.data["results"]
+
+    def test_normalization_and_trigrams(self):
+        self.assertEqual(fuzzy_text("St. Louis, Mo.", "St. Louis"), "ST LOUIS MO")
+        self.assertEqual(trigrams("MO"), {"##M", "#MO", "MO#"})
+        self.assertTrue(_is_abbrev_of("FREDG", "FREDERICKSBURG"))
+        self.assertFalse(_is_abbrev_of("CHARLE", "CHARLESTON"))
+        self.assertEqual(
+            MarkingTrigram.objects.filter(marking=self.st_louis).count(),
+            self.st_louis.search_document.trigram_count,
+        )
+
+    def test_loose_queries_rank_intended_marking_first(self):
+        for query, expected in [
+            ("FREDG VA", self.fredericksburg),
+            ("st louis mo", self.st_louis),
+            ("RICHM0ND", self.richmond),
+            ("peterburg", self.petersburg),
+        ]:
+            with self.subTest(query=query):
+                results = self._fuzzy(query)
+                self.assertEqual(results[0]["id"], expected.pk)
+                self.assertGreater(results[0]["similarity"], 0)
+                scores = [row["similarity"] for row in results]
+                self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_edits_and_removals_are_reflected(self):
+        self.richmond.inscription_txt = "MANCHESTER Va."
+        self.richmond.save()
+        self.assertEqual(self._fuzzy("manchester")[0]["id"], self.richmond.pk)
+
+        MarkingRecycleBin.objects.create(marking=self.petersburg, removed_by=self.user)
+        self.assertNotIn(self.petersburg.pk, [row["id"] for row in self._fuzzy("petersburg")])
+
+    def test_removed_markings_do_not_take_candidate_slots(self):
+        # Same text, so the removed (lower id) marking would win the cut.
+        twin = self._make("RICHMOND Va.", self.richmond.post_office)
+        MarkingRecycleBin.objects.create(marking=self.richmond, removed_by=self.user)
+        with mock.patch("common.fuzzy.CANDIDATE_LIMIT", 1):
+            self.assertEqual([row["id"] for row in self._fuzzy("richmond")], [twin.pk])
+
+    def test_query_is_required_and_limit_is_clamped(self):
+        self.assertEqual(self.client.get("/api/v2/markings/fuzzy/").status_code, 400)
+        self.assertEqual(len(self._fuzzy("va", limit=1)), 1)
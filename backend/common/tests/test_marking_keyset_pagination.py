@@ -0,0 +1,144 @@
+"""
+Tests for the keyset (cursor) mode of MarkingListPagination.
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_marking_keyset_pagination -v 2
+
+Walking /api/v2/markings/?cursor= forwards must visit every marking exactly
+once in the requested order (NULL codes and dates included), and following
+`previous` must walk the same pages back. The default catalog ordering
+works in cursor mode and stays in step with renames; orderings without an
+indexed seek column are a 400.
+"""
+from datetime import date
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from common.models import Color, DateSeen, Marking, PostOffice, PostOfficeRegion, Region
+
+User = get_user_model()
+
+
+class MarkingKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="editor", password="pw")
+        color = Color.objects.create(name="Black", created_by=user, modified_by=user)
+        regions = [
+            Region.objects.create(name=name, abbrev=abbrev, region_tier="STATE", created_by=user, modified_by=user)
+            for name, abbrev in (("Virginia", "VA"), ("Maryland", "MD"))
+        ]
+        self.regions = regions
+        offices = []
+        for i, name in enumerate(("Richmond", "Baltimore", "Abingdon")):
+            po = PostOffice.objects.create(name=name, created_by=user, modified_by=user)
+            PostOfficeRegion.objects.create(
+                post_office=po, region=regions[i % 2], created_by=user, modified_by=user
+            )
+            offices.append(po)
+        self.offices = offices
+
+        self.markings = []
+        for i in range(11):
+            marking = Marking.objects.create(
+                type="TOWNMARK",
+                # Every fourth marking has no code so NULL sort keys are exercised.
+                code=f"M-{(i * 7) % 11:02d}" if i % 4 else None,
+                inscription_txt=f"MARK {i}",
+                is_manuscript=True,
+                color=color,
+                post_office=offices[i % 3],
+                created_by=user,
+                modified_by=user,
+            )
+            if i % 3:
+                DateSeen.objects.create(
+                    subject_type="MARKING",
+                    subject_id=marking.pk,
+                    date=date(1840 + (i * 7) % 20, 1, 1),
+                    granularity="YEAR",
+                    created_by=user,
+                    modified_by=user,
+                )
+            self.markings.append(marking)
+
+    def _walk(self, params):
+        pages = []
+        resp = self.client.get("/api/v2/markings/", {"cursor": "", "page_size": 4, **params})
+        while True:
+            self.assertEqual(resp.status_code, 200, resp.data)
+            self.assertIsNone(resp.data["count"])
+            pages.append(resp.data)
+            if not resp.data["next"]:
+                return pages
+            query = parse_qs(urlparse(resp.data["next"]).query)
+            resp = self.client.get("/api/v2/markings/", {k: v[0] for k, v in query.items()})
+
+    def _assert_walk_matches_offset_order(self, params):
+        pages = self._walk(params)
+        walked = [row["id"] for page in pages for row in page["results"]]
+        self.assertEqual(sorted(walked), sorted(m.pk for m in self.markings))
+
+        expected = []
+        page = 1
+        while True:
+            resp = self.client.get("/api/v2/markings/", {"page": page, "page_size": 4, **params})
+            expected.extend(row["id"] for row in resp.data["results"])
+            if not resp.data["next"]:
+                break
+            page += 1
+        self.assertEqual(walked, expected)
+        return pages
+
+    def test_default_ordering_walks_the_catalog_order(self):
+        pages = self._assert_walk_matches_offset_order({})
+        self.assertEqual(
+            [row["town"] for row in pages[0]["results"]][:1],
+            ["Baltimore"],  # Maryland sorts before Virginia
+        )
+
+    def test_default_keys_follow_renames_and_region_changes(self):
+        abingdon = self.offices[2]
+        abingdon.name = "Zanesville"
+        abingdon.save()
+        baltimore = PostOfficeRegion.objects.get(post_office=self.offices[1])
+        baltimore.region = self.regions[0]
+        baltimore.save()
+        self.regions[1].name = "Alabama"
+        self.regions[1].save()
+        self._assert_walk_matches_offset_order({})
+
+    def test_descending_date_with_nulls(self):
+        self._assert_walk_matches_offset_order({"ordering": "-earliest_seen,code"})
+
+    def test_descending_town_then_date(self):
+        self._assert_walk_matches_offset_order({"ordering": "-post_office__name,earliest_seen,id"})
+
+    def test_descending_code_with_nulls(self):
+        self._assert_walk_matches_offset_order({"ordering": "-code,id"})
+
+    def test_ascending_code_with_nulls(self):
+        self._assert_walk_matches_offset_order({"ordering": "code,id"})
+
+    def test_previous_links_walk_back(self):
+        pages = self._assert_walk_matches_offset_order({"ordering": "code,id"})
+        self.assertIsNone(pages[0]["previous"])
+        last = pages[-1]
+        query = parse_qs(urlparse(last["previous"]).query)
+        resp = self.client.get("/api/v2/markings/", {k: v[0] for k, v in query.items()})
+        self.assertEqual(
+            [row["id"] for row in resp.data["results"]],
+            [row["id"] for row in pages[-2]["results"]],
+        )
+
+    def test_unindexed_ordering_is_400(self):
+        for ordering in ("latest_seen", "shape__name", "code,post_office__post_office_regions__region__abbrev"):
+            resp = self.client.get("/api/v2/markings/", {"cursor": "", "ordering": ordering})
+            self.assertEqual(resp.status_code, 400, ordering)
+            self.assertIn("ordering", resp.data)
+
+    def test_invalid_cursor_is_404(self):
+        resp = self.client.get("/api/v2/markings/", {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,131 @@
+"""
+Tests for catalog keyword search over MarkingSearchDocument.
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_marking_search -v 2
+
+SQLite exercises the LIKE fallback in common.search; the MySQL FULLTEXT path
+shares the same documents and term handling.
+"""
+import importlib
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from common.admin import CatalogRequestMarking
+from common.models import (
+    Color,
+    Marking,
+    MarkingSearchDocument,
+    MarkingTrigram,
+    PostOffice,
+    PostOfficeRegion,
+    Region,
+)
+from common.search import normalize_search_text
+
+User = get_user_model()
+
+
+class MarkingSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="editor", password="pw")
+        color = Color.objects.create(name="Black", created_by=self.user, modified_by=self.user)
+        self.virginia = Region.objects.create(
+            name="Virginia", abbrev="VA", region_tier="STATE", created_by=self.user, modified_by=self.user
+        )
+        self.richmond = PostOffice.objects.create(name="Richmond", created_by=self.user, modified_by=self.user)
+        petersburg = PostOffice.objects.create(name="Petersburg", created_by=self.user, modified_by=self.user)
+        for po in (self.richmond, petersburg):
+            PostOfficeRegion.objects.create(
+                post_office=po, region=self.virginia, created_by=self.user, modified_by=self.user
+            )
+
+        def make(inscription, po, desc=None):
+            return Marking.objects.create(
+                type="TOWNMARK",
+                inscription_txt=inscription,
+                desc=desc,
+                is_manuscript=True,
+                color=color,
+                post_office=po,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+
+        self.richmond_mark = make("RICHMOND Va.", self.richmond)
+        self.richmond_paid = make("RICHMOND PAID", self.richmond, desc="Richmondesque flourish")
+        self.petersburg_mark = make("PETERSBURG", petersburg)
+
+    def _search(self, text, **params):
+        resp = self.client.get("/api/v2/markings/", {"search": text, **params})
+        self.assertEqual(resp.status_code, 200)
+        return [row["id"] for row in resp.data["results"]]
+
+    def test_normalization_folds_case_accents_and_punctuation(self):
+        self.assertEqual(normalize_search_text("Saint-Étienne, N.C."), "saint etienne n c")
+        doc = MarkingSearchDocument.objects.get(marking=self.richmond_mark).document
+        self.assertIn(" richmond ", doc)
+        self.assertIn(" virginia ", doc)
+        self.assertIn(" va ", doc)
+
+    def test_every_term_must_match_as_a_prefix(self):
+        self.assertEqual(sorted(self._search("rich")), sorted([self.richmond_mark.pk, self.richmond_paid.pk]))
+        self.assertEqual(self._search("rich paid"), [self.richmond_paid.pk])
+        self.assertEqual(self._search("VA petersb"), [self.petersburg_mark.pk])
+        self.assertEqual(self._search("nowhere"), [])
+
+    def test_whole_token_hits_rank_first_without_duplicates(self):
+        def make(inscription):
+            return Marking.objects.create(
+                type="TOWNMARK",
+                inscription_txt=inscription,
+                is_manuscript=True,
+                color=self.petersburg_mark.color,
+                post_office=self.richmond,
+                created_by=self.user,
+                modified_by=self.user,
+            )
+
+        prefix_only = make("PETERSBURGH")
+        whole_token = make("PETERSBURG PAID")
+        self.assertEqual(
+            self._search("petersburg"),
+            [self.petersburg_mark.pk, whole_token.pk, prefix_only.pk],
+        )
+        ids = self._search("virginia")
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 5)
+
+    def test_explicit_ordering_overrides_rank(self):
+        ids = self._search("rich", ordering="-id")
+        self.assertEqual(ids, [self.richmond_paid.pk, self.richmond_mark.pk])
+
+    def test_renamed_post_office_refreshes_documents(self):
+        self.richmond.name = "Manchester"
+        self.richmond.save()
+        self.assertEqual(self._search("richmond paid"), [self.richmond_paid.pk])  # still in inscription
+        self.assertEqual(sorted(self._search("manchester")), sorted([self.richmond_mark.pk, self.richmond_paid.pk]))
+
+    def test_admin_proxy_saves_refresh_documents(self):
+        proxy = CatalogRequestMarking.objects.get(pk=self.petersburg_mark.pk)
+        proxy.inscription_txt = "BLANDFORD"
+        proxy.save()
+        self.assertEqual(self._search("blandford"), [self.petersburg_mark.pk])
+        self.assertEqual(self._search("petersburg"), [self.petersburg_mark.pk])  # still its town
+
+    def test_backfill_migration_fills_missing_documents(self):
+        MarkingSearchDocument.objects.all().delete()
+        MarkingTrigram.objects.all().delete()
+        migration = importlib.import_module("common.migrations.0081_backfill_marking_search_documents")
+        migration.backfill_search_documents(apps, None)
+        self.assertEqual(sorted(self._search("richmond")), sorted([self.richmond_mark.pk, self.richmond_paid.pk]))
+        self.assertTrue(MarkingTrigram.objects.filter(marking=self.petersburg_mark).exists())
+
+    def test_town_options_prefix(self):
+        resp = self.client.get("/api/v2/post-offices/town-options/", {"q": "pet"})
+        self.assertEqual(resp.data, [{"town": "Petersburg", "state": "Virginia"}])
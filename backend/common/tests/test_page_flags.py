@@ -0,0 +1,122 @@
+"""
+Tests for the page-level row flags (common.api.v2.serializers.PageFlags).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_page_flags -v 2
+
+is_removed / can_remove / comment_for_editor / editor_feedback must be
+computed per page with set queries, so the editor dashboards (my-assigned,
+my-submissions, the recycle bins) cost the same number of queries whatever
+the page size, and must still return the same values as the per-row path.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from common.models import (
+    Collection,
+    CollectionAssignment,
+    Color,
+    Contribution,
+    Cover,
+    CoverMarking,
+    CoverRecycleBin,
+    Marking,
+    MarkingRecycleBin,
+    PostOffice,
+    PostOfficeRegion,
+    Region,
+)
+
+User = get_user_model()
+
+
+class PageFlagsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.editor = User.objects.create_user(username="editor", password="pw")
+        self.editor.user_permissions.add(Permission.objects.get(codename="review_contribution"))
+        self.virginia = Region.objects.create(
+            name="Virginia", abbrev="VA", region_tier="STATE", created_by=self.admin, modified_by=self.admin
+        )
+        self.collection = Collection.objects.create(
+            name="Virginia", region=self.virginia, created_by=self.admin, modified_by=self.admin
+        )
+        CollectionAssignment.objects.create(
+            user=self.editor, collection=self.collection, created_by=self.admin, modified_by=self.admin
+        )
+        self.color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+        self.client.force_authenticate(self.editor)
+
+    def _marking(self, town, comment=""):
+        po = PostOffice.objects.create(name=town, created_by=self.admin, modified_by=self.admin)
+        PostOfficeRegion.objects.create(
+            post_office=po, region=self.virginia, created_by=self.admin, modified_by=self.admin
+        )
+        marking = Marking.objects.create(
+            type="TOWNMARK", inscription_txt=town.upper(), is_manuscript=True, color=self.color,
+            post_office=po, created_by=self.admin, modified_by=self.admin,
+        )
+        Contribution.objects.create(
+            contributor=self.editor, marking=marking, collection=self.collection,
+            submitted_data={"comment_for_editor": comment}, review_notes=f"checked {town}",
+        )
+        return marking
+
+    def _removed_cover(self, town):
+        cover = Cover.objects.create(created_by=self.admin, modified_by=self.admin)
+        CoverMarking.objects.create(
+            cover=cover, marking=self._marking(town), created_by=self.admin, modified_by=self.admin
+        )
+        CoverRecycleBin.objects.create(cover=cover, removed_by=self.admin)
+        return cover
+
+    def _count(self, path):
+        self.client.get(path)  # warm the editor scope and permission caches
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(path)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx), resp
+
+    def test_my_submissions_flags_match_per_row_values(self):
+        richmond = self._marking("Richmond", comment="Seen on two covers")
+        self._marking("Norfolk")
+        MarkingRecycleBin.objects.create(marking=richmond, removed_by=self.admin)
+
+        resp = self.client.get("/api/v2/markings/my-submissions/")
+        self.assertEqual(resp.status_code, 200)
+        rows = {row["town"]: row for row in resp.data["results"]}
+        self.assertNotIn("Richmond", rows)
+        norfolk = rows["Norfolk"]
+        self.assertFalse(norfolk["is_removed"])
+        self.assertTrue(norfolk["can_remove"])
+        self.assertEqual(norfolk["editor_feedback"], "checked Norfolk")
+
+        detail = self.client.get(f"/api/v2/markings/{richmond.pk}/")
+        self.assertTrue(detail.data["is_removed"])
+        self.assertEqual(detail.data["comment_for_editor"], "Seen on two covers")
+
+    def test_editor_dashboards_run_constant_queries(self):
+        for town in ("Richmond", "Norfolk"):
+            self._marking(town)
+        self._removed_cover("Petersburg")
+        paths = ("/api/v2/markings/my-assigned/", "/api/v2/markings/my-submissions/", "/api/v2/covers/recycle-bin/")
+        small = {path: self._count(path)[0] for path in paths}
+
+        for town in ("Alexandria", "Lynchburg", "Staunton", "Winchester"):
+            self._marking(town)
+            self._removed_cover(f"{town} C.H.")
+        for path in paths:
+            with self.subTest(path=path):
+                queries, resp = self._count(path)
+                self.assertEqual(queries, small[path])
+                rows = resp.data["results"]
+                self.assertGreaterEqual(len(rows), 5)
+                self.assertTrue(all(row["can_remove"] for row in rows))
+        _, bin_page = self._count("/api/v2/covers/recycle-bin/")
+        self.assertTrue(all(row["is_removed"] for row in bin_page.data["results"]))
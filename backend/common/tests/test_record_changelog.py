@@ -0,0 +1,145 @@
+"""
+Tests for the paged record changelog (common.api.v2.changelog).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_record_changelog -v 2
+
+Events come newest first in id-keyed pages (CHANGELOG_PAGE_SIZE unless
+?limit says otherwise; ?cursor / ?since move the window), each carrying only
+the versions its events wrote, summarized from the summary stored on the
+version row. Transactions logged against a contribution before approval
+must show up on the marking.
+"""
+import importlib
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from common.audit import create_marking_version, log_submission_transaction
+from common.models import (
+    Collection,
+    Color,
+    Contribution,
+    Marking,
+    MarkingVersion,
+    PostOffice,
+    Region,
+    SubmissionTransaction,
+)
+
+User = get_user_model()
+
+
+class RecordChangelogTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="pw", email="admin@example.org")
+        color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+        po = PostOffice.objects.create(name="Richmond", created_by=self.admin, modified_by=self.admin)
+        self.marking = Marking.objects.create(
+            type="TOWNMARK", inscription_txt="RICHMOND Va.", is_manuscript=True, color=color,
+            post_office=po, created_by=self.admin, modified_by=self.admin,
+        )
+        self.txns = [self._edit(f"v{n}") for n in range(1, 6)]
+        self.client.force_authenticate(self.admin)
+
+    def _edit(self, code):
+        self.marking.code = code
+        self.marking.save()
+        txn = log_submission_transaction(
+            action=SubmissionTransaction.ACTION_CATALOG_DIRECT_EDIT,
+            actor=self.admin,
+            marking=self.marking,
+            source=SubmissionTransaction.SOURCE_EDITOR_PORTAL,
+            before_payload={},
+            after_payload={"code": code},
+        )
+        create_marking_version(self.marking, txn, self.admin)
+        return txn
+
+    def _changelog(self, **params):
+        resp = self.client.get(f"/api/v2/markings/{self.marking.pk}/changelog/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.data
+
+    def test_first_page_holds_short_history(self):
+        data = self._changelog()
+        self.assertEqual([e["event_id"] for e in data["events"]], [t.id for t in reversed(self.txns)])
+        self.assertEqual([v["version_no"] for v in data["versions"]], [5, 4, 3, 2, 1])
+        self.assertIsNone(data["next_cursor"])
+        latest = data["versions"][0]
+        self.assertEqual(latest["snapshot"]["code"], "v5")
+        self.assertIs(latest["snapshot"]["is_manuscript"], True)
+        self.assertEqual(latest["snapshot"]["inscription_txt"], "RICHMOND Va.")
+        self.assertEqual(latest["created_by"], "admin")
+        self.assertEqual(len(data["approved_versions"]), 5)
+
+    def test_default_limit_pages_the_history(self):
+        with mock.patch("common.api.v2.changelog.CHANGELOG_PAGE_SIZE", 3):
+            data = self._changelog()
+        self.assertEqual([e["event_id"] for e in data["events"]], [t.id for t in reversed(self.txns[2:])])
+        self.assertEqual([v["version_no"] for v in data["versions"]], [5, 4, 3])
+        self.assertEqual(data["next_cursor"], self.txns[2].id)
+
+    def test_versions_list_their_stored_summary(self):
+        MarkingVersion.objects.filter(marking=self.marking, version_no=5).update(summary={"code": "stored"})
+        with mock.patch("common.version_store.apply_patch") as apply_patch:
+            data = self._changelog()
+        apply_patch.assert_not_called()
+        self.assertEqual(data["versions"][0]["snapshot"], {"code": "stored"})
+
+    def test_migration_backfills_summaries_from_snapshots(self):
+        MarkingVersion.objects.update(summary={})
+        migration = importlib.import_module("common.migrations.0082_version_summaries")
+        migration.backfill_summaries(apps, None)
+        summaries = dict(MarkingVersion.objects.values_list("version_no", "summary"))
+        self.assertEqual([summaries[n]["code"] for n in range(1, 6)], ["v1", "v2", "v3", "v4", "v5"])
+        self.assertEqual(summaries[3]["town"], "Richmond")
+
+    def test_cursor_pages_walk_back_through_history(self):
+        first = self._changelog(limit=2)
+        self.assertEqual([e["event_id"] for e in first["events"]], [self.txns[4].id, self.txns[3].id])
+        self.assertEqual([v["version_no"] for v in first["versions"]], [5, 4])
+        self.assertEqual(first["next_cursor"], self.txns[3].id)
+
+        second = self._changelog(limit=2, cursor=first["next_cursor"])
+        self.assertEqual([e["event_id"] for e in second["events"]], [self.txns[2].id, self.txns[1].id])
+        last = self._changelog(limit=2, cursor=second["next_cursor"])
+        self.assertEqual([e["event_id"] for e in last["events"]], [self.txns[0].id])
+        self.assertIsNone(last["next_cursor"])
+
+    def test_since_returns_only_newer_events(self):
+        newest = self._edit("v6")
+        data = self._changelog(since=self.txns[4].id)
+        self.assertEqual([e["event_id"] for e in data["events"]], [newest.id])
+        self.assertEqual([v["version_no"] for v in data["versions"]], [6])
+
+    def test_invalid_paging_parameter_is_rejected(self):
+        resp = self.client.get(f"/api/v2/markings/{self.marking.pk}/changelog/", {"limit": "ten"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_contribution_transactions_join_the_marking_on_approval(self):
+        region = Region.objects.create(
+            name="Virginia", abbrev="VA", region_tier="STATE", created_by=self.admin, modified_by=self.admin
+        )
+        collection = Collection.objects.create(
+            name="Virginia", region=region, created_by=self.admin, modified_by=self.admin
+        )
+        contribution = Contribution.objects.create(contributor=self.admin, collection=collection)
+        submitted = log_submission_transaction(
+            action=SubmissionTransaction.ACTION_SUBMIT, actor=self.admin, contribution=contribution,
+        )
+        self.assertNotIn(submitted.id, [e["event_id"] for e in self._changelog()["events"]])
+
+        contribution.marking = self.marking
+        contribution.save()
+        approved = log_submission_transaction(
+            action=SubmissionTransaction.ACTION_APPROVE, actor=self.admin, contribution=contribution,
+        )
+        event_ids = [e["event_id"] for e in self._changelog()["events"]]
+        self.assertIn(submitted.id, event_ids)
+        self.assertEqual(event_ids[0], approved.id)
@@ -0,0 +1,93 @@
+"""
+Tests for per-request query budget instrumentation (woco.request_metrics).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_request_metrics -v 2
+
+When enabled, staff responses must carry Server-Timing, samples must be
+summarized per endpoint for administrators only, and budgets must warn when
+exceeded. Metrics are off by default.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from common.models import Color, Marking, PostOffice
+from woco.request_metrics import endpoint_summary, reset_samples
+
+User = get_user_model()
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_samples()
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+        po = PostOffice.objects.create(name="Richmond", created_by=self.admin, modified_by=self.admin)
+        for i in range(3):
+            Marking.objects.create(
+                type="TOWNMARK",
+                inscription_txt=f"RICHMOND {i}",
+                is_manuscript=True,
+                color=color,
+                post_office=po,
+                created_by=self.admin,
+                modified_by=self.admin,
+            )
+
+    def test_server_timing_and_admin_summary(self):
+        anonymous = self.client.get("/api/v2/markings/")
+        self.assertFalse(anonymous.has_header("Server-Timing"))
+
+        self.assertEqual(self.client.get("/api/v2/request-metrics/").status_code, 403)
+        self.client.force_authenticate(self.admin)
+        timing = self.client.get("/api/v2/markings/")["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r"ser;dur=[\d.]+")
+
+        summary = {row["endpoint"]: row for row in self.client.get("/api/v2/request-metrics/").data["results"]}
+        row = summary["MarkingViewSet.list"]
+        self.assertEqual(row["samples"], 2)
+        self.assertGreater(row["ser_ms"]["max"], 0)
+        self.assertEqual(row["query_budget"], 10)
+        self.assertGreater(row["queries"]["max"], 0)
+        self.assertGreater(row["bytes"]["max"], 0)
+
+    def test_default_budgets_hold_for_catalog_reads(self):
+        for path in ("/api/v2/markings/", "/api/v2/post-offices/town-options/", "/api/v2/markings-range/"):
+            with self.subTest(path=path), self.assertNoLogs("woco.request_metrics", level="WARNING"):
+                self.client.get(path)
+
+    @override_settings(QUERY_BUDGETS={"MarkingViewSet.list": 1})
+    def test_exceeded_budget_warns(self):
+        with self.assertLogs("woco.request_metrics", level="WARNING") as logs:
+            self.client.get("/api/v2/markings/")
+        self.assertIn("MarkingViewSet.list", logs.output[0])
+
+    def test_jsonl_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.jsonl"
+            with override_settings(REQUEST_METRICS_LOG=str(path)):
+                self.client.get("/api/v2/colors/")
+            sample = json.loads(path.read_text().splitlines()[0])
+        self.assertEqual(sample["endpoint"], "ColorViewSet.list")
+        self.assertEqual(sample["status"], 200)
+
+
+class RequestMetricsDisabledTests(APITestCase):
+    def test_off_by_default(self):
+        reset_samples()
+        admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_authenticate(admin)
+        resp = self.client.get("/api/v2/colors/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.has_header("Server-Timing"))
+        self.assertEqual(endpoint_summary(), [])
@@ -0,0 +1,135 @@
+"""
+Tests for the anonymous catalog response cache (woco.response_cache).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_response_cache -v 2
+
+Repeat anonymous reads must be served from the cache, writes must invalidate
+it once they commit (never inside the writer's transaction), and
+authenticated reads must bypass it.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from common.audit import log_submission_transaction
+from common.models import (
+    Collection,
+    CollectionAssignment,
+    Color,
+    Contribution,
+    Marking,
+    PostOffice,
+    Region,
+    SubmissionTransaction,
+)
+from woco.response_cache import (
+    CACHE_STATUS_HEADER,
+    _PendingBump,
+    bump_catalog_generation,
+    catalog_generation,
+)
+
+User = get_user_model()
+
+
+class CatalogResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Commit the fixture: writes invalidate cached responses on commit only.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username="editor", password="pw")
+            self.color = Color.objects.create(name="Black", created_by=self.user, modified_by=self.user)
+            self.po = PostOffice.objects.create(name="Richmond", created_by=self.user, modified_by=self.user)
+            self._make_marking("RICHMOND Va.")
+
+    def _make_marking(self, inscription):
+        return Marking.objects.create(
+            type="TOWNMARK",
+            inscription_txt=inscription,
+            is_manuscript=True,
+            color=self.color,
+            post_office=self.po,
+            created_by=self.user,
+            modified_by=self.user,
+        )
+
+    def test_repeat_anonymous_reads_hit_until_a_write_commits(self):
+        first = self.client.get("/api/v2/markings/", {"page_size": 5, "type": "TOWNMARK"})
+        self.assertEqual(first[CACHE_STATUS_HEADER], "MISS")
+
+        # Same params in another order share the entry.
+        again = self.client.get("/api/v2/markings/", {"type": "TOWNMARK", "page_size": 5})
+        self.assertEqual(again[CACHE_STATUS_HEADER], "HIT")
+        self.assertEqual(again.data["results"], first.data["results"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._make_marking("RICHMOND PAID")
+        after_write = self.client.get("/api/v2/markings/", {"page_size": 5, "type": "TOWNMARK"})
+        self.assertEqual(after_write[CACHE_STATUS_HEADER], "MISS")
+        self.assertEqual(len(after_write.data["results"]), 2)
+
+    def test_lookup_endpoints_are_cached(self):
+        for path in ("/api/v2/colors/", "/api/v2/post-offices/town-options/", "/api/v2/markings-range/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path)[CACHE_STATUS_HEADER], "MISS")
+                self.assertEqual(self.client.get(path)[CACHE_STATUS_HEADER], "HIT")
+
+    def test_authenticated_reads_bypass_cache(self):
+        self.client.force_authenticate(self.user)
+        resp = self.client.get("/api/v2/markings/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.has_header(CACHE_STATUS_HEADER))
+
+
+    def test_only_catalog_writes_bump_the_generation(self):
+        audit = {"created_by": self.user, "modified_by": self.user}
+        with self.captureOnCommitCallbacks(execute=True):
+            region = Region.objects.create(name="Virginia", abbrev="VA", region_tier="STATE", **audit)
+            collection = Collection.objects.create(name="Virginia", region=region, **audit)
+        before = catalog_generation()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            contribution = Contribution.objects.create(
+                contributor=self.user,
+                collection=collection,
+                status=Contribution.STATUS_DRAFT,
+                submitted_data={"town": "Richmond"},
+            )
+            log_submission_transaction(
+                action=SubmissionTransaction.ACTION_SUBMIT, actor=self.user, contribution=contribution
+            )
+            CollectionAssignment.objects.create(user=self.user, collection=collection, **audit)
+        self.assertEqual(catalog_generation(), before)
+
+        self.color.name = "Blue"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.color.save()
+        self.assertNotEqual(catalog_generation(), before)
+
+
+class CatalogGenerationCommitTests(APITransactionTestCase):
+    def test_bump_waits_for_commit_once(self):
+        before = catalog_generation()
+        with transaction.atomic():
+            bump_catalog_generation()
+            bump_catalog_generation()
+            # The cache row is not written inside the writer's transaction.
+            self.assertEqual(catalog_generation(), before)
+            pending = [entry for entry in connection.run_on_commit if isinstance(entry[1], _PendingBump)]
+            self.assertEqual(len(pending), 1)
+        self.assertNotEqual(catalog_generation(), before)
+
+    def test_rolled_back_writes_keep_the_generation(self):
+        before = catalog_generation()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            bump_catalog_generation()
+            raise RuntimeError
+        self.assertEqual(catalog_generation(), before)
+
+    def test_autocommit_bumps_at_once(self):
+        before = catalog_generation()
+        bump_catalog_generation()
+        self.assertNotEqual(catalog_generation(), before)
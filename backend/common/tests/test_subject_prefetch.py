@@ -0,0 +1,116 @@
+"""
+Tests for batch loading of polymorphic (subject_type, subject_id) rows.
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_subject_prefetch -v 2
+
+A page of markings must load its list images with one query regardless of
+page size, and only the first two images per marking come back.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from common.models import Color, Image, Marking, PostOffice
+from common.subject_prefetch import fetch_subject_rows, prefetch_subject_rows
+
+User = get_user_model()
+
+
+def _make_markings(user, count):
+    color = Color.objects.create(name="Black", created_by=user, modified_by=user)
+    po = PostOffice.objects.create(name="Richmond", created_by=user, modified_by=user)
+    return [
+        Marking.objects.create(
+            type="TOWNMARK",
+            inscription_txt=f"RICHMOND {i}",
+            is_manuscript=True,
+            color=color,
+            post_office=po,
+            created_by=user,
+            modified_by=user,
+        )
+        for i in range(count)
+    ]
+
+
+def _add_images(user, marking, count):
+    for order in range(count):
+        Image.objects.create(
+            subject_type=Image.SUBJECT_MARKING,
+            subject_id=marking.pk,
+            original_filename=f"m{marking.pk}-{order}.jpg",
+            storage_filename=f"m{marking.pk}-{order}.jpg",
+            file_checksum=f"{marking.pk:032d}{order:032d}",
+            mime_type="image/jpeg",
+            image_width=100,
+            image_height=100,
+            file_size_bytes=1024,
+            image_view="FULL",
+            display_order=order,
+            uploaded_by=user,
+            created_by=user,
+            modified_by=user,
+        )
+
+
+def _image_queries(ctx):
+    return [q for q in ctx.captured_queries if 'FROM "images"' in q["sql"] or "FROM `images`" in q["sql"]]
+
+
+class SubjectPrefetchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="editor", password="pw")
+        self.markings = _make_markings(self.user, 3)
+        _add_images(self.user, self.markings[0], 3)
+        _add_images(self.user, self.markings[1], 1)
+
+    def test_limit_keeps_first_rows_per_subject(self):
+        grouped = fetch_subject_rows(
+            Image,
+            Image.SUBJECT_MARKING,
+            [m.pk for m in self.markings],
+            order_by=("display_order", "image_id"),
+            limit=2,
+        )
+        self.assertEqual([img.display_order for img in grouped[self.markings[0].pk]], [0, 1])
+        self.assertEqual(len(grouped[self.markings[1].pk]), 1)
+        self.assertEqual(grouped[self.markings[2].pk], [])
+
+    def test_prefetch_is_one_query_and_cached(self):
+        with self.assertNumQueries(1):
+            prefetch_subject_rows(
+                self.markings,
+                Image,
+                Image.SUBJECT_MARKING,
+                "_rows",
+                order_by=("display_order",),
+            )
+        with self.assertNumQueries(0):
+            prefetch_subject_rows(
+                self.markings,
+                Image,
+                Image.SUBJECT_MARKING,
+                "_rows",
+                order_by=("display_order",),
+            )
+        self.assertEqual(len(self.markings[0]._rows), 3)
+
+
+class MarkingListImageQueryTests(APITestCase):
+    def test_list_page_loads_images_in_one_query(self):
+        user = User.objects.create_user(username="editor", password="pw")
+        markings = _make_markings(user, 5)
+        for marking in markings:
+            _add_images(user, marking, 3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/v2/markings/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(_image_queries(ctx)), 1)
+        for row in resp.data["results"]:
+            self.assertEqual(row["main_image"]["display_order"], 0)
+            self.assertEqual(row["second_image"]["display_order"], 1)
@@ -0,0 +1,97 @@
+"""
+Tests for per-record version numbering (RecordVersionCounter).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_version_counter -v 2
+
+Version numbers must come from the locked counter row (no MAX() over the
+version table once seeded), continue existing history, and stay contiguous
+when benchmark_version_writes drives perform_update from several threads.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from common.audit import create_cover_version, create_marking_version
+from common.models import (
+    Color,
+    Cover,
+    CoverVersion,
+    Marking,
+    MarkingVersion,
+    PostOffice,
+    RecordVersionCounter,
+)
+
+User = get_user_model()
+
+
+class VersionCounterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+        po = PostOffice.objects.create(name="Richmond", created_by=self.admin, modified_by=self.admin)
+        self.marking = Marking.objects.create(
+            type="TOWNMARK", inscription_txt="RICHMOND Va.", is_manuscript=True, color=color,
+            post_office=po, created_by=self.admin, modified_by=self.admin,
+        )
+
+    def test_numbers_come_from_the_counter(self):
+        create_marking_version(self.marking, None, self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            second = create_marking_version(self.marking, None, self.admin)
+        self.assertEqual(second.version_no, 2)
+        self.assertFalse(any("MAX(" in q["sql"].upper() for q in ctx), [q["sql"] for q in ctx])
+
+        counter = RecordVersionCounter.objects.get(
+            record_type=RecordVersionCounter.RECORD_MARKING, record_id=self.marking.pk
+        )
+        self.assertEqual((counter.last_version_no, counter.keyframe_version_no), (2, 1))
+
+    def test_counter_seeds_from_existing_history(self):
+        for n in (1, 2, 3):
+            MarkingVersion.objects.create(marking=self.marking, version_no=n, snapshot={"code": str(n)})
+        self.assertEqual(create_marking_version(self.marking, None, self.admin).version_no, 4)
+
+        cover = Cover.objects.create(pk=self.marking.pk, created_by=self.admin, modified_by=self.admin)
+        self.assertEqual(create_cover_version(cover, None, self.admin).version_no, 1)
+        self.assertEqual(CoverVersion.objects.get(cover=cover).base_version_no, None)
+
+
+    def test_hard_delete_and_wipe_drop_counters(self):
+        create_marking_version(self.marking, None, self.admin)
+        marking_id = self.marking.pk
+        self.marking.delete()
+        self.assertFalse(RecordVersionCounter.objects.filter(record_id=marking_id).exists())
+
+        cover = Cover.objects.create(created_by=self.admin, modified_by=self.admin)
+        create_cover_version(cover, None, self.admin)
+        call_command("wipe_user_data", "--no-input", stdout=StringIO())
+        self.assertFalse(RecordVersionCounter.objects.exists())
+        self.assertEqual(create_cover_version(cover, None, self.admin).version_no, 1)
+
+class VersionWriteBenchmarkTests(TransactionTestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(username="admin", password="pw")
+        Color.objects.create(name="Black", created_by=admin, modified_by=admin)
+        PostOffice.objects.create(name="Richmond", created_by=admin, modified_by=admin)
+
+    def _benchmark(self, threads, writes):
+        out = StringIO()
+        call_command("benchmark_version_writes", "--threads", str(threads), "--writes", str(writes), stdout=out)
+        self.assertIn(f"Version numbering OK: 1..{threads * writes}", out.getvalue())
+        self.assertIn("latency ms:", out.getvalue())
+        self.assertFalse(Marking.all_objects.filter(inscription_txt="VERSION BENCHMARK").exists())
+
+    def test_benchmark_reports_contiguous_numbering(self):
+        self._benchmark(threads=1, writes=4)
+
+    # SQLite cannot run concurrent writers; this runs on the MySQL test database.
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_concurrent_updates_take_consecutive_numbers(self):
+        self._benchmark(threads=4, writes=5)
@@ -0,0 +1,146 @@
+"""
+Tests for keyframe + delta version storage (common.version_store).
+
+Run from the backend repo root:
+
+    python manage.py test common.tests.test_version_store -v 2
+
+Patches must round-trip arbitrary snapshot edits, new versions must be
+delta-encoded between keyframes, every version must reconstruct to the
+snapshot taken when it was written (including through restore-version),
+and compact_version_history must rewrite full-snapshot history losslessly.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from common.audit import build_marking_snapshot, create_marking_version
+from common.models import Color, Marking, MarkingVersion, PostOffice
+from common.version_store import (
+    VERSION_KEYFRAME_INTERVAL,
+    apply_patch,
+    make_patch,
+    version_snapshot,
+    version_snapshots,
+)
+
+User = get_user_model()
+
+
+class JsonPatchTests(TestCase):
+    def test_patches_round_trip(self):
+        before = {
+            "code": "A1",
+            "width": "30.00",
+            "images": [{"storage_filename": "a.jpg"}, {"storage_filename": "b.jpg"}],
+            "citations": [],
+            "a/b~c": 1,
+            "gone": True,
+        }
+        cases = [
+            {**before, "code": "A2"},
+            {**before, "images": before["images"] + [{"storage_filename": "c.jpg"}]},
+            {**before, "images": before["images"][:1], "citations": [{"reference_work_id": 3}]},
+            {key: value for key, value in before.items() if key != "gone"},
+            {**before, "a/b~c": None, "width": 30, "new": {"nested": [1, 2]}},
+            before,
+        ]
+        for after in cases:
+            with self.subTest(after=after):
+                patch = make_patch(before, after)
+                self.assertEqual(apply_patch(before, patch), after)
+        self.assertEqual(make_patch(before, dict(before)), [])
+        self.assertEqual(before["images"][0], {"storage_filename": "a.jpg"})  # input untouched
+
+
+class VersionStoreTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        color = Color.objects.create(name="Black", created_by=self.admin, modified_by=self.admin)
+        po = PostOffice.objects.create(name="Richmond", created_by=self.admin, modified_by=self.admin)
+        self.marking = Marking.objects.create(
+            type="TOWNMARK", inscription_txt="RICHMOND Va.", is_manuscript=True, color=color,
+            post_office=po, created_by=self.admin, modified_by=self.admin,
+        )
+
+    def _write_versions(self, count):
+        expected = {}
+        for n in range(1, count + 1):
+            self.marking.code = f"v{n}"
+            self.marking.save()
+            version = create_marking_version(self.marking, None, self.admin)
+            expected[version.version_no] = build_marking_snapshot(self.marking)
+        return expected
+
+    def _assert_reconstructs(self, expected):
+        versions = MarkingVersion.objects.filter(marking=self.marking)
+        rebuilt = version_snapshots(versions)
+        for version_no, snapshot in expected.items():
+            rebuilt[version_no].pop("captured_at")
+            snapshot = {key: value for key, value in snapshot.items() if key != "captured_at"}
+            self.assertEqual(rebuilt[version_no], snapshot)
+
+    def test_new_versions_are_deltas_between_keyframes(self):
+        expected = self._write_versions(VERSION_KEYFRAME_INTERVAL + 2)
+        bases = dict(
+            MarkingVersion.objects.filter(marking=self.marking).values_list("version_no", "base_version_no")
+        )
+        keyframes = sorted(no for no, base in bases.items() if base is None)
+        self.assertEqual(keyframes, [1, VERSION_KEYFRAME_INTERVAL + 1])
+        self.assertEqual(bases[2], 1)
+        self.assertEqual(bases[VERSION_KEYFRAME_INTERVAL + 2], VERSION_KEYFRAME_INTERVAL + 1)
+        self._assert_reconstructs(expected)
+
+        delta_row = MarkingVersion.objects.get(marking=self.marking, version_no=3)
+        self.assertEqual(delta_row.snapshot, {})
+        self.assertEqual(version_snapshot(delta_row)["code"], "v3")
+
+    def test_restore_version_reads_delta_rows(self):
+        self._write_versions(4)
+        self.client.force_authenticate(self.admin)
+        resp = self.client.post(
+            f"/api/v2/markings/{self.marking.pk}/restore-version/", {"version_no": 3}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.marking.refresh_from_db()
+        self.assertEqual(self.marking.code, "v3")
+
+    def test_compaction_rewrites_full_history_losslessly(self):
+        expected = {}
+        for n in range(1, 8):
+            self.marking.code = f"legacy{n}"
+            self.marking.save()
+            snapshot = build_marking_snapshot(self.marking)
+            MarkingVersion.objects.create(marking=self.marking, version_no=n, snapshot=snapshot)
+            expected[n] = snapshot
+
+        out = StringIO()
+        call_command("compact_version_history", "--dry-run", stdout=out)
+        self.assertEqual(MarkingVersion.objects.filter(base_version_no__isnull=False).count(), 0)
+        self.assertIn("Would save", out.getvalue())
+
+        out = StringIO()
+        call_command("compact_version_history", stdout=out)
+        self.assertIn("MarkingVersion: records=1 rows_rewritten=6", out.getvalue())
+        self.assertIn("% smaller", out.getvalue())
+        self.assertEqual(
+            MarkingVersion.objects.filter(marking=self.marking, base_version_no__isnull=True).count(), 1
+        )
+        self._assert_reconstructs(expected)
+
+        out = StringIO()
+        call_command("compact_version_history", stdout=out)
+        self.assertIn("rows_rewritten=0", out.getvalue())
+
+    def test_admin_shows_reconstructed_snapshot(self):
+        self._write_versions(3)
+        delta_row = MarkingVersion.objects.get(marking=self.marking, version_no=3)
+        self.client.force_login(self.admin)
+        resp = self.client.get(f"/admin/common/markingversion/{delta_row.pk}/change/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "&quot;code&quot;: &quot;v3&quot;")
@@ -0,0 +1,274 @@
+###################################################################################################
+## WoCo Commons - Version store
+## Keyframe + JSON-patch delta encoding for MarkingVersion / CoverVersion snapshots
+###################################################################################################
+"""
+Store and reconstruct version snapshots.
+
+A version row is either a keyframe or a delta:
+
+  keyframe  base_version_no IS NULL; `snapshot` holds the full snapshot.
+  delta     base_version_no names an earlier keyframe of the same record;
+            `delta` holds the JSON Patch (RFC 6902 add / remove / replace)
+            that turns that keyframe into this version, `snapshot` is {}.
+
+Deltas are taken against the keyframe, not the previous version, so any
+version reconstructs from at most two rows, and writing one reads only the
+latest keyframe. A new keyframe starts every VERSION_KEYFRAME_INTERVAL
+versions, or sooner when a patch would not be smaller than the snapshot.
+
+Version numbers come from the record's RecordVersionCounter row, locked for
+the rest of the write transaction: concurrent saves of one record queue on
+that lock and take consecutive numbers, and no MAX(version_no) is needed.
+
+Always read snapshots through version_snapshot() / version_snapshots();
+existing full-snapshot history stays valid (every row is a keyframe) until
+compact_version_history rewrites it.
+"""
+import copy
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Q
+
+from common.models import CoverVersion, MarkingVersion, RecordVersionCounter
+
+VERSION_KEYFRAME_INTERVAL = getattr(settings, "VERSION_KEYFRAME_INTERVAL", 10)
+
+# Version model -> FK naming the record it versions.
+VERSION_OWNER_FIELDS = {
+    MarkingVersion: "marking",
+    CoverVersion: "cover",
+}
+VERSION_RECORD_TYPES = {
+    MarkingVersion: RecordVersionCounter.RECORD_MARKING,
+    CoverVersion: RecordVersionCounter.RECORD_COVER,
+}
+
+
+###################################################################################################
+## JSON Patch
+###################################################################################################
+def _pointer(path, key):
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _diff(before, after, path, ops):
+    if type(before) is not type(after):
+        ops.append({"op": "replace", "path": path, "value": after})
+    elif isinstance(after, dict):
+        for key in before:
+            if key not in after:
+                ops.append({"op": "remove", "path": _pointer(path, key)})
+        for key, value in after.items():
+            if key not in before:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            else:
+                _diff(before[key], value, _pointer(path, key), ops)
+    elif isinstance(after, list):
+        shared = min(len(before), len(after))
+        for index in range(shared):
+            _diff(before[index], after[index], _pointer(path, index), ops)
+        # Trailing removals last-first so earlier indexes stay valid.
+        for index in range(len(before) - 1, shared - 1, -1):
+            ops.append({"op": "remove", "path": _pointer(path, index)})
+        for index in range(shared, len(after)):
+            ops.append({"op": "add", "path": _pointer(path, index), "value": after[index]})
+    elif before != after:
+        ops.append({"op": "replace", "path": path, "value": after})
+
+
+def make_patch(before, after):
+    """JSON Patch operations turning `before` into `after` (both JSON values)."""
+    ops = []
+    _diff(before, after, "", ops)
+    return ops
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply_patch(document, patch):
+    """Return a new document with the JSON Patch applied; `document` is untouched."""
+    document = copy.deepcopy(document)
+    for op in patch:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        if not tokens:
+            document = copy.deepcopy(op.get("value"))
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return document
+
+
+###################################################################################################
+## Encoding
+###################################################################################################
+def json_size(value):
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def encode_version(snapshot, version_no, keyframe_no=None, keyframe=None):
+    """
+    Column values (snapshot, base_version_no, delta) for version `version_no`
+    given the record's latest keyframe. Returns a keyframe when there is none,
+    the interval is used up, or the patch would not save space.
+    """
+    if keyframe is None or version_no - keyframe_no >= VERSION_KEYFRAME_INTERVAL:
+        return snapshot, None, None
+    delta = make_patch(keyframe, snapshot)
+    if json_size(delta) >= json_size(snapshot):
+        return snapshot, None, None
+    return {}, keyframe_no, delta
+
+
+def locked_counter(model, owner_id):
+    """
+    The record's RecordVersionCounter, locked until the surrounding
+    transaction ends. Call inside transaction.atomic().
+    """
+    lookup = {"record_type": VERSION_RECORD_TYPES[model], "record_id": owner_id}
+    counters = RecordVersionCounter.objects.select_for_update()
+    counter = counters.filter(**lookup).first()
+    if counter is not None:
+        return counter
+    # First version since counters were introduced: seed from the history.
+    latest = model.objects.filter(**{f"{VERSION_OWNER_FIELDS[model]}_id": owner_id}).aggregate(
+        max_no=Max("version_no"),
+        keyframe_no=Max("version_no", filter=Q(base_version_no__isnull=True)),
+    )
+    try:
+        with transaction.atomic():
+            return RecordVersionCounter.objects.create(
+                last_version_no=latest["max_no"] or 0,
+                keyframe_version_no=latest["keyframe_no"],
+                **lookup,
+            )
+    except IntegrityError:
+        # A concurrent writer seeded it first; wait for its lock.
+        return counters.get(**lookup)
+
+
+def create_version(model, owner, snapshot, **fields):
+    """Create the next version row for `owner` (a Marking or Cover), delta-encoded."""
+    owner_filter = {VERSION_OWNER_FIELDS[model]: owner}
+    with transaction.atomic():
+        counter = locked_counter(model, owner.pk)
+        version_no = counter.last_version_no + 1
+        keyframe_no = counter.keyframe_version_no
+        keyframe = None
+        if keyframe_no is not None and version_no - keyframe_no < VERSION_KEYFRAME_INTERVAL:
+            keyframe = (
+                model.objects.filter(**owner_filter, version_no=keyframe_no)
+                .values_list("snapshot", flat=True)
+                .first()
+            )
+        stored, base_version_no, delta = encode_version(snapshot, version_no, keyframe_no, keyframe)
+        # queryset.update(): no model signals for bookkeeping rows.
+        RecordVersionCounter.objects.filter(pk=counter.pk).update(
+            last_version_no=version_no,
+            keyframe_version_no=keyframe_no if base_version_no is not None else version_no,
+        )
+        return model.objects.create(
+            version_no=version_no,
+            snapshot=stored,
+            base_version_no=base_version_no,
+            delta=delta,
+            **owner_filter,
+            **fields,
+        )
+
+
+###################################################################################################
+## Reconstruction
+###################################################################################################
+def version_snapshots(versions):
+    """
+    {version_no: full snapshot} for version rows of ONE record. Keyframes the
+    deltas need but that are not in `versions` are loaded with one query.
+    """
+    versions = list(versions)
+    if not versions:
+        return {}
+    model = type(versions[0])
+    owner_field = VERSION_OWNER_FIELDS[model]
+    keyframes = {v.version_no: v.snapshot for v in versions if v.base_version_no is None}
+    missing = {v.base_version_no for v in versions if v.base_version_no is not None} - set(keyframes)
+    if missing:
+        keyframes.update(
+            model.objects.filter(
+                **{f"{owner_field}_id": getattr(versions[0], f"{owner_field}_id")},
+                version_no__in=missing,
+            ).values_list("version_no", "snapshot")
+        )
+    out = {}
+    for version in versions:
+        if version.base_version_no is None:
+            out[version.version_no] = version.snapshot or {}
+        else:
+            out[version.version_no] = apply_patch(keyframes[version.base_version_no] or {}, version.delta or [])
+    return out
+
+
+def version_snapshot(version):
+    """Full snapshot for one MarkingVersion / CoverVersion."""
+    return version_snapshots([version])[version.version_no]
+
+
+###################################################################################################
+## Compaction
+###################################################################################################
+def _stored_size(snapshot, delta):
+    return json_size(snapshot or {}) + (json_size(delta) if delta is not None else 0)
+
+
+def compact_record_history(model, owner_id, dry_run=False):
+    """
+    Re-encode one record's versions as keyframes + deltas. Returns
+    (bytes_before, bytes_after, rows_rewritten). Call inside
+    transaction.atomic() unless dry_run.
+    """
+    owner_field = VERSION_OWNER_FIELDS[model]
+    # Holds off concurrent create_version() calls for this record until the
+    # caller's transaction ends, so none encodes against a keyframe that is
+    # being rewritten here.
+    counter = None if dry_run else locked_counter(model, owner_id)
+    versions = list(
+        model.objects.filter(**{f"{owner_field}_id": owner_id})
+        .only("id", "version_no", "snapshot", "base_version_no", "delta")
+        .order_by("version_no")
+    )
+    snapshots = version_snapshots(versions)
+    before = after = 0
+    changed = []
+    keyframe_no = keyframe = None
+    for version in versions:
+        before += _stored_size(version.snapshot, version.delta)
+        full = snapshots[version.version_no]
+        stored, base_version_no, delta = encode_version(full, version.version_no, keyframe_no, keyframe)
+        if base_version_no is None:
+            keyframe_no, keyframe = version.version_no, full
+        after += _stored_size(stored, delta)
+        if (stored, base_version_no, delta) != (version.snapshot, version.base_version_no, version.delta):
+            version.snapshot, version.base_version_no, version.delta = stored, base_version_no, delta
+            changed.append(version)
+    if changed and not dry_run:
+        model.objects.bulk_update(changed, ["snapshot", "base_version_no", "delta"])
+        RecordVersionCounter.objects.filter(pk=counter.pk).update(keyframe_version_no=keyframe_no)
+    return before, after, len(changed)
@@ -0,0 +1,139 @@
+"""
+Conditional GET (ETag / Last-Modified) for API v2 read endpoints.
+
+Collection handlers (no URL kwargs: list, town-options) are validated from
+the catalog generation in woco.response_cache, not from the rows served: a
+catalog write replaces the generation, so an unchanged generation means an
+unchanged representation for the same user, URL and renderer. DRF has run
+the view's permission checks by the time the handler is called, so
+conditional_catalog_response answers If-None-Match / If-Modified-Since with
+a 304 before the handler runs -- no queryset, no serializer.
+
+  ETag           weak; hashes the generation, the requesting user (id and
+                 superuser flag: responses are permission-scoped), the full
+                 path with sorted query params and the negotiated format.
+  Last-Modified  when the current generation began, i.e. the last catalog
+                 write. Conservative for any single row.
+
+Detail handlers (retrieve, changelog) must look the record up and check
+object permissions first, so a missing or forbidden record answers 404/403,
+never 304. They build a validator from the record itself -- for markings and
+covers its modified_date, latest version_no and latest transaction id -- and
+call record_not_modified before serializing anything. ConditionalRetrieveMixin
+does this for retrieve; views override record_validator. The ETag hashes the
+validator with the same user, URL and format parts as above. No
+Last-Modified is sent for them: a changelog also moves with submission
+transactions, which are not catalog writes.
+
+Only successful (200) GET/HEAD responses are stamped; responses that set
+Cache-Control themselves are left alone.
+"""
+import hashlib
+import math
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .request_metrics import serializer_data
+from .response_cache import catalog_changed_at, catalog_generation
+
+
+def _identity(request):
+    user = request.user
+    return f"{user.pk}:{int(user.is_superuser)}" if user.is_authenticated else "anon"
+
+
+def _renderer_format(request):
+    renderer = getattr(request, "accepted_renderer", None)
+    return getattr(renderer, "format", "") or ""
+
+
+def record_etag(request, validator):
+    params = sorted((name, values) for name, values in request.query_params.lists())
+    raw = "\x00".join([
+        _identity(request),
+        request.path,
+        repr(params),
+        _renderer_format(request),
+        *(str(part) for part in validator),
+    ])
+    return f'W/{quote_etag(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32])}'
+
+
+def catalog_etag(request):
+    return record_etag(request, [catalog_generation()])
+
+
+def _stampable(response):
+    return (
+        isinstance(response, Response)
+        and response.status_code == 200
+        and not response.has_header("Cache-Control")
+    )
+
+
+def record_not_modified(request, etag):
+    """The 304 for a GET/HEAD whose If-None-Match matches `etag`, else None."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None and not_modified.status_code == 304:
+        not_modified["ETag"] = etag
+    return not_modified
+
+
+def stamp_etag(response, etag):
+    if _stampable(response):
+        response["ETag"] = etag
+    return response
+
+
+def conditional_catalog_response(view_func):
+    """Decorate a DRF collection handler `(request, *args, **kwargs)`; use method_decorator on views."""
+
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view_func(request, *args, **kwargs)
+
+        etag = catalog_etag(request)
+        # HTTP dates have one-second resolution; round up so a write later in
+        # the same second still moves Last-Modified past an earlier copy.
+        last_modified = math.ceil(catalog_changed_at())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                not_modified["ETag"] = etag
+            return not_modified
+
+        response = view_func(request, *args, **kwargs)
+        if _stampable(response):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    return wrapped
+
+
+class ConditionalRetrieveMixin:
+    """retrieve answered with a 304 from record_validator, after get_object()
+    and before the serializer runs.
+
+    List it before TimedSerializationMixin and the DRF viewset base class.
+    The default validator suits catalog lookups, whose every write replaces
+    the catalog generation.
+    """
+
+    def record_validator(self, instance):
+        return [catalog_generation(), instance.pk]
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = record_etag(request, self.record_validator(instance))
+        not_modified = record_not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return stamp_etag(Response(serializer_data(serializer)), etag)
@@ -0,0 +1,178 @@
+"""
+Count strategies for paginated list views (API and admin).
+
+COUNT(*) over the full catalog joins and filters is slow enough that the SPA
+used to opt out of it (?include_count=false). Instead, counts are resolved in
+this order:
+
+  cached     -- an exact count computed earlier for the same query. The cache
+                key hashes the compiled SQL + params, so any filter, search or
+                user scoping yields its own entry. Keys embed a per-app
+                generation that model writes bump (see bump_count_generation),
+                so a write invalidates every cached count for that app at once.
+                A TTL bounds staleness from writes that bypass model signals.
+  estimated  -- MySQL's table statistics (information_schema.TABLES.TABLE_ROWS)
+                when the queryset carries no filter beyond its default manager's
+                and the table is large. Cheap but approximate (InnoDB samples).
+                TABLE_ROWS counts every row, so a default manager that hides
+                rows (Marking / Cover hide the recycle bin) must say how many
+                through hidden_row_count(); otherwise no estimate is made.
+  exact      -- a real COUNT(*), then cached.
+
+CountedPaginator exposes the chosen strategy as `count_strategy` so callers
+can surface it (MarkingListPagination adds it to the response).
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+
+COUNT_CACHE_TIMEOUT = getattr(settings, "COUNT_CACHE_TIMEOUT", 300)
+# Below this many rows a real COUNT(*) is cheap enough to prefer over an estimate.
+COUNT_ESTIMATE_MIN_ROWS = getattr(settings, "COUNT_ESTIMATE_MIN_ROWS", 50_000)
+
+
+def _generation_key(app_label):
+    return f"count-generation:{app_label}"
+
+
+def count_generation(app_label):
+    return cache.get_or_set(_generation_key(app_label), uuid.uuid4().hex, None)
+
+
+def bump_count_generation(app_label):
+    """Invalidate every cached count for models in `app_label`."""
+    cache.set(_generation_key(app_label), uuid.uuid4().hex, None)
+
+
+def _is_unfiltered(queryset):
+    """True when the queryset filters nothing beyond its model's default manager."""
+    query = queryset.query
+    if query.distinct or query.is_sliced:
+        return False
+    base = queryset.model._default_manager.all().query
+    return query.where == base.where
+
+
+def _hidden_rows(model, using):
+    """
+    Rows in the model's table that its default manager hides, or None when
+    that is not cheaply known (a filtering manager without hidden_row_count).
+    """
+    manager = model._default_manager.db_manager(using)
+    if manager.all().query.where == model._base_manager.all().query.where:
+        return 0
+    hidden_row_count = getattr(manager, "hidden_row_count", None)
+    return hidden_row_count() if hidden_row_count is not None else None
+
+
+def estimated_table_rows(model, using="default"):
+    """Row estimate from MySQL table statistics, or None when unavailable."""
+    connection = connections[using]
+    if connection.vendor != "mysql":
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None:
+        return None
+    return int(row[0])
+
+
+def _signature(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha256(f"{sql}\x00{params!r}".encode("utf-8")).hexdigest()
+    return f"count:{queryset.model._meta.label_lower}:{digest}"
+
+
+def resolve_count(queryset, *, allow_estimate=True):
+    """Return (count, strategy) for `queryset` using the cheapest available strategy."""
+    if not hasattr(queryset, "query"):
+        return len(queryset), COUNT_EXACT
+
+    if allow_estimate and _is_unfiltered(queryset):
+        estimate = estimated_table_rows(queryset.model, using=queryset.db)
+        if estimate is not None and estimate >= COUNT_ESTIMATE_MIN_ROWS:
+            hidden = _hidden_rows(queryset.model, queryset.db)
+            if hidden is not None:
+                return max(estimate - hidden, 0), COUNT_ESTIMATED
+
+    try:
+        signature = _signature(queryset)
+    except Exception:
+        # e.g. EmptyResultSet from .none() / impossible filters.
+        return queryset.count(), COUNT_EXACT
+    key = f"{signature}:{count_generation(queryset.model._meta.app_label)}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, COUNT_CACHED
+    value = queryset.count()
+    cache.set(key, value, COUNT_CACHE_TIMEOUT)
+    return value, COUNT_EXACT
+
+
+class _ProbedPage(Page):
+    """Page whose has_next() comes from fetching one extra row, not from count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator that resolves `count` through resolve_count(). With an estimated
+    count, page bounds are not trusted: any page number is accepted and
+    has_next() probes one row past the page instead.
+    """
+    count_strategy = None
+
+    @cached_property
+    def count(self):
+        value, self.count_strategy = resolve_count(self.object_list)
+        return value
+
+    @property
+    def is_estimated(self):
+        # Reading `count` is what resolves count_strategy.
+        return self.count is not None and self.count_strategy == COUNT_ESTIMATED
+
+    def validate_number(self, number):
+        if not self.is_estimated:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        if not self.is_estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return _ProbedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
@@ -1,10 +1,19 @@
 """
 Custom pagination so API respects ?page_size= from the client (e.g. 10 per page for catalog).
 """
+import base64
+import json
 from collections import OrderedDict
+from urllib.parse import urlencode, urlparse, urlunparse
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from woco.counts import CountedPaginator
 
 
 class PageSizePagination(PageNumberPagination):
@@ -20,9 +29,35 @@ class MarkingListPagination(PageSizePagination):
     the slow COUNT query on 50k+ rows for faster first paint. When count is
     skipped, we manually slice the queryset (Django Paginator breaks with
     count=0).
+
+    Otherwise the count comes from woco.counts (cached exact count per query,
+    or a table-statistics estimate for the unfiltered catalog on MySQL) and
+    the response carries `count_strategy`: "exact", "cached" or "estimated".
+
+    Keyset mode: passing ?cursor= (empty for the first page) switches to
+    seek pagination over the active ordering plus an `id` tie-breaker. Each
+    page is `WHERE (sort keys) > (last row's keys) ORDER BY ... LIMIT n`, so
+    page 500 costs the same as page 1 instead of sorting and discarding an
+    OFFSET prefix. `next` / `previous` carry opaque cursors; count is null.
+
+    That only holds when the database can walk an index in sort order, so
+    views map each ordering field cursor mode supports to the indexed,
+    single-valued column it seeks on in `keyset_ordering_fields`, e.g. a
+    related name to its denormalized copy. The view's default ordering is
+    kept; a cursor request whose ordering has any other field is a 400,
+    never silently re-ordered.
     """
+    django_paginator_class = CountedPaginator
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
     def paginate_queryset(self, queryset, request, view=None):
         self.request = request
+        self._keyset = bool(request and self.cursor_query_param in request.query_params)
+        if self._keyset:
+            self._defer_count = False
+            return self._paginate_keyset(queryset, request, view)
+
         self._defer_count = bool(request and request.query_params.get("include_count") == "false")
 
         if self._defer_count:
@@ -43,9 +78,14 @@ class MarkingListPagination(PageSizePagination):
         return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if getattr(self, "_keyset", False):
+            return Response(OrderedDict([
+                ("count", None),
+                ("next", self._keyset_link(self._next_position)),
+                ("previous", self._keyset_link(self._previous_position)),
+                ("results", data),
+            ]))
         if getattr(self, "_defer_count", False):
-            from urllib.parse import urlencode, urlparse, urlunparse
-
             page_size = self.get_page_size(self.request)
             has_next = len(data) >= page_size if data else False
             page_number = self.request.query_params.get(self.page_query_param, 1)
@@ -69,7 +109,126 @@ class MarkingListPagination(PageSizePagination):
                 ("previous", prev_link),
                 ("results", data),
             ]))
-        return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("count", self.page.paginator.count),
+            ("count_strategy", self.page.paginator.count_strategy),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    # -- keyset mode -------------------------------------------------------
+
+    def _keyset_ordering(self, queryset, view):
+        """The ordering terms the cursor records, `id` tie-breaker included."""
+        ordering = [o for o in (queryset.query.order_by or queryset.model._meta.ordering) if isinstance(o, str)]
+        allowed = getattr(view, "keyset_ordering_fields", None)
+        if allowed is not None and any(o.lstrip("-") not in allowed for o in ordering):
+            raise ValidationError({
+                api_settings.ORDERING_PARAM: [
+                    "Cursor pagination can only order by: " + ", ".join(allowed) + "."
+                ],
+            })
+        if not any(o.lstrip("-") in ("id", "pk") for o in ordering):
+            ordering.append("id")
+        return ordering
+
+    def _paginate_keyset(self, queryset, request, view):
+        ordering = self._keyset_ordering(queryset, view)
+        self._ordering = ordering
+        columns = getattr(view, "keyset_ordering_fields", None) or {}
+
+        keys = []
+        annotations = {}
+        for i, field in enumerate(ordering):
+            alias = f"_keyset_{i}"
+            name = field.lstrip("-")
+            annotations[alias] = F(columns.get(name, name))
+            keys.append((alias, field.startswith("-")))
+
+        position = self._decode_cursor(request.query_params.get(self.cursor_query_param))
+        reverse = bool(position and position["r"])
+        # Scanning backwards flips every direction (and the NULL placement
+        # with it), then the page is re-reversed into display order.
+        scan = [(alias, desc != reverse) for alias, desc in keys]
+
+        qs = queryset.annotate(**annotations).order_by(*[
+            F(alias).desc(nulls_last=True) if desc else F(alias).asc(nulls_first=True)
+            for alias, desc in scan
+        ])
+        if position:
+            qs = qs.filter(self._after(scan, position["v"]))
+
+        page_size = self.get_page_size(request)
+        rows = list(qs[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        def values_of(row):
+            return [getattr(row, alias) for alias, _ in keys]
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else position is not None
+        self._next_position = {"v": values_of(rows[-1]), "r": 0} if rows and has_next else None
+        self._previous_position = {"v": values_of(rows[0]), "r": 1} if rows and has_previous else None
+        self.page = rows
+        return rows
+
+    @staticmethod
+    def _after(scan, values):
+        """
+        Rows strictly after `values` in the scan order. NULL sorts before
+        every value ascending and after every value descending, matching
+        the ORDER BY built in _paginate_keyset.
+        """
+        result = Q(pk__in=[])
+        prefix = Q()
+        for (alias, desc), value in zip(scan, values):
+            if value is None:
+                step = None if desc else Q(**{f"{alias}__isnull": False})
+                equal = Q(**{f"{alias}__isnull": True})
+            else:
+                if desc:
+                    step = Q(**{f"{alias}__lt": value}) | Q(**{f"{alias}__isnull": True})
+                else:
+                    step = Q(**{f"{alias}__gt": value})
+                equal = Q(**{alias: value})
+            if step is not None:
+                result |= prefix & step
+            prefix &= equal
+        return result
+
+    def _decode_cursor(self, raw):
+        if not raw:
+            return None
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            values = position["v"]
+            if position["o"] != self._ordering or len(values) != len(self._ordering):
+                raise ValueError("cursor ordering mismatch")
+            return {"v": values, "r": int(position.get("r", 0))}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode_cursor(self, position):
+        payload = json.dumps(
+            {"o": self._ordering, "v": position["v"], "r": position["r"]},
+            cls=DjangoJSONEncoder,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def _keyset_link(self, position):
+        if position is None:
+            return None
+        p = self.request.query_params.copy()
+        p.pop(self.page_query_param, None)
+        p[self.cursor_query_param] = self._encode_cursor(position)
+        parsed = urlparse(self.request.build_absolute_uri())
+        return urlunparse(parsed._replace(query=urlencode(p, doseq=True)))
 
 
 class LargePageSizePagination(PageNumberPagination):
@@ -0,0 +1,227 @@
+"""
+Per-request query budget instrumentation.
+
+RequestMetricsMiddleware measures, for every request that resolves to a view:
+
+  queries   number of SQL statements (all database aliases)
+  db_ms     wall time spent inside those statements
+  ser_ms    wall time spent producing serializer output, as timed by the
+            view through serializer_data() (TimedSerializationMixin does
+            it for list / retrieve); 0 for views that do not
+  total_ms  wall time of the whole request
+  bytes     response body size (0 for streaming responses)
+
+and reports them under an endpoint label such as "MarkingViewSet.list",
+"MarkingViewSet.fuzzy" or "MarkingDateRangeView.get":
+
+  Server-Timing  header on responses to staff users (db, ser, total),
+                 readable in the browser's network panel.
+  histogram      rolling per-process window of the last
+                 REQUEST_METRICS_WINDOW samples per endpoint; summarized by
+                 endpoint_summary() and served at /api/v2/request-metrics/
+                 (Administrators only). Each worker keeps its own window.
+  JSONL log      one line per request appended to REQUEST_METRICS_LOG when
+                 that setting names a file.
+
+QUERY_BUDGETS maps endpoint labels to a maximum query count; a request
+above its budget logs a warning on the "woco.request_metrics" logger.
+Nothing is measured unless REQUEST_METRICS_ENABLED is True.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 500
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+_samples = defaultdict(lambda: deque(maxlen=_window()))
+_samples_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def _window():
+    return getattr(settings, "REQUEST_METRICS_WINDOW", DEFAULT_WINDOW)
+
+
+class _Metrics:
+    __slots__ = ("queries", "db_seconds", "ser_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.ser_seconds = 0.0
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+###################################################################################################
+## Serializer timing
+###################################################################################################
+def serializer_data(serializer):
+    """Return serializer.data, adding the time it takes to the request's ser_ms."""
+    metrics = _current.get()
+    if metrics is None:
+        return serializer.data
+    started = time.perf_counter()
+    try:
+        return serializer.data
+    finally:
+        metrics.ser_seconds += time.perf_counter() - started
+
+
+class TimedSerializationMixin:
+    """DRF's list / retrieve with the serializer output timed via serializer_data.
+
+    List it before the DRF viewset base class.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer_data(serializer))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer_data(serializer))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer_data(serializer))
+
+
+###################################################################################################
+## Endpoint labels and reporting
+###################################################################################################
+def endpoint_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    func = match.func
+    cls = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if cls is None:
+        return match.view_name or getattr(func, "__name__", None)
+    actions = getattr(func, "actions", None) or {}
+    handler = actions.get(request.method.lower(), request.method.lower())
+    return f"{cls.__name__}.{handler}"
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def endpoint_summary():
+    """Per-endpoint count / p50 / p95 / max over the rolling window."""
+    with _samples_lock:
+        snapshot = {label: list(samples) for label, samples in _samples.items()}
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    out = []
+    for label, samples in sorted(snapshot.items()):
+        row = {"endpoint": label, "samples": len(samples), "query_budget": budgets.get(label)}
+        for field in ("queries", "db_ms", "ser_ms", "total_ms", "bytes"):
+            values = [s[field] for s in samples]
+            row[field] = {
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95),
+                "max": max(values),
+            }
+        out.append(row)
+    return out
+
+
+def reset_samples():
+    with _samples_lock:
+        _samples.clear()
+
+
+def _write_log_line(path, sample):
+    line = json.dumps(sample, separators=(",", ":")) + "\n"
+    try:
+        with _log_lock, open(path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+    except OSError:
+        logger.exception("Could not append request metrics to %s", path)
+
+
+###################################################################################################
+## Middleware
+###################################################################################################
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            return self.get_response(request)
+
+        metrics = _Metrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_seconds = time.perf_counter() - started
+
+        label = endpoint_label(request)
+        if label is None:
+            return response
+
+        sample = {
+            "endpoint": label,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_seconds * 1000, 2),
+            "ser_ms": round(metrics.ser_seconds * 1000, 2),
+            "total_ms": round(total_seconds * 1000, 2),
+            "bytes": 0 if response.streaming else len(response.content),
+        }
+        # Timings reveal query counts and server load; only staff see them.
+        # DRF copies the user it authenticated onto the Django request.
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={sample["db_ms"]};desc="{metrics.queries} queries"',
+                f'ser;dur={sample["ser_ms"]}',
+                f'total;dur={sample["total_ms"]}',
+            ])
+
+        with _samples_lock:
+            _samples[label].append(sample)
+
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(label)
+        if budget is not None and metrics.queries > budget:
+            logger.warning(
+                "Query budget exceeded: %s %s ran %d queries (budget %d)",
+                label, request.get_full_path(), metrics.queries, budget,
+            )
+
+        log_path = getattr(settings, "REQUEST_METRICS_LOG", "")
+        if log_path:
+            _write_log_line(log_path, {"ts": time.time(), "path": request.path, **sample})
+        return response
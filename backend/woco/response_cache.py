@@ -0,0 +1,133 @@
+"""
+Server-side response cache for anonymous catalog reads.
+
+The public catalog (markings, regions, shapes, colors, letterings, FAQ, town
+options, the marking date range) is read far more often than it is written,
+and almost all of those reads are anonymous. cache_anonymous_response wraps a
+view handler so an anonymous GET is answered from the cache when the same
+request has been served since the catalog last changed:
+
+  key        host + path + query params (sorted by name) + catalog generation.
+             Only response.data and its ETag (woco.conditional) are stored;
+             rendering still happens per request, so content negotiation is
+             unaffected. A HIT whose If-None-Match matches the ETag is a 304.
+  generation an opaque token in the cache. bump_catalog_generation replaces
+             it once the writing transaction commits, which orphans every
+             cached response at once; they then age out via
+             CATALOG_CACHE_TIMEOUT.
+             common.signals bumps it on writes to the catalog models
+             (CATALOG_MODELS: records, lookups, recycle bins), so API
+             writes, recycle-bin remove/restore and contribution approval
+             are covered; draft contributions, transactions and version
+             history are not catalog writes. Bulk paths that bypass signals
+             (import_ascc_bundle, the rebuild commands) bump it explicitly.
+
+Authenticated requests, non-GET methods and non-200 responses are never
+served from or written to the cache, nor are responses that set their own
+Cache-Control. Each response carries X-Catalog-Cache: HIT or MISS.
+"""
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+CATALOG_CACHE_TIMEOUT = getattr(settings, "CATALOG_CACHE_TIMEOUT", 600)
+CACHE_STATUS_HEADER = "X-Catalog-Cache"
+
+_GENERATION_KEY = "catalog-generation"
+
+
+def _new_generation():
+    return uuid.uuid4().hex, time.time()
+
+
+def catalog_generation():
+    return cache.get_or_set(_GENERATION_KEY, _new_generation, None)[0]
+
+
+def catalog_changed_at():
+    """Epoch seconds when the current generation began (the catalog's last write)."""
+    return cache.get_or_set(_GENERATION_KEY, _new_generation, None)[1]
+
+
+def _replace_generation():
+    cache.set(_GENERATION_KEY, _new_generation(), None)
+
+
+class _PendingBump:
+    """The on-commit bump of one transaction; later bumps in it reuse this."""
+
+    ran = False
+
+    def __call__(self):
+        # Marked so a test's captureOnCommitCallbacks(execute=True), which
+        # runs callbacks without dequeuing them, does not absorb later bumps.
+        self.ran = True
+        _replace_generation()
+
+
+def bump_catalog_generation(using=None):
+    """
+    Invalidate every cached catalog response once the current transaction
+    commits (at once in autocommit). Until then readers only see pre-commit
+    data, which the old generation still describes. Bumping inside the
+    transaction would also write the DatabaseCache row there and hold its
+    lock, which every catalog write needs, until the writer commits: for a
+    bundle import, minutes. Repeat calls within one transaction schedule a
+    single bump.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        _replace_generation()
+        return
+    if any(isinstance(entry[1], _PendingBump) and not entry[1].ran for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(_PendingBump(), using=using)
+
+
+def response_cache_key(request):
+    params = sorted(
+        (name, values) for name, values in request.query_params.lists()
+    )
+    raw = f"{request.get_host()}\x00{request.path}\x00{params!r}"
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"catalog-response:v2:{catalog_generation()}:{digest}"
+
+
+def cache_anonymous_response(view_func):
+    """Decorate a DRF handler `(request, *args, **kwargs)`; use method_decorator on views."""
+
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        key = response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            data, etag = cached
+            response = get_conditional_response(request, etag=etag) if etag else None
+            if response is None:
+                response = Response(data)
+            if etag:
+                response["ETag"] = etag
+            response[CACHE_STATUS_HEADER] = "HIT"
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if (
+            isinstance(response, Response)
+            and response.status_code == 200
+            and not response.has_header("Cache-Control")
+        ):
+            cache.set(key, (response.data, response.get("ETag")), CATALOG_CACHE_TIMEOUT)
+            response[CACHE_STATUS_HEADER] = "MISS"
+        return response
+
+    return wrapped
@@ -82,6 +82,8 @@ if not TESTING:
     ]
 
 MIDDLEWARE = [
+    # Outermost so query counts / timings cover every other middleware too.
+    "woco.request_metrics.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -137,6 +139,66 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds cached list counts (woco.counts) and anonymous catalog responses
+# (woco.response_cache). Every worker on every host must see the same
+# generation keys, so the default is the database cache: the woco_cache table
+# in the main database, created by `manage.py createcachetable` (run by
+# tools/deploy.sh). A Redis or Memcached server is the faster shared option,
+# e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://127.0.0.1:6379/1. Avoid FileBasedCache: every set
+# lists the whole cache directory to decide whether to cull, a full cache
+# deletes a random third of it (live generation keys included), and the
+# directory is not shared between hosts. Tests use a per-process
+# local-memory cache.
+if TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "woco-test",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": config(
+                "CACHE_BACKEND",
+                default="django.core.cache.backends.db.DatabaseCache",
+            ),
+            "LOCATION": config("CACHE_LOCATION", default="woco_cache"),
+        }
+    }
+    if CACHES["default"]["BACKEND"].endswith((".DatabaseCache", ".FileBasedCache", ".LocMemCache")):
+        # Django's default of 300 entries is below one page per common filter
+        # combination; these backends cull by counting (or listing) every entry,
+        # so keep the ceiling modest. Stale generations age out via timeouts.
+        CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": config("CACHE_MAX_ENTRIES", cast=int, default=5000)}
+
+# Seconds an anonymous catalog response may be served from the cache; writes
+# invalidate sooner (see woco.response_cache).
+CATALOG_CACHE_TIMEOUT = config("CATALOG_CACHE_TIMEOUT", cast=int, default=600)
+
+# Request metrics (woco.request_metrics): Server-Timing header for staff,
+# rolling per-endpoint histogram at /api/v2/request-metrics/, optional JSONL
+# log. Off unless REQUEST_METRICS_ENABLED is set; it wraps every query.
+# QUERY_BUDGETS caps the query count per endpoint ("<View>.<action>"); a
+# request over budget logs a warning on the woco.request_metrics logger.
+REQUEST_METRICS_ENABLED = config("REQUEST_METRICS_ENABLED", cast=bool, default=False)
+REQUEST_METRICS_LOG = config("REQUEST_METRICS_LOG", default="")
+REQUEST_METRICS_WINDOW = 500
+QUERY_BUDGETS = {
+    "MarkingViewSet.list": 10,
+    "MarkingViewSet.retrieve": 15,
+    "MarkingViewSet.fuzzy": 10,
+    "CoverV2ViewSet.list": 10,
+    "CoverV2ViewSet.retrieve": 15,
+    "CoverMarkingViewSet.list": 10,
+    "RegionViewSet.list": 5,
+    "PostOfficeViewSet.town_options": 5,
+    "MarkingDateRangeView.get": 5,
+}
+
 # MariaDB cannot enforce partial unique constraints, so allauth's
 # account.EmailAddress model triggers models.W036 on every manage.py
 # check. Uniqueness is still enforced in application code by allauth.
@@ -309,6 +371,11 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
+        "woco": {
+            "handlers": _log_handlers,
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -4,7 +4,6 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import type { MarkingChangelogEvent } from "@/services/markings";
 
 const HISTORY_COLLAPSED_LIMIT = 1;
-const HISTORY_EXPANDED_LIMIT = 10;
 
 function formatHistoryTimestamp(raw: string | null | undefined): string {
   if (!raw) return "";
@@ -34,6 +33,9 @@ export function EntryRecordHistoryCard({
   events,
   expanded,
   onToggleExpanded,
+  hasOlder,
+  loadingOlder,
+  onLoadOlder,
   unavailableMessage,
 }: {
   loading: boolean;
@@ -41,13 +43,14 @@ export function EntryRecordHistoryCard({
   events: MarkingChangelogEvent[];
   expanded: boolean;
   onToggleExpanded: () => void;
+  /** The changelog has a `next_cursor`: older events exist on the server. */
+  hasOlder: boolean;
+  loadingOlder: boolean;
+  onLoadOlder: () => void;
   unavailableMessage?: string;
 }) {
-  const visibleEvents = expanded
-    ? events.slice(0, HISTORY_EXPANDED_LIMIT)
-    : events.slice(0, HISTORY_COLLAPSED_LIMIT);
-  const hasMoreHistory = events.length > HISTORY_COLLAPSED_LIMIT;
-  const historyOverflow = Math.max(0, events.length - HISTORY_EXPANDED_LIMIT);
+  const visibleEvents = expanded ? events : events.slice(0, HISTORY_COLLAPSED_LIMIT);
+  const hasMoreHistory = events.length > HISTORY_COLLAPSED_LIMIT || hasOlder;
 
   return (
     <Card className="shadow-archival-md">
@@ -91,14 +94,13 @@ export function EntryRecordHistoryCard({
             {hasMoreHistory && (
               <div className="mt-3 flex items-center justify-between gap-3">
                 <Button type="button" variant="ghost" size="sm" onClick={onToggleExpanded}>
-                  {expanded
-                    ? "Show only latest"
-                    : `Show recent history (up to ${HISTORY_EXPANDED_LIMIT})`}
+                  {expanded ? "Show only latest" : "Show recent history"}
                 </Button>
-                {expanded && historyOverflow > 0 && (
-                  <span className="text-xs text-muted-foreground">
-                    {historyOverflow} older event{historyOverflow === 1 ? "" : "s"} not shown
-                  </span>
+                {expanded && hasOlder && (
+                  <Button type="button" variant="ghost" size="sm" disabled={loadingOlder} onClick={onLoadOlder}>
+                    {loadingOlder && <Loader2 className="h-4 w-4 animate-spin" />}
+                    Load older events
+                  </Button>
                 )}
               </div>
             )}
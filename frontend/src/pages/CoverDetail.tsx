@@ -152,6 +152,8 @@ const CoverDetailPage = () => {
   const [historyLoading, setHistoryLoading] = useState(false);
   const [historyError, setHistoryError] = useState<string | null>(null);
   const [historyExpanded, setHistoryExpanded] = useState(false);
+  const [historyNextCursor, setHistoryNextCursor] = useState<number | null>(null);
+  const [historyLoadingOlder, setHistoryLoadingOlder] = useState(false);
   const [coverReviewOpen, setCoverReviewOpen] = useState(false);
   const [coverReviewKind, setCoverReviewKind] = useState<CoverMarkingReviewActionApi | null>(null);
   const [coverReviewNotes, setCoverReviewNotes] = useState("");
@@ -382,6 +384,7 @@ const CoverDetailPage = () => {
     setHistoryLoading(true);
     setHistoryError(null);
     setHistoryExpanded(false);
+    setHistoryNextCursor(null);
     getMarkingChangelog(markingId)
       .then((data) => {
         if (cancelled) return;
@@ -393,6 +396,7 @@ const CoverDetailPage = () => {
           return;
         }
         setHistoryEvents(Array.isArray(data.events) ? data.events : []);
+        setHistoryNextCursor(data.next_cursor ?? null);
       })
       .catch(() => {
         if (cancelled) return;
@@ -407,6 +411,21 @@ const CoverDetailPage = () => {
     };
   }, [markingId, canViewHistory]);
 
+  // The changelog is paged newest first; "Load older events" follows the
+  // last page's next_cursor and appends what it returns.
+  const loadOlderHistory = async () => {
+    if (markingId == null || historyNextCursor == null || historyLoadingOlder) return;
+    setHistoryLoadingOlder(true);
+    const data = await getMarkingChangelog(markingId, historyNextCursor);
+    setHistoryLoadingOlder(false);
+    if (!data) {
+      toast({ title: "Unable to load older history", variant: "destructive" });
+      return;
+    }
+    setHistoryEvents((prev) => [...prev, ...(Array.isArray(data.events) ? data.events : [])]);
+    setHistoryNextCursor(data.next_cursor ?? null);
+  };
+
   useEffect(() => {
     if (!api) return;
     setCurrent(api.selectedScrollSnap());
@@ -570,6 +589,9 @@ const CoverDetailPage = () => {
                 events={historyEvents}
                 expanded={historyExpanded}
                 onToggleExpanded={() => setHistoryExpanded((v) => !v)}
+                hasOlder={historyNextCursor != null}
+                loadingOlder={historyLoadingOlder}
+                onLoadOlder={loadOlderHistory}
                 unavailableMessage={
                   markingId == null
                     ? "Open this cover from a marking record to view audit history."
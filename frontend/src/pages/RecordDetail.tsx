@@ -310,6 +310,8 @@ const RecordDetail = () => {
   const [historyLoading, setHistoryLoading] = useState(false);
   const [historyError, setHistoryError] = useState<string | null>(null);
   const [historyExpanded, setHistoryExpanded] = useState(false);
+  const [historyNextCursor, setHistoryNextCursor] = useState<number | null>(null);
+  const [historyLoadingOlder, setHistoryLoadingOlder] = useState(false);
   // Disables the editor's reorder buttons while a PATCH round-trip is in
   // flight. Without this an editor can fire two overlapping reorders before
   // the first one resolves, producing inconsistent display_order values.
@@ -408,6 +410,7 @@ const RecordDetail = () => {
     setHistoryLoading(true);
     setHistoryError(null);
     setHistoryExpanded(false);
+    setHistoryNextCursor(null);
     getMarkingChangelog(markingId)
       .then((data) => {
         if (cancelled) return;
@@ -419,6 +422,7 @@ const RecordDetail = () => {
           return;
         }
         setHistoryEvents(Array.isArray(data.events) ? data.events : []);
+        setHistoryNextCursor(data.next_cursor ?? null);
       })
       .catch(() => {
         if (cancelled) return;
@@ -433,6 +437,21 @@ const RecordDetail = () => {
     };
   }, [markingId, canViewHistory]);
 
+  // The changelog is paged newest first; "Load older events" follows the
+  // last page's next_cursor and appends what it returns.
+  const loadOlderHistory = async () => {
+    if (markingId == null || historyNextCursor == null || historyLoadingOlder) return;
+    setHistoryLoadingOlder(true);
+    const data = await getMarkingChangelog(markingId, historyNextCursor);
+    setHistoryLoadingOlder(false);
+    if (!data) {
+      toast({ title: "Unable to load older history", variant: "destructive" });
+      return;
+    }
+    setHistoryEvents((prev) => [...prev, ...(Array.isArray(data.events) ? data.events : [])]);
+    setHistoryNextCursor(data.next_cursor ?? null);
+  };
+
   useEffect(() => {
     if (!api) return;
     setCurrent(api.selectedScrollSnap());
@@ -615,19 +634,16 @@ const RecordDetail = () => {
       user.is_superuser === true);
 
   // Record History display rule: collapsed by default we show only the most
-  // recent event; when expanded we cap at the 10 newest events. Backend
-  // already returns events sorted by timestamp DESC, so we slice from the
+  // recent event; when expanded we show every page loaded so far (the first
+  // page is MARKING_CHANGELOG_PAGE_SIZE events, "Load older events" appends
+  // the next). Backend returns events newest first, so we slice from the
   // front to avoid an extra sort pass on every render.
   const HISTORY_COLLAPSED_LIMIT = 1;
-  const HISTORY_EXPANDED_LIMIT = 10;
   const visibleHistoryEvents = historyExpanded
-    ? historyEvents.slice(0, HISTORY_EXPANDED_LIMIT)
+    ? historyEvents
     : historyEvents.slice(0, HISTORY_COLLAPSED_LIMIT);
-  const hasMoreHistory = historyEvents.length > HISTORY_COLLAPSED_LIMIT;
-  const historyOverflow = Math.max(
-    0,
-    historyEvents.length - HISTORY_EXPANDED_LIMIT,
-  );
+  const hasMoreHistory =
+    historyEvents.length > HISTORY_COLLAPSED_LIMIT || historyNextCursor != null;
 
   // Field order and visibility rules live in buildMarkingFields so
   // ContributionDetail renders the same sequence.
@@ -908,15 +924,21 @@ const RecordDetail = () => {
                               size="sm"
                               onClick={() => setHistoryExpanded((v) => !v)}
                             >
-                              {historyExpanded
-                                ? "Show only latest"
-                                : `Show recent history (up to ${HISTORY_EXPANDED_LIMIT})`}
+                              {historyExpanded ? "Show only latest" : "Show recent history"}
                             </Button>
-                            {historyExpanded && historyOverflow > 0 && (
-                              <span className="text-xs text-muted-foreground">
-                                {historyOverflow} older event
-                                {historyOverflow === 1 ? "" : "s"} not shown
-                              </span>
+                            {historyExpanded && historyNextCursor != null && (
+                              <Button
+                                type="button"
+                                variant="ghost"
+                                size="sm"
+                                disabled={historyLoadingOlder}
+                                onClick={loadOlderHistory}
+                              >
+                                {historyLoadingOlder && (
+                                  <Loader2 className="h-4 w-4 animate-spin" />
+                                )}
+                                Load older events
+                              </Button>
                             )}
                           </div>
                         )}
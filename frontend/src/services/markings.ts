@@ -19,7 +19,7 @@ import {
  * Endpoints (under /api/v2):
  *   GET    /markings/                       list, paginated
  *   GET    /markings/{id}/                  detail
- *   GET    /markings/{id}/changelog/        version history
+ *   GET    /markings/{id}/changelog/        version history, newest first, paged by cursor
  *   POST   /markings/{id}/restore-version/  restore prior version
  *   POST   /markings/{id}/remove/           soft-remove into recycle bin
  *   POST   /markings/{id}/restore/          restore from recycle bin
@@ -341,6 +341,8 @@ export interface MarkingChangelogResponse {
   events: MarkingChangelogEvent[];
   versions: MarkingVersionRow[];
   approved_versions?: MarkingVersionRow[];
+  /** Pass back as `cursor` for the next older page; null on the last page. */
+  next_cursor: number | null;
 }
 
 export interface MarkingYearRange {
@@ -724,11 +726,25 @@ export async function reorderImages(
   return results.every((row) => row !== null);
 }
 
-export async function getMarkingChangelog(markingId: number): Promise<MarkingChangelogResponse | null> {
+/** Events per Record History page; the server's default page is larger. */
+export const MARKING_CHANGELOG_PAGE_SIZE = 10;
+
+/**
+ * One page of a marking's changelog, newest first. Omit `cursor` for the
+ * latest events; pass the previous page's `next_cursor` for older ones.
+ */
+export async function getMarkingChangelog(
+  markingId: number,
+  cursor?: number | null,
+): Promise<MarkingChangelogResponse | null> {
   try {
     const res = await apiClient.get<MarkingChangelogResponse>(
       `/markings/${markingId}/changelog/`,
       {
+        params: {
+          limit: MARKING_CHANGELOG_PAGE_SIZE,
+          ...(cursor != null ? { cursor } : {}),
+        },
         withCredentials: true,
         headers: { Accept: "application/json" },
       }
@@ -0,0 +1,293 @@
+"""ascc_cache.py -- append-only journal caches for the ASCC OCR tools.
+
+Every model response ascc_page_processor.py and ascc_page_extract.py
+pay for is cached on disk so re-runs skip it. A cache is a JSONL
+journal:
+
+    {"model": "...", "prompt_version": "..."}          header (line 1)
+    {"key": "page-0419-0001", "value": {...}}          set
+    {"key": "page-0419-0001", "deleted": true}         delete
+
+Each change is one line appended with a single write(2) on an O_APPEND
+descriptor, so saving an entry costs the same whether the cache holds
+10 entries or 10,000, and a crash can at worst leave a torn final line,
+which load_cache() drops. Once dead lines (overwritten or deleted keys)
+outnumber live ones the journal is compacted: rewritten to a temp file
+and os.replace()d into place, so the file on disk is always whole.
+
+Several processes may share a journal (every stage and basename shares
+the ResponseStore's). Appends and rewrites hold an exclusive flock(2) on
+a sidecar `<journal>.lock` file -- not on the journal itself, which a
+rewrite replaces. A rewrite first re-reads the journal under that lock,
+so entries other processes appended since this one loaded are kept, and
+an append after another process's rewrite reopens the new file instead
+of writing to the replaced one.
+
+Later lines win. To hand-edit an entry, edit its line (after a
+compaction each key has exactly one) or append a corrected one.
+
+Caches written by older versions as a single JSON document at the same
+path with a .json suffix are read transparently and converted to a
+journal on the first write; the old file is left in place.
+
+Below the per-stage caches (keyed by page / chunk position) sits one
+ResponseStore shared by every stage and basename: raw model replies
+keyed on (sha256 of the PNG bytes sent, model, prompt id). Re-chunking
+a page with different cut points re-uses the reply for every image
+whose pixels did not change, so only images that actually changed cost
+a call.
+"""
+
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Never compact journals shorter than this; below it a rewrite is not
+# worth the I/O.
+COMPACT_MIN_LINES = 1000
+
+# Shared content-addressed store; cwd-relative like the per-basename
+# caches (run the tools from tools/). The store's journal header carries
+# RESPONSE_STORE_FORMAT instead of a model id: the model is part of every
+# key, so one file serves all models.
+RESPONSE_STORE_PATH   = Path("./wip/cache/vision_responses.jsonl")
+RESPONSE_STORE_FORMAT = "sha256-model-prompt/1"
+
+
+class JournalCache:
+    """In-memory view of one journal: `responses` is a plain dict for
+    reads; every change goes through put/delete/clear so it reaches
+    disk. Safe to share between threads and processes; `responses` only
+    picks up other processes' entries when this one rewrites the
+    journal."""
+
+    def __init__(self, path, model, prompt_version):
+        self.path = Path(path)
+        self.model = model
+        self.prompt_version = prompt_version
+        self.responses = {}
+        self._lines = 0        # entry lines currently in the journal file
+        self._fd = None
+        self._rewrite_first = True  # no usable journal on disk yet
+        self._lock = threading.Lock()
+        self._lock_fd = None   # sidecar file held under flock(2)
+
+    def put(self, key, value):
+        """Store `value` (any JSON-serialisable object) under `key`."""
+        with self._lock, self._file_lock():
+            self.responses[key] = value
+            self._append({"key": key, "value": value})
+
+    def delete(self, key):
+        with self._lock, self._file_lock():
+            if self.responses.pop(key, None) is not None:
+                self._append({"key": key, "deleted": True})
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            self.responses.clear()
+            self._rewrite(merge=False)
+
+    def compact(self):
+        """Rewrite the journal with one line per live key."""
+        with self._lock, self._file_lock():
+            self._rewrite()
+
+    def _header(self):
+        return {"model": self.model, "prompt_version": self.prompt_version}
+
+    @contextmanager
+    def _file_lock(self):
+        if self._lock_fd is None:
+            lock_path = self.path.with_name(self.path.name + ".lock")
+            self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _append(self, record):
+        if self._rewrite_first:
+            self._rewrite(pending=record)
+            return
+        if self._fd is not None and self._replaced():
+            os.close(self._fd)
+            self._fd = None
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        os.write(self._fd, (json.dumps(record) + "\n").encode())
+        self._lines += 1
+        if (self._lines > COMPACT_MIN_LINES
+                and self._lines > 2 * len(self.responses)):
+            self._rewrite()
+
+    def _replaced(self):
+        """True if another process has os.replace()d the journal since
+        this one opened it."""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._fd).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reload(self):
+        """Adopt the on-disk journal if it is ours (same header). Call
+        with the file lock held."""
+        if not self.path.exists():
+            return
+        try:
+            header, responses, _count, _intact = _read_journal(self.path)
+        except ValueError:
+            return
+        if header == self._header():
+            self.responses = responses
+
+    def _rewrite(self, merge=True, pending=None):
+        """Write the journal afresh. With `merge`, start from what is on
+        disk (other processes' appends included) and apply `pending`, the
+        record that has not reached the journal yet."""
+        if merge:
+            self._reload()
+        if pending is not None:
+            if pending.get("deleted"):
+                self.responses.pop(pending["key"], None)
+            else:
+                self.responses[pending["key"]] = pending["value"]
+        lines = [json.dumps(self._header())]
+        lines.extend(json.dumps({"key": key, "value": value})
+                     for key, value in self.responses.items())
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as fh:
+            fh.write("\n".join(lines) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._lines = len(self.responses)
+        self._rewrite_first = False
+
+
+def _read_journal(path):
+    """Return (header, responses, entry_lines, intact). A torn final line
+    (no trailing newline, not valid JSON) is dropped and reported as
+    intact=False; a bad line anywhere else is an error."""
+    text = path.read_text()
+    lines = text.split("\n")
+    intact = text.endswith("\n")
+    if intact:
+        lines.pop()
+    header = json.loads(lines[0]) if lines and lines[0] else {}
+    responses = {}
+    count = 0
+    for lineno, line in enumerate(lines[1:], 2):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            if lineno == len(lines) and not intact:
+                break
+            raise ValueError(f"{path}:{lineno}: not a JSON journal line")
+        count += 1
+        if record.get("deleted"):
+            responses.pop(record["key"], None)
+        else:
+            responses[record["key"]] = record["value"]
+    return header, responses, count, intact
+
+
+def load_cache(path, model, version):
+    """Load the journal at `path`, invalidating it if model/prompt_version
+    changed. An invalidated journal is only replaced on the first write,
+    so a run that makes no calls leaves it alone."""
+    path = Path(path)
+    cache = JournalCache(path, model, version)
+    legacy = path.with_suffix(".json")
+    if path.exists():
+        header, responses, count, intact = _read_journal(path)
+    elif legacy.exists():
+        header = json.loads(legacy.read_text())
+        responses, count, intact = header.pop("responses", {}), 0, False
+    else:
+        return cache
+    if header.get("model") != model or header.get("prompt_version") != version:
+        print(
+            f"cache invalidated at {path.name} "
+            f"(was model={header.get('model')!r}, "
+            f"prompt={header.get('prompt_version')!r})"
+        )
+        return cache
+    cache.responses = responses
+    cache._lines = count
+    # Appending after a torn line would glue the new record onto it, and a
+    # legacy cache has no journal yet; both get a full rewrite first.
+    cache._rewrite_first = not intact
+    return cache
+
+
+class ResponseStore:
+    """Content-addressed cache of raw vision-model replies.
+
+    fetch() returns the stored reply for (image, model, prompt_id) or runs
+    call() and stores what it returns. prompt_id names the prompt and its
+    version (e.g. "blocks/g1"): bump the version and old replies simply stop
+    matching. Lookups for prompt ids in `refresh` (and fetch(refresh=True))
+    are skipped -- the fresh reply still replaces the stored one -- which
+    is how --force reaches past this layer. Safe to share between threads;
+    concurrent fetches of the same uncached key make one call, the others
+    wait for its reply.
+    """
+
+    def __init__(self, path=RESPONSE_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal = load_cache(self.path, "*", RESPONSE_STORE_FORMAT)
+        self.refresh = set()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight = {}    # key -> Event set when its call finishes
+
+    @staticmethod
+    def key(image_b64, model, prompt_id):
+        digest = hashlib.sha256(base64.standard_b64decode(image_b64)).hexdigest()
+        return f"{digest}|{model}|{prompt_id}"
+
+    def fetch(self, image_b64, model, prompt_id, call, refresh=False):
+        key = self.key(image_b64, model, prompt_id)
+        if refresh or prompt_id in self.refresh:
+            return self._call(key, call)
+        while True:
+            with self._lock:
+                raw = self._journal.responses.get(key)
+                if raw is not None:
+                    self.hits += 1
+                    return raw
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._inflight[key] = threading.Event()
+                    break
+            # Another thread is asking the model for this exact image; take
+            # its reply (or, if that call failed, try again ourselves).
+            pending.wait()
+        try:
+            return self._call(key, call)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def _call(self, key, call):
+        raw = call()
+        with self._lock:
+            self.misses += 1
+        self._journal.put(key, raw)
+        return raw
+
+    def __len__(self):
+        return len(self._journal.responses)
@@ -5,6 +5,11 @@ Hoistable function and constant definitions live at module scope;
 functions or constants that depend on runtime pipeline state remain
 inside main(). AUDIT_TS honors the ASCC_AUDIT_TS env var when set, for
 diffable test runs.
+
+Per-row parsing stages run as batched passes over column values (the
+munger.* helpers that return plain dicts / tuples) rather than
+DataFrame.apply(axis=1), which builds a Series for every row on the way in
+and on the way out. --profile prints the wall-clock time of each stage.
 """
 import argparse
 import hashlib
@@ -18,20 +23,21 @@ import mimetypes
 from pathlib import Path
 from PIL import Image as PILImage
 
-from munger.assembly import LETTERING_SEEDS, SHAPE_SEEDS, _nkey, confidence_level, dt_date, resolve_effective_shape, resolve_shape_name
-from munger.classify import RELATIONSHIP_PATTERN, TRAILING_VALUE_PATTERN, _csv_manuscript_truthy, classify_entry, detect_cross_reference, detect_fragment, detect_structural_anatomy
-from munger.export import AUDIT_TAIL, AUDIT_USER_ID, INT_COLS, _by_listing, _cast_int_columns, _resolve_int_fk, _src_row_by
-from munger.fields import _split_ms_date_token, classify_all_fields, classify_paren_field, subparse_fields, triage_other_field
+from munger.assembly import LETTERING_SEEDS, SHAPE_SEEDS, _nkey, confidence_level, dt_date, effective_shape, resolve_shape_name
+from munger.classify import RELATIONSHIP_PATTERN, TRAILING_VALUE_PATTERN, classify_signals, csv_manuscript_flags, detect_cross_reference, detect_fragment, detect_structural_anatomy_columns
+from munger.export import AUDIT_TAIL, AUDIT_USER_ID, INT_COLS, _by_listing, _cast_int_columns, _resolve_int_fk, _src_rows_by
+from munger.fields import SUBPARSE_COLUMNS, _split_ms_date_token, classify_all_fields, classify_paren_field, subparse_field_lists, triage_other_field
 from munger.fields.colors import parse_color_field
 from munger.fields.dates import parse_date_field
 from munger.fields.rates import RATE_BRACKET_RE, parse_rate_token, split_rate_tokens
 from munger.fields.sizes import parse_size_field
-from munger.head import parse_head, parse_manuscript_row
+from munger.head import HEAD_COLUMNS, parse_head_text, parse_manuscript_text
 from munger.images import MEDIA_ROOT
 from munger.io import OPTIONAL_COLS, REQUIRED_COLS, process_meta_rows
 from munger.rate_assembly import BRACKET_DIM_RE, BRACKET_SHAPE_MAP, _date_cls, _tm_codes_by_listing, parse_rate_amount
+from munger.profiling import StageTimer
 from munger.relationships import OR_ALIAS_RE, TOWN_HEADING_RE, _is_abbrev_of, _norm_for_alias, resolve_relationships, roll_up_catalog_text
-from munger.segment import classify_entry_form, decompose_tail, segment_entry, split_paren_fields, split_valuation_tiers
+from munger.segment import SEGMENT_COLUMNS, TAIL_COLUMNS, decompose_tail_text, entry_form, segment_text, split_paren_text, split_valuation_tiers
 from munger.text_utils import strip_dot_leaders
 
 def main(argv=None):
@@ -39,7 +45,10 @@ def main(argv=None):
     ap.add_argument("--input", default="./wip/in/VA_ASCC_CTLG.csv")
     ap.add_argument("--input-dir", default=None)
     ap.add_argument("--out-dir", default="./wip/out/")
+    ap.add_argument("--profile", action="store_true",
+                    help="Print the wall-clock time of each pipeline stage at the end.")
     args = ap.parse_args(argv)
+    profile = StageTimer(enabled=args.profile)
 
     INPUT_CSV = args.input
     INPUT_DIR = args.input_dir if args.input_dir is not None else (os.path.dirname(INPUT_CSV) + "/")
@@ -49,6 +58,7 @@ def main(argv=None):
     # ======================================================================
     # 0. Setup
     # ======================================================================
+    profile.stage('setup')
     # INPUT_CSV / INPUT_DIR / OUT_DIR supplied by main() argparse.
     REGION_ABBREV = os.path.basename(INPUT_CSV)[:2].upper()
     _rw_seed = pd.read_csv(os.path.join(INPUT_DIR, 'reference_works.csv'))
@@ -90,11 +100,12 @@ def main(argv=None):
     # ======================================================================
     # 1. Preprocessing
     # ======================================================================
+    profile.stage('preprocessing + signals')
     df['clean_text'] = df['Listing'].apply(strip_dot_leaders)
     print('Sample cleaned entries:')
     for t in df['clean_text'].head(5):
         print(f'  {t}')
-    df['is_manuscript_section'] = df.apply(_csv_manuscript_truthy, axis=1)
+    df['is_manuscript_section'] = csv_manuscript_flags(df)
     print(f'Manuscript-section rows detected: '
           f'{int(df["is_manuscript_section"].sum())} / {len(df)}')
 
@@ -221,7 +232,7 @@ def main(argv=None):
     # ======================================================================
     # Signal 5: Core Structural Anatomy
     # ======================================================================
-    anatomy = df['clean_text'].apply(detect_structural_anatomy).apply(pd.Series)
+    anatomy = detect_structural_anatomy_columns(df['clean_text'])
     df['s5_semicolon_paren'] = anatomy['semicolon_paren']
     df['s5_four_digit_year'] = anatomy['four_digit_year']
     df['s5_decade_ref'] = anatomy['decade_ref']
@@ -246,7 +257,14 @@ def main(argv=None):
     # ======================================================================
     # 3. Classification
     # ======================================================================
-    classifications = df.apply(classify_entry, axis=1, result_type='expand')
+    profile.stage('classification')
+    classifications = pd.DataFrame(
+        [classify_signals(*flags) for flags in zip(
+            df['s1_relationship'], df['s2_cross_ref'], df['s3_fragment'],
+            df['s4_trailing_value'], df['s5_anatomy'],
+        )],
+        index=df.index, columns=[0, 1, 2],
+    )
     df['classification'] = classifications[0]
     df['confidence'] = classifications[1]
     df['reason'] = classifications[2]
@@ -313,9 +331,13 @@ def main(argv=None):
     # ======================================================================
     # 2.1 Entry Form Classification
     # ======================================================================
+    profile.stage('step 2: segmentation')
     listings = df[df['classification'] == 'listing'].copy()
     print(f'Segmenting {len(listings)} listings')
-    listings['entry_form'] = listings.apply(classify_entry_form, axis=1)
+    listings['entry_form'] = [
+        entry_form(text, rel, ms) for text, rel, ms in zip(
+            listings['clean_text'], listings['s1_relationship'], listings['is_manuscript_section'])
+    ]
     print()
     print('Entry form distribution:')
     for form, count in listings['entry_form'].value_counts().items():
@@ -324,7 +346,10 @@ def main(argv=None):
     # ======================================================================
     # 2.2 Segmentation
     # ======================================================================
-    segments = listings.apply(segment_entry, axis=1)
+    segments = pd.DataFrame(
+        [segment_text(text, form) for text, form in zip(listings['clean_text'], listings['entry_form'])],
+        index=listings.index, columns=SEGMENT_COLUMNS,
+    )
     listings = pd.concat([listings, segments], axis=1)
     non_ms_errors = listings[
         listings['seg_error'].notna() & (listings['entry_form'] != 'manuscript')
@@ -350,7 +375,8 @@ def main(argv=None):
     listings['ms_date_text'] = pd.Series([None] * len(listings), index=listings.index, dtype='object')
     ms_mask = listings['is_manuscript_section'].fillna(False)
     if ms_mask.any():
-        ms_parsed = listings[ms_mask].apply(parse_manuscript_row, axis=1)
+        ms_text = listings.loc[ms_mask, 'clean_text']
+        ms_parsed = pd.DataFrame([parse_manuscript_text(text) for text in ms_text], index=ms_text.index)
         # Cast target columns to object dtype before scatter-assign; the
         # placeholder None values from segment_entry made them float64,
         # which cannot accept the string values produced by the overlay.
@@ -447,7 +473,8 @@ def main(argv=None):
     # ======================================================================
     # 3.1 Paren Field Splitting
     # ======================================================================
-    listings['paren_fields'] = listings.apply(split_paren_fields, axis=1)
+    profile.stage('step 3: paren fields + tail')
+    listings['paren_fields'] = [split_paren_text(paren) for paren in listings['seg_paren']]
     listings['paren_field_count'] = listings['paren_fields'].apply(len)
     print('Paren field count distribution:')
     fc = listings['paren_field_count'].value_counts().sort_index()
@@ -467,7 +494,10 @@ def main(argv=None):
     # ======================================================================
     # 3.2 Tail Decomposition
     # ======================================================================
-    tail_parts = listings.apply(decompose_tail, axis=1)
+    tail_parts = pd.DataFrame(
+        [decompose_tail_text(tail, form) for tail, form in zip(listings['seg_tail'], listings['entry_form'])],
+        index=listings.index, columns=TAIL_COLUMNS,
+    )
     listings = pd.concat([listings, tail_parts], axis=1)
     errors = listings[listings['tail_error'].notna()]
     print(f'Tail decomposition errors: {len(errors)} / {len(listings)}')
@@ -546,7 +576,11 @@ def main(argv=None):
     # ======================================================================
     # Step 4: Head Parsing
     # ======================================================================
-    head_parts = listings.apply(parse_head, axis=1)
+    profile.stage('step 4: head parsing')
+    head_parts = pd.DataFrame(
+        [parse_head_text(head, rel) for head, rel in zip(listings['seg_head'], listings['s1_relationship'])],
+        index=listings.index, columns=HEAD_COLUMNS,
+    )
     listings = pd.concat([listings, head_parts], axis=1)
     print(f'Step 4: Head parsing applied to {len(listings)} listings')
     print(f'  First-of-town markers: {listings["head_first_of_town"].sum()}')
@@ -625,6 +659,7 @@ def main(argv=None):
     # ======================================================================
     # Step 5: Paren Field-Type Classification
     # ======================================================================
+    profile.stage('step 5: field types')
     assert classify_paren_field('April 8,1800') == 'date'
     assert classify_paren_field('1850-53') == 'date'
     assert classify_paren_field("1850's") == 'date'
@@ -701,13 +736,17 @@ def main(argv=None):
     else:
         print(f'=== UNCLASSIFIED FIELDS ({len(other_fields)}) ===')
         print()
+        # First listing carrying each field text, indexed in one pass
+        # instead of rescanning every listing per field.
+        first_listing_with = {}
+        for pos, pf in enumerate(listings['paren_fields']):
+            for text in pf:
+                first_listing_with.setdefault(text, pos)
         for _, frow in other_fields.iterrows():
             # Find the parent listing
-            match = listings[
-                listings['paren_fields'].apply(lambda pf: frow['field_text'] in pf)
-            ]
-            if len(match):
-                first = match.iloc[0]
+            pos = first_listing_with.get(frow['field_text'])
+            if pos is not None:
+                first = listings.iloc[pos]
                 print(f'  field={frow["field_text"]!r}  pos={frow["position"]}')
                 print(f'    fields={first["paren_fields"]}')
                 print(f'    types={first["paren_field_types"]}')
@@ -718,12 +757,14 @@ def main(argv=None):
         non_date_pos0 = pos0[pos0['field_type'] != 'date']
         print(f'Position 0 non-date fields: {len(non_date_pos0)} / {len(pos0)}')
         if len(non_date_pos0):
+            first_listing_led_by = {}
+            for pos, pf in enumerate(listings['paren_fields']):
+                if len(pf) > 0:
+                    first_listing_led_by.setdefault(pf[0], pos)
             for _, frow in non_date_pos0.iterrows():
-                match = listings[
-                    listings['paren_fields'].apply(lambda pf: len(pf) > 0 and pf[0] == frow['field_text'])
-                ]
-                if len(match):
-                    first = match.iloc[0]
+                pos = first_listing_led_by.get(frow['field_text'])
+                if pos is not None:
+                    first = listings.iloc[pos]
                     print(f'  {frow["field_type"]}: {frow["field_text"]!r}')
                     print(f'    raw: {first["clean_text"][:120]}')
                     print()
@@ -761,6 +802,7 @@ def main(argv=None):
     # ======================================================================
     # Step 6: Field-Level Sub-Parsing
     # ======================================================================
+    profile.stage('step 6: field sub-parsing')
     assert parse_date_field('April 8,1800') == {
         'date_month': 4, 'date_day': 8, 'date_year_start': 1800,
         'date_year_end': 1800, 'date_granularity': 'DAY',
@@ -867,13 +909,18 @@ def main(argv=None):
     assert triage_other_field('Red,Purple,Blue,Brownish')[0] == 'color'
     assert triage_other_field('Double 50')[0] == 'rate'
     print('Other-field triage self-tests passed')
-    parsed = listings.apply(subparse_fields, axis=1)
+    manuscript_cells = listings['Manuscript'] if 'Manuscript' in listings.columns else [None] * len(listings)
+    parsed = pd.DataFrame(
+        [subparse_field_lists(fields, types, ms) for fields, types, ms in zip(
+            listings['paren_fields'], listings['paren_field_types'], manuscript_cells)],
+        index=listings.index, columns=SUBPARSE_COLUMNS,
+    )
     listings = pd.concat([listings, parsed], axis=1)
     print('Step 6: Field-level sub-parsing applied')
     print(f'  Listings processed: {len(listings)}')
     print(f'  Manuscript entries: {listings["is_manuscript"].sum()}')
     if 'Manuscript' in listings.columns:
-        csv_ms_hits = listings.apply(_csv_manuscript_truthy, axis=1).sum()
+        csv_ms_hits = sum(csv_manuscript_flags(listings))
         print(f'    (of which CSV Manuscript column contributed: {csv_ms_hits})')
     print(f'  Entries with dates: {listings["parsed_dates"].apply(len).gt(0).sum()}')
     print(f'  Entries with sizes: {listings["parsed_sizes"].apply(len).gt(0).sum()}')
@@ -1001,6 +1048,7 @@ def main(argv=None):
     # ======================================================================
     # Step 7: Relationship Resolution
     # ======================================================================
+    profile.stage('step 7: relationships')
     listings = resolve_relationships(listings)
     listings = roll_up_catalog_text(listings)
     print(f'Step 7: Relationship resolution applied to {len(listings)} listings')
@@ -1280,6 +1328,7 @@ def main(argv=None):
     # ======================================================================
     # 8.1 Value Table Construction
     # ======================================================================
+    profile.stage('step 8.1: value tables')
     shapes_df = pd.DataFrame({
         'shape_id': range(1, len(SHAPE_SEEDS) + 1),
         'name': SHAPE_SEEDS,
@@ -1320,15 +1369,17 @@ def main(argv=None):
     # ======================================================================
     # 8.2 Effective Shape Resolution
     # ======================================================================
-    shape_resolution = listings.apply(
-        lambda row: pd.Series(resolve_effective_shape(row),
-                              index=['effective_shape_code', 'shape_source']),
-        axis=1
+    profile.stage('step 8.2: effective shape')
+    default_shapes = listings['Default Shape'] if 'Default Shape' in listings.columns else [None] * len(listings)
+    shape_resolution = pd.DataFrame(
+        [effective_shape(ms, sizes, default) for ms, sizes, default in zip(
+            listings['is_manuscript_section'], listings['parsed_sizes'], default_shapes)],
+        index=listings.index, columns=['effective_shape_code', 'shape_source'],
     )
     listings = pd.concat([listings, shape_resolution], axis=1)
-    resolved = listings['effective_shape_code'].apply(
-        lambda c: pd.Series(resolve_shape_name(c),
-                            index=['shape_name', 'shape_error'])
+    resolved = pd.DataFrame(
+        [resolve_shape_name(code) for code in listings['effective_shape_code']],
+        index=listings.index, columns=['shape_name', 'shape_error'],
     )
     listings = pd.concat([listings, resolved], axis=1)
     listings['shape_id'] = listings['shape_name'].apply(
@@ -1364,6 +1415,7 @@ def main(argv=None):
     # ======================================================================
     # 8.25 Image Flow-Down Pre-Pass
     # ======================================================================
+    profile.stage('step 8.25: image flow-down')
     # Catalog layout convention: when N images sit directly above a listing,
     # only the first (counter=1, top-left in reading order) belongs to that
     # listing; images 2..N "flow down" to the next listing in catalog order,
@@ -1416,6 +1468,7 @@ def main(argv=None):
     # ======================================================================
     # 8.3 Color Fan-Out
     # ======================================================================
+    profile.stage('step 8.3: color fan-out')
     expanded_rows = []
     next_townmark_id = 1
     for idx, row in listings.iterrows():
@@ -1463,6 +1516,7 @@ def main(argv=None):
     # ======================================================================
     # 8.4 Townmark Record Assembly
     # ======================================================================
+    profile.stage('step 8.4: townmarks')
     def build_townmark(fan_row):
         """Assemble a single Townmark record from a fan-out row + source listing."""
         src = listings.loc[fan_row['source_listing_idx']]
@@ -1630,6 +1684,7 @@ def main(argv=None):
     # ======================================================================
     # 8.5 DateObserved Assembly
     # ======================================================================
+    profile.stage('step 8.5: dates observed')
     date_rows = []
     next_date_id = 1
     for _, pm in townmarks_df.iterrows():
@@ -1715,6 +1770,7 @@ def main(argv=None):
     # ======================================================================
     # 8.6 Valuation Assembly
     # ======================================================================
+    profile.stage('step 8.6: valuations')
     val_rows = []
     next_val_id = 1
     for _, pm in townmarks_df.iterrows():
@@ -1754,6 +1810,7 @@ def main(argv=None):
     # ======================================================================
     # 8.8 PostOffice Normalization
     # ======================================================================
+    profile.stage('step 8.8: post offices')
     _apostrophe_re = re.compile(r"[\u2019']")  # straight + curly apostrophe
     _amp_re        = re.compile(r"\s*&\s*")
     _strip_punct   = re.compile(r"[,/=()\[\]:`*]")
@@ -1874,6 +1931,7 @@ def main(argv=None):
     # ======================================================================
     # 8.9 Assembly Confidence
     # ======================================================================
+    profile.stage('step 8.9: assembly confidence')
     def compute_assembly_warnings(pm_row):
         """Collect all warnings applicable to a single townmark."""
         src = listings.loc[pm_row['source_listing_idx']]
@@ -2048,6 +2106,7 @@ def main(argv=None):
     # ======================================================================
     # 9.1 Rate Amount Parsing
     # ======================================================================
+    profile.stage('step 9: ratemarks')
     assert parse_rate_amount('5') == (5.0, False)
     assert parse_rate_amount('25') == (25.0, False)
     assert parse_rate_amount('12-1/2') == (12.5, False)
@@ -2595,6 +2654,7 @@ def main(argv=None):
     # ======================================================================
     # Step 10: Output
     # ======================================================================
+    profile.stage('step 10: output')
     os.makedirs(OUT_DIR, exist_ok=True)
     _emitted_listing_idxs = set()
     for _frame in (townmarks_df, ratemarks_df, auxmarks_df):
@@ -2711,22 +2771,32 @@ def main(argv=None):
             _lines.append(_see.strip())
         if _lines:
             desc_by_listing[_lidx] = "\n".join(_lines)
+    # Source rows keyed by id, looked up once per emitted marking.
+    src_rows = {
+        "TM": _src_rows_by(townmarks_df, "townmark_id"),
+        "RM": _src_rows_by(ratemarks_df, "ratemark_id"),
+        "AX": _src_rows_by(auxmarks_df, "auxmark_id"),
+    }
+    tm_by_listing = (
+        _src_rows_by(townmarks_df, "source_listing_idx")
+        if townmarks_df is not None and "post_office_id" in townmarks_df.columns else {}
+    )
     marking_rows = []
     for kind, src_id, mk_id in emit_order:
         if kind == "TM":
-            r = _src_row_by(townmarks_df, "townmark_id", src_id)
+            r = src_rows["TM"].get(src_id)
             type_label = "TOWNMARK"
             rate_val = None
             catalog_txt = r.get("catalog_text") if r is not None else None
             date_fmt = r.get("date_format") if r is not None else None
         elif kind == "RM":
-            r = _src_row_by(ratemarks_df, "ratemark_id", src_id)
+            r = src_rows["RM"].get(src_id)
             type_label = "RATEMARK"
             rate_val = r.get("rate_value") if r is not None else None
             catalog_txt = catalog_text_by_listing.get(r.get("source_listing_idx")) if r is not None else None
             date_fmt = None
         else:
-            r = _src_row_by(auxmarks_df, "auxmark_id", src_id)
+            r = src_rows["AX"].get(src_id)
             type_label = "AUXMARK"
             rate_val = None
             catalog_txt = catalog_text_by_listing.get(r.get("source_listing_idx")) if r is not None else None
@@ -2738,10 +2808,9 @@ def main(argv=None):
         if po_internal is None or (isinstance(po_internal, float) and pd.isna(po_internal)):
             # Fall back to the listing's townmark post_office (same convention as
             # the previous notebook). Pull from townmarks_df keyed by listing.
-            if townmarks_df is not None and "post_office_id" in townmarks_df.columns:
-                sel = townmarks_df[townmarks_df["source_listing_idx"] == src_idx]
-                if len(sel):
-                    po_internal = sel.iloc[0]["post_office_id"]
+            first_tm = tm_by_listing.get(src_idx)
+            if first_tm is not None:
+                po_internal = first_tm["post_office_id"]
         is_ms = bool(r.get("is_manuscript"))
         shape_int = r.get("shape_id")
         shape_id = _resolve_int_fk(shape_id_by_internal, shape_int)
@@ -2824,11 +2893,11 @@ def main(argv=None):
     cit_rows = []
     for kind, src_id, mk_id in emit_order:
         if kind == "TM":
-            r = _src_row_by(townmarks_df, "townmark_id", src_id)
+            r = src_rows["TM"].get(src_id)
         elif kind == "RM":
-            r = _src_row_by(ratemarks_df, "ratemark_id", src_id)
+            r = src_rows["RM"].get(src_id)
         else:
-            r = _src_row_by(auxmarks_df, "auxmark_id", src_id)
+            r = src_rows["AX"].get(src_id)
         if r is None:
             continue
         src_idx = r.get("source_listing_idx")
@@ -2888,6 +2957,7 @@ def main(argv=None):
     # ======================================================================
     # Step 11: Images Table Assembly
     # ======================================================================
+    profile.stage('step 11: images')
     IMAGES_SUBDIR = REGION_ABBREV.lower()  # e.g. 'va'
     pm_to_final_id = marking_id_by_tm
     image_rows = []
@@ -2985,6 +3055,7 @@ def main(argv=None):
     images_out[_img_emit_cols].to_csv(_img_path, index=False)
     print(f'  {"images.csv":<22s} {len(images_out):>5d} rows  ->  {_img_path}')
     print(f'  (tracing images: all, is_tracing=True, image_view=FULL)')
+    profile.report()
 
 
 if __name__ == "__main__":
@@ -81,6 +81,11 @@ from ascc_page_extract import (     # noqa: E402
     discover_chunks,
     parse_pages_arg,
 )
+from ascc_runs import (             # noqa: E402
+    dark_mask,
+    long_runs,
+    true_runs,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -206,26 +211,19 @@ def _find_fine_blank_gap(im, y0, y1, min_gap_rows=2, skip_top_rows=20):
     in image-local Y coordinates, or None if no qualifying gap exists.
     """
     arr = np.array(im.crop((0, y0, im.size[0], y1 + 1)).convert("L"))
-    H, W = arr.shape
     # Mirror find_blocks: center 90% of width, dark < 180, row 'dark' if >=2.
-    left = int(W * 0.05)
-    right = int(W * 0.95)
-    center = arr[:, left:right]
-    dark_per_row = (center < COL_DARK_BRIGHTNESS_MAX).sum(axis=1)
-    is_blank = dark_per_row < COL_DARK_MIN_PIXELS
-
-    run_start = None
-    for y in range(H):
-        if is_blank[y]:
-            if run_start is None:
-                run_start = y
-        else:
-            if run_start is not None:
-                length = y - run_start
-                if length >= min_gap_rows and run_start >= skip_top_rows:
-                    return (y0 + run_start, y0 + y)
-                run_start = None
-    return None
+    is_dark = dark_mask(arr, COL_DARK_BRIGHTNESS_MAX, COL_DARK_MIN_PIXELS, 0.05)
+
+    # Only gaps closed by a dark row below them count; a blank tail is not
+    # a boundary.
+    starts, ends = true_runs(~is_dark)
+    closed = ends < len(is_dark)
+    starts, ends = long_runs(starts[closed], ends[closed], min_gap_rows)
+    hits = np.flatnonzero(starts >= skip_top_rows)
+    if not len(hits):
+        return None
+    i = hits[0]
+    return (y0 + int(starts[i]), y0 + int(ends[i]))
 
 
 def split_chunk(im, expected, verbose, label):
@@ -302,20 +300,8 @@ def _column_candidates(is_dark, y_start, y_stop, W):
     dark_per_col = strip.sum(axis=0)
     has_content = dark_per_col >= COL_DARK_MIN_PIXELS
 
-    raw_runs = []
-    in_run = False
-    start = None
-    for x in range(W):
-        if has_content[x]:
-            if not in_run:
-                in_run = True
-                start = x
-        else:
-            if in_run:
-                raw_runs.append([start, x - 1])
-                in_run = False
-    if in_run:
-        raw_runs.append([start, W - 1])
+    starts, ends = true_runs(has_content)
+    raw_runs = [[int(a), int(b) - 1] for a, b in zip(starts, ends)]
 
     # Pre-filter: drop narrow runs in the page-edge zone BEFORE merging.
     # Two adjacent edge-artifact fragments (e.g. a 1-px bar at x=0 and a
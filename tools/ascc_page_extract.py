@@ -14,10 +14,27 @@ Usage (run from the tools/ directory so relative paths resolve):
     uv run python ascc_page_extract.py VA_ASCC_CTLG --pages 419-420
     uv run python ascc_page_extract.py VA_ASCC_CTLG --pages 419 --force
     uv run python ascc_page_extract.py VA_ASCC_CTLG -v
+    uv run python ascc_page_extract.py VA_ASCC_CTLG --workers 8 --rate 120
+
+Concurrency:
+    --workers N runs N chunk calls at once (ascc_vision_pool.ordered_map);
+    --rate caps HTTP requests per minute across all workers. Transient
+    API errors (429, 5xx, dropped connections) are retried with jittered
+    backoff. Progress lines print in catalog order whatever order the
+    calls finish in, and each response is cached the moment it arrives.
+    Point OPENROUTER_BASE_URL at ascc_stub_model.py to benchmark offline.
 
 Cache:
-    wip/cache/<basename>_extract.json -- one entry per chunk; tagged with
+    wip/cache/<basename>_extract.jsonl -- one entry per chunk; tagged with
     model id and EXTRACT_PROMPT_VERSION; invalidated on either change.
+    Each entry records the sha256 of the PNG it was made from, so a chunk
+    whose pixels changed (the page was re-chunked) is re-queried even
+    though its page/chunk key is cached. Append-only journal (see ascc_cache.py); an older _extract.json is
+    picked up and converted on the first write.
+    wip/cache/vision_responses.jsonl -- raw replies keyed on (PNG sha256,
+    model, EXTRACT_PROMPT_ID), shared with ascc_page_processor.py and
+    every basename. A re-queried chunk whose pixels some earlier chunk
+    already had -- at any position -- is answered from here for free.
 
 Post-filter (cosmetic; the downstream munger reclassifies from scratch):
     1. Bare integers up to 4 digits  -- printed page numbers and their
@@ -37,6 +54,7 @@ Post-filter (cosmetic; the downstream munger reclassifies from scratch):
 import argparse
 import base64
 import csv
+import hashlib
 import json
 import os
 import re
@@ -48,6 +66,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from ascc_cache import ResponseStore, load_cache
+from ascc_vision_pool import (
+    DEFAULT_WORKERS,
+    TokenBucket,
+    call_with_backoff,
+    ordered_map,
+)
+
 
 # Repo-root .env (this script's parent.parent is the repo root).
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
@@ -59,6 +85,7 @@ load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 DEFAULT_MODEL          = "anthropic/claude-sonnet-4.6"
 EXTRACT_PROMPT_VERSION = "v9"
+EXTRACT_PROMPT_ID      = f"extract/{EXTRACT_PROMPT_VERSION}"
 # Claude Sonnet 4.6 advertises a 200K input window and 64K output cap on
 # OpenRouter. 16000 is plenty for a single-chunk extraction (the densest
 # observed chunk has under 30 entries at ~120 tokens each = ~3600
@@ -226,11 +253,17 @@ If a chunk is pure illustration with no catalog text below, return
 # ---------------------------------------------------------------------------
 
 def _make_client():
+    """OpenRouter client. SDK-level retries are off: call_with_backoff
+    owns retrying so every attempt goes through the rate limiter.
+    OPENROUTER_BASE_URL overrides the endpoint (e.g. the local stub)."""
     assert os.environ.get("OPENROUTER_API_KEY"), \
         "OPENROUTER_API_KEY not set in .env"
     return OpenAI(
-        base_url="https://openrouter.ai/api/v1",
+        base_url=os.environ.get(
+            "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"
+        ),
         api_key=os.environ["OPENROUTER_API_KEY"],
+        max_retries=0,
     )
 
 
@@ -245,7 +278,7 @@ class Paths:
         self.basename   = basename
         self.images_dir = Path(f"./wip/in/{basename}")
         self.output_csv = Path(f"./wip/out/{basename}.csv")
-        self.cache_file = Path(f"./wip/cache/{basename}_extract.json")
+        self.cache_file = Path(f"./wip/cache/{basename}_extract.jsonl")
         self.run_log    = Path(f"./wip/cache/{basename}_extract.log")
 
 
@@ -408,19 +441,34 @@ def _parse_partial(text):
     return {"images_above": images_above, "entries": entries}
 
 
-def _call_model(client, model, image_b64, user_prompt):
-    resp = client.chat.completions.create(
-        model=model,
-        max_tokens=EXTRACT_MAX_TOKENS,
-        messages=[
-            {"role": "system", "content": EXTRACT_SYSTEM_PROMPT},
-            {"role": "user", "content": [
-                {"type": "image_url", "image_url": {
-                    "url": f"data:image/png;base64,{image_b64}",
-                }},
-                {"type": "text", "text": user_prompt},
-            ]},
-        ],
+def _call_model(client, model, image_b64, user_prompt, limiter=None,
+                label="", store=None, refresh=False):
+    """Return the model's raw reply for one chunk image. With a store, the
+    reply is served from / saved to the shared content-addressed
+    ResponseStore; refresh=True skips the lookup but still saves."""
+    if store is not None:
+        return store.fetch(
+            image_b64, model, EXTRACT_PROMPT_ID,
+            lambda: _call_model(client, model, image_b64, user_prompt,
+                                limiter=limiter, label=label),
+            refresh=refresh,
+        )
+    resp = call_with_backoff(
+        lambda: client.chat.completions.create(
+            model=model,
+            max_tokens=EXTRACT_MAX_TOKENS,
+            messages=[
+                {"role": "system", "content": EXTRACT_SYSTEM_PROMPT},
+                {"role": "user", "content": [
+                    {"type": "image_url", "image_url": {
+                        "url": f"data:image/png;base64,{image_b64}",
+                    }},
+                    {"type": "text", "text": user_prompt},
+                ]},
+            ],
+        ),
+        limiter=limiter,
+        label=label,
     )
     choice = resp.choices[0]
     content = choice.message.content or ""
@@ -432,10 +480,15 @@ def _call_model(client, model, image_b64, user_prompt):
     return content
 
 
-def extract_chunk(client, model, image_path, page, chunk_seq):
+def extract_chunk(client, model, image_path, page, chunk_seq, limiter=None,
+                  store=None):
     """Send one chunk PNG to the vision model and return the parsed
-    {images_above, entries} dict. Retries once on JSON parse failure;
-    falls back to _parse_partial on a second failure."""
+    {images_above, entries} dict. Retries once on JSON parse failure
+    (bypassing the store, which may hold the bad reply); falls back to
+    _parse_partial on a second failure. Safe to call from worker threads;
+    `limiter` is the shared TokenBucket and `store` the shared
+    ResponseStore, if any."""
+    label = f"page-{page:04d}-{chunk_seq:04d}"
     user_prompt = (
         f"Chunk {chunk_seq} of ASCC catalog page {page}. "
         "Reply with MINIFIED JSON on ONE LINE, no fences, no extra whitespace. "
@@ -443,11 +496,14 @@ def extract_chunk(client, model, image_path, page, chunk_seq):
         'Shape: {"images_above":0,"entries":[{"text":"...","type":"LISTING|META"},...]}\n'
         "No preamble. No explanation. Just the JSON."
     )
-    image_b64 = base64.standard_b64encode(image_path.read_bytes()).decode()
+    png_bytes = image_path.read_bytes()
+    image_b64 = base64.standard_b64encode(png_bytes).decode()
 
     last_raw = ""
-    for _attempt in range(2):
-        raw = _call_model(client, model, image_b64, user_prompt)
+    for attempt in range(2):
+        raw = _call_model(client, model, image_b64, user_prompt,
+                          limiter=limiter, label=label,
+                          store=store, refresh=attempt > 0)
         last_raw = raw
         cleaned = _strip_fences(raw)
         if not cleaned:
@@ -461,7 +517,7 @@ def extract_chunk(client, model, image_path, page, chunk_seq):
         partial = _parse_partial(last_raw)
         if partial is not None:
             print(
-                f"    WARNING: partial parse used "
+                f"    {label}: WARNING: partial parse used "
                 f"({len(partial['entries'])} entries recovered)"
             )
             parsed = partial
@@ -485,30 +541,11 @@ def extract_chunk(client, model, image_path, page, chunk_seq):
         assert r.get("type") in ("LISTING", "META"), \
             f"entry[{i}].type bad: {r.get('type')!r}"
         r["text"] = _compress_leaders(r["text"])
-    return {"images_above": images_above, "entries": entries}
-
-
-# ---------------------------------------------------------------------------
-# Cache (mirrors ascc_page_processor.py)
-# ---------------------------------------------------------------------------
-
-def load_cache(path, model, version):
-    """Load a cache file, invalidating it if model/prompt_version changed."""
-    if not path.exists():
-        return {"model": model, "prompt_version": version, "responses": {}}
-    cache = json.loads(path.read_text())
-    if cache.get("model") != model or cache.get("prompt_version") != version:
-        print(
-            f"cache invalidated at {path.name} "
-            f"(was model={cache.get('model')!r}, "
-            f"prompt={cache.get('prompt_version')!r})"
-        )
-        return {"model": model, "prompt_version": version, "responses": {}}
-    return cache
-
-
-def save_cache(path, cache):
-    path.write_text(json.dumps(cache, indent=2))
+    return {
+        "images_above": images_above,
+        "entries": entries,
+        "image_sha256": hashlib.sha256(png_bytes).hexdigest(),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -572,12 +609,25 @@ def discover_chunks(images_dir):
     return chunks
 
 
-def run_extract(paths, model, page_filter, force, client):
-    """Loop through chunks, query the model where needed, save cache
-    after each call (so a crash mid-loop only loses the in-flight
-    response). Returns (cache, calls_made)."""
+def _image_changed(rec, img_path):
+    """True when a cached response was made from different pixels than
+    the chunk PNG now at img_path (the page was re-chunked since). Entries
+    cached before image hashes were recorded are trusted as-is."""
+    digest = rec.get("image_sha256")
+    return (digest is not None and img_path.exists()
+            and digest != hashlib.sha256(img_path.read_bytes()).hexdigest())
+
+
+def run_extract(paths, model, page_filter, force, client,
+                workers=1, limiter=None, store=None):
+    """Query the model for every uncached in-scope chunk, `workers` calls
+    at a time, and journal each response as it arrives (so a crash
+    mid-run only loses the responses still in flight). Progress lines
+    print in catalog order. On a failure, queued chunks are abandoned,
+    in-flight ones are still saved, then the error is re-raised.
+    Returns (cache, calls_made)."""
     cache = load_cache(paths.cache_file, model, EXTRACT_PROMPT_VERSION)
-    responses = cache["responses"]
+    responses = cache.responses
     chunks = discover_chunks(paths.images_dir)
     if not chunks:
         raise SystemExit(f"no PNGs matched in {paths.images_dir}")
@@ -592,27 +642,47 @@ def run_extract(paths, model, page_filter, force, client):
     else:
         print(f"chunks: {total} total")
 
-    calls_made = 0
+    todo = []
+    changed = 0
     for page, chunk_seq, img_path in in_scope:
         key = f"page-{page:04d}-{chunk_seq:04d}"
         if key in responses and not force:
-            continue
+            if not _image_changed(responses[key], img_path):
+                continue
+            changed += 1
         if not img_path.exists():
             print(f"missing image, skipping: {img_path}")
             continue
-        try:
-            result = extract_chunk(client, model, img_path, page, chunk_seq)
-        except Exception as e:
-            print(f"  {key}: FAILED ({type(e).__name__}: {e})")
-            save_cache(paths.cache_file, cache)
-            raise
-        responses[key] = result
-        save_cache(paths.cache_file, cache)
+        todo.append((key, page, chunk_seq, img_path))
+    if changed:
+        print(f"re-querying {changed} cached chunk(s) whose image changed")
+
+    def _extract(item):
+        _key, page, chunk_seq, img_path = item
+        return extract_chunk(
+            client, model, img_path, page, chunk_seq,
+            limiter=limiter, store=store,
+        )
+
+    def _record(item, result):
+        cache.put(item[0], result)
+
+    calls_made = 0
+    failure = None
+    for (key, _page, _seq, _path), result, error in ordered_map(
+        _extract, todo, workers=workers, on_done=_record
+    ):
+        if error is not None:
+            print(f"  {key}: FAILED ({type(error).__name__}: {error})")
+            failure = failure or error
+            continue
         calls_made += 1
         n = len(result["entries"])
         print(
             f"  {key}: {n:3d} entries, images_above={result['images_above']}"
         )
+    if failure is not None:
+        raise failure
 
     print()
     print(f"calls made: {calls_made}")
@@ -723,7 +793,7 @@ def main(argv=None):
         help=("base name of the catalog (e.g. VA_ASCC_CTLG). Drives the "
               "input dir wip/in/<basename>/, output CSV "
               "wip/out/<basename>.csv, and cache "
-              "wip/cache/<basename>_extract.json."),
+              "wip/cache/<basename>_extract.jsonl."),
     )
     parser.add_argument(
         "--model",
@@ -756,6 +826,21 @@ def main(argv=None):
         help=("re-query every in-scope chunk, ignoring the cache. Scoped "
               "to --pages when set. Default: cached chunks are skipped."),
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(f"number of chunk calls in flight at once. Default: "
+              f"{DEFAULT_WORKERS}. 1 reproduces the old one-at-a-time "
+              f"loop. Output order does not depend on this."),
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help=("cap on model requests per minute across all workers "
+              "(retries included). Default: no cap beyond --workers."),
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -815,6 +900,12 @@ def main(argv=None):
             print("pages:    (no filter)")
         if args.force:
             print("force:    yes (re-query in-scope chunks)")
+        rate = f", rate<={args.rate:g}/min" if args.rate else ""
+        print(f"workers:  {args.workers}{rate}")
+        store = ResponseStore()
+        if args.force:
+            store.refresh.add(EXTRACT_PROMPT_ID)
+        print(f"store:    {store.path} ({len(store):,} replies)")
         print(f"images:   {paths.images_dir}")
         print(f"output:   {paths.output_csv}")
         print(f"cache:    {paths.cache_file}")
@@ -827,14 +918,18 @@ def main(argv=None):
             page_filter=args.pages,
             force=args.force,
             client=client,
+            workers=args.workers,
+            limiter=TokenBucket(args.rate) if args.rate else None,
+            store=store,
         )
+        print(f"store hits: {store.hits} (model calls: {store.misses})")
 
         # Assemble the full CSV from every cached response (not scoped to
         # --pages -- partial runs must not clobber complete CSVs with a
         # subset).
         chunks = discover_chunks(paths.images_dir)
         rows, dropped_meta = assemble_rows(
-            chunks, cache["responses"], state_header
+            chunks, cache.responses, state_header
         )
 
         print()
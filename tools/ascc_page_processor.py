@@ -40,7 +40,10 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
 
@@ -49,6 +52,10 @@ from PIL import Image
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from ascc_cache import ResponseStore, load_cache
+from ascc_runs import dark_mask, long_runs, merge_runs, true_runs
+from ascc_vision_pool import TokenBucket, call_with_backoff, ordered_map
+
 
 # ---------------------------------------------------------------------------
 # Config
@@ -112,6 +119,18 @@ BLOCKS_MAX_TOKENS = 1024
 REVIEW_PROMPT_VER = "g2"
 REVIEW_MAX_TOKENS = 1024
 
+# Prompt ids for the content-addressed reply store (ascc_cache.ResponseStore),
+# which is keyed on (PNG sha256, model, prompt id) and shared with
+# ascc_page_extract.py; each carries its stage's prompt version.
+PAGE_NUMBER_PROMPT_ID = f"page_number/{HALVES_PROMPT_VER}"
+SINGLE_COL_PROMPT_ID  = f"single_col/{HALVES_PROMPT_VER}"
+BLOCKS_PROMPT_ID      = f"blocks/{BLOCKS_PROMPT_VER}"
+REVIEW_PROMPT_ID      = f"review/{REVIEW_PROMPT_VER}"
+FORCE_PROMPT_IDS = {
+    "halves": {PAGE_NUMBER_PROMPT_ID, SINGLE_COL_PROMPT_ID},
+    "chunks": {BLOCKS_PROMPT_ID, REVIEW_PROMPT_ID},
+}
+
 # Whenever the model returns a review cut, snap it to the middle of the
 # nearest BLANK_RUN+ blank-row run within +/- SNAP_TOLERANCE_PX. If no such
 # gap exists inside the search window, reject the cut. This guarantees:
@@ -227,16 +246,36 @@ Output JSON only."""
 # ---------------------------------------------------------------------------
 
 assert os.environ.get("OPENROUTER_API_KEY"), "OPENROUTER_API_KEY not set in .env"
+# SDK-level retries are off: _vision_call retries through call_with_backoff
+# so every attempt passes the --rate limiter.
 client = OpenAI(
     base_url="https://openrouter.ai/api/v1",
     api_key=os.environ["OPENROUTER_API_KEY"],
+    max_retries=0,
 )
 
+# Shared TokenBucket for every model call (--rate), set by main(). With
+# --jobs N up to N pages make calls at once; this caps the request rate
+# across all of them. None = no cap.
+_LIMITER = None
+
+# Content-addressed reply store, opened by main(). None when helpers are
+# imported by another script (ascc_image_extract.py); _vision_call then
+# always calls the model.
+_RESPONSE_STORE = None
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _png_bytes(im):
+    """PIL.Image -> PNG file bytes."""
+    buf = BytesIO()
+    im.save(buf, format="PNG")
+    return buf.getvalue()
+
+
 def _img_to_b64_png(im):
     """PIL.Image -> base64-encoded PNG bytes (as ascii str)."""
     buf = BytesIO()
@@ -266,27 +305,40 @@ def _parse_strict_json(text):
     return json.loads(t)
 
 
-def _vision_call(model, system_prompt, user_text, image_b64, max_tokens):
+def _vision_call(model, system_prompt, user_text, image_b64, max_tokens,
+                 prompt_id=None):
     """Common OpenRouter vision call; returns the raw assistant text.
 
     Retries once on empty content, which a reasoning model occasionally
     returns with finish_reason='stop' when reasoning tokens consume the
     budget before any visible output is emitted.
+
+    With a prompt_id, the reply is served from / stored in the shared
+    content-addressed store, so identical pixels never cost a second call.
     """
+    if _RESPONSE_STORE is not None and prompt_id is not None:
+        return _RESPONSE_STORE.fetch(
+            image_b64, model, prompt_id,
+            lambda: _vision_call(model, system_prompt, user_text,
+                                 image_b64, max_tokens),
+        )
     last_finish = None
     for attempt in range(2):
-        resp = client.chat.completions.create(
-            model=model,
-            max_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": [
-                    {"type": "image_url", "image_url": {
-                        "url": f"data:image/png;base64,{image_b64}",
-                    }},
-                    {"type": "text", "text": user_text},
-                ]},
-            ],
+        resp = call_with_backoff(
+            lambda: client.chat.completions.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": [
+                        {"type": "image_url", "image_url": {
+                            "url": f"data:image/png;base64,{image_b64}",
+                        }},
+                        {"type": "text", "text": user_text},
+                    ]},
+                ],
+            ),
+            limiter=_LIMITER,
         )
         choice = resp.choices[0]
         content = choice.message.content or ""
@@ -308,25 +360,6 @@ def _idx(p):
     return int(m.group(1)) if m else 0
 
 
-def load_cache(path, model, version):
-    """Load a cache file, invalidating it if model/prompt_version changed."""
-    if not path.exists():
-        return {"model": model, "prompt_version": version, "responses": {}}
-    cache = json.loads(path.read_text())
-    if cache.get("model") != model or cache.get("prompt_version") != version:
-        print(
-            f"cache invalidated at {path.name} "
-            f"(was model={cache.get('model')!r}, "
-            f"prompt={cache.get('prompt_version')!r})"
-        )
-        return {"model": model, "prompt_version": version, "responses": {}}
-    return cache
-
-
-def save_cache(path, cache):
-    path.write_text(json.dumps(cache, indent=2))
-
-
 class Paths:
     """Per-run filesystem layout, derived from --basename."""
     def __init__(self, basename):
@@ -334,9 +367,9 @@ class Paths:
         self.pdf          = Path(f"./wip/in/{basename}.pdf")
         self.full_dir     = Path(f"./wip/cache/{basename}_full")
         self.halves_dir   = Path(f"./wip/cache/{basename}_halves")
-        self.halves_cache = Path(f"./wip/cache/{basename}_split_halves.json")
-        self.blocks_cache = Path(f"./wip/cache/{basename}_blocks.json")
-        self.review_cache = Path(f"./wip/cache/{basename}_review.json")
+        self.halves_cache = Path(f"./wip/cache/{basename}_split_halves.jsonl")
+        self.blocks_cache = Path(f"./wip/cache/{basename}_blocks.jsonl")
+        self.review_cache = Path(f"./wip/cache/{basename}_review.jsonl")
         self.run_log      = Path(f"./wip/cache/{basename}_run.log")
         self.output_dir   = Path(f"./wip/out/{basename}")
 
@@ -367,29 +400,150 @@ def log_only(msg):
     No-op when no log file is open (non-verbose runs), so the model id is
     recorded in the log but kept off the console.
     """
+    if isinstance(sys.stdout, _PageCapture) and sys.stdout.hold(("log", msg)):
+        return
     if _LOG_FH is not None:
         _LOG_FH.write(msg + "\n")
         _LOG_FH.flush()
 
 
+# ---------------------------------------------------------------------------
+# Parallel pages (--jobs)
+# ---------------------------------------------------------------------------
+#
+# With --jobs N, stages B and C keep N pages in flight on threads. Each
+# page's deterministic image work (rule/block detection, cropping, PNG
+# encoding) is shipped to a pool of N worker processes through the
+# image_job callable; its model calls stay on the page thread and go
+# through _LIMITER and the shared reply store. Each page's console output
+# is held back and printed whole, in page order, so the log reads like a
+# --jobs 1 run. (Two pages in flight can both miss the per-stage cache on
+# the same image; the reply store then makes one model call for both, but
+# the per-stage "calls made" counters may read one higher.)
+
+class _PageCapture:
+    """sys.stdout stand-in while pages run in parallel: writes (and
+    log_only lines) from a thread between start() and stop() are held and
+    handed back by stop(); everything else passes straight through."""
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    def start(self):
+        self._local.held = []
+
+    def stop(self):
+        held, self._local.held = self._local.held, None
+        return held
+
+    def hold(self, item):
+        held = getattr(self._local, "held", None)
+        if held is None:
+            return False
+        held.append(item)
+        return True
+
+    def write(self, s):
+        if not self.hold(s):
+            self.target.write(s)
+
+    def flush(self):
+        if getattr(self._local, "held", None) is None:
+            self.target.flush()
+
+
+@contextmanager
+def _image_jobs(jobs):
+    """Yield image_job(fn, *args): runs fn inline for --jobs 1, otherwise
+    on a pool of `jobs` worker processes (fn must be module-level)."""
+    if jobs <= 1:
+        yield lambda fn, *args: fn(*args)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield lambda fn, *args: pool.submit(fn, *args).result()
+
+
+def _map_pages(task, items, jobs):
+    """Yield task(item) for every item, in order. --jobs 1 runs them one
+    by one; otherwise `jobs` run at once on threads with their output
+    captured per page (see above). The first failure is re-raised once
+    the output of the pages before it has been printed."""
+    if jobs <= 1:
+        for item in items:
+            yield task(item)
+        return
+
+    capture = _PageCapture(sys.stdout)
+
+    def run(item):
+        capture.start()
+        try:
+            result, error = task(item), None
+        except Exception as e:
+            result, error = None, e
+        return capture.stop(), result, error
+
+    saved_stdout = sys.stdout
+    sys.stdout = capture
+    try:
+        for _item, (held, result, error), _ in ordered_map(run, items, workers=jobs):
+            for entry in held:
+                if isinstance(entry, tuple):
+                    log_only(entry[1])
+                else:
+                    saved_stdout.write(entry)
+            if error is not None:
+                raise error
+            yield result
+    finally:
+        sys.stdout = saved_stdout
+
+
 # ---------------------------------------------------------------------------
 # Stage A -- render
 # ---------------------------------------------------------------------------
 
-def render_pdf(pdf_path, full_dir, dpi):
+def _pdf_page_count(pdf_path):
+    """Page count from pdfinfo (ships with pdftoppm in poppler), or None."""
+    if not shutil.which("pdfinfo"):
+        return None
+    out = subprocess.run(
+        ["pdfinfo", str(pdf_path)], check=True, capture_output=True, text=True,
+    ).stdout
+    m = re.search(r"^Pages:\s+(\d+)", out, flags=re.MULTILINE)
+    return int(m.group(1)) if m else None
+
+def render_pdf(pdf_path, full_dir, dpi, jobs=1):
     """Render PDF to full_dir/page-NNNN.png. NNNN is PDF page index, 4 digits.
 
     pdftoppm writes <prefix>-N.png with un-padded N for low pages, so we
-    render to a sentinel prefix then rename in numeric order.
+    render to a sentinel prefix then rename in numeric order. With jobs > 1
+    the pages are split into `jobs` contiguous -f/-l ranges rendered by
+    concurrent pdftoppm processes (N is the PDF page number either way);
+    without pdfinfo to count pages, one pdftoppm renders everything.
     """
     full_dir.mkdir(parents=True, exist_ok=True)
     for old in full_dir.glob("_render-*.png"):
         old.unlink()
     prefix = full_dir / "_render"
-    subprocess.run(
-        ["pdftoppm", "-r", str(dpi), "-png", str(pdf_path), str(prefix)],
-        check=True,
-    )
+    cmd = ["pdftoppm", "-r", str(dpi), "-png"]
+    n_pages = _pdf_page_count(pdf_path) if jobs > 1 else None
+    if not n_pages:
+        subprocess.run(cmd + [str(pdf_path), str(prefix)], check=True)
+    else:
+        step = -(-n_pages // jobs)  # ceil
+        procs = [
+            subprocess.Popen(cmd + ["-f", str(first),
+                                    "-l", str(min(first + step - 1, n_pages)),
+                                    str(pdf_path), str(prefix)])
+            for first in range(1, n_pages + 1, step)
+        ]
+        for proc in procs:
+            proc.wait()
+        for proc in procs:
+            if proc.returncode != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
     rendered = sorted(full_dir.glob("_render-*.png"), key=_idx)
     pages = []
     for i, src in enumerate(rendered, 1):
@@ -401,7 +555,7 @@ def render_pdf(pdf_path, full_dir, dpi):
     return pages
 
 
-def stage_render(paths, force):
+def stage_render(paths, force, jobs=1):
     """Run stage A. Returns the sorted list of full-page PNGs."""
     assert paths.pdf.is_file(), f"missing {paths.pdf}"
     assert shutil.which("pdftoppm"), "pdftoppm not on PATH (install poppler)"
@@ -417,8 +571,9 @@ def stage_render(paths, force):
         for old in existing:
             old.unlink()
 
-    print(f"render: pdftoppm -r {DPI} {paths.pdf.name} -> {paths.full_dir}")
-    pages = render_pdf(paths.pdf, paths.full_dir, DPI)
+    parallel = f" ({jobs} parallel ranges)" if jobs > 1 else ""
+    print(f"render: pdftoppm -r {DPI} {paths.pdf.name} -> {paths.full_dir}{parallel}")
+    pages = render_pdf(paths.pdf, paths.full_dir, DPI, jobs=jobs)
     print(f"render: wrote {len(pages)} pages")
     assert pages, "no rendered pages -- check PDF and pdftoppm output"
     return pages
@@ -472,15 +627,16 @@ def build_header_footer_strip(im):
     return out
 
 
-def detect_page_number(strip_im, model):
-    """Vision call: read the printed catalog page number from the strip."""
-    img_b64 = _img_to_b64_png(strip_im)
+def detect_page_number(strip_b64, model):
+    """Vision call: read the printed catalog page number from the strip
+    (base64 PNG of build_header_footer_strip's output)."""
     raw = _vision_call(
         model,
         PAGE_NUMBER_SYSTEM_PROMPT,
         "Read the printed catalog page number. Return JSON only.",
-        img_b64,
+        strip_b64,
         HALVES_MAX_TOKENS,
+        prompt_id=PAGE_NUMBER_PROMPT_ID,
     )
     data = _parse_strict_json(raw)
     pn = data["page_number"]
@@ -488,16 +644,16 @@ def detect_page_number(strip_im, model):
     return pn
 
 
-def confirm_single_column(im, model):
-    """Vision call: confirm whether the page has two columns (used as a
-    fallback when the deterministic rule detector returns None)."""
-    img_b64 = _img_to_b64_png(im)
+def confirm_single_column(page_b64, model):
+    """Vision call: confirm whether the page (base64 PNG) has two columns
+    (used as a fallback when the deterministic rule detector returns None)."""
     raw = _vision_call(
         model,
         SINGLE_COL_SYSTEM_PROMPT,
         "Is this page laid out as two columns with a printed vertical rule? Return JSON only.",
-        img_b64,
+        page_b64,
         HALVES_MAX_TOKENS,
+        prompt_id=SINGLE_COL_PROMPT_ID,
     )
     data = _parse_strict_json(raw)
     htc = data["has_two_columns"]
@@ -505,7 +661,36 @@ def confirm_single_column(im, model):
     return htc
 
 
-def stage_halves(paths, model, full_pages, force, page_filter, verbose=False):
+def _analyze_full_page(full_png):
+    """Deterministic part of stage B for one uncached page (an image job):
+    size, rule detection, and the PNG payloads for the vision calls --
+    the whole page only when no rule was found."""
+    with Image.open(full_png) as im:
+        iw, ih = im.size
+        rule_x = detect_rule_x(im)
+        strip_b64 = _img_to_b64_png(build_header_footer_strip(im))
+        page_b64 = _img_to_b64_png(im) if rule_x is None else None
+    return iw, ih, rule_x, strip_b64, page_b64
+
+
+def _write_halves(full_png, rec, halves_dir, key):
+    """Crop one page into halves_dir per its halves-cache record (an image
+    job). Returns the number of half images written."""
+    pn = rec["page_number"]
+    with Image.open(full_png) as im:
+        w, h = im.size
+        if rec["has_two_columns"]:
+            rx = rec["rule_x"]
+            assert 0 < rx < w, f"rule_x {rx} out of (0, {w}) for {key}"
+            im.crop((0,  0, rx, h)).save(halves_dir / f"page-{pn:04d}-L.png")
+            im.crop((rx, 0, w,  h)).save(halves_dir / f"page-{pn:04d}-R.png")
+            return 2
+        im.crop((0, 0, w, h)).save(halves_dir / f"page-{pn:04d}.png")
+        return 1
+
+
+def stage_halves(paths, model, full_pages, force, page_filter, verbose=False,
+                 jobs=1):
     """Run stage B. page_filter, if not None, is a (kind, set_of_ints) tuple
     where kind is 'pdf' (PDF page indices) or 'catalog' (catalog page nums).
     Filtering applies to which halves get WRITTEN; page-number detection
@@ -515,14 +700,14 @@ def stage_halves(paths, model, full_pages, force, page_filter, verbose=False):
     paths.halves_cache.parent.mkdir(parents=True, exist_ok=True)
 
     halves_cache = load_cache(paths.halves_cache, model, HALVES_PROMPT_VER)
-    responses = halves_cache["responses"]
+    responses = halves_cache.responses
 
     # If --force halves was set, drop in-scope cache entries up front so the
     # loop re-queries them. Without --pages, every PDF page is in scope.
     if force:
         if page_filter is None:
             print(f"halves: --force halves set, clearing all {len(responses)} cache entries")
-            responses.clear()
+            halves_cache.clear()
         else:
             kind, ids = page_filter
             to_drop = []
@@ -536,62 +721,61 @@ def stage_halves(paths, model, full_pages, force, page_filter, verbose=False):
                 elif kind == "catalog" and rec.get("page_number") in ids:
                     to_drop.append(key)
             for key in to_drop:
-                del responses[key]
+                halves_cache.delete(key)
             print(f"halves: --force halves set, cleared {len(to_drop)} cache entries in scope")
-        save_cache(paths.halves_cache, halves_cache)
 
-    calls = 0
-    rule_failures = []
-    for pdf_idx, full_png in enumerate(full_pages, 1):
+    def halve_page(item):
+        pdf_idx, full_png = item
         key = f"pdf-page-{pdf_idx:04d}"
-        with Image.open(full_png) as im:
-            iw, ih = im.size
-            if key in responses:
-                rec = responses[key]
+        calls = 0
+        rule_failure = None
+        if key in responses:
+            rec = responses[key]
+            with Image.open(full_png) as im:
+                iw, ih = im.size
+        else:
+            iw, ih, rule_x, strip_b64, page_b64 = image_job(
+                _analyze_full_page, full_png,
+            )
+            if verbose:
+                log_only(f"  {key}: calling {model} for page-number...")
+            t0 = time.time()
+            pn = detect_page_number(strip_b64, model)
+            if verbose:
+                print(f"  {key}:   ... {time.time() - t0:.1f}s -> pn={pn}",
+                      flush=True)
+            calls += 1
+
+            if rule_x is not None:
+                htc = True
+                rule_source = "deterministic"
             else:
-                rule_x = detect_rule_x(im)
-
-                hf_strip = build_header_footer_strip(im)
                 if verbose:
-                    log_only(f"  {key}: calling {model} for page-number...")
+                    log_only(f"  {key}: no rule found, calling {model} "
+                             f"for single-col confirm...")
                 t0 = time.time()
-                pn = detect_page_number(hf_strip, model)
+                htc = confirm_single_column(page_b64, model)
                 if verbose:
-                    print(f"  {key}:   ... {time.time() - t0:.1f}s -> pn={pn}",
-                          flush=True)
+                    print(f"  {key}:   ... {time.time() - t0:.1f}s -> "
+                          f"has_two_columns={htc}", flush=True)
                 calls += 1
-
-                if rule_x is not None:
-                    htc = True
-                    rule_source = "deterministic"
+                if htc:
+                    rule_x = iw // 2
+                    rule_source = "vision_single_col_failed"
+                    rule_failure = (key, pn)
                 else:
-                    if verbose:
-                        log_only(f"  {key}: no rule found, calling {model} "
-                                 f"for single-col confirm...")
-                    t0 = time.time()
-                    htc = confirm_single_column(im, model)
-                    if verbose:
-                        print(f"  {key}:   ... {time.time() - t0:.1f}s -> "
-                              f"has_two_columns={htc}", flush=True)
-                    calls += 1
-                    if htc:
-                        rule_x = iw // 2
-                        rule_source = "vision_single_col_failed"
-                        rule_failures.append((key, pn))
-                    else:
-                        rule_x = -1
-                        rule_source = "vision_single_col"
-
-                rec = {
-                    "page_number":     pn,
-                    "has_two_columns": htc,
-                    "rule_x":          rule_x,
-                    "rule_source":     rule_source,
-                    "image_width":     iw,
-                    "image_height":    ih,
-                }
-                responses[key] = rec
-                save_cache(paths.halves_cache, halves_cache)
+                    rule_x = -1
+                    rule_source = "vision_single_col"
+
+            rec = {
+                "page_number":     pn,
+                "has_two_columns": htc,
+                "rule_x":          rule_x,
+                "rule_source":     rule_source,
+                "image_width":     iw,
+                "image_height":    ih,
+            }
+            halves_cache.put(key, rec)
 
         pn = rec["page_number"]
         if rec["has_two_columns"]:
@@ -599,6 +783,17 @@ def stage_halves(paths, model, full_pages, force, page_filter, verbose=False):
                   f"source={rec['rule_source']:<28s}  size {iw}x{ih}")
         else:
             print(f"  {key} -> catalog {pn:>4d}  SINGLE-COLUMN  ({rec['rule_source']})  size {iw}x{ih}")
+        return calls, rule_failure
+
+    calls = 0
+    rule_failures = []
+    with _image_jobs(jobs) as image_job:
+        for page_calls, rule_failure in _map_pages(
+            halve_page, list(enumerate(full_pages, 1)), jobs,
+        ):
+            calls += page_calls
+            if rule_failure is not None:
+                rule_failures.append(rule_failure)
 
     print(f"halves: vision calls made = {calls}")
     if rule_failures:
@@ -644,23 +839,13 @@ def stage_halves(paths, model, full_pages, force, page_filter, verbose=False):
         for old in paths.halves_dir.glob(f"page-{pn:04d}*.png"):
             old.unlink()
 
-    halves_written = 0
-    for pdf_idx, full_png in enumerate(full_pages, 1):
-        if pdf_idx not in selected:
-            continue
-        rec = responses[f"pdf-page-{pdf_idx:04d}"]
-        pn = rec["page_number"]
-        with Image.open(full_png) as im:
-            w, h = im.size
-            if rec["has_two_columns"]:
-                rx = rec["rule_x"]
-                assert 0 < rx < w, f"rule_x {rx} out of (0, {w}) for pdf-page-{pdf_idx:04d}"
-                im.crop((0,  0, rx, h)).save(paths.halves_dir / f"page-{pn:04d}-L.png")
-                im.crop((rx, 0, w,  h)).save(paths.halves_dir / f"page-{pn:04d}-R.png")
-                halves_written += 2
-            else:
-                im.crop((0, 0, w, h)).save(paths.halves_dir / f"page-{pn:04d}.png")
-                halves_written += 1
+    def write_page(pdf_idx):
+        key = f"pdf-page-{pdf_idx:04d}"
+        return image_job(_write_halves, full_pages[pdf_idx - 1],
+                         responses[key], paths.halves_dir, key)
+
+    with _image_jobs(jobs) as image_job:
+        halves_written = sum(_map_pages(write_page, sorted(selected), jobs))
 
     print(f"halves: wrote {halves_written} half images to {paths.halves_dir}")
     if page_filter is None:
@@ -681,48 +866,18 @@ def find_blocks(img_gray):
 
     Returns a list of (y_top, y_bottom) inclusive tuples.
     """
-    arr = np.array(img_gray)
-    H, W = arr.shape
-
     margin = (1.0 - CENTER_FRACTION) / 2.0
-    left   = int(W * margin)
-    right  = int(W * (1.0 - margin))
-    center = arr[:, left:right]
-
-    dark_per_row = (center < DARK_BRIGHTNESS_MAX).sum(axis=1)
-    is_dark = dark_per_row >= ROW_DARK_MIN_PIXELS
-
-    blocks = []
-    in_block = False
-    block_start = None
-    last_dark = None
-    blank_run = BLANK_RUN  # primed so the first dark row opens a block
-
-    for y in range(H):
-        if is_dark[y]:
-            if not in_block:
-                if blank_run >= BLANK_RUN:
-                    in_block = True
-                    block_start = y
-                    last_dark = y
-            else:
-                last_dark = y
-            blank_run = 0
-        else:
-            blank_run += 1
-            if in_block and blank_run >= BLANK_RUN:
-                blocks.append((block_start, last_dark))
-                in_block = False
-                block_start = None
-
-    if in_block:
-        blocks.append((block_start, last_dark))
+    is_dark = dark_mask(np.array(img_gray), DARK_BRIGHTNESS_MAX,
+                        ROW_DARK_MIN_PIXELS, margin)
 
-    return blocks
+    # Dark-row runs separated by fewer than BLANK_RUN blank rows belong to
+    # the same block.
+    starts, ends = merge_runs(*true_runs(is_dark), max_gap=BLANK_RUN - 1)
+    return [(int(a), int(b) - 1) for a, b in zip(starts, ends)]
 
 
-def classify_block(block_im, blocks_cache, model, verbose=False, label=""):
-    """Classify a single block crop as 'illustration' or 'text'.
+def classify_block(png_bytes, blocks_cache, model, verbose=False, label=""):
+    """Classify a single block crop (PNG bytes) as 'illustration' or 'text'.
 
     Cache key: SHA-256 of the block PNG bytes. Coordinate-keyed caching
     would needlessly miss whenever a block-detector constant gets tweaked.
@@ -730,12 +885,9 @@ def classify_block(block_im, blocks_cache, model, verbose=False, label=""):
     If verbose, prints per-call progress (cache hit/miss, elapsed seconds,
     raw response length). label is a short prefix like '419-L block 3/12'.
     """
-    buf = BytesIO()
-    block_im.save(buf, format="PNG")
-    png_bytes = buf.getvalue()
     key = hashlib.sha256(png_bytes).hexdigest()
 
-    responses = blocks_cache["responses"]
+    responses = blocks_cache.responses
     if key in responses:
         if verbose:
             print(f"    {label} CACHE HIT -> {responses[key]['kind']}")
@@ -752,6 +904,7 @@ def classify_block(block_im, blocks_cache, model, verbose=False, label=""):
         "Classify this strip. Return JSON only.",
         img_b64,
         BLOCKS_MAX_TOKENS,
+        prompt_id=BLOCKS_PROMPT_ID,
     )
     if verbose:
         print(f"    {label}   ... {time.time() - t0:.1f}s, "
@@ -769,8 +922,8 @@ def classify_block(block_im, blocks_cache, model, verbose=False, label=""):
         print(f"    WARNING: classify_block fallback used "
               f"({type(e).__name__}: {e}); raw={raw[:80]!r} -> {kind}")
 
-    responses[key] = {"kind": kind}
-    return kind, True  # cache miss -> caller should save
+    blocks_cache.put(key, {"kind": kind})
+    return kind, True  # cache miss
 
 
 def drop_orphan_illustration_cuts(cut_ys, kinds, H, label_prefix=""):
@@ -823,31 +976,11 @@ def find_blank_runs(slice_im):
     consecutive blank rows in the slice, using the same row-darkness rule
     as find_blocks (DARK_BRIGHTNESS_MAX, ROW_DARK_MIN_PIXELS, CENTER_FRACTION).
     """
-    arr = np.array(slice_im.convert("L"))
-    H, W = arr.shape
-
     margin = (1.0 - CENTER_FRACTION) / 2.0
-    left   = int(W * margin)
-    right  = int(W * (1.0 - margin))
-    center = arr[:, left:right]
-
-    dark_per_row = (center < DARK_BRIGHTNESS_MAX).sum(axis=1)
-    is_blank = dark_per_row < ROW_DARK_MIN_PIXELS
-
-    runs = []
-    run_start = None
-    for y in range(H):
-        if is_blank[y]:
-            if run_start is None:
-                run_start = y
-        else:
-            if run_start is not None:
-                if y - run_start >= BLANK_RUN:
-                    runs.append((run_start, y))
-                run_start = None
-    if run_start is not None and H - run_start >= BLANK_RUN:
-        runs.append((run_start, H))
-    return runs
+    is_dark = dark_mask(np.array(slice_im.convert("L")), DARK_BRIGHTNESS_MAX,
+                        ROW_DARK_MIN_PIXELS, margin)
+    starts, ends = long_runs(*true_runs(~is_dark), BLANK_RUN)
+    return [(int(a), int(b)) for a, b in zip(starts, ends)]
 
 
 def snap_cut_to_blank_run(cut_y, blank_runs, tolerance=SNAP_TOLERANCE_PX):
@@ -865,20 +998,17 @@ def snap_cut_to_blank_run(cut_y, blank_runs, tolerance=SNAP_TOLERANCE_PX):
     return best_mid
 
 
-def review_slice(slice_im, review_cache, model, verbose=False, label=""):
-    """Per-slice entry-aware review.
+def review_slice(png_bytes, h, review_cache, model, verbose=False, label=""):
+    """Per-slice entry-aware review of one slice (PNG bytes, h px tall).
 
     Returns (cuts, was_call). cuts is a list of LOCAL y-offsets where the
     chunk should be split further (empty list = chunk is already a single
     entry and should not be re-cut). Cached by SHA-256 of slice PNG bytes
     so re-runs do not re-query.
     """
-    buf = BytesIO()
-    slice_im.save(buf, format="PNG")
-    png_bytes = buf.getvalue()
     key = hashlib.sha256(png_bytes).hexdigest()
 
-    responses = review_cache["responses"]
+    responses = review_cache.responses
     if key in responses:
         cuts = responses[key]["cuts"]
         if verbose:
@@ -887,7 +1017,6 @@ def review_slice(slice_im, review_cache, model, verbose=False, label=""):
         return cuts, False
 
     img_b64 = base64.standard_b64encode(png_bytes).decode()
-    h = slice_im.size[1]
     if verbose:
         log_only(f"    {label} review: calling {model} "
                  f"({len(png_bytes):,} bytes png, h={h})...")
@@ -899,6 +1028,7 @@ def review_slice(slice_im, review_cache, model, verbose=False, label=""):
         f"multiple. Return JSON only.",
         img_b64,
         REVIEW_MAX_TOKENS,
+        prompt_id=REVIEW_PROMPT_ID,
     )
     if verbose:
         print(f"    {label}   ... {time.time() - t0:.1f}s, raw={len(raw)} chars",
@@ -928,12 +1058,43 @@ def review_slice(slice_im, review_cache, model, verbose=False, label=""):
               f"treating as no-split")
         cuts = []
 
-    responses[key] = {"cuts": cuts}
+    review_cache.put(key, {"cuts": cuts})
     return cuts, True
 
 
+def _detect_half_blocks(img_path):
+    """Deterministic part of stage C for one half (an image job): its size,
+    find_blocks() rows, and each block's PNG bytes for classify_block."""
+    with Image.open(img_path) as im:
+        W, H = im.size
+        blocks = find_blocks(im.convert("L"))
+        pngs = [_png_bytes(im.crop((0, y0, W, y1 + 1))) for y0, y1 in blocks]
+    return W, H, blocks, pngs
+
+
+def _slice_payloads(img_path, spans):
+    """PNG bytes and find_blank_runs() of each (y0, y1) slice of one half
+    (an image job), for review_slice and cut snapping."""
+    with Image.open(img_path) as im:
+        W = im.size[0]
+        out = []
+        for y0, y1 in spans:
+            sl = im.crop((0, y0, W, y1))
+            out.append((_png_bytes(sl), find_blank_runs(sl)))
+    return out
+
+
+def _write_pieces(img_path, spans, out_paths):
+    """Crop each (y0, y1) piece of one half into its chunk PNG (an image
+    job)."""
+    with Image.open(img_path) as im:
+        W = im.size[0]
+        for (y0, y1), out_path in zip(spans, out_paths):
+            im.crop((0, y0, W, y1)).save(out_path)
+
+
 def stage_chunks(paths, model, force, page_filter, verbose=False,
-                 skip_review=False):
+                 skip_review=False, jobs=1):
     """Run stage C. page_filter, if not None, is a (kind, set_of_ints).
     'kind' for chunks is always interpreted as catalog page numbers
     because halves are named by catalog page; a 'pdf' filter raises."""
@@ -978,32 +1139,26 @@ def stage_chunks(paths, model, force, page_filter, verbose=False,
     # there is no honest way to scope the wipe to a page subset; the user
     # signalled they want everything reclassified.
     if force:
-        nb = len(blocks_cache["responses"])
-        nr = len(review_cache["responses"])
+        nb = len(blocks_cache.responses)
+        nr = len(review_cache.responses)
         print(f"chunks: --force chunks set, clearing {nb} block cache entries "
               f"and {nr} review cache entries")
-        blocks_cache["responses"].clear()
-        review_cache["responses"].clear()
-        save_cache(paths.blocks_cache, blocks_cache)
-        save_cache(paths.review_cache, review_cache)
+        blocks_cache.clear()
+        review_cache.clear()
 
     # Wipe in-scope output files first so stale chunks do not linger.
     for pn in pages:
         for old in paths.output_dir.glob(f"page-{pn:04d}-*.png"):
             old.unlink()
 
-    total_pages = 0
-    total_blocks = 0
-    total_illus = 0
-    total_slices = 0
-    total_review_splits = 0
-    calls = 0
-    review_calls = 0
-
-    for pn in sorted(pages):
+    def chunk_page(pn):
         halves_for_page = pages[pn]
         print(f"--- page {pn:04d} ---")
         counter = 1
+        stats = dict.fromkeys(
+            ("blocks", "illus", "slices", "review_splits", "calls",
+             "review_calls"), 0,
+        )
 
         # Process L then R (or '_' for single-column).
         if "_" in halves_for_page:
@@ -1016,160 +1171,167 @@ def stage_chunks(paths, model, force, page_filter, verbose=False,
                 print(f"  missing {side} half")
                 continue
             img_path = halves_for_page[side]
-            with Image.open(img_path) as im:
-                gray = im.convert("L")
-                W, H = im.size
-                blocks = find_blocks(gray)
-                if verbose:
-                    print(f"  {side}: {img_path.name} {W}x{H}, "
-                          f"{len(blocks)} blocks detected", flush=True)
-
-                cut_ys = []
-                kinds = []
-                for i, (y0, y1) in enumerate(blocks, 1):
-                    block_im = im.crop((0, y0, W, y1 + 1))
-                    label = (f"[{pn:04d}-{side} block {i}/{len(blocks)} "
-                             f"y={y0}-{y1} h={y1 - y0 + 1}]")
-                    kind, was_call = classify_block(
-                        block_im, blocks_cache, model,
-                        verbose=verbose, label=label,
-                    )
-                    if was_call:
-                        save_cache(paths.blocks_cache, blocks_cache)
-                        calls += 1
-                    kinds.append((y0, y1, kind))
-                    if kind == "illustration":
-                        cut_ys.append(y0)
-
-                # Drop cuts that would create chunks containing only an
-                # illustration (no text below the marking). This catches
-                # tall-marking-split-by-blank-gap cases (e.g. arc postmarks
-                # where the top arc text and bottom arc text are detected as
-                # two separate illustration blocks) and stacked-markings-
-                # sharing-one-listing cases.
-                cut_ys = drop_orphan_illustration_cuts(
-                    cut_ys, kinds, H, label_prefix=f"[{pn:04d}-{side}] ",
+            W, H, blocks, block_pngs = image_job(_detect_half_blocks, img_path)
+            if verbose:
+                print(f"  {side}: {img_path.name} {W}x{H}, "
+                      f"{len(blocks)} blocks detected", flush=True)
+
+            cut_ys = []
+            kinds = []
+            for i, ((y0, y1), block_png) in enumerate(zip(blocks, block_pngs), 1):
+                label = (f"[{pn:04d}-{side} block {i}/{len(blocks)} "
+                         f"y={y0}-{y1} h={y1 - y0 + 1}]")
+                kind, was_call = classify_block(
+                    block_png, blocks_cache, model,
+                    verbose=verbose, label=label,
                 )
+                if was_call:
+                    stats["calls"] += 1
+                kinds.append((y0, y1, kind))
+                if kind == "illustration":
+                    cut_ys.append(y0)
+
+            # Drop cuts that would create chunks containing only an
+            # illustration (no text below the marking). This catches
+            # tall-marking-split-by-blank-gap cases (e.g. arc postmarks
+            # where the top arc text and bottom arc text are detected as
+            # two separate illustration blocks) and stacked-markings-
+            # sharing-one-listing cases.
+            cut_ys = drop_orphan_illustration_cuts(
+                cut_ys, kinds, H, label_prefix=f"[{pn:04d}-{side}] ",
+            )
+
+            # Filter cuts that would produce slivers thinner than
+            # MIN_SLICE_HEIGHT_PX.
+            kept_cuts = []
+            last = 0
+            for c in cut_ys:
+                if c - last < MIN_SLICE_HEIGHT_PX:
+                    continue
+                if H - c < MIN_SLICE_HEIGHT_PX:
+                    continue
+                kept_cuts.append(c)
+                last = c
+
+            ys = [0] + kept_cuts + [H]
+            spans = [(y0, y1) for y0, y1 in zip(ys[:-1], ys[1:])
+                     if y1 - y0 >= MIN_SLICE_HEIGHT_PX]
+
+            n_blocks = len(blocks)
+            n_illus = sum(1 for _, _, k in kinds if k == "illustration")
+            n_slices = len(spans)
+            stats["blocks"] += n_blocks
+            stats["illus"] += n_illus
+            label = side if side != "_" else "single"
+            print(f"  {label}: blocks={n_blocks} illustrations={n_illus} "
+                  f"slices(pre-review)={n_slices}")
+            for (y0, y1, kind) in kinds:
+                print(f"    y=[{y0:5d}..{y1:5d}]  {kind}")
+
+            # Per-slice entry-aware review pass. Each slice goes back to
+            # the model with the entry-aware prompt; if the model returns
+            # extra cuts in local coords, we re-slice and emit the pieces.
+            # MIN_SLICE_HEIGHT_PX still applies to the pieces. Pieces are
+            # (y0, y1) spans of the half, cropped and saved at the end.
+            payloads = (None if skip_review
+                        else image_job(_slice_payloads, img_path, spans))
+            pieces = []
+            splits_this_half = 0
+            for si, (y0, y1) in enumerate(spans, 1):
+                if skip_review:
+                    pieces.append((y0, y1))
+                    continue
+                slice_png, blank_runs = payloads[si - 1]
+                sh = y1 - y0
+                rlabel = (f"[{pn:04d}-{side} slice {si}/{n_slices} h={sh}]")
+                extra_cuts, was_call = review_slice(
+                    slice_png, sh, review_cache, model,
+                    verbose=verbose, label=rlabel,
+                )
+                if was_call:
+                    stats["review_calls"] += 1
+                if not extra_cuts:
+                    pieces.append((y0, y1))
+                    continue
 
-                # Filter cuts that would produce slivers thinner than
-                # MIN_SLICE_HEIGHT_PX.
-                kept_cuts = []
+                # Snap each model-returned cut to the middle of the nearest
+                # BLANK_RUN+ blank-row run inside the slice. Cuts that
+                # cannot be snapped (no blank run within tolerance) are
+                # rejected -- this filters out false positives where the
+                # model thought there was an entry boundary inside a
+                # solid-text listing.
+                snapped = []
+                for c in extra_cuts:
+                    s = snap_cut_to_blank_run(c, blank_runs)
+                    if s is None:
+                        print(f"    {rlabel} REJECT review cut y={c}: "
+                              f"no blank-run gap within "
+                              f"+/-{SNAP_TOLERANCE_PX}px")
+                        continue
+                    if s != c:
+                        print(f"    {rlabel} snap cut y={c} -> y={s} "
+                              f"(nearest blank-run middle)")
+                    snapped.append(s)
+                snapped = sorted(set(snapped))
+
+                # Filter: keep only cuts that produce >= MIN_SLICE_HEIGHT_PX
+                # on both sides of the cut.
+                kept = []
                 last = 0
-                for c in cut_ys:
+                for c in snapped:
                     if c - last < MIN_SLICE_HEIGHT_PX:
+                        print(f"    {rlabel} drop review cut y={c}: "
+                              f"gap above={c - last} < {MIN_SLICE_HEIGHT_PX}")
                         continue
-                    if H - c < MIN_SLICE_HEIGHT_PX:
+                    if sh - c < MIN_SLICE_HEIGHT_PX:
+                        print(f"    {rlabel} drop review cut y={c}: "
+                              f"gap below={sh - c} < {MIN_SLICE_HEIGHT_PX}")
                         continue
-                    kept_cuts.append(c)
+                    kept.append(c)
                     last = c
-
-                ys = [0] + kept_cuts + [H]
-                slices = []
-                for y0, y1 in zip(ys[:-1], ys[1:]):
-                    if y1 - y0 < MIN_SLICE_HEIGHT_PX:
-                        continue
-                    slices.append(im.crop((0, y0, W, y1)))
-
-                n_blocks = len(blocks)
-                n_illus = sum(1 for _, _, k in kinds if k == "illustration")
-                n_slices = len(slices)
-                total_blocks += n_blocks
-                total_illus += n_illus
-                label = side if side != "_" else "single"
-                print(f"  {label}: blocks={n_blocks} illustrations={n_illus} "
-                      f"slices(pre-review)={n_slices}")
-                for (y0, y1, kind) in kinds:
-                    print(f"    y=[{y0:5d}..{y1:5d}]  {kind}")
-
-                # Per-slice entry-aware review pass. Each slice goes back to
-                # the model with the entry-aware prompt; if the model returns
-                # extra cuts in local coords, we re-slice and emit the pieces.
-                # MIN_SLICE_HEIGHT_PX still applies to the pieces.
-                final_pieces = []
-                splits_this_half = 0
-                for si, sl in enumerate(slices, 1):
-                    if skip_review:
-                        final_pieces.append(sl)
-                        continue
-                    sw, sh = sl.size
-                    rlabel = (f"[{pn:04d}-{side} slice {si}/{n_slices} h={sh}]")
-                    extra_cuts, was_call = review_slice(
-                        sl, review_cache, model,
-                        verbose=verbose, label=rlabel,
-                    )
-                    if was_call:
-                        save_cache(paths.review_cache, review_cache)
-                        review_calls += 1
-                    if not extra_cuts:
-                        final_pieces.append(sl)
-                        continue
-
-                    # Snap each model-returned cut to the middle of the nearest
-                    # BLANK_RUN+ blank-row run inside the slice. Cuts that
-                    # cannot be snapped (no blank run within tolerance) are
-                    # rejected -- this filters out false positives where the
-                    # model thought there was an entry boundary inside a
-                    # solid-text listing.
-                    blank_runs = find_blank_runs(sl)
-                    snapped = []
-                    for c in extra_cuts:
-                        s = snap_cut_to_blank_run(c, blank_runs)
-                        if s is None:
-                            print(f"    {rlabel} REJECT review cut y={c}: "
-                                  f"no blank-run gap within "
-                                  f"+/-{SNAP_TOLERANCE_PX}px")
-                            continue
-                        if s != c:
-                            print(f"    {rlabel} snap cut y={c} -> y={s} "
-                                  f"(nearest blank-run middle)")
-                        snapped.append(s)
-                    snapped = sorted(set(snapped))
-
-                    # Filter: keep only cuts that produce >= MIN_SLICE_HEIGHT_PX
-                    # on both sides of the cut.
-                    kept = []
-                    last = 0
-                    for c in snapped:
-                        if c - last < MIN_SLICE_HEIGHT_PX:
-                            print(f"    {rlabel} drop review cut y={c}: "
-                                  f"gap above={c - last} < {MIN_SLICE_HEIGHT_PX}")
-                            continue
-                        if sh - c < MIN_SLICE_HEIGHT_PX:
-                            print(f"    {rlabel} drop review cut y={c}: "
-                                  f"gap below={sh - c} < {MIN_SLICE_HEIGHT_PX}")
-                            continue
-                        kept.append(c)
-                        last = c
-                    if not kept:
-                        final_pieces.append(sl)
-                        continue
-                    splits_this_half += len(kept)
-                    print(f"    {rlabel} REVIEW SPLIT into "
-                          f"{len(kept) + 1} pieces at {kept}")
-                    sub_ys = [0] + kept + [sh]
-                    for a, b in zip(sub_ys[:-1], sub_ys[1:]):
-                        final_pieces.append(sl.crop((0, a, sw, b)))
-
-                total_review_splits += splits_this_half
-                total_slices += len(final_pieces)
-                if splits_this_half:
-                    print(f"  {label}: review added {splits_this_half} cut(s); "
-                          f"final pieces = {len(final_pieces)}")
-
-                for piece in final_pieces:
-                    out_path = paths.output_dir / f"page-{pn:04d}-{counter:04d}.png"
-                    piece.save(out_path)
-                    counter += 1
-        total_pages += 1
+                if not kept:
+                    pieces.append((y0, y1))
+                    continue
+                splits_this_half += len(kept)
+                print(f"    {rlabel} REVIEW SPLIT into "
+                      f"{len(kept) + 1} pieces at {kept}")
+                sub_ys = [0] + kept + [sh]
+                for a, b in zip(sub_ys[:-1], sub_ys[1:]):
+                    pieces.append((y0 + a, y0 + b))
+
+            stats["review_splits"] += splits_this_half
+            stats["slices"] += len(pieces)
+            if splits_this_half:
+                print(f"  {label}: review added {splits_this_half} cut(s); "
+                      f"final pieces = {len(pieces)}")
+
+            out_paths = [
+                paths.output_dir / f"page-{pn:04d}-{counter + k:04d}.png"
+                for k in range(len(pieces))
+            ]
+            image_job(_write_pieces, img_path, pieces, out_paths)
+            counter += len(pieces)
+        return stats
+
+    totals = dict.fromkeys(
+        ("blocks", "illus", "slices", "review_splits", "calls",
+         "review_calls"), 0,
+    )
+    total_pages = 0
+    with _image_jobs(jobs) as image_job:
+        for stats in _map_pages(chunk_page, sorted(pages), jobs):
+            for name, n in stats.items():
+                totals[name] += n
+            total_pages += 1
 
     print()
     print(f"chunks: pages processed     = {total_pages}")
-    print(f"chunks: blocks detected     = {total_blocks}")
-    print(f"chunks: illustrations       = {total_illus}")
-    print(f"chunks: pieces written      = {total_slices}")
-    print(f"chunks: review splits added = {total_review_splits}")
-    print(f"chunks: classify calls made = {calls}")
-    print(f"chunks: review calls made   = {review_calls}")
+    print(f"chunks: blocks detected     = {totals['blocks']}")
+    print(f"chunks: illustrations       = {totals['illus']}")
+    print(f"chunks: pieces written      = {totals['slices']}")
+    print(f"chunks: review splits added = {totals['review_splits']}")
+    print(f"chunks: classify calls made = {totals['calls']}")
+    print(f"chunks: review calls made   = {totals['review_calls']}")
 
 
 # ---------------------------------------------------------------------------
@@ -1308,7 +1470,9 @@ def main(argv=None):
         default=set(),
         help=("comma-separated stages whose caches should be invalidated. "
               "Choices: render,halves,chunks. Scoped to --pages where "
-              "applicable. Default: empty."),
+              "applicable; forced stages also skip lookups in the shared "
+              "reply store (wip/cache/vision_responses.jsonl). Default: "
+              "empty."),
     )
     parser.add_argument(
         "-v", "--verbose",
@@ -1317,6 +1481,23 @@ def main(argv=None):
               "elapsed seconds, cache hit vs model call, response size. "
               "Useful when chunk processing seems stuck."),
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=("parallelism for the deterministic work: render runs N "
+              "pdftoppm processes over page ranges, and halves/chunks keep "
+              "N pages in flight with their image analysis on N worker "
+              "processes. Model calls stay rate-limited (see --rate). "
+              "Output and log order do not depend on N. Default: 1."),
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help=("cap on model requests per minute across all pages in "
+              "flight (retries included). Default: no cap."),
+    )
     parser.add_argument(
         "--skip-review",
         action="store_true",
@@ -1333,7 +1514,7 @@ def main(argv=None):
 
     # In verbose mode, tee everything to a per-basename log file in the cache
     # dir so re-running just to re-read the log is unnecessary.
-    global _LOG_FH
+    global _LOG_FH, _RESPONSE_STORE, _LIMITER
     log_fh = None
     saved_stdout = sys.stdout
     if args.verbose:
@@ -1362,6 +1543,15 @@ def main(argv=None):
             print("pages:    (no filter)")
         if args.force:
             print(f"force:    {','.join(sorted(args.force))}")
+        if args.jobs > 1 or args.rate:
+            rate = f", rate<={args.rate:g}/min" if args.rate else ""
+            print(f"jobs:     {args.jobs}{rate}")
+        _LIMITER = TokenBucket(args.rate) if args.rate else None
+        _RESPONSE_STORE = ResponseStore()
+        for stage in args.force:
+            _RESPONSE_STORE.refresh |= FORCE_PROMPT_IDS.get(stage, set())
+        print(f"store:    {_RESPONSE_STORE.path} "
+              f"({len(_RESPONSE_STORE):,} replies)")
         print()
 
         full_pages = None
@@ -1369,7 +1559,9 @@ def main(argv=None):
         for stage in args.stages:
             print(f"=== stage: {stage} ===")
             if stage == "render":
-                full_pages = stage_render(paths, force=("render" in args.force))
+                full_pages = stage_render(
+                    paths, force=("render" in args.force), jobs=args.jobs,
+                )
             elif stage == "halves":
                 if full_pages is None:
                     full_pages = sorted(paths.full_dir.glob("page-*.png"), key=_idx)
@@ -1385,6 +1577,7 @@ def main(argv=None):
                     force=("halves" in args.force),
                     page_filter=args.pages,
                     verbose=args.verbose,
+                    jobs=args.jobs,
                 )
             elif stage == "chunks":
                 stage_chunks(
@@ -1394,8 +1587,11 @@ def main(argv=None):
                     page_filter=args.pages,
                     verbose=args.verbose,
                     skip_review=args.skip_review,
+                    jobs=args.jobs,
                 )
             print()
+        print(f"store: {_RESPONSE_STORE.hits} hit(s), "
+              f"{_RESPONSE_STORE.misses} model call(s)")
     finally:
         if log_fh is not None:
             sys.stdout = saved_stdout
@@ -0,0 +1,52 @@
+"""ascc_runs.py -- run-length helpers for the ASCC page scanners.
+
+ascc_page_processor.py and ascc_image_extract.py find blocks, blank
+gaps and marking columns by reducing a page to one boolean per row (or
+per column) and then looking for runs of True. These helpers extract
+those runs with np.diff / np.flatnonzero instead of a Python loop over
+every row, which on a 300 dpi page is thousands of iterations per call.
+
+Runs are returned as a pair of int arrays (starts, ends) with `ends`
+EXCLUSIVE, so run i covers mask[starts[i]:ends[i]].
+"""
+
+import numpy as np
+
+
+def dark_mask(arr, brightness_max, min_pixels, margin):
+    """One boolean per row of the 2-D grayscale array `arr`: True where
+    the row, less `margin` (a fraction of the width) at each side, has at
+    least `min_pixels` pixels darker than `brightness_max`."""
+    W = arr.shape[1]
+    left   = int(W * margin)
+    right  = int(W * (1.0 - margin))
+    # Summing the bools as uint8 into int32 is ~3x faster than the default
+    # bool -> int64 reduction.
+    dark = (arr[:, left:right] < brightness_max).view(np.uint8)
+    dark_per_row = dark.sum(axis=1, dtype=np.int32)
+    return dark_per_row >= min_pixels
+
+
+def true_runs(mask):
+    """Return (starts, ends) of the runs of True in the 1-D boolean `mask`,
+    ends exclusive."""
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(np.diff(padded.view(np.int8)))
+    return edges[0::2], edges[1::2]
+
+
+def merge_runs(starts, ends, max_gap):
+    """Merge consecutive runs separated by at most `max_gap` False
+    elements. Returns new (starts, ends) arrays."""
+    if len(starts) == 0:
+        return starts, ends
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] > max_gap)
+    keep_start = np.concatenate(([0], breaks + 1))
+    keep_end   = np.concatenate((breaks, [len(ends) - 1]))
+    return starts[keep_start], ends[keep_end]
+
+
+def long_runs(starts, ends, min_len):
+    """Keep only the runs at least `min_len` elements long."""
+    keep = ends - starts >= min_len
+    return starts[keep], ends[keep]
@@ -0,0 +1,136 @@
+"""ascc_stub_model.py -- local stand-in for the OpenRouter chat endpoint.
+
+Answers POST /chat/completions (the only call the ASCC OCR tools make)
+with a fixed, valid chunk-extraction reply after a configurable delay,
+and can inject 429s so the retry/backoff path gets exercised. Use it to
+test and benchmark ascc_page_extract.py --workers/--rate without
+spending API credit.
+
+Usage (run from the tools/ directory):
+
+    uv run python ascc_stub_model.py --port 8765 --latency 2.0 --fail-rate 0.1
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765 OPENROUTER_API_KEY=stub \\
+        uv run python ascc_page_extract.py VA_ASCC_CTLG --workers 8 --rate 600
+
+The server prints a request count, the peak number of concurrent
+requests and the observed request rate on exit (Ctrl-C or SIGTERM).
+"""
+
+import argparse
+import json
+import random
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+STUB_REPLY = {
+    "images_above": 1,
+    "entries": [
+        {"text": "RICHMOND Va. ... 1790", "type": "LISTING"},
+    ],
+}
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.active = 0
+        self.peak = 0
+        self.first = None
+        self.last = None
+
+
+def make_handler(latency, fail_rate, stats):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            with stats.lock:
+                now = time.monotonic()
+                stats.requests += 1
+                stats.first = stats.first or now
+                stats.last = now
+                stats.active += 1
+                stats.peak = max(stats.peak, stats.active)
+                reject = random.random() < fail_rate
+                stats.rejected += reject
+            try:
+                time.sleep(latency)
+                if reject:
+                    self._reply(429, {"error": {"message": "stub rate limit"}})
+                    return
+                self._reply(200, {
+                    "id": f"stub-{stats.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps(STUB_REPLY,
+                                                  separators=(",", ":")),
+                        },
+                    }],
+                })
+            finally:
+                with stats.lock:
+                    stats.active -= 1
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Local stub for the OpenRouter chat completions endpoint.",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=1.0,
+        help="seconds each request takes. Default: 1.0.",
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0,
+        help="fraction of requests answered with HTTP 429. Default: 0.",
+    )
+    args = parser.parse_args(argv)
+
+    # Report on `kill` too, not just Ctrl-C (background jobs ignore SIGINT).
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    stats = _Stats()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port),
+        make_handler(args.latency, args.fail_rate, stats),
+    )
+    print(f"stub model: http://127.0.0.1:{args.port} "
+          f"(latency={args.latency}s, fail_rate={args.fail_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        span = (stats.last - stats.first) if stats.first else 0.0
+        rate = stats.requests / span * 60 if span else 0.0
+        print(f"requests: {stats.requests} ({stats.rejected} answered 429), "
+              f"peak concurrency: {stats.peak}, rate: {rate:.0f}/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""ascc_vision_pool.py -- bounded-concurrency executor for vision-model calls.
+
+Shared by the ASCC OCR tools (ascc_page_extract.py) so thousands of
+chunk calls can be in flight a few at a time instead of strictly one
+after another. Three pieces:
+
+    TokenBucket        process-wide calls-per-minute limiter; every HTTP
+                       request (including retries) takes one token.
+    call_with_backoff  retry transient API failures (429, 5xx, connection
+                       errors) with capped, fully-jittered exponential
+                       backoff.
+    ordered_map        run fn(item) on N worker threads; hand each result
+                       to a callback as soon as it completes (so the
+                       caller can persist it) and yield results in input
+                       order (so logs and output stay deterministic).
+
+Benchmark against ascc_stub_model.py rather than the real endpoint.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+
+DEFAULT_WORKERS   = 4
+DEFAULT_RETRIES   = 5      # retries after the first attempt
+BACKOFF_BASE_S    = 2.0    # first retry waits up to this long
+BACKOFF_CAP_S     = 60.0   # no single wait exceeds this
+
+# Failures worth retrying: rate limiting, server-side errors, and
+# connection drops / timeouts (APITimeoutError subclasses
+# APIConnectionError). Anything else (bad request, auth) is permanent.
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+)
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting + retry
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket: `per_minute` calls per minute on average,
+    with bursts of up to `burst` calls after an idle spell. acquire()
+    blocks until a token is available."""
+
+    def __init__(self, per_minute, burst=None):
+        assert per_minute > 0, f"per_minute must be positive: {per_minute!r}"
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, per_minute // 60))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._stamp) * self.rate
+                )
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_S, cap=BACKOFF_CAP_S):
+    """Full-jitter delay before retry number `attempt` (0-based): uniform
+    in [0, min(cap, base * 2**attempt)], so concurrent workers that hit
+    the same 429 do not all come back at once."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_backoff(fn, limiter=None, retries=DEFAULT_RETRIES, label=""):
+    """Call fn() (one HTTP request), taking a limiter token per attempt
+    and retrying TRANSIENT_ERRORS up to `retries` times. The last
+    failure propagates unchanged."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except TRANSIENT_ERRORS as e:
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"    {label + ': ' if label else ''}{type(e).__name__}, "
+                  f"retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Ordered thread-pool map
+# ---------------------------------------------------------------------------
+
+def ordered_map(fn, items, workers=DEFAULT_WORKERS, on_done=None):
+    """Run fn(item) for every item on `workers` threads.
+
+    on_done(item, result) runs on the calling thread as each call
+    succeeds, in completion order -- persist results there so a crash
+    loses only what is still in flight. The generator yields
+    (item, result, error) in input order; error is None on success.
+
+    The first failure stops the run: queued items are cancelled (and
+    never yielded), calls already in flight are allowed to finish and
+    are still passed to on_done and yielded.
+    """
+    items = list(items)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = [pool.submit(fn, item) for item in items]
+    position = {fut: i for i, fut in enumerate(futures)}
+    finished = {}
+    next_i = 0
+    try:
+        for fut in as_completed(futures):
+            if fut.cancelled():
+                continue
+            i = position[fut]
+            error = fut.exception()
+            result = None if error is not None else fut.result()
+            if error is None:
+                if on_done is not None:
+                    on_done(items[i], result)
+            else:
+                for other in futures:
+                    other.cancel()
+            finished[i] = (result, error)
+            while next_i < len(items):
+                if next_i in finished:
+                    yield (items[next_i], *finished.pop(next_i))
+                elif not futures[next_i].cancelled():
+                    break
+                next_i += 1
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -13,6 +13,8 @@ uv sync --no-dev --frozen
 
 echo "[2/4] Running migrations..."
 uv run python backend/manage.py migrate --noinput
+# Idempotent: creates the database cache table (CACHES in woco/settings.py) if missing.
+uv run python backend/manage.py createcachetable
 
 echo "[3/4] Building frontend (creates frontend/dist/)..."
 # Load frontend/.env if present (not in git; create on server or set env vars in host dashboard).
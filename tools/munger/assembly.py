@@ -41,18 +41,22 @@ def resolve_effective_shape(row):
     # Priority: paren-body shape code > Default Shape column > catalog-wide SL.
     # Manuscript-section rows always return None -- they carry no stamped shape.
     # Returns (effective_code_upper_or_None, source_label).
+    return effective_shape(row.get('is_manuscript_section'), row['parsed_sizes'], row.get('Default Shape'))
+
+def effective_shape(is_manuscript_section, parsed_sizes, default):
+    # resolve_effective_shape on one row's is_manuscript_section,
+    # parsed_sizes and Default Shape cell.
 
     # Manuscript rows carry no shape attribute; shape_id will be null in output.
-    if row.get('is_manuscript_section'):
+    if is_manuscript_section:
         return None, 'manuscript_no_shape'
 
     # 1. Paren-body shape (from parsed_sizes -- use first non-None)
-    for s in row['parsed_sizes']:
+    for s in parsed_sizes:
         if s.get('size_shape_code'):
             return s['size_shape_code'].upper(), 'paren_body'
 
     # 2. Section-level Default Shape
-    default = row.get('Default Shape')
     if pd.notna(default) and str(default).strip():
         ds = str(default).strip().upper()
         name_to_code = {
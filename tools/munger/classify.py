@@ -8,11 +8,19 @@ _MS_TRUTHY = {'1', 'true', 'yes', 'y', 't'}
 
 def _csv_manuscript_truthy(row):
     """True if the optional Manuscript column is present and truthy for this row."""
-    val = row.get('Manuscript')
+    return _manuscript_value_truthy(row.get('Manuscript'))
+
+def _manuscript_value_truthy(val):
     if val is None or (isinstance(val, float) and pd.isna(val)):
         return False
     return str(val).strip().lower() in _MS_TRUTHY
 
+def csv_manuscript_flags(frame):
+    """_csv_manuscript_truthy for every row of `frame`, as a list of bools."""
+    if 'Manuscript' not in frame.columns:
+        return [False] * len(frame)
+    return [_manuscript_value_truthy(val) for val in frame['Manuscript']]
+
 RELATIONSHIP_PATTERN = re.compile(
     r'^\+?'
     r'(?:'
@@ -52,36 +60,51 @@ TRAILING_VALUE_PATTERN = re.compile(
     r')\s*$'
 )
 
+ANATOMY_PATTERNS = {
+    'semicolon_paren': re.compile(r'\([^)]*;[^)]*\)'),
+    'four_digit_year': re.compile(r'\b1[78]\d{2}\b'),
+    'decade_ref': re.compile(r"1[78]\d0['\'s]"),
+    'c_year': re.compile(r'\bc1[78]\d{2}\b', re.IGNORECASE),
+}
+
 def detect_structural_anatomy(text):
     """Returns a dict of which structural sub-signals are present."""
-    result = {
-        'semicolon_paren': bool(re.search(r'\([^)]*;[^)]*\)', text)),
-        'four_digit_year': bool(re.search(r'\b1[78]\d{2}\b', text)),
-        'decade_ref': bool(re.search(r"1[78]\d0['\'s]", text)),
-        'c_year': bool(re.search(r'\bc1[78]\d{2}\b', text, re.IGNORECASE)),
-    }
+    result = {name: bool(pattern.search(text)) for name, pattern in ANATOMY_PATTERNS.items()}
     result['any'] = any(result.values())
     return result
 
+def detect_structural_anatomy_columns(texts):
+    """detect_structural_anatomy over a Series of texts: one bool column per
+    sub-signal plus 'any', computed column-at-a-time."""
+    result = pd.DataFrame(
+        {name: texts.str.contains(pattern) for name, pattern in ANATOMY_PATTERNS.items()},
+        index=texts.index,
+    )
+    result['any'] = result.any(axis=1)
+    return result
+
 def classify_entry(row):
     """Apply signals in priority order. Returns (classification, confidence, reason)."""
+    return classify_signals(
+        row['s1_relationship'], row['s2_cross_ref'], row['s3_fragment'],
+        row['s4_trailing_value'], row['s5_anatomy'],
+    )
+
+def classify_signals(relationship, cross_ref, fragment, has_value, has_anatomy):
+    """classify_entry on the five signal flags of one row."""
 
     # Signal 1: relationship indicator -> auto listing
-    if row['s1_relationship']:
+    if relationship:
         return 'listing', 'high', 'relationship_indicator'
 
     # Signal 2: cross-reference
-    if row['s2_cross_ref']:
+    if cross_ref:
         return 'cross_reference', 'high', 'see_pattern'
 
-    # Signals 4+5 conjunction
-    has_value = row['s4_trailing_value']
-    has_anatomy = row['s5_anatomy']
-
     # Signal 3: fragment -- only reject if the row lacks strong listing signals.
     # A lowercase-initial entry with both trailing value and full anatomy is a
     # stylistic catalog entry (e.g. 'wmfbURG'), not a segmentation artifact.
-    if row['s3_fragment']:
+    if fragment:
         if has_value and has_anatomy:
             return 'listing', 'medium', 'fragment_with_anatomy'
         return 'non_entry', 'high', 'fragment'
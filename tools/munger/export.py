@@ -29,6 +29,17 @@ def _src_row_by(frame, key, internal_id):
         return None
     return sel.iloc[0]
 
+def _src_rows_by(frame, key):
+    """{value: first row with frame[key] == value}: _src_row_by for every
+    value in one pass. Null keys never match, as with _src_row_by."""
+    if frame is None or len(frame) == 0 or key not in frame.columns:
+        return {}
+    first = {}
+    for pos, value in enumerate(frame[key]):
+        if not pd.isna(value):
+            first.setdefault(value, pos)
+    return {value: frame.iloc[pos] for value, pos in first.items()}
+
 AUDIT_TAIL = ["created_date", "modified_date", "created_by", "modified_by"]
 
 INT_COLS = {
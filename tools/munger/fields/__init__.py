@@ -6,7 +6,7 @@ from .dates import parse_date_field, MONTHS_PAT, DATE_FIELD_RE
 from .sizes import parse_size_field, SHAPE_CODE_SET, SHAPE_CODE_PAT, SIZE_SUFFIX_PAT, SIZE_FIELD_RE
 from .rates import parse_rate_field
 from .colors import parse_color_field
-from ..classify import _csv_manuscript_truthy
+from ..classify import _manuscript_value_truthy
 
 
 RATE_FIELD_RE = re.compile(
@@ -179,8 +179,16 @@ def subparse_fields(row):
     optional per-row `Manuscript` CSV column (truthy values promote; the column
     cannot demote a paren-detected manuscript).
     """
-    fields = row['paren_fields']
-    types = row['paren_field_types']
+    return pd.Series(subparse_field_lists(row['paren_fields'], row['paren_field_types'], row.get('Manuscript')))
+
+SUBPARSE_COLUMNS = [
+    'parsed_dates', 'parsed_sizes', 'parsed_rates', 'parsed_colors',
+    'is_manuscript', 'other_fields', 'reclassified_fields',
+]
+
+def subparse_field_lists(fields, types, manuscript=None):
+    """subparse_fields on one row's paren_fields, paren_field_types and
+    Manuscript cell; returns a dict."""
 
     parsed_dates = []
     parsed_sizes = []
@@ -223,10 +231,10 @@ def subparse_fields(row):
                 other_fields.append(field)
 
     # Union the optional CSV `Manuscript` column (if present + truthy).
-    if _csv_manuscript_truthy(row):
+    if _manuscript_value_truthy(manuscript):
         is_manuscript = True
 
-    return pd.Series({
+    return {
         'parsed_dates': parsed_dates,
         'parsed_sizes': parsed_sizes,
         'parsed_rates': parsed_rates,
@@ -234,7 +242,7 @@ def subparse_fields(row):
         'is_manuscript': is_manuscript,
         'other_fields': other_fields,
         'reclassified_fields': reclassified,
-    })
+    }
 
 def _split_ms_date_token(token):
     """Split a captured ms_date_text into individual sub-tokens that
@@ -22,7 +22,11 @@ MS_SEP_AT_END = re.compile(r"[\s,/]+$")
 
 def parse_manuscript_row(row):
     """Parse a Manuscript-section LISTING row into seg_head + seg_tail + ms_date_text."""
-    text = str(row['clean_text']).strip()
+    return pd.Series(parse_manuscript_text(row['clean_text']))
+
+def parse_manuscript_text(clean_text):
+    """parse_manuscript_row on one row's clean_text; returns a dict."""
+    text = str(clean_text).strip()
 
     # 1. Pull off the trailing value as one whole token (handles slash
     #    tiers like `100/--` and `--/15.00`). The mandatory leading
@@ -58,13 +62,13 @@ def parse_manuscript_row(row):
 
     ms_date_text = ','.join(dates) if dates else None
 
-    return pd.Series({
+    return {
         'seg_head': body if body else None,
         'seg_paren': None,
         'seg_tail': seg_tail,
         'seg_error': None,
         'ms_date_text': ms_date_text,
-    })
+    }
 
 PAREN_GROUP_RE = re.compile(r'\(([^)]*)\)')
 
@@ -75,9 +79,15 @@ REL_INDICATOR_RE = re.compile(
     r')'
 )
 
+HEAD_COLUMNS = ['head_first_of_town', 'head_rel_type', 'head_name_body', 'head_annotations']
+
 def parse_head(row):
     """Extract structured components from seg_head."""
-    head = str(row['seg_head']) if pd.notna(row['seg_head']) else ''
+    return pd.Series(parse_head_text(row['seg_head'], row['s1_relationship']))
+
+def parse_head_text(seg_head, relationship):
+    """parse_head on one row's seg_head and s1_relationship; returns a dict."""
+    head = str(seg_head) if pd.notna(seg_head) else ''
 
     # 1. First-of-town marker (leading *)
     first_of_town = head.startswith('*')
@@ -91,7 +101,7 @@ def parse_head(row):
 
     # 3. Relationship indicator
     rel_type = None
-    if row['s1_relationship']:
+    if relationship:
         m = REL_INDICATOR_RE.match(head)
         if m:
             rel_type = m.group(0)
@@ -104,9 +114,9 @@ def parse_head(row):
     name_body = PAREN_GROUP_RE.sub('', head).strip()
     name_body = name_body if name_body else None
 
-    return pd.Series({
+    return {
         'head_first_of_town': first_of_town,
         'head_rel_type': rel_type,
         'head_name_body': name_body,
         'head_annotations': annotations,
-    })
+    }
@@ -0,0 +1,40 @@
+import time
+
+
+class StageTimer:
+    """Wall-clock time per pipeline stage, for ascc_data_munger --profile.
+
+    stage(name) ends the running stage and starts the next one; report()
+    ends the last stage and prints one line per stage in pipeline order.
+    A disabled timer does nothing, so main() can call it unconditionally.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.timings = []
+        self._name = None
+        self._started = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._close(now)
+        self._name, self._started = name, now
+
+    def _close(self, now):
+        if self._name is not None:
+            self.timings.append((self._name, now - self._started))
+            self._name = None
+
+    def report(self):
+        if not self.enabled:
+            return
+        self._close(time.perf_counter())
+        total = sum(seconds for _, seconds in self.timings) or 1e-9
+        width = max(len(name) for name, _ in self.timings) if self.timings else 0
+        print()
+        print('Stage timings (--profile):')
+        for name, seconds in self.timings:
+            print(f'  {name:<{width}s}  {seconds:8.3f}s  {seconds / total * 100:5.1f}%')
+        print(f'  {"total":<{width}s}  {total:8.3f}s')
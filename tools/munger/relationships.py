@@ -35,13 +35,20 @@ def resolve_relationships(listings_df):
     # Track most recent child position per parent, for sibling-walk inheritance
     last_child_pos_by_parent = {}
 
+    # Walk column values rather than listings_df.iloc[pos]: building a row
+    # Series per listing dominated this pass on full catalogs.
+    rel_types = listings_df['head_rel_type'].tolist()
+    name_bodies = listings_df['head_name_body'].tolist()
+    default_shapes = (
+        listings_df['Default Shape'].tolist() if 'Default Shape' in listings_df.columns else [None] * n
+    )
+
     for pos in range(n):
-        row = listings_df.iloc[pos]
         warnings = []
 
-        if pd.isna(row['head_rel_type']) or row['head_rel_type'] is None:
+        if pd.isna(rel_types[pos]) or rel_types[pos] is None:
             # --- Independent entry ---
-            inscription = row['head_name_body']
+            inscription = name_bodies[pos]
             if inscription is None or (isinstance(inscription, float) and pd.isna(inscription)):
                 warnings.append('independent_no_name')
                 inscription = ''
@@ -60,7 +67,7 @@ def resolve_relationships(listings_df):
             if current_parent_pos is None:
                 warnings.append('orphan_rel')
                 # Best-effort: use own name body if any
-                _nb = row['head_name_body']
+                _nb = name_bodies[pos]
                 fallback = '' if (_nb is None or (isinstance(_nb, float) and pd.isna(_nb))) else (_nb or '')
                 parent_idx[pos] = None
                 prev_sibling_idx[pos] = None
@@ -78,8 +85,8 @@ def resolve_relationships(listings_df):
                 p_inscription = resolved_inscription[current_parent_pos]
                 p_town = resolved_town[current_parent_pos]
 
-                rel = row['head_rel_type']
-                name_body = row['head_name_body']
+                rel = rel_types[pos]
+                name_body = name_bodies[pos]
 
                 if rel == 'Same' and pd.notna(name_body):
                     # Different device, same town: reconstruct inscription.
@@ -100,8 +107,7 @@ def resolve_relationships(listings_df):
                     resolved_town[pos] = p_town
 
                 # Cross-section check
-                parent_row = listings_df.iloc[current_parent_pos]
-                if row.get('Default Shape') != parent_row.get('Default Shape'):
+                if default_shapes[pos] != default_shapes[current_parent_pos]:
                     warnings.append('cross_section_parent')
 
         s7_warnings[pos] = warnings
@@ -130,30 +136,31 @@ def roll_up_catalog_text(listings_df):
         return str(v)
 
     n = len(listings_df)
+    texts = listings_df['clean_text'].tolist()
+    parents = listings_df['parent_idx'].tolist()
+    text_by_label = dict(zip(listings_df.index, texts))
 
     # Pass 1: collect every child's clean_text per parent, in catalog order.
     children_by_parent = {}  # parent_idx label -> list of clean_text
     for pos in range(n):
-        row = listings_df.iloc[pos]
-        pidx = row.get('parent_idx')
+        pidx = parents[pos]
         if pidx is None or (isinstance(pidx, float) and pd.isna(pidx)):
             continue
-        children_by_parent.setdefault(pidx, []).append(_txt(row.get('clean_text')))
+        children_by_parent.setdefault(pidx, []).append(_txt(texts[pos]))
 
     # Pass 2: emit rolled text. Children get parent + ALL siblings (incl. self,
     # incl. siblings that come after them in catalog order). Independents get
     # their own clean_text plus all of their children below.
     rolled = [None] * n
     for pos in range(n):
-        row = listings_df.iloc[pos]
-        own = _txt(row.get('clean_text'))
-        pidx = row.get('parent_idx')
+        own = _txt(texts[pos])
+        pidx = parents[pos]
         if pidx is None or (isinstance(pidx, float) and pd.isna(pidx)):
             own_label = listings_df.index[pos]
             kids = children_by_parent.get(own_label, [])
             rolled[pos] = '\n'.join([own] + list(kids))
         else:
-            parent_text = _txt(listings_df.loc[pidx, 'clean_text'])
+            parent_text = _txt(text_by_label[pidx])
             sibs = children_by_parent.get(pidx, [])
             rolled[pos] = '\n'.join([parent_text] + list(sibs))
 
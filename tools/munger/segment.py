@@ -52,19 +52,21 @@ def find_last_paren_group(text):
 
 def classify_entry_form(row):
     """Determine structural form: manuscript, semicolon_paren, simple_paren, or no_paren."""
+    return entry_form(row['clean_text'], row['s1_relationship'], row.get('is_manuscript_section'))
+
+def entry_form(text, relationship, is_manuscript_section=False):
+    """classify_entry_form on one row's clean_text / s1_relationship / is_manuscript_section."""
     # Manuscript-section rows take a dedicated parser path; see Step 0.5
     # and the parse_manuscript_row overlay cell after segmentation.
-    if row.get('is_manuscript_section'):
+    if is_manuscript_section:
         return 'manuscript'
 
-    text = row['clean_text']
-
     # Form 1: last paren group with semicolons
     if find_last_semicolon_paren(text) is not None:
         return 'semicolon_paren'
 
     # Form 2: relationship indicator + has parens (single-attribute modification)
-    if row['s1_relationship'] and '(' in text:
+    if relationship and '(' in text:
         return 'simple_paren'
 
     # Form 3: everything else
@@ -74,55 +76,61 @@ TRAILING_VALUE_RE = re.compile(
     r'(\d[\d,]*(?:\.\d+)?(?:/\d[\d,]*(?:\.\d+)?)*|---?)\s*$'
 )
 
+SEGMENT_COLUMNS = ['seg_head', 'seg_paren', 'seg_tail', 'seg_error']
+
 def segment_entry(row):
     """Split entry into head / paren_body / tail based on entry_form."""
-    text = row['clean_text']
-    form = row['entry_form']
+    return pd.Series(segment_text(row['clean_text'], row['entry_form']))
 
+def segment_text(text, form):
+    """segment_entry on one row's clean_text and entry_form; returns a dict."""
     # Manuscript-section rows are handled by parse_manuscript_row in the
     # next cell (overlay). Emit empty placeholders here so the column
     # shape matches the standard branches.
     if form == 'manuscript':
-        return pd.Series({'seg_head': None, 'seg_paren': None, 'seg_tail': None,
-                          'seg_error': None})
+        return {'seg_head': None, 'seg_paren': None, 'seg_tail': None,
+                'seg_error': None}
 
     if form == 'semicolon_paren':
         bounds = find_last_semicolon_paren(text)
         if bounds is None:
-            return pd.Series({'seg_head': text, 'seg_paren': None, 'seg_tail': None,
-                              'seg_error': 'semicolon_paren but no match'})
+            return {'seg_head': text, 'seg_paren': None, 'seg_tail': None,
+                    'seg_error': 'semicolon_paren but no match'}
         open_pos, close_pos = bounds
         head = text[:open_pos].strip()
         paren_body = text[open_pos + 1:close_pos]
         tail = text[close_pos + 1:].strip()
-        return pd.Series({'seg_head': head, 'seg_paren': paren_body,
-                          'seg_tail': tail, 'seg_error': None})
+        return {'seg_head': head, 'seg_paren': paren_body,
+                'seg_tail': tail, 'seg_error': None}
 
     elif form == 'simple_paren':
         bounds = find_last_paren_group(text)
         if bounds is None:
-            return pd.Series({'seg_head': text, 'seg_paren': None, 'seg_tail': None,
-                              'seg_error': 'simple_paren but no paren found'})
+            return {'seg_head': text, 'seg_paren': None, 'seg_tail': None,
+                    'seg_error': 'simple_paren but no paren found'}
         open_pos, close_pos = bounds
         head = text[:open_pos].strip()
         paren_body = text[open_pos + 1:close_pos]
         tail = text[close_pos + 1:].strip()
-        return pd.Series({'seg_head': head, 'seg_paren': paren_body,
-                          'seg_tail': tail, 'seg_error': None})
+        return {'seg_head': head, 'seg_paren': paren_body,
+                'seg_tail': tail, 'seg_error': None}
 
     else:  # no_paren
         m = TRAILING_VALUE_RE.search(text)
         if m is None:
-            return pd.Series({'seg_head': text, 'seg_paren': None, 'seg_tail': None,
-                              'seg_error': 'no_paren but no trailing value'})
+            return {'seg_head': text, 'seg_paren': None, 'seg_tail': None,
+                    'seg_error': 'no_paren but no trailing value'}
         tail = m.group(1)
         head = text[:m.start()].strip()
-        return pd.Series({'seg_head': head, 'seg_paren': None,
-                          'seg_tail': tail, 'seg_error': None})
+        return {'seg_head': head, 'seg_paren': None,
+                'seg_tail': tail, 'seg_error': None}
 
 def split_paren_fields(row):
     """Split seg_paren on semicolons into positional list."""
-    paren = row['seg_paren']
+    return split_paren_text(row['seg_paren'])
+
+def split_paren_text(paren):
+    """split_paren_fields on one seg_paren value."""
     if paren is None or (isinstance(paren, float) and pd.isna(paren)):
         return []
     fields = [f.strip() for f in paren.split(';')]
@@ -136,38 +144,41 @@ TAIL_VALUE_RE = re.compile(
     r')\s*$'
 )
 
+TAIL_COLUMNS = ['tail_annotation', 'tail_valuation', 'tail_error']
+
 def decompose_tail(row):
     """Split seg_tail into annotation (nullable) and valuation."""
-    tail = row['seg_tail']
-    form = row['entry_form']
+    return pd.Series(decompose_tail_text(row['seg_tail'], row['entry_form']))
 
+def decompose_tail_text(tail, form):
+    """decompose_tail on one row's seg_tail and entry_form; returns a dict."""
     if tail is None or (isinstance(tail, float) and pd.isna(tail)) or tail.strip() == '':
-        return pd.Series({'tail_annotation': None, 'tail_valuation': None,
-                          'tail_error': 'empty tail'})
+        return {'tail_annotation': None, 'tail_valuation': None,
+                'tail_error': 'empty tail'}
 
     tail = tail.strip()
 
     # For no_paren, Step 2 already isolated the valuation
     if form == 'no_paren':
-        return pd.Series({'tail_annotation': None, 'tail_valuation': tail,
-                          'tail_error': None})
+        return {'tail_annotation': None, 'tail_valuation': tail,
+                'tail_error': None}
 
     # For paren forms, split on trailing value
     m = TAIL_VALUE_RE.search(tail)
     if m is None:
-        return pd.Series({'tail_annotation': tail if tail else None,
-                          'tail_valuation': None,
-                          'tail_error': 'no valuation found in tail'})
+        return {'tail_annotation': tail if tail else None,
+                'tail_valuation': None,
+                'tail_error': 'no valuation found in tail'}
 
     valuation = m.group(1)
     annotation = tail[:m.start()].strip()
     if annotation in ('', '.', '*'):
         annotation = None
-    return pd.Series({
+    return {
         'tail_annotation': annotation,
         'tail_valuation': valuation,
         'tail_error': None
-    })
+    }
 
 def split_valuation_tiers(val_str):
     """Split a valuation string into positional tiers.
@@ -0,0 +1,51 @@
+"""Tests for the journal caches in ascc_cache.py.
+
+Run from tools/:
+
+    python -m unittest discover tests
+
+Several processes appending to, and compacting, one journal must not
+lose each other's entries.
+"""
+
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+
+import ascc_cache
+
+WORKERS = 4
+KEYS_PER_WORKER = 200
+
+
+def _fill(path, worker):
+    # Tiny threshold so every worker compacts many times while the
+    # others are appending.
+    ascc_cache.COMPACT_MIN_LINES = 10
+    cache = ascc_cache.load_cache(path, "model", "v1")
+    for n in range(KEYS_PER_WORKER):
+        cache.put(f"{worker}-{n}", n)
+        cache.put("shared", worker)
+
+
+class JournalCacheProcessTests(unittest.TestCase):
+    def test_concurrent_writers_keep_every_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "responses.jsonl"
+            ctx = multiprocessing.get_context("fork")
+            workers = [ctx.Process(target=_fill, args=(path, i)) for i in range(WORKERS)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.assertEqual([w.exitcode for w in workers], [0] * WORKERS)
+
+            cache = ascc_cache.load_cache(path, "model", "v1")
+            expected = {f"{i}-{n}": n for i in range(WORKERS) for n in range(KEYS_PER_WORKER)}
+            self.assertEqual({k: v for k, v in cache.responses.items() if k != "shared"}, expected)
+            self.assertIn(cache.responses["shared"], range(WORKERS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""Property tests for the vectorised run detection (ascc_runs.py).
+
+Run from tools/:
+
+    python -m unittest discover tests
+
+find_blocks, find_blank_runs, _find_fine_blank_gap and _column_candidates
+used to walk rows / columns in Python loops. The reference_* functions
+below are those loops, kept verbatim apart from taking arrays; every
+scanner must agree with its reference on seeded random pages, including
+blank, fully dark and 1-px images and gaps right at each threshold.
+"""
+
+import os
+import random
+import unittest
+
+import numpy as np
+from PIL import Image
+
+# The scanners build their API client at import; no call is ever made
+# here, so the offline stub key (see ascc_stub_model.py) is enough.
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+import ascc_image_extract as extract  # noqa: E402
+import ascc_page_processor as processor  # noqa: E402
+
+CASES = 400
+
+
+# ---------------------------------------------------------------------------
+# Reference loop implementations
+# ---------------------------------------------------------------------------
+
+def _center_dark_per_row(arr, margin, brightness_max):
+    H, W = arr.shape
+    left = int(W * margin)
+    right = int(W * (1.0 - margin))
+    return (arr[:, left:right] < brightness_max).sum(axis=1)
+
+
+def reference_find_blocks(arr):
+    margin = (1.0 - processor.CENTER_FRACTION) / 2.0
+    is_dark = (_center_dark_per_row(arr, margin, processor.DARK_BRIGHTNESS_MAX)
+               >= processor.ROW_DARK_MIN_PIXELS)
+    H = arr.shape[0]
+
+    blocks = []
+    in_block = False
+    block_start = None
+    last_dark = None
+    blank_run = processor.BLANK_RUN
+
+    for y in range(H):
+        if is_dark[y]:
+            if not in_block:
+                if blank_run >= processor.BLANK_RUN:
+                    in_block = True
+                    block_start = y
+                    last_dark = y
+            else:
+                last_dark = y
+            blank_run = 0
+        else:
+            blank_run += 1
+            if in_block and blank_run >= processor.BLANK_RUN:
+                blocks.append((block_start, last_dark))
+                in_block = False
+                block_start = None
+
+    if in_block:
+        blocks.append((block_start, last_dark))
+    return blocks
+
+
+def reference_find_blank_runs(arr):
+    margin = (1.0 - processor.CENTER_FRACTION) / 2.0
+    is_blank = (_center_dark_per_row(arr, margin, processor.DARK_BRIGHTNESS_MAX)
+                < processor.ROW_DARK_MIN_PIXELS)
+    H = arr.shape[0]
+
+    runs = []
+    run_start = None
+    for y in range(H):
+        if is_blank[y]:
+            if run_start is None:
+                run_start = y
+        else:
+            if run_start is not None:
+                if y - run_start >= processor.BLANK_RUN:
+                    runs.append((run_start, y))
+                run_start = None
+    if run_start is not None and H - run_start >= processor.BLANK_RUN:
+        runs.append((run_start, H))
+    return runs
+
+
+def reference_find_fine_blank_gap(arr, y0, y1, min_gap_rows=2, skip_top_rows=20):
+    crop = arr[y0:y1 + 1]
+    is_blank = (_center_dark_per_row(crop, 0.05, extract.COL_DARK_BRIGHTNESS_MAX)
+                < extract.COL_DARK_MIN_PIXELS)
+
+    run_start = None
+    for y in range(crop.shape[0]):
+        if is_blank[y]:
+            if run_start is None:
+                run_start = y
+        else:
+            if run_start is not None:
+                length = y - run_start
+                if length >= min_gap_rows and run_start >= skip_top_rows:
+                    return (y0 + run_start, y0 + y)
+                run_start = None
+    return None
+
+
+def reference_column_candidates(is_dark, y_start, y_stop, W):
+    strip = is_dark[y_start:y_stop, :]
+    has_content = strip.sum(axis=0) >= extract.COL_DARK_MIN_PIXELS
+
+    raw_runs = []
+    in_run = False
+    start = None
+    for x in range(W):
+        if has_content[x]:
+            if not in_run:
+                in_run = True
+                start = x
+        else:
+            if in_run:
+                raw_runs.append([start, x - 1])
+                in_run = False
+    if in_run:
+        raw_runs.append([start, W - 1])
+
+    pre_filtered = []
+    for r in raw_runs:
+        width = r[1] - r[0] + 1
+        at_edge = (r[0] < extract.EDGE_ZONE_PX) or (r[1] >= W - extract.EDGE_ZONE_PX)
+        if at_edge and width < extract.MIN_MARKING_WIDTH:
+            continue
+        pre_filtered.append(r)
+
+    merged = []
+    for r in pre_filtered:
+        if merged and r[0] - merged[-1][1] - 1 <= extract.MERGE_GAP_MAX:
+            merged[-1][1] = r[1]
+        else:
+            merged.append([r[0], r[1]])
+    return [r for r in merged if r[1] - r[0] + 1 >= extract.MIN_MARKING_WIDTH]
+
+
+# ---------------------------------------------------------------------------
+# Random pages
+# ---------------------------------------------------------------------------
+
+def _random_page(rng):
+    """A grayscale page of alternating bands: blank rows, rows with one
+    dark pixel (still blank) and dark rows. Band heights cluster around
+    the BLANK_RUN / min_gap thresholds; pixel values straddle the
+    brightness cut-off."""
+    shape = rng.choice(["normal", "normal", "normal", "blank", "dark", "thin"])
+    H = rng.randint(1, 4) if shape == "thin" else rng.randint(1, 160)
+    W = rng.randint(1, 4) if shape == "thin" else rng.randint(1, 90)
+    arr = np.full((H, W), 255, dtype=np.uint8)
+    if shape == "blank":
+        return arr
+    if shape == "dark":
+        arr[:] = 0
+        return arr
+    light = processor.DARK_BRIGHTNESS_MAX
+    y = 0
+    while y < H:
+        band = min(H - y, rng.choice([1, 2, 3, 4, 5, 6, 7, rng.randint(8, 30)]))
+        kind = rng.choice(["blank", "speck", "dark"])
+        for row in range(y, y + band):
+            arr[row] = rng.choice([255, light, light + 1])
+            if kind == "speck":
+                arr[row, rng.randrange(W)] = light - 1
+            elif kind == "dark":
+                cols = rng.sample(range(W), rng.randint(1, W))
+                arr[row, cols] = rng.choice([0, light - 1])
+        y += band
+    return arr
+
+
+def _random_column_mask(rng):
+    """A dark mask whose columns form runs and gaps around EDGE_ZONE_PX,
+    MERGE_GAP_MAX and MIN_MARKING_WIDTH."""
+    H = rng.randint(1, 12)
+    W = rng.randint(1, 400)
+    mask = np.zeros((H, W), dtype=bool)
+    widths = [1, 5, extract.MIN_MARKING_WIDTH - 1, extract.MIN_MARKING_WIDTH,
+              extract.MERGE_GAP_MAX, extract.MERGE_GAP_MAX + 1, rng.randint(1, 120)]
+    x = rng.choice([0, 0, rng.randint(0, extract.EDGE_ZONE_PX + 5)])
+    while x < W:
+        width = rng.choice(widths)
+        mask[:rng.randint(0, H), x:x + width] = True  # may stay below COL_DARK_MIN_PIXELS
+        x += width + rng.choice(widths)
+    return mask
+
+
+class RunDetectionPropertyTests(unittest.TestCase):
+    def test_page_scanners_match_the_row_loops(self):
+        rng = random.Random(25)
+        for case in range(CASES):
+            arr = _random_page(rng)
+            im = Image.fromarray(arr)
+            y0 = rng.randrange(arr.shape[0])
+            y1 = rng.randrange(y0, arr.shape[0])
+            skip = rng.choice([0, 3, 20])
+            with self.subTest(case=case, shape=arr.shape):
+                self.assertEqual(processor.find_blocks(im), reference_find_blocks(arr))
+                self.assertEqual(processor.find_blank_runs(im), reference_find_blank_runs(arr))
+                self.assertEqual(
+                    extract._find_fine_blank_gap(im, y0, y1, skip_top_rows=skip),
+                    reference_find_fine_blank_gap(arr, y0, y1, skip_top_rows=skip),
+                )
+
+    def test_column_candidates_match_the_column_loop(self):
+        rng = random.Random(25)
+        for case in range(CASES):
+            mask = _random_column_mask(rng)
+            H, W = mask.shape
+            y_start = rng.randrange(H)
+            y_stop = rng.randint(y_start, H)
+            with self.subTest(case=case, shape=mask.shape):
+                self.assertEqual(
+                    extract._column_candidates(mask, y_start, y_stop, W),
+                    reference_column_candidates(mask, y_start, y_stop, W),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()